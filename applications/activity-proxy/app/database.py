@@ -15,12 +15,19 @@
 #
 
 from datetime import datetime
+import logging
 import sqlite3
+import threading
+import time
+from typing import Optional
 
 DATABASE_FILENAME = 'proxy.db'
 
 DATETIME_STRING_FORMAT = '%d.%m.%Y %H:%M:%S'
 
+# maximal time in seconds after which time of the last request is written to database
+FLUSH_INTERVAL = 5
+
 
 def init_db():
     c = sqlite3.connect(DATABASE_FILENAME)
@@ -38,9 +45,9 @@ def init_db():
         c.close()
 
 
-def update_timestamp():
+def update_timestamp(timestamp: datetime = None):
     c = sqlite3.connect(DATABASE_FILENAME)
-    current_datetime = datetime.utcnow().strftime(DATETIME_STRING_FORMAT)
+    current_datetime = (timestamp or datetime.utcnow()).strftime(DATETIME_STRING_FORMAT)
     c.execute(f"UPDATE main SET datetimestamp='{current_datetime}'")
     c.commit()
     c.close()
@@ -55,3 +62,57 @@ def get_timestamp() -> datetime:
     result = datetime.strptime(db_datetimestamp[0], DATETIME_STRING_FORMAT)
 
     return result
+
+
+class ActivityRecorder:
+    """
+    Keeps time of the last request in memory and writes it to database on a background thread, at most once
+    every flush_interval seconds. Database is shared by all worker processes of the proxy.
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._last_activity: Optional[datetime] = None
+        self._pending = False
+        self._lock = threading.Lock()
+        self._flush_thread: Optional[threading.Thread] = None
+
+    def record(self):
+        with self._lock:
+            self._last_activity = datetime.utcnow()
+            self._pending = True
+            # thread is started lazily, so it is started in a worker process and not in a parent one
+            if self._flush_thread is None:
+                self._flush_thread = threading.Thread(target=self._run, name='activity-flush', daemon=True)
+                self._flush_thread.start()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            self._pending = False
+            last_activity = self._last_activity
+        try:
+            update_timestamp(last_activity)
+        except Exception:
+            with self._lock:
+                self._pending = True
+            raise
+
+    def get_timestamp(self) -> datetime:
+        """
+        Returns time of the last request handled by any process, including a request not written to database yet.
+        """
+        stored_timestamp = get_timestamp()
+        last_activity = self._last_activity
+        if last_activity and last_activity > stored_timestamp:
+            return last_activity
+        return stored_timestamp
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logging.exception('Failed to write time of the last request.')
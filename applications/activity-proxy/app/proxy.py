@@ -14,11 +14,14 @@
 # limitations under the License.
 #
 
+from http.cookiejar import DefaultCookiePolicy
 import json
 import logging
+import os
 
 from flask import Flask, Response, request
 import requests
+from requests.adapters import HTTPAdapter
 
 import database
 from models import InactivityResponse
@@ -28,10 +31,30 @@ logging.basicConfig(level=logging.INFO)
 
 redirect_to = 'http://127.0.0.1:{}/'.format('6006')
 
+# responses of TensorBoard are streamed to a client, instead of being read whole into memory first
+STREAMING = os.environ.get('ACTIVITY_PROXY_STREAMING', 'true').lower() != 'false'
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# connections to TensorBoard are kept alive and reused by all requests handled by a process - the session is shared
+# by all clients, so it mustn't store cookies set by TensorBoard, only cookies of a client are sent with its request
+session = requests.Session()
+session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=32))
+
+activity_recorder = database.ActivityRecorder()
+
 
 database.init_db()
 
 
+def _stream_response(resp: requests.Response):
+    try:
+        for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        resp.close()
+
+
 @app.route('/', defaults={'url': ''})
 @app.route('/<path:url>')
 def proxy(url):
@@ -43,35 +66,37 @@ def proxy(url):
 
     final_url = str(redirect_to + new_url)
 
-    resp = requests.request(request.method,
-                            final_url,
-                            data=request.get_data(),
-                            headers=headers,
-                            cookies=request.cookies
-                            )
+    resp = session.request(request.method,
+                           final_url,
+                           data=request.get_data(),
+                           headers=headers,
+                           cookies=request.cookies,
+                           stream=STREAMING
+                           )
 
-    flask_resp = Response(response=resp.content, content_type=resp.headers['Content-Type'])
+    response_body = _stream_response(resp) if STREAMING else resp.content
+    flask_resp = Response(response=response_body, content_type=resp.headers.get('Content-Type'))
 
     flask_resp.status_code = resp.status_code
 
     for cookie_key, cookie_value in resp.cookies.items():
         flask_resp.set_cookie(cookie_key, value=cookie_value)
 
-    database.update_timestamp()
+    activity_recorder.record()
 
     return flask_resp
 
 
 @app.route('/inactivity')
 def inactivity():
-    timestamp = database.get_timestamp()
+    timestamp = activity_recorder.get_timestamp()
     response = InactivityResponse(last_request_datetime=timestamp)
     return Response(response=json.dumps(response.to_dict()), content_type='application/json')
 
 
 @app.route('/healthz')
 def healthz():
-    resp = requests.get(redirect_to)
+    resp = session.get(redirect_to)
     flask_response = Response()
     flask_response.status_code = resp.status_code
     return flask_response
@@ -77,3 +77,55 @@ def test_get_timestamp(mocker):
     assert fake_connection.execute.call_count == 1
     assert fake_cursor.fetchone.call_count == 1
     assert fake_connection.close.call_count == 1
+
+
+def test_update_timestamp_given_timestamp(mocker):
+    fake_connection = mocker.MagicMock()
+    mocker.patch('sqlite3.connect').return_value = fake_connection
+    database.update_timestamp(datetime(year=2018, month=7, day=26, hour=11, minute=41, second=26))
+
+    assert fake_connection.execute.call_args[0][0] == "UPDATE main SET datetimestamp='26.07.2018 11:41:26'"
+
+
+def test_activity_recorder_flush(mocker):
+    thread_mock = mocker.patch('database.threading.Thread')
+    update_mock = mocker.patch('database.update_timestamp')
+    recorder = database.ActivityRecorder()
+
+    recorder.record()
+    recorder.record()
+    recorder.flush()
+    recorder.flush()
+
+    assert thread_mock.return_value.start.call_count == 1
+    update_mock.assert_called_once_with(recorder._last_activity)
+
+
+def test_activity_recorder_flush_failure(mocker):
+    mocker.patch('database.threading.Thread')
+    update_mock = mocker.patch('database.update_timestamp')
+    update_mock.side_effect = [sqlite3.OperationalError, None]
+    recorder = database.ActivityRecorder()
+    recorder.record()
+
+    with pytest.raises(sqlite3.OperationalError):
+        recorder.flush()
+    recorder.flush()
+
+    assert update_mock.call_count == 2
+
+
+STORED_TIMESTAMP = datetime(year=2018, month=7, day=26, hour=11, minute=41, second=26)
+
+
+@pytest.mark.parametrize('last_activity,expected_timestamp', [
+    (None, STORED_TIMESTAMP),
+    (datetime(year=2018, month=7, day=26, hour=11, minute=0), STORED_TIMESTAMP),
+    (datetime(year=2018, month=7, day=26, hour=12, minute=0), datetime(year=2018, month=7, day=26, hour=12, minute=0))
+])
+def test_activity_recorder_get_timestamp(mocker, last_activity, expected_timestamp):
+    mocker.patch('database.get_timestamp').return_value = STORED_TIMESTAMP
+    recorder = database.ActivityRecorder()
+    recorder._last_activity = last_activity
+
+    assert recorder.get_timestamp() == expected_timestamp
@@ -16,7 +16,9 @@
 
 from datetime import datetime
 from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
 import json
+import threading
 from unittest.mock import MagicMock
 
 from flask.testing import FlaskClient
@@ -29,19 +31,25 @@ import database
 def flask_client(mocker):
     mocker.patch('database.init_db')
     from proxy import app
+    mocker.patch('proxy.activity_recorder', new=database.ActivityRecorder())
     client = app.test_client()
     yield client
 
 
+@pytest.mark.parametrize('streaming', [True, False])
 @pytest.mark.parametrize('url', ['/', '/random/url'])
 # noinspection PyShadowingNames
-def test_proxy(mocker, flask_client: FlaskClient, url):
+def test_proxy(mocker, flask_client: FlaskClient, url, streaming):
     fake_upstream_response = 'hello world!'
     fake_upstream_response_status_code = HTTPStatus.OK
-    mocker.patch('requests.request').return_value = MagicMock(content=fake_upstream_response.encode('utf-8'),
-                                                              headers={'Content-Type': 'text/html'},
-                                                              status_code=fake_upstream_response_status_code.value)
-    mocker.patch('database.update_timestamp')
+    fake_upstream = MagicMock(content=fake_upstream_response.encode('utf-8'),
+                              iter_content=lambda chunk_size: [b'hello ', b'world!'],
+                              headers={'Content-Type': 'text/html'},
+                              status_code=fake_upstream_response_status_code.value)
+    mocker.patch('proxy.STREAMING', new=streaming)
+    request_mock = mocker.patch('proxy.session.request')
+    request_mock.return_value = fake_upstream
+    record_mock = mocker.patch('proxy.activity_recorder.record')
 
     response = flask_client.get(url)
 
@@ -49,8 +57,53 @@ def test_proxy(mocker, flask_client: FlaskClient, url):
 
     assert response_body == 'hello world!'
     assert response.status_code == HTTPStatus.OK
-    # noinspection PyUnresolvedReferences
-    assert database.update_timestamp.call_count == 1
+    assert request_mock.call_args[1]['stream'] == streaming
+    assert fake_upstream.close.call_count == (1 if streaming else 0)
+    assert record_mock.call_count == 1
+
+
+class FakeTensorboardHandler(BaseHTTPRequestHandler):
+    """
+    Sets a cookie with a value given in a query string and returns value of a Cookie header of a request.
+    """
+    def do_GET(self):
+        body = (self.headers.get('Cookie') or '').encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        if '?' in self.path:
+            self.send_header('Set-Cookie', f'session={self.path.split("?", 1)[1]}; Path=/')
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_tensorboard(mocker):
+    server = HTTPServer(('127.0.0.1', 0), FakeTensorboardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    mocker.patch('proxy.redirect_to', new=f'http://127.0.0.1:{server.server_address[1]}/')
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+# noinspection PyShadowingNames
+def test_proxy_does_not_share_cookies_between_clients(mocker, fake_tensorboard):
+    mocker.patch('database.init_db')
+    from proxy import app
+    mocker.patch('proxy.activity_recorder.record')
+    first_client = app.test_client()
+    second_client = app.test_client()
+
+    first_client.get('/login?first-client')
+    second_client.get('/login?second-client')
+
+    assert first_client.get('/data').data.decode('utf-8') == 'session=first-client'
+    assert second_client.get('/data').data.decode('utf-8') == 'session=second-client'
+    assert app.test_client().get('/data').data.decode('utf-8') == ''
 
 
 def test_inactivity(mocker, flask_client: FlaskClient):
@@ -69,7 +122,7 @@ def test_inactivity(mocker, flask_client: FlaskClient):
 
 def test_healthz(mocker, flask_client: FlaskClient):
     fake_upstream_response_status_code = HTTPStatus.OK
-    mocker.patch('requests.get').return_value = MagicMock(status_code=fake_upstream_response_status_code.value)
+    mocker.patch('proxy.session.get').return_value = MagicMock(status_code=fake_upstream_response_status_code.value)
 
     response = flask_client.get('/healthz')
 
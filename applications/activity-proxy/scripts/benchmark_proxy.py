@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Throughput benchmark of activity proxy against a local dummy upstream serving responses of a given size.
+Compares the previous way of proxying (a new connection per request, buffered response and a database write
+per request) with buffered and streaming modes using pooled connections. Run from activity-proxy directory:
+python scripts/benchmark_proxy.py
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import logging
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from typing import Tuple
+
+import requests
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+os.chdir(tempfile.mkdtemp())  # database of the proxy is created in a current directory
+
+import database  # noqa: E402
+import proxy  # noqa: E402
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def start_upstream(response_size: int) -> HTTPServer:
+    body = b'x' * response_size
+
+    class UpstreamHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), UpstreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_proxy():
+    server = make_server('127.0.0.1', 0, proxy.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure_mode(mode: str, pooled_session: requests.Session, activity_recorder: database.ActivityRecorder):
+    if mode == 'legacy':
+        proxy.session = requests
+        proxy.STREAMING = False
+        proxy.activity_recorder = type('LegacyRecorder', (), {'record': staticmethod(database.update_timestamp)})
+    else:
+        proxy.session = pooled_session
+        proxy.STREAMING = mode == 'streaming'
+        proxy.activity_recorder = activity_recorder
+
+
+def run_benchmark(proxy_port: int, clients: int, requests_per_client: int) -> Tuple[float, int]:
+    def client_loop(_):
+        received = 0
+        with requests.Session() as session:
+            for _ in range(requests_per_client):
+                response = session.get(f'http://127.0.0.1:{proxy_port}/data/plugin/scalars/scalars?run=train')
+                assert response.status_code == 200
+                received += len(response.content)
+        return received
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        received_bytes = sum(executor.map(client_loop, range(clients)))
+    return time.perf_counter() - start, received_bytes
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Throughput benchmark of activity proxy.')
+    parser.add_argument('--clients', type=int, default=8, help='Number of concurrent clients.')
+    parser.add_argument('--requests', type=int, default=200, help='Number of requests sent by every client.')
+    parser.add_argument('--response-size', type=int, default=256 * 1024, help='Size of upstream responses [B].')
+    parser.add_argument('--modes', nargs='+', default=['legacy', 'buffered', 'streaming'],
+                        choices=['legacy', 'buffered', 'streaming'], help='Proxy modes to compare.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    upstream = start_upstream(args.response_size)
+    proxy.redirect_to = f'http://127.0.0.1:{upstream.server_port}/'
+    proxy_server = start_proxy()
+    default_session, default_recorder = proxy.session, proxy.activity_recorder
+
+    for proxy_mode in args.modes:
+        configure_mode(proxy_mode, default_session, default_recorder)
+        elapsed_time, total_bytes = run_benchmark(proxy_server.server_port, args.clients, args.requests)
+        request_count = args.clients * args.requests
+        print(f'{proxy_mode:>10}  time: {elapsed_time:8.3f} s  requests/s: {request_count / elapsed_time:9.1f}  '
+              f'MB/s: {total_bytes / elapsed_time / 2 ** 20:8.1f}')
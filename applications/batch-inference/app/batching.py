@@ -0,0 +1,157 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+from tensorflow_serving.apis import predict_pb2
+
+
+class BatchedRecord:
+    """
+    Single record of a tf-record file together with its parsed PredictRequest.
+    """
+
+    def __init__(self, label: str, request: predict_pb2.PredictRequest):
+        self.label = label
+        self.request = request
+
+    @property
+    def batch_size(self) -> int:
+        """
+        Size of the first dimension of the first input - 1 if the request has no inputs or its first input is
+        a scalar.
+        """
+        if not self.request.inputs:
+            return 1
+        dims = self.request.inputs[sorted(self.request.inputs)[0]].tensor_shape.dim
+        return dims[0].size if dims and dims[0].size > 0 else 1
+
+
+def get_batch_signature(request: predict_pb2.PredictRequest) -> Optional[tuple]:
+    """
+    Returns a signature of a request - only requests with equal signatures can be merged into one request.
+    :return: signature or None if the request cannot be merged with other requests
+    """
+    if not request.inputs:
+        return None
+
+    batch_sizes = set()
+    inputs = []
+    for key in sorted(request.inputs):
+        tensor = request.inputs[key]
+        dims = [dim.size for dim in tensor.tensor_shape.dim]
+        if not dims or dims[0] < 1 or any(size < 0 for size in dims):
+            return None
+        batch_sizes.add(dims[0])
+        inputs.append((key, tensor.dtype, tuple(dims[1:])))
+
+    # all inputs have to be split in the same way
+    if len(batch_sizes) != 1:
+        return None
+
+    return request.model_spec.SerializeToString(), tuple(request.output_filter), tuple(inputs)
+
+
+def group_into_batches(records: Iterable[BatchedRecord], batch_size: int) -> Iterator[List[BatchedRecord]]:
+    """
+    Groups consecutive records with equal signatures into batches of at most batch_size records. Order
+    of records is preserved, records which cannot be merged are returned in single-record batches.
+    """
+    batch = []
+    batch_signature = None
+
+    for record in records:
+        signature = get_batch_signature(record.request)
+        if batch and (signature is None or signature != batch_signature or len(batch) >= batch_size):
+            yield batch
+            batch = []
+        batch.append(record)
+        batch_signature = signature
+
+    if batch:
+        yield batch
+
+
+def merge_predict_requests(requests: List[predict_pb2.PredictRequest]) -> predict_pb2.PredictRequest:
+    """
+    Concatenates inputs of requests with equal signatures along the batch dimension.
+    """
+    if len(requests) == 1:
+        return requests[0]
+
+    merged_request = predict_pb2.PredictRequest()
+    merged_request.model_spec.CopyFrom(requests[0].model_spec)
+    merged_request.output_filter.extend(requests[0].output_filter)
+
+    for key in requests[0].inputs:
+        arrays = [tf.make_ndarray(request.inputs[key]) for request in requests]
+        merged_request.inputs[key].CopyFrom(tf.make_tensor_proto(np.concatenate(arrays)))
+
+    return merged_request
+
+
+def split_predict_response(response: predict_pb2.PredictResponse,
+                           batch_sizes: List[int]) -> List[predict_pb2.PredictResponse]:
+    """
+    Splits outputs of a response to a merged request into responses to requests, from which it was merged.
+    :param batch_sizes: batch sizes of merged requests
+    """
+    if len(batch_sizes) == 1:
+        return [response]
+
+    split_points = np.cumsum(batch_sizes)[:-1]
+    split_outputs = {}
+    for key in response.outputs:
+        output = tf.make_ndarray(response.outputs[key])
+        if not output.shape or output.shape[0] != sum(batch_sizes):
+            raise ValueError(f"output {key} of shape {output.shape} cannot be split into batches of "
+                             f"sizes {batch_sizes}")
+        split_outputs[key] = np.split(output, split_points)
+
+    responses = []
+    for i in range(len(batch_sizes)):
+        single_response = predict_pb2.PredictResponse()
+        single_response.model_spec.CopyFrom(response.model_spec)
+        for key, outputs in split_outputs.items():
+            single_response.outputs[key].CopyFrom(tf.make_tensor_proto(outputs[i]))
+        responses.append(single_response)
+
+    return responses
+
+
+def serialize_result(label: str, result: bytes) -> bytes:
+    """
+    Serializes a result of a record of a tf-record file as tf.train.Example with label and result features,
+    so results of a file can be stored in a tf-record file as well.
+    """
+    example = tf.train.Example(features=tf.train.Features(feature={
+        'label': tf.train.Feature(bytes_list=tf.train.BytesList(value=[label.encode('utf_8')])),
+        'result': tf.train.Feature(bytes_list=tf.train.BytesList(value=[result]))
+    }))
+    return example.SerializeToString()
+
+
+def read_results(path: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Reads results stored by serialize_result in a tf-record file.
+    :return: generator yielding tuples (label, serialized PredictResponse)
+    """
+    for string_record in tf.python_io.tf_record_iterator(path=path):
+        example = tf.train.Example.FromString(string_record)
+        yield example.features.feature['label'].bytes_list.value[0].decode('utf_8'), \
+            example.features.feature['result'].bytes_list.value[0]
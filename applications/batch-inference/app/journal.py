@@ -0,0 +1,140 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional, Set
+
+JOURNAL_FILE_NAME = '.batch_inference_journal.json'
+JOURNAL_VERSION = 1
+
+
+class ProgressJournal:
+    """
+    Records progress of batch inference in a file stored in an output directory - input files, whose results
+    were written, and numbers of records of tf-record files, whose results were written so far. Changes are
+    kept in memory and saved in batches, a file of the journal is replaced atomically, so after a crash
+    the journal contains only progress, whose results were written before it was saved.
+    """
+
+    def __init__(self, output_dir_path: str, total_files: int, flush_interval: float = 5.0, flush_every: int = 100,
+                 on_flush: Callable[[float], None] = None):
+        """
+        :param output_dir_path: directory, in which the journal is stored
+        :param total_files: number of all input files, used to calculate a progress percentage
+        :param flush_interval: maximal time in seconds between saving of changes
+        :param flush_every: maximal number of changes, which are not saved
+        :param on_flush: function called with a progress percentage every time the journal is saved
+        """
+        self.path = os.path.join(output_dir_path, JOURNAL_FILE_NAME)
+        self.total_files = total_files
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.on_flush = on_flush
+
+        self._completed_files: Set[str] = set()
+        self._record_offsets: Dict[str, int] = {}
+        self._pending_changes = 0
+        self._last_flush_time = time.monotonic()
+
+    def load(self) -> bool:
+        """
+        Loads progress saved by a previous run.
+        :return: True if the journal was found
+        """
+        if not os.path.isfile(self.path):
+            return False
+
+        with open(self.path, mode='r') as file:
+            content = json.load(file)
+
+        if content.get('version') != JOURNAL_VERSION:
+            raise RuntimeError(f"unsupported version of a journal {self.path}: {content.get('version')}")
+
+        self._completed_files = set(content['completed_files'])
+        self._record_offsets = dict(content['record_offsets'])
+        logging.debug(f"journal loaded, completed files: {len(self._completed_files)}, "
+                      f"partially completed files: {len(self._record_offsets)}")
+        return True
+
+    @property
+    def completed_files_count(self) -> int:
+        return len(self._completed_files)
+
+    @property
+    def progress_percent(self) -> float:
+        return min(self.completed_files_count / self.total_files * 100, 100) if self.total_files else 100
+
+    def is_file_completed(self, data_file: str) -> bool:
+        return data_file in self._completed_files
+
+    def get_record_offset(self, data_file: str) -> int:
+        """
+        :return: number of records of a file, whose results were written
+        """
+        return self._record_offsets.get(data_file, 0)
+
+    def mark_records_completed(self, data_file: str, record_offset: int):
+        self._record_offsets[data_file] = record_offset
+        self._pending_changes += 1
+
+    def mark_file_completed(self, data_file: str):
+        self._completed_files.add(data_file)
+        self._record_offsets.pop(data_file, None)
+        self._pending_changes += 1
+
+    def is_flush_due(self) -> bool:
+        return self._pending_changes > 0 and (self._pending_changes >= self.flush_every or
+                                              time.monotonic() - self._last_flush_time >= self.flush_interval)
+
+    def flush_if_due(self):
+        if self.is_flush_due():
+            self.flush()
+
+    def flush(self):
+        """
+        Saves the journal - results of all changes have to be written before.
+        """
+        content = {
+            'version': JOURNAL_VERSION,
+            'completed_files': sorted(self._completed_files),
+            'record_offsets': self._record_offsets
+        }
+        temporary_path = f'{self.path}.tmp'
+
+        with open(temporary_path, mode='w') as file:
+            json.dump(content, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+        _fsync_directory(os.path.dirname(self.path))
+
+        self._pending_changes = 0
+        self._last_flush_time = time.monotonic()
+
+        if self.on_flush:
+            self.on_flush(self.progress_percent)
+
+
+def _fsync_directory(path: Optional[str]):
+    # makes the replacement of a file durable
+    directory_fd = os.open(path or '.', os.O_RDONLY)
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
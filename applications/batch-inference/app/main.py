@@ -15,12 +15,15 @@
 #
 
 import argparse
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
+from itertools import islice
 import logging
 import os
-from time import sleep
-from threading import Thread
-from typing import Optional
+import queue
+from threading import BoundedSemaphore, Event, Thread
+from typing import Iterable, Iterator, List, Optional, Tuple
 import pickle
 
 from retry.api import retry_call
@@ -31,6 +34,10 @@ import grpc
 from kubernetes import config, client
 from tensorflow_serving.apis import predict_pb2, prediction_service_pb2_grpc
 
+from batching import BatchedRecord, group_into_batches, merge_predict_requests, serialize_result, \
+    split_predict_response
+from journal import ProgressJournal
+
 PROGRESS_METRIC_KEY = 'progress'
 
 API_GROUP_NAME = 'aggregator.aipg.intel.com'
@@ -40,9 +47,15 @@ RUN_VERSION = 'v1'
 LABEL_KEY = "label"
 RESULT_KEY = "result"
 
-progress = 0
-max_progress = 1
-stop_thread = False
+# number of prediction requests sent concurrently, 1 means that files are processed sequentially
+CONCURRENCY_ENV_VAR = 'BATCH_INFERENCE_CONCURRENCY'
+DEFAULT_CONCURRENCY = 1
+
+# maximal number of records of tf-record files sent in one request, 1 means that every record is sent separately
+BATCH_SIZE_ENV_VAR = 'BATCH_INFERENCE_BATCH_SIZE'
+DEFAULT_BATCH_SIZE = 1
+# results of batched requests are streamed to tf-record files with this suffix instead of a pickled list
+STREAMED_RESULTS_SUFFIX = '.result.tfrecord'
 
 log_level_env_var = os.getenv('LOG_LEVEL')
 
@@ -67,7 +80,8 @@ k8s_rest_logger.setLevel(logging.INFO)
 
 
 def do_batch_inference(server_address: str, input_dir_path: str, output_dir_path: str, related_run_name: str,
-                       input_format: str):
+                       input_format: str, concurrency: int = DEFAULT_CONCURRENCY,
+                       batch_size: int = DEFAULT_BATCH_SIZE):
     detected_files = []
 
     for root, _, files in os.walk(input_dir_path):
@@ -79,66 +93,295 @@ def do_batch_inference(server_address: str, input_dir_path: str, output_dir_path
     channel = grpc.insecure_channel(server_address)
     stub = prediction_service_pb2_grpc.PredictionServiceStub(channel)
 
-    global max_progress
-    global progress
-    max_progress = len(detected_files)
-
-    reverted_progress = try_revert_progress(related_run_name)
-    if reverted_progress:
-        logging.debug(f"new progress for processing: {progress}")
-        progress = reverted_progress
+    journal = ProgressJournal(output_dir_path=output_dir_path, total_files=len(detected_files),
+                              on_flush=publish_progress)
+    if not journal.load():
+        # progress of runs started before the journal was introduced is reverted from the progress metric
+        reverted_progress = try_revert_progress(related_run_name, max_progress=len(detected_files))
+        if reverted_progress:
+            logging.debug(f"new progress for processing: {reverted_progress}")
+            for data_file in detected_files[:reverted_progress]:
+                journal.mark_file_completed(data_file)
+        else:
+            logging.debug("no progress reverted")
+
+    files_to_process = [data_file for data_file in detected_files if not journal.is_file_completed(data_file)]
+
+    if input_format == APPLICABLE_FORMATS.TF_RECORD.value and batch_size > 1:
+        for data_file in files_to_process:
+            logging.debug(f"processing file: {data_file}")
+            do_batched_tf_record_inference(data_file=data_file, stub=stub, output_dir_path=output_dir_path,
+                                           batch_size=batch_size, concurrency=concurrency, journal=journal)
+            complete_file(journal, data_file)
+    elif concurrency > 1:
+        do_pipelined_batch_inference(stub=stub, files_to_process=files_to_process, output_dir_path=output_dir_path,
+                                     input_format=input_format, concurrency=concurrency, journal=journal)
     else:
-        logging.debug("no progress reverted")
+        for data_file in files_to_process:
+            logging.debug(f"processing file: {data_file}")
 
-    files_to_process = detected_files[progress:]
+            if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
+                output_list = []
 
-    for data_file in files_to_process:
-        logging.debug(f"processing file: {data_file}")
+                for label, data_pb in read_tf_record_file(data_file):
+                    binary_result = make_prediction(input=data_pb, stub=stub)
 
-        if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
-            record_iterator = tf.python_io.tf_record_iterator(path=data_file)
+                    output_list.append({LABEL_KEY: label, RESULT_KEY: binary_result})
 
-            id = 0
-            # if tf-record input format is chosen, results are stored in Python list containing dictionary items
-            # each item contains label (key - label) and binary object (key - result)
-            output_list = []
+                write_tf_record_results(data_file=data_file, output_dir_path=output_dir_path,
+                                        output_list=output_list)
 
-            filename, _ = os.path.splitext(data_file)
+            else:
+                with open(data_file, mode='rb') as fi:
+                    pb_bytes = fi.read()
 
-            for string_record in record_iterator:
-                example = tf.train.Example()
-                example.ParseFromString(string_record)
+                    make_prediction(input=pb_bytes,
+                                    stub=stub,
+                                    output_filename=data_file,
+                                    output_dir_path=output_dir_path)
 
-                label = example.features.feature['label'].bytes_list.value[0].decode('utf_8') \
-                    if example.features.feature.get('label') else None
+            complete_file(journal, data_file)
 
-                if not label:
-                    label = data_file
-                    if len(record_iterator) > 1:
-                        label = "{}_{}".format(filename, id)
-                        id += 1
+    journal.flush()
 
-                binary_result = make_prediction(input=example.features.feature['data_pb'].bytes_list.value[0],
-                                                stub=stub)
 
-                output_list.append({LABEL_KEY: label, RESULT_KEY: binary_result})
+def complete_file(journal: ProgressJournal, data_file: str):
+    journal.mark_file_completed(data_file)
+    journal.flush_if_due()
+    logging.info(f'progress: {journal.completed_files_count}/{journal.total_files}')
 
-            output_filename = "{}.result".format(data_file)
 
-            with open(f'{output_dir_path}/{os.path.basename(output_filename)}', mode='wb') as fi:
-                pickle.dump(obj=output_list, file=fi, protocol=pickle.HIGHEST_PROTOCOL)
+def iterate_tf_record_file(data_file: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Reads a file in tf-record format record by record.
+    :return: generator yielding tuples (label, serialized PredictRequest) - one per record
+    """
+    record_iterator = tf.python_io.tf_record_iterator(path=data_file)
+    # one record ahead is read to check whether the file contains more than one record
+    next_record = next(record_iterator, None)
+    multiple_records = False
 
-        else:
-            with open(data_file, mode='rb') as fi:
-                pb_bytes = fi.read()
+    id = 0
+    filename, _ = os.path.splitext(data_file)
+
+    while next_record is not None:
+        string_record, next_record = next_record, next(record_iterator, None)
+        multiple_records = multiple_records or next_record is not None
+
+        example = tf.train.Example()
+        example.ParseFromString(string_record)
+
+        label = example.features.feature['label'].bytes_list.value[0].decode('utf_8') \
+            if example.features.feature.get('label') else None
+
+        if not label:
+            label = data_file
+            if multiple_records:
+                label = "{}_{}".format(filename, id)
+                id += 1
+
+        yield label, example.features.feature['data_pb'].bytes_list.value[0]
+
+
+def read_tf_record_file(data_file: str) -> List[Tuple[str, bytes]]:
+    """
+    Reads a file in tf-record format.
+    :return: list of tuples (label, serialized PredictRequest) - one per record
+    """
+    return list(iterate_tf_record_file(data_file))
+
+
+def predict_batch(batch: List[BatchedRecord], stub: prediction_service_pb2_grpc.PredictionServiceStub) \
+        -> List[bytes]:
+    if len(batch) == 1:
+        # records which cannot be merged with other records are always sent alone, as they are
+        return [send_predict_request(request=batch[0].request, stub=stub)]
 
-                make_prediction(input=pb_bytes,
-                                stub=stub,
-                                output_filename=data_file,
-                                output_dir_path=output_dir_path)
+    request = merge_predict_requests([record.request for record in batch])
+    result = predict_pb2.PredictResponse.FromString(send_predict_request(request=request, stub=stub))
+    try:
+        responses = split_predict_response(result, [record.batch_size for record in batch])
+    except ValueError:
+        logging.warning(f"results of a batch cannot be split, sending {len(batch)} requests one by one",
+                        exc_info=True)
+        return [send_predict_request(request=record.request, stub=stub) for record in batch]
+
+    return [response.SerializeToString() for response in responses]
+
+
+def do_batched_tf_record_inference(data_file: str, stub: prediction_service_pb2_grpc.PredictionServiceStub,
+                                   output_dir_path: str, batch_size: int, concurrency: int = 1,
+                                   journal: ProgressJournal = None):
+    """
+    Sends records of a tf-record file merged into requests of at most batch_size records. Results are written
+    record by record to a tf-record file, so neither all records nor all results of a file are kept in memory.
+    If a journal is given, numbers of records with written results are saved in it and processing of a file
+    is resumed after the last saved record.
+    """
+    output_path = f'{output_dir_path}/{os.path.basename(data_file)}{STREAMED_RESULTS_SUFFIX}'
+    record_offset = journal.get_record_offset(data_file) if journal else 0
+    previous_output_path = f'{output_path}.previous'
+
+    if record_offset:
+        # results written after the journal was saved are dropped, tf-record files cannot be truncated
+        # or appended, so saved results are copied from a previous output file
+        if not os.path.isfile(previous_output_path):
+            if os.path.isfile(output_path):
+                os.replace(output_path, previous_output_path)
+            else:
+                logging.warning(f"results of {data_file} are missing, processing the file from the beginning")
+                record_offset = 0
+
+    records = (BatchedRecord(label=label, request=parse_predict_request(input=data_pb, filename=data_file))
+               for label, data_pb in islice(iterate_tf_record_file(data_file), record_offset, None))
+    pending_batches = deque()
+
+    def write_oldest_batch():
+        nonlocal record_offset
+        batch, results = pending_batches.popleft()
+        for record, result in zip(batch, results.result()):
+            writer.write(serialize_result(label=record.label, result=result))
+
+        record_offset += len(batch)
+        if journal:
+            journal.mark_records_completed(data_file, record_offset)
+            if journal.is_flush_due():
+                writer.flush()
+                journal.flush()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='predict') as executor, \
+            tf.python_io.TFRecordWriter(output_path) as writer:
+        if record_offset:
+            for string_record in islice(tf.python_io.tf_record_iterator(previous_output_path), record_offset):
+                writer.write(string_record)
+            writer.flush()
+            os.remove(previous_output_path)
+            logging.debug(f"processing of {data_file} resumed from record {record_offset}")
+
+        try:
+            for batch in group_into_batches(records, batch_size=batch_size):
+                if len(pending_batches) >= concurrency:
+                    write_oldest_batch()
+                pending_batches.append((batch, executor.submit(predict_batch, batch, stub)))
+
+            while pending_batches:
+                write_oldest_batch()
+        except Exception:
+            for _, results in pending_batches:
+                results.cancel()
+            raise
+
+
+def write_tf_record_results(data_file: str, output_dir_path: str, output_list: List[dict]):
+    # if tf-record input format is chosen, results are stored in Python list containing dictionary items
+    # each item contains label (key - label) and binary object (key - result)
+    output_filename = "{}.result".format(data_file)
+
+    with open(f'{output_dir_path}/{os.path.basename(output_filename)}', mode='wb') as fi:
+        pickle.dump(obj=output_list, file=fi, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def write_result(data_file: str, output_dir_path: str, result_pb_serialized: bytes):
+    with open(f'{output_dir_path}/{os.path.basename(data_file)}', mode='wb') as fi:
+        fi.write(result_pb_serialized)
+
+
+class PredictionPipeline:
+    """
+    Processes files in three stages - a reader thread reads and parses files and submits their prediction
+    requests, at most concurrency requests are sent at the same time by a thread pool, and results are
+    written in order of files by a caller of write_results.
+    """
+
+    _END_OF_FILES = object()
+
+    def __init__(self, stub: prediction_service_pb2_grpc.PredictionServiceStub, input_format: str,
+                 concurrency: int):
+        self.stub = stub
+        self.input_format = input_format
+        self.concurrency = concurrency
+        self._in_flight = BoundedSemaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='predict')
+        # files whose requests were submitted, but results were not written yet
+        self._submitted_files = queue.Queue(maxsize=concurrency)
+        self._stopped = Event()
+
+    def _predict(self, request: predict_pb2.PredictRequest) -> bytes:
+        try:
+            return send_predict_request(request=request, stub=self.stub)
+        finally:
+            self._in_flight.release()
+
+    def _submit(self, input: bytes, filename: str) -> Future:
+        request = parse_predict_request(input=input, filename=filename)
+        while not self._in_flight.acquire(timeout=1):
+            if self._stopped.is_set():
+                raise RuntimeError('prediction pipeline stopped')
+        return self._executor.submit(self._predict, request)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._submitted_files.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def read_files(self, files: Iterable[str]):
+        try:
+            for data_file in files:
+                logging.debug(f"reading file: {data_file}")
+                if self.input_format == APPLICABLE_FORMATS.TF_RECORD.value:
+                    predictions = [(label, self._submit(input=data_pb, filename=data_file))
+                                   for label, data_pb in read_tf_record_file(data_file)]
+                else:
+                    with open(data_file, mode='rb') as fi:
+                        predictions = self._submit(input=fi.read(), filename=data_file)
+                self._put((data_file, predictions))
+        except Exception as ex:
+            self._put((None, ex))
+        finally:
+            self._put((self._END_OF_FILES, None))
+
+    def write_results(self, output_dir_path: str):
+        """
+        Writes results of files in order, in which they were read.
+        :return: generator yielding names of files, whose results were written
+        """
+        while True:
+            data_file, predictions = self._submitted_files.get()
+            if data_file is self._END_OF_FILES:
+                return
+            if data_file is None:
+                raise predictions
+
+            if self.input_format == APPLICABLE_FORMATS.TF_RECORD.value:
+                output_list = [{LABEL_KEY: label, RESULT_KEY: prediction.result()}
+                               for label, prediction in predictions]
+                write_tf_record_results(data_file=data_file, output_dir_path=output_dir_path,
+                                        output_list=output_list)
+            else:
+                write_result(data_file=data_file, output_dir_path=output_dir_path,
+                             result_pb_serialized=predictions.result())
+            yield data_file
+
+    def stop(self):
+        self._stopped.set()
+        self._executor.shutdown(wait=False)
+
+
+def do_pipelined_batch_inference(stub: prediction_service_pb2_grpc.PredictionServiceStub,
+                                 files_to_process: List[str], output_dir_path: str, input_format: str,
+                                 concurrency: int, journal: ProgressJournal):
+    pipeline = PredictionPipeline(stub=stub, input_format=input_format, concurrency=concurrency)
+    reader_thread = Thread(target=pipeline.read_files, args=(files_to_process,), daemon=True)
+    reader_thread.start()
 
-        progress += 1
-        logging.info(f'progress: {progress}/{max_progress}')
+    try:
+        for data_file in pipeline.write_results(output_dir_path=output_dir_path):
+            complete_file(journal, data_file)
+    finally:
+        pipeline.stop()
 
 
 def build_label_from_filename(filename: str, id: int):
@@ -147,46 +390,46 @@ def build_label_from_filename(filename: str, id: int):
     return "{}_{}".format(name, id)
 
 
-def make_prediction(input: bytes, stub: prediction_service_pb2_grpc.PredictionServiceStub,
-                    output_filename: str = None, output_dir_path: str = None):
+def parse_predict_request(input: bytes, filename: str = None) -> predict_pb2.PredictRequest:
     request = predict_pb2.PredictRequest()
     try:
         request.ParseFromString(input)
     except Exception as ex:
-        raise RuntimeError(f"failed to parse {output_filename}") from ex
+        raise RuntimeError(f"failed to parse {filename}") from ex
+    return request
 
+
+def send_predict_request(request: predict_pb2.PredictRequest,
+                         stub: prediction_service_pb2_grpc.PredictionServiceStub) -> bytes:
     # actual call without retry:
     # result = stub.Predict(request, timeout=30.0)  # timeout 30 seconds
     result = retry_call(stub.Predict, fargs=[request], fkwargs={"timeout": 30.0}, tries=5, delay=30)
 
-    result_pb_serialized: bytes = result.SerializeToString()
+    return result.SerializeToString()
 
-    if output_filename:
-        with open(f'{output_dir_path}/{os.path.basename(output_filename)}', mode='wb') as fi:
-            fi.write(result_pb_serialized)
 
-    return result_pb_serialized
+def make_prediction(input: bytes, stub: prediction_service_pb2_grpc.PredictionServiceStub,
+                    output_filename: str = None, output_dir_path: str = None):
+    request = parse_predict_request(input=input, filename=output_filename)
 
+    result_pb_serialized: bytes = send_predict_request(request=request, stub=stub)
 
-def publish_progress():
-    logging.debug("starting publish_progress ...")
-    progress_percent = 0
-    while progress_percent != 100 and not stop_thread:
-        new_progress_percent = progress/max_progress * 100 if max_progress else 100
-        logging.debug(f"new_progress_percent: %.1f" % new_progress_percent)
-        if new_progress_percent != progress_percent:
-            progress_percent = new_progress_percent
+    if output_filename:
+        write_result(data_file=output_filename, output_dir_path=output_dir_path,
+                     result_pb_serialized=result_pb_serialized)
 
-            metrics = {
-                PROGRESS_METRIC_KEY: str("%.1f" % progress_percent)
-            }
-            logging.debug("publishing metrics ...")
-            publish(metrics)
+    return result_pb_serialized
 
-        sleep(1)
 
+def publish_progress(progress_percent: float):
+    metrics = {
+        PROGRESS_METRIC_KEY: str("%.1f" % progress_percent)
+    }
+    logging.debug("publishing metrics ...")
+    publish(metrics)
 
-def try_revert_progress(run_name: str) -> Optional[int]:
+
+def try_revert_progress(run_name: str, max_progress: int) -> Optional[int]:
     logging.debug("trying to revert progress...")
     config.load_incluster_config()
 
@@ -230,6 +473,12 @@ def main():
     parser.add_argument('--input_dir_path', type=str)
     parser.add_argument('--output_dir_path', type=str)
     parser.add_argument('--input_format', type=str)
+    parser.add_argument('--concurrency', type=int,
+                        help='number of prediction requests sent concurrently, if greater than 1 files are read '
+                             'and results are written while requests are being processed')
+    parser.add_argument('--batch_size', type=int,
+                        help='maximal number of records of tf-record files merged into one request, if greater than '
+                             f'1 results are streamed to files with {STREAMED_RESULTS_SUFFIX} suffix')
 
     args = parser.parse_args()
 
@@ -243,19 +492,16 @@ def main():
     if not os.path.isdir(input_dir_path) or len(os.listdir(input_dir_path)) == 0:
         raise RuntimeError(f"input directory: '{input_dir_path}' does not exist or is empty!")
 
-    progress_thread = Thread(target=publish_progress)
-    progress_thread.start()
+    concurrency = args.concurrency if args.concurrency else int(os.getenv(CONCURRENCY_ENV_VAR, DEFAULT_CONCURRENCY))
+    batch_size = args.batch_size if args.batch_size else int(os.getenv(BATCH_SIZE_ENV_VAR, DEFAULT_BATCH_SIZE))
 
-    try:
-        do_batch_inference(server_address=os.getenv('TENSORFLOW_MODEL_SERVER_SVC_NAME', ''),
-                           input_dir_path=input_dir_path,
-                           output_dir_path=output_dir_path,
-                           related_run_name=related_run_name,
-                           input_format=input_format)
-    except Exception:
-        global stop_thread
-        stop_thread = True
-        raise
+    do_batch_inference(server_address=os.getenv('TENSORFLOW_MODEL_SERVER_SVC_NAME', ''),
+                       input_dir_path=input_dir_path,
+                       output_dir_path=output_dir_path,
+                       related_run_name=related_run_name,
+                       input_format=input_format,
+                       concurrency=concurrency,
+                       batch_size=batch_size)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,86 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import numpy as np
+import pytest
+import tensorflow as tf
+from tensorflow_serving.apis import predict_pb2
+
+from batching import BatchedRecord, get_batch_signature, group_into_batches, merge_predict_requests, \
+    read_results, serialize_result, split_predict_response
+
+
+def _request(values, model_name: str = 'model') -> predict_pb2.PredictRequest:
+    request = predict_pb2.PredictRequest()
+    request.model_spec.name = model_name
+    request.inputs['images'].CopyFrom(tf.make_tensor_proto(np.array(values, dtype=np.float32)))
+    return request
+
+
+def test_get_batch_signature():
+    assert get_batch_signature(_request([[1, 2]])) == get_batch_signature(_request([[3, 4], [5, 6]]))
+    assert get_batch_signature(_request([[1, 2]])) != get_batch_signature(_request([[1, 2, 3]]))
+    assert get_batch_signature(_request([[1, 2]])) != get_batch_signature(_request([[1, 2]], model_name='other'))
+    assert get_batch_signature(_request(1)) is None
+    assert get_batch_signature(predict_pb2.PredictRequest()) is None
+
+
+def test_group_into_batches():
+    records = [BatchedRecord(label=str(i), request=request) for i, request in enumerate([
+        _request([[1, 2]]), _request([[1, 2]]), _request([[1, 2]]), _request([[1, 2, 3]]), _request(1),
+        _request([[1, 2, 3]])])]
+
+    batches = list(group_into_batches(records, batch_size=2))
+
+    assert [[record.label for record in batch] for batch in batches] == [['0', '1'], ['2'], ['3'], ['4'], ['5']]
+
+
+def test_batched_record_batch_size():
+    assert BatchedRecord(label='0', request=_request([[1, 2], [3, 4]])).batch_size == 2
+    assert BatchedRecord(label='1', request=_request(1)).batch_size == 1
+    assert BatchedRecord(label='2', request=predict_pb2.PredictRequest()).batch_size == 1
+
+
+def test_merge_and_split():
+    requests = [_request([[1, 2]]), _request([[3, 4], [5, 6]])]
+
+    merged_request = merge_predict_requests(requests)
+
+    assert np.array_equal(tf.make_ndarray(merged_request.inputs['images']), [[1, 2], [3, 4], [5, 6]])
+    assert merged_request.model_spec == requests[0].model_spec
+
+    response = predict_pb2.PredictResponse()
+    response.outputs['scores'].CopyFrom(merged_request.inputs['images'])
+    responses = split_predict_response(response, batch_sizes=[1, 2])
+
+    assert [tf.make_ndarray(r.outputs['scores']).tolist() for r in responses] == [[[1, 2]], [[3, 4], [5, 6]]]
+
+
+def test_split_not_batched_output():
+    response = predict_pb2.PredictResponse()
+    response.outputs['scores'].CopyFrom(tf.make_tensor_proto(np.float32(1)))
+
+    with pytest.raises(ValueError):
+        split_predict_response(response, batch_sizes=[1, 1])
+
+
+def test_serialize_and_read_results(tmpdir):
+    path = str(tmpdir.join('results.tfrecord'))
+    with tf.python_io.TFRecordWriter(path) as writer:
+        writer.write(serialize_result(label='first', result=b'a'))
+        writer.write(serialize_result(label='second', result=b'b'))
+
+    assert list(read_results(path)) == [('first', b'a'), ('second', b'b')]
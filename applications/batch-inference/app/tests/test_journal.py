@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+
+import pytest
+
+import journal
+from journal import ProgressJournal
+
+
+def test_flush_and_load(tmpdir):
+    on_flush_percents = []
+    progress_journal = ProgressJournal(output_dir_path=str(tmpdir), total_files=4, on_flush=on_flush_percents.append)
+    progress_journal.mark_file_completed('a')
+    progress_journal.mark_records_completed('b', record_offset=10)
+    progress_journal.flush()
+
+    loaded_journal = ProgressJournal(output_dir_path=str(tmpdir), total_files=4)
+
+    assert loaded_journal.load()
+    assert loaded_journal.is_file_completed('a')
+    assert not loaded_journal.is_file_completed('b')
+    assert loaded_journal.get_record_offset('b') == 10
+    assert on_flush_percents == [25.0]
+    assert tmpdir.listdir() == [tmpdir.join(journal.JOURNAL_FILE_NAME)]
+
+
+def test_load_missing_journal(tmpdir):
+    assert not ProgressJournal(output_dir_path=str(tmpdir), total_files=1).load()
+
+
+def test_load_unsupported_version(tmpdir):
+    tmpdir.join(journal.JOURNAL_FILE_NAME).write(json.dumps({'version': 1000}))
+
+    with pytest.raises(RuntimeError):
+        ProgressJournal(output_dir_path=str(tmpdir), total_files=1).load()
+
+
+def test_file_completion_removes_record_offset(tmpdir):
+    progress_journal = ProgressJournal(output_dir_path=str(tmpdir), total_files=1)
+    progress_journal.mark_records_completed('a', record_offset=10)
+    progress_journal.mark_file_completed('a')
+
+    assert progress_journal.get_record_offset('a') == 0
+    assert progress_journal.progress_percent == 100
+
+
+def test_is_flush_due(mocker, tmpdir):
+    monotonic_mock = mocker.patch('journal.time.monotonic', return_value=0)
+    progress_journal = ProgressJournal(output_dir_path=str(tmpdir), total_files=10, flush_interval=5,
+                                       flush_every=3)
+
+    assert not progress_journal.is_flush_due()
+    progress_journal.mark_file_completed('a')
+    progress_journal.mark_file_completed('b')
+    assert not progress_journal.is_flush_due()
+    progress_journal.mark_file_completed('c')
+    assert progress_journal.is_flush_due()
+
+    progress_journal.flush()
+    progress_journal.mark_file_completed('d')
+    assert not progress_journal.is_flush_due()
+    monotonic_mock.return_value = 5
+    assert progress_journal.is_flush_due()
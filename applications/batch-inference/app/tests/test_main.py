@@ -14,10 +14,21 @@
 # limitations under the License.
 #
 
+import os
+import pickle
+import threading
+import time
+from typing import List
+
+from batching import read_results, serialize_result
+from journal import ProgressJournal
 import main
 
 from grpc._channel import _Rendezvous
+import numpy as np
 import pytest
+import tensorflow as tf
+from tensorflow_serving.apis import predict_pb2
 
 
 def test_make_prediction_retrying(mocker):
@@ -64,3 +75,237 @@ def test_input_dir_is_empty(mocker):
 
     with pytest.raises(RuntimeError):
         main.main()
+
+
+class FakePredictionStub:
+    """
+    Returns a serialized input of a request as a result of a prediction and records the highest number
+    of requests processed at the same time.
+    """
+
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def Predict(self, request, timeout):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return predict_pb2.PredictResponse(model_spec=request.model_spec)
+
+
+def _predict_request(name: str) -> bytes:
+    request = predict_pb2.PredictRequest()
+    request.model_spec.name = name
+    return request.SerializeToString()
+
+
+@pytest.fixture
+def input_files(tmpdir) -> List[str]:
+    files = []
+    input_dir = tmpdir.mkdir('input')
+    for i in range(10):
+        input_file = input_dir.join(f'request-{i}.pb')
+        input_file.write_binary(_predict_request(f'model-{i}'))
+        files.append(str(input_file))
+    return files
+
+
+@pytest.mark.parametrize('concurrency', [2, 4])
+def test_pipelined_batch_inference(tmpdir, input_files, concurrency):
+    stub = FakePredictionStub()
+    output_dir = tmpdir.mkdir('output')
+    journal = ProgressJournal(output_dir_path=str(output_dir), total_files=len(input_files))
+
+    main.do_pipelined_batch_inference(stub=stub, files_to_process=input_files, output_dir_path=str(output_dir),
+                                      input_format=None, concurrency=concurrency, journal=journal)
+
+    assert journal.completed_files_count == len(input_files)
+    assert 1 < stub.max_in_flight <= concurrency
+    for i, input_file in enumerate(input_files):
+        result = predict_pb2.PredictResponse()
+        result.ParseFromString(output_dir.join(os.path.basename(input_file)).read_binary())
+        assert result.model_spec.name == f'model-{i}'
+
+
+def test_read_tf_record_file(tmpdir):
+    data_file = str(tmpdir.join('input.tfrecord'))
+    with tf.python_io.TFRecordWriter(data_file) as writer:
+        for i in range(3):
+            features = {'data_pb': tf.train.Feature(bytes_list=tf.train.BytesList(value=[_predict_request(f'{i}')]))}
+            if i == 0:
+                features['label'] = tf.train.Feature(bytes_list=tf.train.BytesList(value=[b'first']))
+            writer.write(tf.train.Example(features=tf.train.Features(feature=features)).SerializeToString())
+
+    records = main.read_tf_record_file(data_file)
+
+    assert [label for label, _ in records] == ['first', f'{data_file[:-9]}_0', f'{data_file[:-9]}_1']
+    assert records[2][1] == _predict_request('2')
+
+
+def test_pipelined_batch_inference_tf_record(mocker, tmpdir):
+    records = [(f'label-{i}', _predict_request(f'model-{i}')) for i in range(5)]
+    mocker.patch.object(main, 'read_tf_record_file').return_value = records
+    output_dir = tmpdir.mkdir('output')
+
+    main.do_pipelined_batch_inference(stub=FakePredictionStub(), files_to_process=['input.tfrecord'],
+                                      output_dir_path=str(output_dir),
+                                      input_format=main.APPLICABLE_FORMATS.TF_RECORD.value, concurrency=3,
+                                      journal=ProgressJournal(output_dir_path=str(output_dir), total_files=1))
+
+    output_list = pickle.loads(output_dir.join('input.tfrecord.result').read_binary())
+    assert [output[main.LABEL_KEY] for output in output_list] == [label for label, _ in records]
+    for output, (_, request) in zip(output_list, records):
+        assert predict_pb2.PredictResponse.FromString(output[main.RESULT_KEY]).model_spec == \
+            predict_pb2.PredictRequest.FromString(request).model_spec
+
+
+def test_pipelined_batch_inference_failure(mocker, tmpdir, input_files):
+    mocker.patch.object(main, 'send_predict_request').side_effect = [b'result', RuntimeError]
+    journal = ProgressJournal(output_dir_path=str(tmpdir), total_files=len(input_files))
+
+    with pytest.raises(RuntimeError):
+        main.do_pipelined_batch_inference(stub=FakePredictionStub(), files_to_process=input_files,
+                                          output_dir_path=str(tmpdir), input_format=None, concurrency=1,
+                                          journal=journal)
+
+    assert journal.completed_files_count == 1
+
+
+class EchoPredictionStub:
+    """
+    Returns inputs of a request as outputs and records batch sizes of received requests.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def Predict(self, request, timeout):
+        dims = request.inputs['images'].tensor_shape.dim
+        self.batch_sizes.append(dims[0].size if dims else None)
+        response = predict_pb2.PredictResponse()
+        response.outputs['images'].CopyFrom(request.inputs['images'])
+        return response
+
+
+def _images_request(images: np.ndarray) -> predict_pb2.PredictRequest:
+    request = predict_pb2.PredictRequest()
+    request.inputs['images'].CopyFrom(tf.make_tensor_proto(images))
+    return request
+
+
+def _write_tf_record_input(data_file: str, record_count: int):
+    _write_tf_record_requests(data_file, [_images_request(np.full((1, 2), i, dtype=np.float32))
+                                          for i in range(record_count)])
+
+
+def _write_tf_record_requests(data_file: str, requests: List[predict_pb2.PredictRequest]):
+    with tf.python_io.TFRecordWriter(data_file) as writer:
+        for request in requests:
+            features = {'data_pb': tf.train.Feature(bytes_list=tf.train.BytesList(
+                value=[request.SerializeToString()]))}
+            writer.write(tf.train.Example(features=tf.train.Features(feature=features)).SerializeToString())
+
+
+@pytest.mark.parametrize('concurrency', [1, 2])
+def test_batched_tf_record_inference(tmpdir, concurrency):
+    data_file = str(tmpdir.join('input.tfrecord'))
+    _write_tf_record_input(data_file, record_count=5)
+    stub = EchoPredictionStub()
+
+    main.do_batched_tf_record_inference(data_file=data_file, stub=stub, output_dir_path=str(tmpdir), batch_size=2,
+                                        concurrency=concurrency)
+
+    assert sorted(stub.batch_sizes) == [1, 2, 2]
+    results = list(read_results(data_file + main.STREAMED_RESULTS_SUFFIX))
+    assert [label for label, _ in results] == [f'{data_file[:-9]}_{i}' for i in range(5)]
+    for i, (_, result) in enumerate(results):
+        outputs = predict_pb2.PredictResponse.FromString(result).outputs['images']
+        assert tf.make_ndarray(outputs).tolist() == [[i, i]]
+
+
+def test_batched_tf_record_inference_not_batched_records(tmpdir):
+    data_file = str(tmpdir.join('input.tfrecord'))
+    requests = [_images_request(np.full((1, 2), 0, dtype=np.float32)),
+                _images_request(np.float32(1)),
+                predict_pb2.PredictRequest(),
+                _images_request(np.full((1, 2), 3, dtype=np.float32)),
+                _images_request(np.full((1, 2), 4, dtype=np.float32))]
+    _write_tf_record_requests(data_file, requests)
+    stub = EchoPredictionStub()
+
+    main.do_batched_tf_record_inference(data_file=data_file, stub=stub, output_dir_path=str(tmpdir), batch_size=2)
+
+    # scalar input and request without inputs are sent alone
+    assert stub.batch_sizes == [1, None, None, 2]
+    results = list(read_results(data_file + main.STREAMED_RESULTS_SUFFIX))
+    assert [label for label, _ in results] == [f'{data_file[:-9]}_{i}' for i in range(5)]
+    outputs = [predict_pb2.PredictResponse.FromString(result).outputs['images'] for _, result in results]
+    assert tf.make_ndarray(outputs[1]) == 1
+    assert [tf.make_ndarray(outputs[i]).tolist() for i in (0, 3, 4)] == [[[0, 0]], [[3, 3]], [[4, 4]]]
+
+
+def test_batched_tf_record_inference_resumed(tmpdir):
+    data_file = str(tmpdir.join('input.tfrecord'))
+    _write_tf_record_input(data_file, record_count=5)
+    output_dir = tmpdir.mkdir('output')
+    journal = ProgressJournal(output_dir_path=str(output_dir), total_files=1)
+    journal.mark_records_completed(data_file, record_offset=2)
+    # the third result was written after the journal was saved
+    with tf.python_io.TFRecordWriter(str(output_dir.join('input.tfrecord' + main.STREAMED_RESULTS_SUFFIX))) \
+            as writer:
+        for label in ('saved-0', 'saved-1', 'not-saved-2'):
+            writer.write(serialize_result(label=label, result=b''))
+    stub = EchoPredictionStub()
+
+    main.do_batched_tf_record_inference(data_file=data_file, stub=stub, output_dir_path=str(output_dir),
+                                        batch_size=2, journal=journal)
+
+    assert stub.batch_sizes == [2, 1]
+    results = list(read_results(str(output_dir.join('input.tfrecord' + main.STREAMED_RESULTS_SUFFIX))))
+    assert [label for label, _ in results] == ['saved-0', 'saved-1'] + [f'{data_file[:-9]}_{i}' for i in (2, 3, 4)]
+    assert journal.get_record_offset(data_file) == 5
+    assert output_dir.listdir() == [output_dir.join('input.tfrecord' + main.STREAMED_RESULTS_SUFFIX)]
+
+
+def test_batch_inference_resumed_from_journal(mocker, tmpdir, input_files):
+    output_dir = tmpdir.mkdir('output')
+    journal = ProgressJournal(output_dir_path=str(output_dir), total_files=len(input_files))
+    for input_file in input_files[:3]:
+        journal.mark_file_completed(input_file)
+    journal.flush()
+    mocker.patch.object(main.grpc, 'insecure_channel')
+    mocker.patch.object(main.prediction_service_pb2_grpc, 'PredictionServiceStub')
+    make_prediction_mock = mocker.patch.object(main, 'make_prediction')
+    try_revert_progress_mock = mocker.patch.object(main, 'try_revert_progress')
+    publish_mock = mocker.patch.object(main, 'publish')
+
+    main.do_batch_inference(server_address='', input_dir_path=str(tmpdir.join('input')),
+                            output_dir_path=str(output_dir),
+                            related_run_name='run', input_format=None)
+
+    assert [call[1]['output_filename'] for call in make_prediction_mock.call_args_list] == input_files[3:]
+    assert try_revert_progress_mock.call_count == 0
+    publish_mock.assert_called_with({main.PROGRESS_METRIC_KEY: '100.0'})
+    journal.load()
+    assert journal.completed_files_count == len(input_files)
+
+
+def test_batch_inference_progress_reverted_from_metric(mocker, tmpdir, input_files):
+    output_dir = tmpdir.mkdir('output')
+    mocker.patch.object(main.grpc, 'insecure_channel')
+    mocker.patch.object(main.prediction_service_pb2_grpc, 'PredictionServiceStub')
+    make_prediction_mock = mocker.patch.object(main, 'make_prediction')
+    mocker.patch.object(main, 'try_revert_progress').return_value = 4
+    mocker.patch.object(main, 'publish')
+
+    main.do_batch_inference(server_address='', input_dir_path=str(tmpdir.join('input')),
+                            output_dir_path=str(output_dir),
+                            related_run_name='run', input_format=None)
+
+    assert [call[1]['output_filename'] for call in make_prediction_mock.call_args_list] == input_files[4:]
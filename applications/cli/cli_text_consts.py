@@ -104,6 +104,8 @@ class CmdsCommonTexts:
     LOGS_STORING_CANCEL_MESSAGE = "Logs have not been written to the file mentioned above, cancelled by user." 
     MORE_EXP_LOGS_MESSAGE = "There is more than one log to be stored. Each log will be stored in a separate file."
     SAVING_LOGS_TO_FILE_PROGRESS_MSG = "Saving logs to a file..."
+    LOGS_COMPRESSION_NOT_AVAILABLE_ERROR = "{compression} compression is not available. Install the zstandard " \
+                                           "python package to use it."
 
 
 class VerifyCmdTexts:
@@ -193,6 +195,8 @@ class UserDeleteCmdTexts:
     USERNAME - is a name of user which should be deleted.
     """
     HELP_PR = "If this option is added, the command removes all of client's artifacts."
+    HELP_W = "If given along with the -p option, the command waits until logs of a user are deleted and displays " \
+             "a progress of their deletion. Otherwise logs are deleted in the background."
     USER_NOT_EXISTS_ERROR_MSG = "User {username} does not exist."
     USER_BEING_REMOVED_ERROR_MSG = "User is still being removed."
     USER_PRESENCE_VERIFICATION_ERROR_MSG = "Problems during verifying users presence."
@@ -213,6 +217,8 @@ class UserDeleteCmdTexts:
     DELETION_DELETING_NAMESPACE = "- Deleting user's namespace."
     DELETION_DELETING_USERS_OBJECTS = "- Deleting user's objects."
     DELETION_DELETING_USERS_EXPERIMENTS = "- Deleting user experiments' logs."
+    DELETION_WAITING_FOR_USERS_EXPERIMENTS = "- Waiting for deletion of user experiments' logs ... " \
+                                             "{deleted}/{total} log entries deleted"
     DELETION_DELETING_USERS_REPOSITORY = "- Deleting user's repository."
 
 
@@ -318,6 +324,8 @@ class PredictCancelCmdTexts:
     HELP_P = "If given, then all prediction instances-related information, completed and currently " \
              "running, is removed from the system."
     HELP_M = "If given, the command searches for prediction instances matching the value of this option."
+    HELP_W = "If given along with the -p option, the command waits until logs of purged prediction instances are " \
+             "deleted and displays a progress of their deletion. Otherwise logs are deleted in the background."
     EXPERIMENT_NAME = "prediction instance."
     EXPERIMENT_NAME_PLURAL = "prediction instances."
 
@@ -393,8 +401,11 @@ class ExperimentLogsCmdTexts:
     HELP_M = "Searches for logs from experiments matching the value of this option. Cannot be used with the " \
              "experiment_name argument. "
     HELP_O = "Stores file-named experiment logs."
-    HELP_F = "Specifies if logs should be streamed. Streams only logs from a single experiment."
+    HELP_F = "Specifies if logs should be streamed. If many experiments match, their logs are streamed together."
     HELP_PAGER = "Display logs in interactive pager."
+    HELP_SL = "Number of parallel streams used to retrieve logs. Increasing it speeds up retrieval of large logs. " \
+              "Ignored when logs are streamed."
+    HELP_C = "Compresses logs stored with the -o option, using the chosen format."
 
 
 class PredictLogsCmdTexts:
@@ -413,8 +424,12 @@ class PredictLogsCmdTexts:
     HELP_M = "If given, command searches for logs from prediction instances matching the value of this option. " \
              "This option cannot be used along with the NAME argument."
     HELP_O = "If given - logs are stored in a file with a name derived from a name of a prediction instance."
-    HELP_F = "Specify if logs should be streamed. Only logs from a single prediction instance can be streamed."
+    HELP_F = "Specify if logs should be streamed. If many prediction instances match, their logs are streamed " \
+             "together."
     HELP_PAGER = "Display logs in interactive pager."
+    HELP_SL = "Number of parallel streams used to retrieve logs. Increasing it speeds up retrieval of large logs. " \
+              "Ignored when logs are streamed."
+    HELP_C = "Compresses logs stored with the -o option, using the chosen format."
 
 
 class PredictViewCmdTexts:
@@ -471,6 +486,16 @@ class ExperimentSubmitCmdTexts:
     HELP_PS = "Values for one or several parameters."
     HELP_E = "Environment variables passed to training. You can pass as many environmental variables as desired. Each variable in such cases should be passed as a separate -e parameter."
     HELP_R = "Path to file containing an experiment's pip requirements. Dependencies listed in this file are automatically installed using pip."
+    HELP_SM = "Method of selection of experiments from all combinations of values given by -pr/-ps options. 'grid' " \
+              "submits all combinations, 'random' submits random combinations and 'lhs' submits combinations " \
+              "chosen by latin hypercube sampling. A number of combinations chosen by 'random' and 'lhs' methods " \
+              "has to be given by -mr option."
+    HELP_MR = "Number of experiments submitted by 'random' and 'lhs' sampling methods."
+    HELP_SEED = "Seed of a random number generator used by sampling methods. Given the same seed, the same " \
+                "experiments are chosen."
+    HELP_MCR = "Maximal number of experiments, which are queued or running at the same time. If given, next " \
+               "experiments are submitted when previous ones are finished, so nctl waits until all experiments " \
+               "are submitted."
     SCRIPT_NOT_FOUND_ERROR_MSG = "Cannot find: {script_location}. Make sure that provided path is correct."
     DEFAULT_SCRIPT_NOT_FOUND_ERROR_MSG = "Cannot find script: {default_script_name} in directory: " \
                                          "{script_directory}. If path to directory was passed as submit command " \
@@ -483,6 +508,9 @@ class ExperimentSubmitCmdTexts:
     SUBMIT_ERROR_MSG = "Problems during submitting experiment: {exception_message}"
     SUBMIT_OTHER_ERROR_MSG = "Other problems during submitting experiment."
     FAILED_RUNS_LOG_MSG = "There are failed runs"
+    MAX_RUNS_WITH_GRID_ERROR_MSG = "-mr/--max-runs option can be used only with 'random' and 'lhs' sampling methods."
+    SAMPLING_WITHOUT_MAX_RUNS_ERROR_MSG = "'{sampling}' sampling method requires -pr/-ps options and -mr/--max-runs " \
+                                          "option."
 
 
 class ExperimentInteractCmdTexts:
@@ -538,6 +566,8 @@ class ExperimentCancelCmdTexts:
              "from the system."
     HELP_M = "If given, command searches for experiments matching the value of this option. This option cannot be " \
              "used along with the name argument."
+    HELP_W = "If given along with the -p option, the command waits until logs of purged experiments are deleted " \
+             "and displays a progress of their deletion. Otherwise logs are deleted in the background."
     HELP_I = "Comma-separated pods IDs. If given, then matches pods by their IDs and deletes them."
     HELP_S = "One of: {available_statuses} - searches pods by their status and deletes them."
     NAME_M_BOTH_GIVEN_ERROR_MSG = "Both name and -m option cannot be given. Choose one of them."
@@ -596,8 +626,25 @@ class ExperimentCancelCmdTexts:
     CANCELING_PODS_MSG = "Deleting the pod: {pod_name} ..."
     OTHER_POD_CANCELLING_ERROR_MSG = "Error occurred during deletion of the pod."
     UNINITIALIZED_EXPERIMENT_CANCEL_MSG = "Experiment {experiment_name} has no resources submitted for creation."
-    PURGING_PROGRESS_MSG = 'Purging experiment {run_name}...'
-    PURGING_LOGS_PROGRESS_MSG = 'Purging experiment {run_name} logs...'
+    CANCELING_RUNS_PROGRESS_MSG = "Cancelling {run_count} {experiment_name_plural} ..."
+    PURGING_RUNS_PROGRESS_MSG = "Purging {run_count} {experiment_name_plural} ..."
+    DELETING_RUNS_PROGRESS_MSG = "Deleting {run_count} {experiment_name_plural} ..."
+    PURGING_LOGS_PROGRESS_MSG = "Deleting logs of {run_count} {experiment_name_plural} ..."
+    WAITING_FOR_LOGS_DELETION_MSG = "Waiting for deletion of logs ... {deleted}/{total} log entries deleted"
+    PURGING_LOGS_ERROR_MSG = "Logs of purged {experiment_name_plural} were not deleted correctly."
+
+
+class ExperimentGcCmdTexts:
+    SHORT_HELP = "Removes old local data of submitted experiments."
+    HELP = """
+    Removes local environments of experiments submitted earlier than given number of days ago, and files
+    of a workspace store, which are not used by any remaining environment.
+    """
+    HELP_O = "Minimal age in days of removed environments. Default value is 7, 0 removes all environments."
+    GC_PROGRESS_MSG = "Removing old experiments' environments..."
+    GC_ERROR_MSG = "Failed to remove old experiments' environments."
+    GC_SUCCESS_MSG = "Removed environments of {environments_count} experiments and {files_count} files " \
+                     "of workspace store ({size_mb:.2f} MB)."
 
 
 class ExperimentViewCmdTexts:
@@ -652,6 +699,7 @@ class ExperimentCommonTexts:
     ENV_CREATION_ERROR_MSG = "Problems during creation of environments."
     CONFIRM_SUBMIT_MSG = "Confirm that the following experiments should be submitted."
     CONFIRM_SUBMIT_QUESTION_MSG = "Do you want to continue?"
+    CONFIRM_SUBMIT_MORE_RUNS_MSG = "... and {run_count} more experiments ({total_run_count} in total)."
     SUBMISSION_FAIL_ERROR_MSG = "Your Experiment submission failed. Use the verbose option to get more " \
                                 "detailed information about failure's cause."
     PROXY_CLOSE_ERROR_MSG = "Docker proxy has not been closed correctly. Check if it still exists. If yes, close " \
@@ -675,7 +723,10 @@ class ExperimentCommonTexts:
     PREPARING_RESOURCE_DEFINITIONS_MSG = "Preparing resources' definitions..."
     CLUSTER_CONNECTION_MSG = "Connecting to the cluster..."
     CREATING_ENVIRONMENT_MSG = "Creating {run_name} environment..."
+    CREATING_ENVIRONMENTS_MSG = "Creating environments of {run_count} experiments..."
+    RUNS_ENV_CREATION_ERROR_MSG = "Problems during creation of environments.\n{run_errors}"
     CREATING_RESOURCES_MSG = "Creating {run_name} resources..."
+    WAITING_FOR_RUN_SLOTS_MSG = "Waiting until less than {max_concurrent_runs} experiments are queued or running..."
     CLUSTER_CONNECTION_CLOSING_MSG = "Closing tunnel to the cluster..."
     INCORRECT_TEMPLATE_NAME = "Incorrect template name."
     INCORRECT_ENV_PARAMETER = "-e/--env option must be in <KEY>=<VALUE> format."
@@ -17,7 +17,7 @@
 
 from collections import namedtuple
 from sys import exit
-from typing import List
+from typing import List, Dict, Tuple
 
 import click
 from tabulate import tabulate
@@ -160,9 +160,10 @@ def replace_initializing_runs(run_list: List[Run]):
     """
     initializing_experiments: set = set()
     ret_list = []
+    experiments = get_experiments_of_runs(run_list)
     for run in run_list:
         exp_name = run.experiment_name
-        experiment = Experiment.get(name=exp_name, namespace=run.namespace)
+        experiment = experiments.get((run.namespace, exp_name))
         if (run.state is None or run.state == '') and exp_name not in initializing_experiments:
             ret_list.append(create_fake_run(experiment))
             initializing_experiments.add(exp_name)
@@ -176,6 +177,21 @@ def replace_initializing_runs(run_list: List[Run]):
     return ret_list
 
 
+def get_experiments_of_runs(run_list: List[Run]) -> Dict[Tuple[str, str], Experiment]:
+    """
+    Retrieves experiments to which given runs belong, using a single list request instead of getting
+    each experiment separately. If all runs are in the same namespace - only this namespace is listed.
+    :param run_list: list of runs
+    :return: dictionary of experiments with (namespace, experiment name) tuples as keys
+    """
+    if not run_list:
+        return {}
+    namespaces = {run.namespace for run in run_list}
+    namespace = namespaces.pop() if len(namespaces) == 1 else None
+    return {(experiment.namespace, experiment.name): experiment
+            for experiment in Experiment.list(namespace=namespace)}
+
+
 def create_fake_run(experiment: Experiment) -> Run:
     return Run(name=experiment.name, experiment_name=experiment.name, metrics={},
                parameters=experiment.parameters_spec, pod_count=0,
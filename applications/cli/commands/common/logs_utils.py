@@ -15,9 +15,13 @@
 #
 
 
+from functools import lru_cache
+import gzip
+from itertools import islice
 import os
+import re
 from sys import exit
-from typing import List, Generator
+from typing import List, Generator, Iterable, IO
 
 import click
 import dateutil.parser
@@ -34,10 +38,21 @@ from util.system import handle_error
 
 logger = initialize_logger(__name__)
 
+# Number of formatted log lines written at once to stdout or to a file
+LOGS_WRITE_BATCH_SIZE = 1000
+# Size of a buffer used when writing logs to a file
+LOGS_FILE_BUFFER_SIZE = 1024 * 1024
+
+LOGS_FILE_COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Fluentd stores @timestamp in fixed ISO 8601 format, e.g. 2018-04-17T09:28:39.123456789+00:00
+FLUENTD_TIMESTAMP_REGEX = re.compile(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.\d+)?(Z|[+-]\d{2}:\d{2})?$')
+
 
 def get_logs(experiment_name: str, min_severity: SeverityLevel, start_date: str,
              end_date: str, pod_ids: str, pod_status: PodStatus, match: str, output: bool,
-             pager: bool, follow: bool, runs_kinds: List[RunKinds], instance_type: str):
+             pager: bool, follow: bool, runs_kinds: List[RunKinds], instance_type: str, slices: int = 1,
+             compression: str = None):
     """
     Show logs for a given experiment.
     """
@@ -67,20 +82,29 @@ def get_logs(experiment_name: str, min_severity: SeverityLevel, start_date: str,
         follow_logs = True if follow and not output else False
         if output and len(runs) > 1:
             click.echo(Texts.MORE_EXP_LOGS_MESSAGE)
+        if follow_logs and len(runs) > 1:
+            # logs of all matching runs are followed as a single stream
+            runs_logs_generator = es_client.get_experiments_stream_logs_generator(runs=runs, namespace=namespace,
+                                                                                  min_severity=min_severity,
+                                                                                  start_date=start_date,
+                                                                                  end_date=end_date, pod_ids=pod_ids,
+                                                                                  pod_status=pod_status)
+            print_logs(run_logs_generator=runs_logs_generator, pager=pager, follow=True)
+            return
         for run in runs:
             start_date = start_date if start_date else run.creation_timestamp
             run_logs_generator = es_client.get_experiment_logs_generator(run=run, namespace=namespace,
                                                                          min_severity=min_severity,
                                                                          start_date=start_date, end_date=end_date,
                                                                          pod_ids=pod_ids, pod_status=pod_status,
-                                                                         follow=follow_logs)
+                                                                         follow=follow_logs, slices=slices)
             if output:
                 save_logs_to_file(logs_generator=run_logs_generator, instance_name=run.name,
-                                  instance_type=instance_type)
+                                  instance_type=instance_type, compression=compression)
             else:
                 if len(runs) > 1:
                     click.echo(f'Experiment : {run.name}')
-                print_logs(run_logs_generator=run_logs_generator, pager=pager)
+                print_logs(run_logs_generator=run_logs_generator, pager=pager, follow=follow_logs)
     except ValueError:
         handle_error(logger, Texts.EXPERIMENT_NOT_EXISTS_ERROR_MSG.format(experiment_name=experiment_name,
                                                                           instance_type=instance_type.capitalize()),
@@ -93,32 +117,72 @@ def get_logs(experiment_name: str, min_severity: SeverityLevel, start_date: str,
         exit(1)
 
 
-def format_log_date(date: str):
+def parse_and_format_log_date(date: str) -> str:
     log_date = dateutil.parser.parse(date)
     log_date = log_date.replace(microsecond=0)
     formatted_date = log_date.isoformat()
     return formatted_date
 
 
-def print_logs(run_logs_generator: Generator[LogEntry, None, None], pager=False):
-    def formatted_logs():
-        for log_entry in run_logs_generator:
-            if not log_entry.content.isspace():
-                formatted_date = format_log_date(log_entry.date)
-                yield f'{formatted_date} {log_entry.pod_name} {log_entry.content}'
+@lru_cache(maxsize=4096)
+def format_whole_second_log_date(date: str) -> str:
+    return parse_and_format_log_date(date)
+
+
+def format_log_date(date: str) -> str:
+    # Fractions of seconds are dropped from formatted date, so dates in Fluentd format can be formatted
+    # once per second, instead of parsing date of every log entry.
+    match = FLUENTD_TIMESTAMP_REGEX.match(date)
+    if match:
+        return format_whole_second_log_date(match.group(1) + (match.group(2) or ''))
+    return parse_and_format_log_date(date)
+
+
+def format_logs(logs_generator: Iterable[LogEntry]) -> Generator[str, None, None]:
+    for log_entry in logs_generator:
+        if not log_entry.content.isspace():
+            formatted_date = format_log_date(log_entry.date)
+            yield f'{formatted_date} {log_entry.pod_name} {log_entry.content}'
+
 
+def batch_formatted_logs(logs_generator: Iterable[LogEntry],
+                         batch_size: int = LOGS_WRITE_BATCH_SIZE) -> Generator[str, None, None]:
+    """
+    Yields formatted logs joined in chunks of batch_size lines.
+    """
+    formatted_logs = format_logs(logs_generator)
+    while True:
+        batch = ''.join(islice(formatted_logs, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def print_logs(run_logs_generator: Generator[LogEntry, None, None], pager=False, follow=False):
     if pager:
         # set -K option for less, so ^C will be respected
         os.environ['LESS'] = os.environ.get('LESS', '') + ' -K'
-        click.echo_via_pager(formatted_logs)  # type: ignore
+        click.echo_via_pager(format_logs(run_logs_generator))
     else:
-        for formatted_log in formatted_logs():
-            click.echo(formatted_log, nl=False)
+        # Streamed logs are printed without batching - otherwise they would be printed with a delay
+        batch_size = 1 if follow else LOGS_WRITE_BATCH_SIZE
+        for logs_batch in batch_formatted_logs(run_logs_generator, batch_size=batch_size):
+            click.echo(logs_batch, nl=False)
+
+
+def open_logs_file(filename: str, compression: str = None) -> IO[str]:
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt')
+    elif compression == 'zstd':
+        # zstandard is an optional dependency, needed only when zstd compression is chosen
+        import zstandard
+        return zstandard.open(filename, 'wt')
+    return open(filename, 'w', buffering=LOGS_FILE_BUFFER_SIZE)
 
 
 def save_logs_to_file(logs_generator: Generator[LogEntry, None, None], instance_name: str,
-                      instance_type: str):
-    filename = instance_name + ".log"
+                      instance_type: str, compression: str = None):
+    filename = instance_name + ".log" + LOGS_FILE_COMPRESSIONS.get(compression, '')  # type: ignore
     confirmation_message = Texts.LOGS_STORING_CONF.format(filename=filename,
                                                           instance_name=instance_name,
                                                           instance_type=instance_type)
@@ -129,13 +193,16 @@ def save_logs_to_file(logs_generator: Generator[LogEntry, None, None], instance_
 
     if click.get_current_context().obj.force or click.confirm(confirmation_message, default=True):
         try:
-            with open(filename, 'w') as file, spinner(spinner=NctlSpinner,
-                                                      text=Texts.SAVING_LOGS_TO_FILE_PROGRESS_MSG, color=SPINNER_COLOR):
-                for log_entry in logs_generator:
-                    if not log_entry.content.isspace():
-                        formatted_date = format_log_date(log_entry.date)
-                        file.write(f'{formatted_date} {log_entry.pod_name} {log_entry.content}')
+            with open_logs_file(filename, compression=compression) as file, \
+                    spinner(spinner=NctlSpinner, text=Texts.SAVING_LOGS_TO_FILE_PROGRESS_MSG, color=SPINNER_COLOR):
+                for logs_batch in batch_formatted_logs(logs_generator):
+                    file.write(logs_batch)
             click.echo(Texts.LOGS_STORING_FINAL_MESSAGE)
+        except ImportError:
+            handle_error(logger,
+                         Texts.LOGS_COMPRESSION_NOT_AVAILABLE_ERROR.format(compression=compression),
+                         Texts.LOGS_COMPRESSION_NOT_AVAILABLE_ERROR.format(compression=compression))
+            exit(1)
         except Exception:
             handle_error(logger,
                          Texts.LOGS_STORING_ERROR,
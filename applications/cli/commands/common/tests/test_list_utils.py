@@ -110,7 +110,7 @@ def test_list_unitialized_experiments_in_cli_one_row(mocker, capsys):
 def test_list_experiments_success(mocker):
     api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
     api_list_runs_mock.return_value = TEST_RUNS
-    mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
+    mocker.patch("commands.common.list_utils.Experiment.list", return_value=[TEST_EXPERIMENT])
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
 
     list_utils.list_runs_in_cli(verbosity_lvl=0, all_users=False, name="", status=None, listed_runs_kinds=[],
@@ -124,7 +124,7 @@ def test_list_experiments_all_users_success(mocker):
     api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
     api_list_runs_mock.return_value = TEST_RUNS
 
-    mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
+    mocker.patch("commands.common.list_utils.Experiment.list", return_value=[TEST_EXPERIMENT])
 
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
 
@@ -155,7 +155,7 @@ def test_list_experiments_one_user_success(mocker, capsys):
     api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
     mocker.patch("dateutil.tz.tzlocal").return_value = dateutil.tz.UTC
     api_list_runs_mock.return_value = TEST_RUNS
-    mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
+    mocker.patch("commands.common.list_utils.Experiment.list", return_value=[TEST_EXPERIMENT])
 
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
 
@@ -178,7 +178,7 @@ def test_list_experiments_brief_success(mocker, capsys):
     api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
     api_list_runs_mock.return_value = TEST_RUNS
 
-    mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
+    mocker.patch("commands.common.list_utils.Experiment.list", return_value=[TEST_EXPERIMENT])
 
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
 
@@ -198,11 +198,49 @@ def test_create_fake_run():
 
 
 def test_replace_initalizing_runs_no_changes(mocker):
-    mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
+    list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list", return_value=[TEST_EXPERIMENT])
     assert len(list_utils.replace_initializing_runs(TEST_RUNS)) == 2
+    list_experiments_mock.assert_called_once_with(namespace=None)
 
 
 def test_replace_initializing_runs_two_not_ready(mocker):
-    get_experiment_mock = mocker.patch("commands.common.list_utils.Experiment.get", return_value=TEST_EXPERIMENT)
-    assert len(list_utils.replace_initializing_runs(TEST_RUNS_CREATING)) == 5
-    assert get_experiment_mock.call_count == 6
+    experiments = [Experiment(name=run.experiment_name, parameters_spec=["param1"], namespace=run.namespace,
+                              creation_timestamp="2018-05-08T13:05:04Z", template_name="template_name",
+                              template_namespace="template_namespace", template_version="1.0.1")
+                   for run in TEST_RUNS_CREATING]
+    list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list", return_value=experiments)
+    mocker.patch("commands.common.list_utils.Experiment.get")
+
+    runs = list_utils.replace_initializing_runs(TEST_RUNS_CREATING)
+
+    assert len(runs) == 5
+    assert list_experiments_mock.call_count == 1
+    assert list_utils.Experiment.get.call_count == 0
+    assert all(run.template_version == "1.0.1" for run in runs)
+
+
+def test_replace_initializing_runs_single_namespace(mocker):
+    list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list", return_value=[TEST_EXPERIMENT])
+    run = Run(name='test-experiment', experiment_name='test-experiment', metrics={}, parameters=['param1'],
+              pod_count=0, pod_selector={}, state=RunStatus.RUNNING, namespace='submitter')
+
+    runs = list_utils.replace_initializing_runs([run])
+
+    list_experiments_mock.assert_called_once_with(namespace='submitter')
+    assert runs[0].template_version == TEST_EXPERIMENT.template_version
+
+
+def test_replace_initializing_runs_missing_experiment(mocker):
+    mocker.patch("commands.common.list_utils.Experiment.list", return_value=[])
+
+    runs = list_utils.replace_initializing_runs(TEST_RUNS)
+
+    assert len(runs) == 2
+    assert all(run.template_version is None for run in runs)
+
+
+def test_replace_initializing_runs_empty_list(mocker):
+    list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list")
+
+    assert list_utils.replace_initializing_runs([]) == []
+    assert list_experiments_mock.call_count == 0
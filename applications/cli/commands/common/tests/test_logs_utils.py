@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import gzip
+
+import pytest
+
+from commands.common.logs_utils import format_log_date, parse_and_format_log_date, batch_formatted_logs, \
+    print_logs, save_logs_to_file
+from logs_aggregator.k8s_log_entry import LogEntry
+
+TEST_LOG_ENTRIES = [LogEntry(date='2018-04-17T09:28:39.123456789+00:00', content='first line\n',
+                             pod_name='pod-1', namespace='default'),
+                    LogEntry(date='2018-04-17T09:28:39.999+00:00', content='  \n',
+                             pod_name='pod-1', namespace='default'),
+                    LogEntry(date='2018-04-17T09:28:49Z', content='second line\n',
+                             pod_name='pod-2', namespace='default')]
+
+TEST_FORMATTED_LOGS = '2018-04-17T09:28:39+00:00 pod-1 first line\n' \
+                      '2018-04-17T09:28:49+00:00 pod-2 second line\n'
+
+
+@pytest.mark.parametrize('date', ['2018-04-17T09:28:39+00:00', '2018-04-17T09:28:39.5+00:00',
+                                  '2018-04-17T09:28:39.123456789+02:00', '2018-04-17T09:28:39.123Z',
+                                  '2018-04-17T09:28:39', '2018-04-17 09:28:39.123+00:00', 'Apr 17 2018 09:28:39'])
+def test_format_log_date(date):
+    assert format_log_date(date) == parse_and_format_log_date(date)
+
+
+def test_format_log_date_cached(mocker):
+    parse_mock = mocker.patch('commands.common.logs_utils.parse_and_format_log_date',
+                              return_value='2018-04-17T10:00:00+00:00')
+
+    for fraction in range(5):
+        format_log_date(f'2018-04-17T10:00:00.{fraction}+00:00')
+
+    assert parse_mock.call_count == 1
+
+
+def test_batch_formatted_logs():
+    batches = list(batch_formatted_logs(TEST_LOG_ENTRIES, batch_size=1))
+
+    assert batches == TEST_FORMATTED_LOGS.splitlines(keepends=True)
+    assert list(batch_formatted_logs(TEST_LOG_ENTRIES)) == [TEST_FORMATTED_LOGS]
+
+
+def test_print_logs(mocker):
+    echo_mock = mocker.patch('commands.common.logs_utils.click.echo')
+
+    print_logs(iter(TEST_LOG_ENTRIES))
+
+    echo_mock.assert_called_once_with(TEST_FORMATTED_LOGS, nl=False)
+
+
+def test_print_logs_follow(mocker):
+    echo_mock = mocker.patch('commands.common.logs_utils.click.echo')
+
+    print_logs(iter(TEST_LOG_ENTRIES), follow=True)
+
+    assert echo_mock.call_count == 2
+
+
+@pytest.mark.parametrize('compression,filename', [(None, 'run.log'), ('gzip', 'run.log.gz')])
+def test_save_logs_to_file(compression, filename, tmpdir, mocker, mock_get_click_context):
+    mock_get_click_context.return_value.obj.force = True
+    mocker.patch('commands.common.logs_utils.spinner')
+    tmpdir.chdir()
+
+    save_logs_to_file(iter(TEST_LOG_ENTRIES), instance_name='run', instance_type='experiment',
+                      compression=compression)
+
+    open_function = gzip.open if compression else open
+    with open_function(tmpdir.join(filename).strpath, 'rt') as file:
+        assert file.read() == TEST_FORMATTED_LOGS
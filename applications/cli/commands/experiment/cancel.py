@@ -15,25 +15,28 @@
 #
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import re
 import sys
 from sys import exit
-from typing import List, Tuple
+import time
+from typing import Callable, List, Tuple
 
 import click
+from kubernetes.client.rest import ApiException
 
 from commands.experiment.common import RunKinds, get_run_environment_path
-import util.k8s.kubectl as kubectl
 from git_repo_manager.utils import delete_exp_tag_from_git_repo_manager
 from platform_resources.workflow import ArgoWorkflow
 from util.cli_state import common_options
 from util.aliascmd import AliasCmd
 from util.k8s.k8s_info import get_current_namespace, is_current_user_administrator, get_api_key, get_kubectl_host
-from platform_resources.run import Run, RunStatus
+from platform_resources.run import Run, RunStatus, EXPERIMENT_NAME_LABEL
 from platform_resources.experiment import ExperimentStatus, Experiment
+from platform_resources.platform_resource import PlatformResource
 from logs_aggregator.k8s_es_client import K8sElasticSearchClient
-from util.helm import delete_helm_release
+from util.helm import delete_helm_release_once
 from util.k8s import pods as k8s_pods
 from util.logger import initialize_logger
 from util.spinner import spinner
@@ -47,16 +50,24 @@ logger = initialize_logger(__name__)
 experiment_name = 'experiment'
 experiment_name_plural = 'experiments'
 
+# maximal number of runs cancelled or purged at the same time
+RUN_OPERATION_WORKERS = 8
+# number of tries of cancelling or purging a run, time between consecutive tries is doubled after each of them
+RUN_OPERATION_TRIES = 3
+RUN_OPERATION_RETRY_DELAY = 1  # seconds
+
 
 @click.command(help=Texts.HELP, short_help=Texts.SHORT_HELP, cls=AliasCmd, alias='c', options_metavar='[options]')
 @click.argument("name", required=False, metavar="[name]")
 @click.option('-m', '--match', help=Texts.HELP_M)
 @click.option('-p', '--purge', help=Texts.HELP_P, is_flag=True)
+@click.option('-w', '--wait', help=Texts.HELP_W, is_flag=True)
 @click.option('-i', '--pod-ids', help=Texts.HELP_I)
 @click.option('-s', '--pod-status', help=Texts.HELP_S.format(available_statuses=PodStatus.all_members()))
 @common_options(admin_command=False)
 @click.pass_context
-def cancel(ctx: click.Context, name: str, match: str, purge: bool, pod_ids: str, pod_status: str,
+@PlatformResource.resource_cache()
+def cancel(ctx: click.Context, name: str, match: str, purge: bool, wait: bool, pod_ids: str, pod_status: str,
            listed_runs_kinds: List[RunKinds] = None):
     """
     Cancels chosen experiments based on a name provided as a parameter.
@@ -209,23 +220,30 @@ def cancel(ctx: click.Context, name: str, match: str, purge: bool, pod_ids: str,
     deleted_runs = []
     not_deleted_runs = []
 
+    if len(exp_with_runs) > 1:
+        # retrieve all experiments using a single request - purge_experiment and cancel_experiment
+        # take them from a resource cache instead of getting each of them separately
+        Experiment.list(namespace=current_namespace)
+
     if purge:
-        # Connect to elasticsearch in order to purge run logs
-        es_client = K8sElasticSearchClient(host=f'{get_kubectl_host(with_port=True)}'
-                                           f'/api/v1/namespaces/nauta/services/nauta-elasticsearch:nauta/proxy',
-                                           verify_certs=False, use_ssl=True,
-                                           headers={'Authorization': get_api_key()})
         for exp_name, run_list in exp_with_runs.items():
             try:
                 exp_del_runs, exp_not_del_runs = purge_experiment(exp_name=exp_name,
                                                                   runs_to_purge=run_list,
-                                                                  namespace=current_namespace,
-                                                                  k8s_es_client=es_client)
+                                                                  namespace=current_namespace)
                 deleted_runs.extend(exp_del_runs)
                 not_deleted_runs.extend(exp_not_del_runs)
             except Exception:
                 handle_error(logger, Texts.OTHER_CANCELLING_ERROR_MSG)
                 not_deleted_runs.extend(run_list)
+
+        if deleted_runs and is_current_user_administrator():
+            # Connect to elasticsearch in order to purge run logs
+            es_client = K8sElasticSearchClient(host=f'{get_kubectl_host(with_port=True)}'
+                                               f'/api/v1/namespaces/nauta/services/nauta-elasticsearch:nauta/proxy',
+                                               verify_certs=False, use_ssl=True,
+                                               headers={'Authorization': get_api_key()})
+            purge_logs(k8s_es_client=es_client, runs=deleted_runs, namespace=current_namespace, wait=wait)
     else:
         for exp_name, run_list in exp_with_runs.items():
             try:
@@ -257,16 +275,13 @@ def cancel(ctx: click.Context, name: str, match: str, purge: bool, pod_ids: str,
         sys.exit(1)
 
 
-def purge_experiment(exp_name: str, runs_to_purge: List[Run],
-                     k8s_es_client: K8sElasticSearchClient,
-                     namespace: str) -> Tuple[List[Run], List[Run]]:
+def purge_experiment(exp_name: str, runs_to_purge: List[Run], namespace: str) -> Tuple[List[Run], List[Run]]:
     """
        Purge experiment with a given name by cancelling runs given as a parameter. If given experiment
        contains more runs than is in the list of runs - experiment's state remains intact.
 
        :param exp_name: name of an experiment to which belong runs passed in run_list parameter
        :param runs_to_purge: list of runs that should be purged, they have to belong to exp_name experiment
-       :param k8s_es_client: Kubernetes ElasticSearch client
        :param namespace: namespace where experiment is located
        :return: two list - first contains runs that were cancelled successfully, second - those which weren't
        """
@@ -287,15 +302,10 @@ def purge_experiment(exp_name: str, runs_to_purge: List[Run],
         experiment.update()
 
     try:
-        cancelled_runs, not_cancelled_runs = cancel_experiment_runs(runs_to_cancel=runs_to_purge, namespace=namespace)
-        not_purged_runs = not_cancelled_runs
-
         if cancel_whole_experiment:
             # Delete associated workflows
-            experiment_associated_workflows = [wf for wf in ArgoWorkflow.list(namespace=namespace)
-                                               if wf.labels.get('experimentName') == experiment.name]
-            for wf in experiment_associated_workflows:
-                wf.delete()
+            ArgoWorkflow.delete_collection(namespace=namespace,
+                                           label_selector=f'experimentName={experiment.name}')
 
             # Remove tags from git repo manager
             try:
@@ -305,31 +315,13 @@ def purge_experiment(exp_name: str, runs_to_purge: List[Run],
                 handle_error(logger, Texts.GIT_REPO_MANAGER_ERROR_MSG, Texts.GIT_REPO_MANAGER_ERROR_MSG)
                 raise
 
-        for run in cancelled_runs:
+        def purge_run(run: Run):
             logger.debug(f"Purging {run.name} run ...")
-            click.echo(Texts.PURGING_START_MSG.format(run_name=run.name))
-            try:
-                with spinner(text=Texts.PURGING_PROGRESS_MSG.format(run_name=run.name)):
-                    # purge helm release
-                    delete_helm_release(run.name, namespace=namespace, purge=True)
-                    # delete run
-                    kubectl.delete_k8s_object("run", run.name)
-                    purged_runs.append(run)
-            except Exception as exe:
-                not_purged_runs.append(run)
-                logger.exception("Error during purging runs.")
-                # occurence of NotFound error may mean, that run has been removed earlier
-                if "NotFound" not in str(exe):
-                    click.echo(Texts.INCOMPLETE_PURGE_ERROR_MSG.format(experiment_name=experiment_name))
-                    raise exe
-            try:
-                # clear run logs
-                if is_current_user_administrator():
-                    logger.debug(f"Clearing logs for {run.name} run.")
-                    with spinner(text=Texts.PURGING_LOGS_PROGRESS_MSG.format(run_name=run.name)):
-                        k8s_es_client.delete_logs_for_run(run=run.name, namespace=namespace)
-            except Exception:
-                logger.exception("Error during clearing run logs.")
+            # purge helm release, failed operation is retried by execute_for_runs
+            delete_helm_release_once(run.name, namespace=namespace, purge=True)
+            # if the whole experiment is purged, all its runs are deleted at once later
+            if not cancel_whole_experiment:
+                delete_run(run)
 
             # CAN-1099 - docker garbage collector has errors that prevent from correct removal of images
             # try:
@@ -338,9 +330,22 @@ def purge_experiment(exp_name: str, runs_to_purge: List[Run],
             # except Exception:
             #    logger.exception("Error during removing images.")
 
+        for run in runs_to_purge:
+            click.echo(Texts.PURGING_START_MSG.format(run_name=run.name))
+        progress_msg = Texts.PURGING_RUNS_PROGRESS_MSG.format(run_count=len(runs_to_purge),
+                                                              experiment_name_plural=experiment_name_plural)
+        purged_runs, failed_runs = execute_for_runs(runs_to_purge, purge_run, progress_msg=progress_msg)
+        not_purged_runs = [run for run, _ in failed_runs]
+
+        if cancel_whole_experiment:
+            purged_runs, not_deleted_runs = delete_experiment_runs(exp_name=exp_name, runs_to_delete=purged_runs,
+                                                                   namespace=namespace,
+                                                                   delete_collection=not not_purged_runs)
+            not_purged_runs.extend(not_deleted_runs)
+
         if cancel_whole_experiment and not not_purged_runs:
             try:
-                kubectl.delete_k8s_object("experiment", exp_name)
+                experiment.delete()
             except Exception:
                 # problems during deleting experiments are hidden as if runs were
                 # cancelled user doesn't have a possibility to remove them
@@ -353,6 +358,74 @@ def purge_experiment(exp_name: str, runs_to_purge: List[Run],
     return purged_runs, not_purged_runs
 
 
+def purge_logs(k8s_es_client: K8sElasticSearchClient, runs: List[Run], namespace: str, wait: bool = False):
+    """
+    Deletes logs of runs. Logs are deleted by ElasticSearch tasks running in background, logs of many runs
+    are deleted by a single task.
+    :param k8s_es_client: Kubernetes ElasticSearch client
+    :param runs: runs which logs should be deleted
+    :param namespace: namespace where runs were located
+    :param wait: if True, function waits until logs are deleted, displaying a progress of deletion
+    """
+    try:
+        progress_msg = Texts.PURGING_LOGS_PROGRESS_MSG.format(run_count=len(runs),
+                                                              experiment_name_plural=experiment_name_plural)
+        with spinner(text=progress_msg):
+            task_ids = k8s_es_client.delete_logs_for_runs(runs=[run.name for run in runs], namespace=namespace,
+                                                          wait_for_completion=False)
+        logger.debug(f"Logs are deleted by tasks: {task_ids}.")
+
+        if wait:
+            with spinner(text=Texts.WAITING_FOR_LOGS_DELETION_MSG.format(deleted=0, total=0)) as logs_spinner:
+                def show_progress(deleted: int, total: int):
+                    logs_spinner.text = Texts.WAITING_FOR_LOGS_DELETION_MSG.format(deleted=deleted, total=total)
+
+                k8s_es_client.wait_for_tasks(task_ids, progress_callback=show_progress)
+    except Exception:
+        handle_error(logger, Texts.PURGING_LOGS_ERROR_MSG.format(experiment_name_plural=experiment_name_plural),
+                     Texts.PURGING_LOGS_ERROR_MSG.format(experiment_name_plural=experiment_name_plural))
+
+
+def delete_run(run: Run):
+    """
+    Deletes a Run object. A run, which doesn't exist, is treated as deleted.
+    """
+    try:
+        run.delete()
+    except Exception as exe:
+        # occurence of NotFound error means, that run has been removed earlier
+        if not is_not_found_error(exe):
+            raise
+
+
+def delete_experiment_runs(exp_name: str, runs_to_delete: List[Run], namespace: str,
+                           delete_collection: bool) -> Tuple[List[Run], List[Run]]:
+    """
+    Deletes Run objects of an experiment.
+    :param exp_name: name of an experiment
+    :param runs_to_delete: runs of an experiment that should be deleted
+    :param namespace: namespace where experiment is located
+    :param delete_collection: if True, all runs of an experiment are deleted using a single request selecting them
+                              by a label, only runs without the label are deleted one by one
+    :return: two list - first contains runs that were deleted successfully, second - those which weren't
+    """
+    deleted_run_names: List[str] = []
+    if delete_collection:
+        try:
+            deleted_run_names = Run.delete_collection(namespace=namespace,
+                                                      label_selector=f'{EXPERIMENT_NAME_LABEL}={exp_name}')
+        except Exception:
+            logger.exception(f"Error during deleting runs of {exp_name} experiment, deleting them one by one.")
+
+    # runs submitted by older versions of nctl don't have a label with a name of an experiment
+    remaining_runs = [run for run in runs_to_delete if run.name not in deleted_run_names]
+    progress_msg = Texts.DELETING_RUNS_PROGRESS_MSG.format(run_count=len(remaining_runs),
+                                                           experiment_name_plural=experiment_name_plural)
+    deleted_runs, failed_runs = execute_for_runs(remaining_runs, delete_run, progress_msg=progress_msg)
+    deleted_runs.extend(run for run in runs_to_delete if run.name in deleted_run_names)
+    return [run for run in runs_to_delete if run in deleted_runs], [run for run, _ in failed_runs]
+
+
 def cancel_experiment(exp_name: str, runs_to_cancel: List[Run], namespace: str) -> Tuple[List[Run], List[Run]]:
     """
     Cancel experiment with a given name by cancelling runs given as a parameter. If given experiment
@@ -406,34 +479,74 @@ def cancel_experiment_runs(runs_to_cancel: List[Run], namespace: str) -> Tuple[L
     :param namespace: namespace where Run instances reside
     :return: tuple of list containing successfully Runs and list containing Runs that were not cancelled
     """
-    deleted_runs = []
-    not_deleted_runs = []
-    try:
-        for run in runs_to_cancel:
-            logger.debug(f"Cancelling {run.name} run ...")
-            click.echo(Texts.CANCELING_RUNS_START_MSG.format(run_name=run.name, experiment_name=experiment_name))
-            try:
-                # if run status is cancelled - omit the following steps
-                if run.state != RunStatus.CANCELLED:
-                    with spinner(text=Texts.CANCEL_SETTING_STATUS_MSG.format(run_name=run.name)):
-                        delete_helm_release(release_name=run.name, namespace=namespace, purge=False)
-                        # change a run state to CANCELLED
-                        run.state = RunStatus.CANCELLED
-                        run.end_timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-                        run.update()
-                deleted_runs.append(run)
-            except Exception:
-                logger.exception(Texts.INCOMPLETE_CANCEL_ERROR_MSG
-                                 .format(run_name=run.name, experiment_name=experiment_name))
-                click.echo(Texts.INCOMPLETE_CANCEL_ERROR_MSG
-                           .format(run_name=run.name, experiment_name=experiment_name))
-                not_deleted_runs.append(run)
+    def cancel_run(run: Run):
+        logger.debug(f"Cancelling {run.name} run ...")
+        # failed operation is retried by execute_for_runs
+        delete_helm_release_once(release_name=run.name, namespace=namespace, purge=False)
+        # change a run state to CANCELLED
+        run.state = RunStatus.CANCELLED
+        run.end_timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        run.update()
 
-    except Exception:
-        logger.exception("Error during cancelling experiments")
-        return deleted_runs, not_deleted_runs
+    for run in runs_to_cancel:
+        click.echo(Texts.CANCELING_RUNS_START_MSG.format(run_name=run.name, experiment_name=experiment_name))
 
-    return deleted_runs, not_deleted_runs
+    # if run status is cancelled - omit the following steps
+    _, failed_runs = execute_for_runs([run for run in runs_to_cancel if run.state != RunStatus.CANCELLED],
+                                      cancel_run, progress_msg=Texts.CANCELING_RUNS_PROGRESS_MSG
+                                      .format(run_count=len(runs_to_cancel),
+                                              experiment_name_plural=experiment_name_plural))
+    for run, _ in failed_runs:
+        click.echo(Texts.INCOMPLETE_CANCEL_ERROR_MSG.format(run_name=run.name, experiment_name=experiment_name))
+
+    not_deleted_runs = [run for run, _ in failed_runs]
+    return [run for run in runs_to_cancel if run not in not_deleted_runs], not_deleted_runs
+
+
+def is_not_found_error(exe: Exception) -> bool:
+    return (isinstance(exe, ApiException) and exe.status == 404) or "NotFound" in str(exe)
+
+
+def execute_for_runs(runs: List[Run], operation: Callable[[Run], None], progress_msg: str,
+                     max_workers: int = None) -> Tuple[List[Run], List[Tuple[Run, Exception]]]:
+    """
+    Executes an operation for every run of a list concurrently, using a pool of threads. A failed operation
+    is retried with an exponential backoff, unless a resource it operates on doesn't exist.
+    :param runs: runs for which an operation is executed
+    :param operation: function called with a run as a parameter
+    :param progress_msg: message displayed while runs are processed
+    :param max_workers: maximal number of runs processed at the same time, RUN_OPERATION_WORKERS by default
+    :return: two lists - first contains runs for which the operation succeeded, second - runs for which it failed
+             with errors which caused failures, runs are in the same order as in the given list
+    """
+    def execute_with_retries(run: Run):
+        delay = RUN_OPERATION_RETRY_DELAY
+        for attempt in range(1, RUN_OPERATION_TRIES + 1):
+            try:
+                return operation(run)
+            except Exception as exe:
+                if attempt == RUN_OPERATION_TRIES or is_not_found_error(exe):
+                    raise
+                logger.warning(f'Operation on {run.name} run failed, retrying in {delay} seconds.', exc_info=True)
+                time.sleep(delay)
+                delay *= 2
+
+    succeeded_runs: List[Run] = []
+    failed_runs: List[Tuple[Run, Exception]] = []
+    if not runs:
+        return succeeded_runs, failed_runs
+
+    max_workers = max(1, min(max_workers or RUN_OPERATION_WORKERS, len(runs)))
+    with spinner(text=progress_msg), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(execute_with_retries, run) for run in runs]
+        for run, future in zip(runs, futures):
+            try:
+                future.result()
+                succeeded_runs.append(run)
+            except Exception as exe:
+                logger.exception(f'Operation on {run.name} run failed.')
+                failed_runs.append((run, exe))
+    return succeeded_runs, failed_runs
 
 
 def cancel_pods_mode(namespace: str, run_name: str = None, pod_ids: str = None,
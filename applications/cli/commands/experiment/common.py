@@ -15,7 +15,8 @@
 #
 
 from collections import namedtuple
-from distutils.dir_util import copy_tree
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import itertools
 import os
 import psutil
@@ -24,22 +25,24 @@ import shutil
 import signal
 from sys import exit
 import textwrap
+import time
 import yaml
 
 import click
 
-from typing import Tuple, List, Dict, Union, Optional
+from typing import Tuple, List, Dict, Union, Optional, Sequence, Iterator
 from pathlib import Path
 from tabulate import tabulate
 from marshmallow import ValidationError
 
 from commands.template.common import get_template_version
+from commands.experiment.sweep import ParameterSweep, ParameterValues, SweepSampling, ValuesRange
 import draft.cmd as cmd
 from git_repo_manager.utils import upload_experiment_to_git_repo_manager
 from platform_resources.experiment_utils import generate_exp_name_and_labels
 from packs.tf_training import update_configuration, get_pod_count
 import platform_resources.experiment as experiments_model
-from platform_resources.run import Run, RunStatus, RunKinds
+from platform_resources.run import Run, RunStatus, RunKinds, EXPERIMENT_NAME_LABEL
 
 from platform_resources.workflow import ExperimentImageBuildWorkflow, ArgoWorkflow
 from util.filesystem import get_total_directory_size_in_bytes
@@ -55,6 +58,7 @@ from util.app_names import NAUTAAppNames
 from util.k8s.k8s_info import get_app_service_node_port, get_kubectl_current_context_namespace
 from platform_resources.custom_object_meta_model import validate_kubernetes_name
 from util.jupyter_notebook_creator import convert_py_to_ipynb
+from util.workspace_store import get_workspace_store, ENVIRONMENT_PRIVATE_FILES
 from util.system import handle_error
 from cli_text_consts import ExperimentCommonTexts as Texts
 
@@ -85,6 +89,16 @@ TEMPL_FOLDER_NAME = "templates"
 
 EXP_IMAGE_BUILD_WORKFLOW_SPEC = "exp-image-build.yaml"
 
+# maximal number of runs' environments prepared at the same time
+ENV_PREPARATION_WORKERS = 8
+# runs of a sweep are prepared and submitted in waves - environments of next runs are created
+# only after runs of a previous wave are submitted
+SUBMISSION_WAVE_SIZE = 50
+# maximal number of runs listed, when a user is asked to confirm submission of a sweep
+CONFIRM_SUBMIT_MAX_LISTED_RUNS = 100
+# time between checks of a number of unfinished runs of an experiment, when it is limited
+RUN_SLOTS_CHECK_INTERVAL = 10  # seconds
+
 log = initialize_logger(__name__)
 
 
@@ -180,10 +194,13 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
     # create a semaphore saying that experiment is under submission
     Path(os.path.join(run_environment_path, EXP_SUB_SEMAPHORE_FILENAME)).touch()
 
+    # files are linked to a store shared by environments of all runs
+    workspace_store = get_workspace_store()
+
     # copy training script - it overwrites the file taken from a folder_location
     if file_location:
         try:
-            shutil.copy2(file_location, folder_path)
+            workspace_store.link_file(file_location, os.path.join(folder_path, os.path.basename(file_location)))
             if get_current_os() == OS.WINDOWS:
                 os.chmod(os.path.join(folder_path, os.path.basename(file_location)), 0o666)  # nosec
         except Exception:
@@ -192,20 +209,11 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
 
     # copy folder content
     if folder_location:
-        folder_size = get_total_directory_size_in_bytes(folder_location)
-        if show_folder_size_warning and folder_size >= max_folder_size_in_bytes:
-            if spinner_to_hide:
-                spinner_to_hide.hide()
-            if (not click.get_current_context().obj.force) and not (click.confirm(
-                    f'Experiment\'s script folder location size ({folder_size / 1024 / 1024:.2f} MB) '
-                    f'exceeds {max_folder_size_in_bytes / 1024 / 1024:.2f} MB. '
-                    f'It is highly recommended to use input/output shares for large amounts of data '
-                    f'instead of submitting them along with experiment. Do you want to continue?')):
-                exit(2)
-            if spinner_to_hide:
-                spinner_to_hide.show()
+        if show_folder_size_warning:
+            check_script_folder_size(folder_location, max_folder_size_in_bytes=max_folder_size_in_bytes,
+                                     spinner_to_hide=spinner_to_hide)
         try:
-            copy_tree(folder_location, folder_path)
+            workspace_store.copytree(folder_location, folder_path, private_files=ENVIRONMENT_PRIVATE_FILES)
         except Exception:
             log.exception("Create environment - copying training folder error.")
             raise SubmitExperimentError(message_prefix.format(reason=Texts.DIR_CANT_BE_COPIED_ERROR_TEXT))
@@ -215,6 +223,29 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
     return run_environment_path
 
 
+def check_script_folder_size(folder_location: str, max_folder_size_in_bytes=1024*1024, spinner_to_hide=None):
+    """
+    Asks user whether submission should be continued, if size of a script folder exceeds a given value.
+    Exits if user doesn't confirm it.
+
+    :param folder_location: location of a script folder
+    :param max_folder_size_in_bytes: maximum script folder size
+    :param spinner_to_hide: provide spinner, if it should be hidden before folder size warning
+    """
+    folder_size = get_total_directory_size_in_bytes(folder_location)
+    if folder_size >= max_folder_size_in_bytes:
+        if spinner_to_hide:
+            spinner_to_hide.hide()
+        if (not click.get_current_context().obj.force) and not (click.confirm(
+                f'Experiment\'s script folder location size ({folder_size / 1024 / 1024:.2f} MB) '
+                f'exceeds {max_folder_size_in_bytes / 1024 / 1024:.2f} MB. '
+                f'It is highly recommended to use input/output shares for large amounts of data '
+                f'instead of submitting them along with experiment. Do you want to continue?')):
+            exit(2)
+        if spinner_to_hide:
+            spinner_to_hide.show()
+
+
 def remove_sempahore(experiment_name: str):
     run_environment_path = get_run_environment_path(experiment_name)
     semaphore_file = os.path.join(run_environment_path, EXP_SUB_SEMAPHORE_FILENAME)
@@ -233,6 +264,32 @@ def delete_environment(experiment_folder: str):
         log.error("Delete environment - i/o error : {}".format(exe))
 
 
+def remove_old_run_environments(older_than: float) -> List[str]:
+    """
+    Removes local environments of runs, which were created earlier than a given time ago. Environments
+    of experiments, which are being submitted, are kept.
+    :param older_than: minimal age of removed environments in seconds
+    :return: names of runs, whose environments were removed
+    """
+    experiments_path = get_run_environment_path('')
+    if not os.path.isdir(experiments_path):
+        return []
+
+    removed_environments = []
+    for run_name in sorted(os.listdir(experiments_path)):
+        run_environment_path = os.path.join(experiments_path, run_name)
+        # hidden directories contain e.g. a git repository used to upload experiments
+        if run_name.startswith('.') or not os.path.isdir(run_environment_path):
+            continue
+        if os.path.isfile(os.path.join(run_environment_path, EXP_SUB_SEMAPHORE_FILENAME)):
+            continue
+        if time.time() - os.path.getmtime(run_environment_path) < older_than:
+            continue
+        delete_environment(run_environment_path)
+        removed_environments.append(run_name)
+    return removed_environments
+
+
 def convert_to_number(s: str) -> Union[int, float]:
     """
     Converts string to number of a proper type.
@@ -252,7 +309,19 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
                       parameter_set: Tuple[str, ...] = None,
                       script_folder_location: str = None,
                       env_variables: List[str] = None,
-                      requirements_file: str = None) -> Tuple[List[Run], Dict[str, str], Optional[str]]:
+                      requirements_file: str = None, sampling: SweepSampling = SweepSampling.GRID,
+                      max_runs: int = None, seed: int = None,
+                      max_concurrent_runs: int = None) -> Tuple[List[Run], Dict[str, str], Optional[str]]:
+    """
+    Submits an experiment. If -pr/-ps parameters are given, runs of a sweep are generated lazily, their
+    environments are prepared and they are submitted in waves of SUBMISSION_WAVE_SIZE runs.
+    :param sampling: method of selection of runs from a space of parameters given by -pr/-ps parameters
+    :param max_runs: number of runs selected by RANDOM and LATIN_HYPERCUBE sampling methods
+    :param seed: seed of a random number generator used by sampling methods
+    :param max_concurrent_runs: if given, a run is submitted only when a number of unfinished runs of an experiment
+                                is lower than this limit
+    :return: submitted runs, errors of failed runs and a name of a script used by runs
+    """
 
     script_parameters: Union[Tuple[str, ...], Tuple[()]] = script_parameters if script_parameters else ()
     parameter_set: Union[Tuple[str, ...], Tuple[()]] = parameter_set if parameter_set else ()
@@ -274,8 +343,11 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
             experiment_name, labels = generate_exp_name_and_labels(script_name=script_location,
                                                                    namespace=namespace, name=name,
                                                                    run_kind=run_kind)
-            runs_list = prepare_list_of_runs(experiment_name=experiment_name, parameter_range=parameter_range,
-                                             parameter_set=parameter_set, template_name=template)
+            parameter_sweep = prepare_parameter_sweep(parameter_range=parameter_range, parameter_set=parameter_set)
+            run_indices = parameter_sweep.get_indices(sampling=sampling, max_points=max_runs, seed=seed) \
+                if parameter_sweep else range(1)
+            runs = iterate_runs(experiment_name=experiment_name, template_name=template,
+                                parameter_sweep=parameter_sweep, run_indices=run_indices)
     except SubmitExperimentError as exe:
         log.exception(str(exe))
         raise exe
@@ -291,52 +363,35 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
     signal.signal(signal.SIGINT, ctrl_c_handler_for_submit)
     signal.signal(signal.SIGTERM, ctrl_c_handler_for_submit)
 
+    wave_size = min(SUBMISSION_WAVE_SIZE, max_concurrent_runs) if max_concurrent_runs else SUBMISSION_WAVE_SIZE
+    runs_list: List[Run] = []
+    run_errors: Dict[str, str] = {}
+    wave: List[Run] = []  # runs, which are currently prepared and submitted
     try:
-        experiment_run_folders = []  # List of local directories used by experiment's runs
+        experiment_run_folders = []  # List of local directories used by experiment's runs of a current wave
         try:
             cluster_registry_port = get_app_service_node_port(nauta_app_name=NAUTAAppNames.DOCKER_REGISTRY)
-            # prepare environments for all experiment's runs
-            for experiment_run in runs_list:
-                if script_parameters and experiment_run.parameters:
-                    current_script_parameters = script_parameters + experiment_run.parameters
-                elif script_parameters:
-                    current_script_parameters = script_parameters
-                elif experiment_run.parameters:
-                    current_script_parameters = experiment_run.parameters
-                else:
-                    current_script_parameters = None
-                run_folder, script_location, pod_count = \
-                    prepare_experiment_environment(experiment_name=experiment_name,
-                                                   run_name=experiment_run.name,
-                                                   local_script_location=script_location,
-                                                   script_folder_location=script_folder_location,  # noqa: E501
-                                                   script_parameters=current_script_parameters,
-                                                   pack_type=template, pack_params=pack_params,
-                                                   cluster_registry_port=cluster_registry_port,
-                                                   env_variables=env_variables,
-                                                   requirements_file=requirements_file,
-                                                   username=namespace,
-                                                   run_kind=run_kind)
-                # Set correct pod count
-                if not pod_count or pod_count < 1:
-                    raise SubmitExperimentError('Unable to determine pod count: make sure that values.yaml '
-                                                'file in your pack has podCount field with positive integer value.')
-
+            prepare_environments = partial(prepare_experiment_environments, experiment_name=experiment_name,
+                                           local_script_location=script_location,
+                                           script_folder_location=script_folder_location,
+                                           script_parameters=script_parameters,
+                                           pack_type=template, pack_params=pack_params,
+                                           cluster_registry_port=cluster_registry_port,
+                                           env_variables=env_variables,
+                                           requirements_file=requirements_file,
+                                           username=namespace,
+                                           run_kind=run_kind)
+            # prepare environments for the first wave of experiment's runs
+            wave = list(itertools.islice(runs, wave_size))
+            prepared_environments = prepare_environments(runs_list=wave)
+            for experiment_run, (run_folder, script_location, pod_count) in zip(wave, prepared_environments):
                 experiment_run.pod_count = pod_count
                 experiment_run_folders.append(run_folder)
-                script_name = None
-                if script_location is not None:
-                    script_name = os.path.basename(script_location)
-                # Prepend script_name parameter to run description only for display purposes.
-                experiment_run.parameters = script_parameters if not experiment_run.parameters \
-                    else experiment_run.parameters + script_parameters
-                if experiment_run.parameters and script_name:
-                    experiment_run.parameters = (script_name, ) + experiment_run.parameters
-                elif script_name:
-                    experiment_run.parameters = (script_name, )
-        except SubmitExperimentError as e:
+                experiment_run.parameters = get_run_display_parameters(experiment_run, script_parameters,
+                                                                       script_location)
+            runs_list.extend(wave)
+        except SubmitExperimentError:
             log.exception(Texts.ENV_CREATION_ERROR_MSG)
-            e.message += f' {Texts.ENV_CREATION_ERROR_MSG}'
             raise
         except Exception:
             # any error in this step breaks execution of this command
@@ -348,10 +403,17 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
         # if ps or pr option is used - first ask whether experiment(s) should be submitted
         if parameter_range or parameter_set:
             click.echo(Texts.CONFIRM_SUBMIT_MSG)
-            click.echo(tabulate({RUN_NAME: [run.name for run in runs_list],
-                                 RUN_PARAMETERS: ["\n".join(run.parameters) if run.parameters
-                                                  else "" for run in runs_list]},
+            listed_runs = iterate_runs(experiment_name=experiment_name, template_name=template,
+                                       parameter_sweep=parameter_sweep, run_indices=run_indices)
+            listed_runs_parameters = [(run.name, get_run_display_parameters(run, script_parameters, script_location))
+                                      for run in itertools.islice(listed_runs, CONFIRM_SUBMIT_MAX_LISTED_RUNS)]
+            click.echo(tabulate({RUN_NAME: [run_name for run_name, _ in listed_runs_parameters],
+                                 RUN_PARAMETERS: ["\n".join(run_parameters) if run_parameters
+                                                  else "" for _, run_parameters in listed_runs_parameters]},
                                 headers=[RUN_NAME, RUN_PARAMETERS], tablefmt=TBLT_TABLE_FORMAT))
+            if len(run_indices) > len(listed_runs_parameters):
+                click.echo(Texts.CONFIRM_SUBMIT_MORE_RUNS_MSG.format(
+                    run_count=len(run_indices) - len(listed_runs_parameters), total_run_count=len(run_indices)))
             if ((not click.get_current_context().obj.force) and
                     (not click.confirm(Texts.CONFIRM_SUBMIT_QUESTION_MSG, default=True))):
                 for experiment_run_folder in experiment_run_folders:
@@ -405,28 +467,57 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
                                   f'to {experiments_model.ExperimentStatus.FAILED}')
                 raise SubmitExperimentError(error_msg)
         # submit runs
-        run_errors: Dict[str, str] = {}
-        for run, run_folder in zip(runs_list, experiment_run_folders):
-            try:
-                run.state = RunStatus.QUEUED
-                with spinner(text=Texts.CREATING_RESOURCES_MSG.format(run_name=run.name)):
-                    # Add Run object with runKind label and pack params as annotations
-                    run.create(namespace=namespace, labels={'runKind': run_kind.value},
-                               annotations={pack_param_name: pack_param_value
-                                            for pack_param_name, pack_param_value in pack_params})
-                    submitted_runs.append(run)
-                    submit_draft_pack(run_name=run.name,
-                                      run_folder=run_folder,
-                                      namespace=namespace)
-            except Exception as exe:
-                delete_environment(run_folder)
+        free_run_slots = 0
+        while wave:
+            for run, run_folder in zip(wave, experiment_run_folders):
+                if max_concurrent_runs:
+                    if not free_run_slots:
+                        free_run_slots = wait_for_free_run_slots(experiment_name=experiment_name,
+                                                                 namespace=namespace,
+                                                                 max_concurrent_runs=max_concurrent_runs)
+                    free_run_slots -= 1
+                try:
+                    run.state = RunStatus.QUEUED
+                    with spinner(text=Texts.CREATING_RESOURCES_MSG.format(run_name=run.name)):
+                        # Add Run object with runKind and experiment name labels and pack params as annotations
+                        run.create(namespace=namespace,
+                                   labels={'runKind': run_kind.value, EXPERIMENT_NAME_LABEL: experiment_name},
+                                   annotations={pack_param_name: pack_param_value
+                                                for pack_param_name, pack_param_value in pack_params})
+                        submitted_runs.append(run)
+                        submit_draft_pack(run_name=run.name,
+                                          run_folder=run_folder,
+                                          namespace=namespace)
+                except Exception as exe:
+                    delete_environment(run_folder)
+                    try:
+                        run.state = RunStatus.FAILED
+                        run_errors[run.name] = str(exe)
+                        run.update()
+                    except Exception as rexe:
+                        # update of non-existing run may fail
+                        log.debug(Texts.ERROR_DURING_PATCHING_RUN.format(str(rexe)))
+            # prepare environments for the next wave of runs
+            experiment_run_folders = []
+            wave = list(itertools.islice(runs, wave_size))
+            while wave:
+                runs_list.extend(wave)
                 try:
-                    run.state = RunStatus.FAILED
-                    run_errors[run.name] = str(exe)
-                    run.update()
-                except Exception as rexe:
-                    # update of non-existing run may fail
-                    log.debug(Texts.ERROR_DURING_PATCHING_RUN.format(str(rexe)))
+                    prepared_environments = prepare_environments(runs_list=wave)
+                except SubmitExperimentError as exe:
+                    # runs of next waves are submitted anyway, like in case of a failure of a single run
+                    log.exception(Texts.ENV_CREATION_ERROR_MSG)
+                    for run in wave:
+                        run.state = RunStatus.FAILED
+                        run_errors[run.name] = exe.message
+                    wave = list(itertools.islice(runs, wave_size))
+                    continue
+                for experiment_run, (run_folder, _, pod_count) in zip(wave, prepared_environments):
+                    experiment_run.pod_count = pod_count
+                    experiment_run_folders.append(run_folder)
+                    experiment_run.parameters = get_run_display_parameters(experiment_run, script_parameters,
+                                                                           script_location)
+                break
         # Delete experiment if no Runs were submitted
         if not submitted_runs:
             click.echo(Texts.SUBMISSION_FAIL_ERROR_MSG)
@@ -458,42 +549,148 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
     return runs_list, run_errors, script_location
 
 
-def prepare_list_of_runs(parameter_range: List[Tuple[str, str]], experiment_name: str,
-                         parameter_set: Tuple[str, ...], template_name: str) -> List[Run]:
+def prepare_parameter_sweep(parameter_range: List[Tuple[str, str]],
+                            parameter_set: Tuple[str, ...]) -> Optional[ParameterSweep]:
+    """
+    :return: space of parameters of runs given by -pr and -ps options, None if none of them is given
+    In case of any problems during analyzing of parameters - it throws
+    an exception with a short message about a detected problem.
+    """
+    if not parameter_range and not parameter_set:
+        return None
+    return ParameterSweep(parameter_sets=analyze_ps_parameters_list(parameter_set) if parameter_set else (),
+                          parameter_values=analyze_pr_parameters(parameter_range) if parameter_range else ())
 
-    run_list: List[Run] = []
 
-    if not parameter_range and not parameter_set:
-        run_list = [Run(name=experiment_name, experiment_name=experiment_name,
-                        pod_selector={'matchLabels': {'app': template_name, 'release': experiment_name}})]
-    else:
-        list_of_range_parameters: List[Tuple[str, ...]] = [("", )]
-        list_of_set_parameters = [("", )]
+def iterate_runs(experiment_name: str, template_name: str, parameter_sweep: ParameterSweep = None,
+                 run_indices: Sequence[int] = None) -> Iterator[Run]:
+    """
+    Generates runs of an experiment one by one, so runs of a large sweep are never kept in memory at once.
+    :param experiment_name: name of an experiment
+    :param template_name: name of a template of an experiment
+    :param parameter_sweep: space of parameters of runs, an experiment has a single run without parameters if
+                            it isn't given
+    :param run_indices: indices of points of parameter_sweep, for which runs are created, all points by default
+    :return: iterator over runs, consecutive runs have names with consecutive numbers
+    """
+    if not parameter_sweep:
+        yield Run(name=experiment_name, experiment_name=experiment_name,
+                  pod_selector={'matchLabels': {'app': template_name, 'release': experiment_name}})
+        return
+
+    run_indices = run_indices if run_indices is not None else range(parameter_sweep.size)
+    for run_number, run_index in enumerate(run_indices, start=1):
+        run_name = f'{experiment_name}-{run_number}'
+        yield Run(name=run_name, experiment_name=experiment_name,
+                  parameters=parameter_sweep.get_parameters(run_index),
+                  pod_selector={'matchLabels': {'app': template_name, 'release': run_name}})
+
+
+def get_run_display_parameters(run: Run, script_parameters: Tuple[str, ...],
+                               script_location: Optional[str]) -> Tuple[str, ...]:
+    """
+    :return: parameters of a run displayed to a user - a name of a script, parameters of a script
+             and parameters of a run
+    """
+    script_name = os.path.basename(script_location) if script_location is not None else None
+    # Prepend script_name parameter to run description only for display purposes.
+    parameters = script_parameters if not run.parameters else run.parameters + script_parameters
+    if parameters and script_name:
+        parameters = (script_name, ) + parameters
+    elif script_name:
+        parameters = (script_name, )
+    return parameters
+
+
+def wait_for_free_run_slots(experiment_name: str, namespace: str, max_concurrent_runs: int) -> int:
+    """
+    Waits until a number of unfinished runs of an experiment is lower than a given limit.
+    :return: number of runs, which can be submitted without exceeding the limit
+    """
+    active_states = {RunStatus.CREATING, RunStatus.QUEUED, RunStatus.RUNNING}
+    with spinner(text=Texts.WAITING_FOR_RUN_SLOTS_MSG.format(max_concurrent_runs=max_concurrent_runs)):
+        while True:
+            try:
+                active_runs = sum(1 for run in Run.list(namespace=namespace, exp_name_filter=[experiment_name])
+                                  if run.state in active_states)
+                if active_runs < max_concurrent_runs:
+                    return max_concurrent_runs - active_runs
+            except Exception:
+                # submission of a sweep may take hours, so it isn't broken by temporary problems with a cluster
+                log.exception(f'Failed to get runs of {experiment_name} experiment.')
+            time.sleep(RUN_SLOTS_CHECK_INTERVAL)
 
-        if parameter_range:
-            list_of_range_parameters = analyze_pr_parameters_list(parameter_range)
 
-        if parameter_set:
-            list_of_set_parameters = analyze_ps_parameters_list(parameter_set)
+def prepare_list_of_runs(parameter_range: List[Tuple[str, str]], experiment_name: str,
+                         parameter_set: Tuple[str, ...], template_name: str) -> List[Run]:
+    return list(iterate_runs(experiment_name=experiment_name, template_name=template_name,
+                             parameter_sweep=prepare_parameter_sweep(parameter_range, parameter_set)))
+
+
+def prepare_experiment_environments(experiment_name: str, runs_list: List[Run],
+                                    script_parameters: Tuple[str, ...],
+                                    pack_type: str, cluster_registry_port: int,
+                                    username: str,
+                                    local_script_location: str = None,
+                                    script_folder_location: str = None,
+                                    pack_params: List[Tuple[str, str]] = None,
+                                    env_variables: List[str] = None,
+                                    requirements_file: str = None,
+                                    run_kind: RunKinds = RunKinds.TRAINING,
+                                    max_workers: int = None) -> List[PrepareExperimentResult]:
+    """
+    Prepares draft's environments for all runs of an experiment. Existing environments are checked one by one,
+    as a user may be asked to delete them, then environments are created concurrently by a pool of threads.
+    :param experiment_name: name of an experiment
+    :param runs_list: runs of an experiment
+    :param script_parameters: parameters passed to a script of every run, parameters of a run are appended to them
+    :param max_workers: maximal number of environments created at the same time, ENV_PREPARATION_WORKERS by default
+    Other parameters are described in prepare_experiment_environment function.
+    :return: results of preparation of environments, in the same order as runs
+    In case of problems with any run, environments of all runs are deleted and an exception describing
+    problems of every failed run is thrown
+    """
+    for run in runs_list:
+        check_run_environment(get_run_environment_path(run.name))
 
-        run_index = 1
-        for set_param in list_of_set_parameters:
-            for range_param in list_of_range_parameters:
-                current_run_name = experiment_name + "-" + str(run_index)
-                current_params: Tuple[str, ...] = ()
+    if script_folder_location and run_kind == RunKinds.TRAINING:
+        check_script_folder_size(script_folder_location)
 
-                if len(set_param) >= 1 and set_param[0]:
-                    current_params = set_param
+    if len(runs_list) == 1:
+        spinner_text = Texts.CREATING_ENVIRONMENT_MSG.format(run_name=runs_list[0].name)
+    else:
+        spinner_text = Texts.CREATING_ENVIRONMENTS_MSG.format(run_count=len(runs_list))
+
+    max_workers = max(1, min(max_workers or ENV_PREPARATION_WORKERS, len(runs_list)))
+    with spinner(text=spinner_text), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for run in runs_list:
+            run_script_parameters = script_parameters + run.parameters if run.parameters else script_parameters
+            futures.append(executor.submit(prepare_experiment_environment, experiment_name=experiment_name,
+                                           run_name=run.name, local_script_location=local_script_location,
+                                           script_folder_location=script_folder_location,
+                                           script_parameters=run_script_parameters or None, pack_type=pack_type,
+                                           pack_params=pack_params, cluster_registry_port=cluster_registry_port,
+                                           env_variables=env_variables, requirements_file=requirements_file,
+                                           username=username))
+
+        results = []
+        run_errors: Dict[str, str] = {}
+        for run, future in zip(runs_list, futures):
+            try:
+                results.append(future.result())
+            except Exception as exe:
+                log.exception(f'Failed to prepare environment of {run.name} run.')
+                run_errors[run.name] = str(exe.__cause__ or exe) or str(exe)
 
-                if len(range_param) >= 1 and range_param[0]:
-                    current_params = current_params + range_param
+    if run_errors:
+        # environments of failed runs are deleted by prepare_experiment_environment
+        for result in results:
+            delete_environment(result.folder_name)
+        raise SubmitExperimentError(Texts.RUNS_ENV_CREATION_ERROR_MSG.format(
+            run_errors='\n'.join(f'  {run_name}: {reason}' for run_name, reason in run_errors.items())))
 
-                run_list.append(Run(name=current_run_name, experiment_name=experiment_name,
-                                    parameters=current_params,
-                                    pod_selector={'matchLabels': {'app': template_name,
-                                                                  'release': current_run_name}}))
-                run_index = run_index + 1
-    return run_list
+    return results
 
 
 def prepare_experiment_environment(experiment_name: str, run_name: str,
@@ -504,10 +701,11 @@ def prepare_experiment_environment(experiment_name: str, run_name: str,
                                    script_folder_location: str = None,
                                    pack_params: List[Tuple[str, str]] = None,
                                    env_variables: List[str] = None,
-                                   requirements_file: str = None,
-                                   run_kind: RunKinds = RunKinds.TRAINING) -> PrepareExperimentResult:
+                                   requirements_file: str = None) -> PrepareExperimentResult:
     """
-    Prepares draft's environment for a certain run based on provided parameters
+    Prepares draft's environment for a certain run based on provided parameters. It doesn't interact with a user,
+    so environments of different runs may be prepared concurrently - an environment should be checked with
+    check_run_environment before.
     :param experiment_name: name of an experiment
     :param run_name: name of an experiment run
     :param local_script_location: location of a script used for training purposes on local machine
@@ -525,21 +723,16 @@ def prepare_experiment_environment(experiment_name: str, run_name: str,
     log.debug(f'Prepare run {run_name} environment - start')
     run_folder = get_run_environment_path(run_name)
     try:
-        # check environment directory
-        check_run_environment(run_folder)
-        with spinner(text=Texts.CREATING_ENVIRONMENT_MSG.format(run_name=run_name)) as create_env_spinner:
-            # create an environment
-            create_environment(run_name, local_script_location, script_folder_location,
-                               show_folder_size_warning=bool(run_kind == RunKinds.TRAINING),
-                               spinner_to_hide=create_env_spinner)
-            # generate draft's data
-            output, exit_code = cmd.create(working_directory=run_folder, pack_type=pack_type)
-            # copy requirements file if it was provided, create empty requirements file otherwise
-            dest_requirements_file = os.path.join(run_folder, 'requirements.txt')
-            if requirements_file:
-                shutil.copyfile(requirements_file, dest_requirements_file)
-            else:
-                Path(dest_requirements_file).touch()
+        # create an environment
+        create_environment(run_name, local_script_location, script_folder_location, show_folder_size_warning=False)
+        # generate draft's data
+        output, exit_code = cmd.create(working_directory=run_folder, pack_type=pack_type)
+        # copy requirements file if it was provided, create empty requirements file otherwise
+        dest_requirements_file = os.path.join(run_folder, 'requirements.txt')
+        if requirements_file:
+            shutil.copyfile(requirements_file, dest_requirements_file)
+        else:
+            Path(dest_requirements_file).touch()
 
         if exit_code:
             raise SubmitExperimentError(Texts.EXP_TEMPLATES_NOT_GENERATED_ERROR_MSG.format(reason=output))
@@ -564,6 +757,9 @@ def prepare_experiment_environment(experiment_name: str, run_name: str,
                              username=username)
 
         pod_count = get_pod_count(run_folder=run_folder, pack_type=pack_type)
+        if not pod_count or pod_count < 1:
+            raise SubmitExperimentError('Unable to determine pod count: make sure that values.yaml '
+                                        'file in your pack has podCount field with positive integer value.')
     except Exception as exe:
         delete_environment(run_folder)
         raise SubmitExperimentError('Problems during creation of environments.') from exe
@@ -610,33 +806,17 @@ def values_range(param_value: str) -> List[str]:
     :param param_value: content of the "pr" parameter
     :return: list of values between start and stop with a given step
     """
-    ret_range = []
-    range_step = param_value.split(":")
-    range_values = range_step[0]
-    step = range_step[1]
-    start, stop = range_values.split("...")
-
-    current_value = convert_to_number(start)
-    if "." in step:
-        number_of_digits = len(step.split(".")[1])
-    else:
-        number_of_digits = 0
-    step_n = convert_to_number(step)
-    stop_n = convert_to_number(stop)
-    while current_value <= stop_n:
-        ret_range.append(str(current_value))
-        current_value = round(current_value + step_n, number_of_digits)
+    return list(ValuesRange(param_value))
 
-    return ret_range
 
-
-def prepare_list_of_values(param_name: str, param_values: str) -> List[str]:
+def get_parameter_values(param_name: str, param_values: str) -> Sequence[str]:
     """
-    Function converts content of -pr parameter to list of single values.
+    Function converts content of -pr parameter to a sequence of single values. Values of a range
+    are not expanded - they are calculated when they are accessed.
 
     :param param_name: name of a parameter which is analysed
     :param param_values: value of a parameter
-    :return: list of all values of a parameter
+    :return: sequence of all values of a parameter
     In case of any problems during analyzing of parameters - it throws
     an exception with a short message about a detected problem.
     More details concerning a cause of such issue can be found in logs.
@@ -648,41 +828,48 @@ def prepare_list_of_values(param_name: str, param_values: str) -> List[str]:
 
     try:
         param_values = str.strip(param_values, "{}")
-        temp_param_values = []
         # {start...stop:step} form
         if "..." in param_values:
-            temp_param_values.extend(values_range(param_values))
+            values: Sequence[str] = ValuesRange(param_values)
         else:
             # {x, y, z} form
-            temp_param_values.extend([str.strip(x) for x in param_values.split(",")])
-
-        ret_values = []
-        # each value contains parameter name
-        for param in temp_param_values:
-            ret_values.append("{}={}".format(param_name, param))
-
+            values = [str.strip(x) for x in param_values.split(",")]
     except Exception:
         log.exception(error_message)
         raise ValueError(error_message)
 
-    return ret_values
+    # each value contains parameter name
+    return ParameterValues(param_name, values)
 
 
-def analyze_pr_parameters_list(list_of_params: List[Tuple[str, str]]) -> List[Tuple[str, ...]]:
+def prepare_list_of_values(param_name: str, param_values: str) -> List[str]:
     """
-    Analyzes a list of -pr/--parameter_range parameters. It returns a list
-    containing a tuples with all combinations of values of parameters given by a user.
+    Function converts content of -pr parameter to list of single values.
+
+    :param param_name: name of a parameter which is analysed
+    :param param_values: value of a parameter
+    :return: list of all values of a parameter
+    In case of any problems during analyzing of parameters - it throws
+    an exception with a short message about a detected problem.
+    More details concerning a cause of such issue can be found in logs.
+    """
+    return list(get_parameter_values(param_name, param_values))
+
+
+def analyze_pr_parameters(list_of_params: List[Tuple[str, str]]) -> List[Sequence[str]]:
+    """
+    Analyzes a list of -pr/--parameter_range parameters. It returns values of every parameter, without
+    expanding ranges and combinations of values.
 
     :param list_of_params: list with tuples in form (parameter name, parameter value)
             list in this format is returned by a click
-    :return: list containing tuples with all combinations of values of params given by
-            a user
+    :return: list containing sequences of values of consecutive parameters in "name=value" form
     In case of any problems during analyzing of parameters - it throws
     an exception with a short message about a detected problem.
     More details concerning a cause of such issue can be found in logs.
     """
     param_names: List[str] = []
-    param_values: List[str] = []
+    param_values: List[Sequence[str]] = []
 
     for param_name, param_value in list_of_params:
         if param_name in param_names:
@@ -691,11 +878,25 @@ def analyze_pr_parameters_list(list_of_params: List[Tuple[str, str]]) -> List[Tu
             raise ValueError(exe_message)
 
         param_names.append(param_name)
-        param_values.append(prepare_list_of_values(param_name, param_value))  # type: ignore
+        param_values.append(get_parameter_values(param_name, param_value))
 
-    ret_list = list(itertools.product(*param_values))
+    return param_values
 
-    return ret_list
+
+def analyze_pr_parameters_list(list_of_params: List[Tuple[str, str]]) -> List[Tuple[str, ...]]:
+    """
+    Analyzes a list of -pr/--parameter_range parameters. It returns a list
+    containing a tuples with all combinations of values of parameters given by a user.
+
+    :param list_of_params: list with tuples in form (parameter name, parameter value)
+            list in this format is returned by a click
+    :return: list containing tuples with all combinations of values of params given by
+            a user
+    In case of any problems during analyzing of parameters - it throws
+    an exception with a short message about a detected problem.
+    More details concerning a cause of such issue can be found in logs.
+    """
+    return list(itertools.product(*analyze_pr_parameters(list_of_params)))
 
 
 def analyze_ps_parameters_list(list_of_params: Tuple[str, ...]):
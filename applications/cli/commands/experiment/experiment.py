@@ -16,7 +16,7 @@
 
 import click
 
-from commands.experiment import list, cancel, logs, view, submit, interact
+from commands.experiment import list, cancel, logs, view, submit, interact, gc
 from util.logger import initialize_logger
 from util.aliascmd import AliasGroup
 from cli_text_consts import ExperimentCmdTexts as Texts
@@ -37,3 +37,4 @@ experiment.add_command(list.list_experiments)
 experiment.add_command(logs.logs)
 experiment.add_command(interact.interact)
 experiment.add_command(view.view)
+experiment.add_command(gc.gc)
@@ -0,0 +1,50 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from sys import exit
+
+import click
+
+from cli_text_consts import ExperimentGcCmdTexts as Texts
+from commands.experiment.common import remove_old_run_environments
+from util.aliascmd import AliasCmd
+from util.cli_state import common_options
+from util.logger import initialize_logger
+from util.spinner import spinner
+from util.system import handle_error
+from util.workspace_store import get_workspace_store
+
+logger = initialize_logger(__name__)
+
+DEFAULT_MIN_AGE_DAYS = 7
+
+
+@click.command(help=Texts.HELP, short_help=Texts.SHORT_HELP, cls=AliasCmd, alias='g', options_metavar='[options]')
+@click.option('-o', '--older-than', type=click.IntRange(min=0), default=DEFAULT_MIN_AGE_DAYS, help=Texts.HELP_O)
+@common_options(verify_dependencies=False)
+@click.pass_context
+def gc(ctx: click.Context, older_than: int):
+    try:
+        with spinner(text=Texts.GC_PROGRESS_MSG):
+            removed_environments = remove_old_run_environments(older_than=older_than * 24 * 60 * 60)
+            # files are removed from the store, when no environment links them anymore
+            removed_files, removed_bytes = get_workspace_store().collect_garbage()
+    except Exception:
+        handle_error(logger, Texts.GC_ERROR_MSG, Texts.GC_ERROR_MSG, add_verbosity_msg=ctx.obj.verbosity == 0)
+        exit(1)
+
+    click.echo(Texts.GC_SUCCESS_MSG.format(environments_count=len(removed_environments), files_count=removed_files,
+                                           size_mb=removed_bytes / 1024 / 1024))
@@ -17,7 +17,7 @@
 import click
 
 from cli_text_consts import ExperimentLogsCmdTexts as Texts
-from commands.common.logs_utils import get_logs
+from commands.common.logs_utils import get_logs, LOGS_FILE_COMPRESSIONS
 from logs_aggregator.log_filters import SeverityLevel
 from util.cli_state import common_options
 from util.logger import initialize_logger
@@ -42,10 +42,14 @@ LOG_RUNS_KINDS = [RunKinds.TRAINING, RunKinds.JUPYTER]
 @click.option('-o', '--output', help=Texts.HELP_O, is_flag=True)
 @click.option('-pa', '--pager', help=Texts.HELP_PAGER, is_flag=True, default=False)
 @click.option('-fl', '--follow', help=Texts.HELP_F, is_flag=True, default=False)
+@click.option('-sl', '--slices', type=click.IntRange(min=1), default=1, help=Texts.HELP_SL)
+@click.option('-c', '--compression', type=click.Choice(list(LOGS_FILE_COMPRESSIONS)),
+              help=Texts.HELP_C)
 @common_options(admin_command=False)
 @click.pass_context
 def logs(ctx: click.Context, experiment_name: str, min_severity: str, start_date: str,
-         end_date: str, pod_ids: str, pod_status: str, match: str, output: bool, pager: bool, follow: bool):
+         end_date: str, pod_ids: str, pod_status: str, match: str, output: bool, pager: bool, follow: bool,
+         slices: int, compression: str):
     """
     Show logs for a given experiment.
     """
@@ -55,4 +59,4 @@ def logs(ctx: click.Context, experiment_name: str, min_severity: str, start_date
 
     get_logs(experiment_name=experiment_name, min_severity=min_severity, start_date=start_date, end_date=end_date,
              pod_ids=pod_ids, pod_status=pod_status, match=match, output=output, pager=pager, follow=follow,
-             runs_kinds=LOG_RUNS_KINDS, instance_type="experiment")
+             slices=slices, compression=compression, runs_kinds=LOG_RUNS_KINDS, instance_type="experiment")
@@ -24,6 +24,7 @@ from tabulate import tabulate
 
 from commands.experiment.common import RUN_NAME, RUN_PARAMETERS, RUN_STATUS, RUN_MESSAGE, RunKinds, \
     validate_env_paramater
+from commands.experiment.sweep import SweepSampling
 from util.cli_state import common_options
 from util.config import TBLT_TABLE_FORMAT
 from util.logger import initialize_logger
@@ -96,6 +97,17 @@ def clean_script_parameters(ctx: click.Context, param, value: Tuple[str, ...]):
     return tuple(new_value)
 
 
+def validate_sampling(sampling: SweepSampling, max_runs: Optional[int], parameter_range: List[Tuple[str, str]],
+                      parameter_set: Tuple[str, ...]):
+    if sampling == SweepSampling.GRID:
+        if max_runs:
+            handle_error(user_msg=Texts.MAX_RUNS_WITH_GRID_ERROR_MSG)
+            exit(2)
+    elif not max_runs or not (parameter_range or parameter_set):
+        handle_error(user_msg=Texts.SAMPLING_WITHOUT_MAX_RUNS_ERROR_MSG.format(sampling=sampling.value))
+        exit(2)
+
+
 def format_run_message(run_message: Optional[str]) -> str:
     return textwrap.fill(run_message, width=60) if run_message else ''
 
@@ -111,16 +123,23 @@ def format_run_message(run_message: Optional[str]) -> str:
 @click.option("-ps", "--parameter-set", multiple=True, help=Texts.HELP_PS)
 @click.option("-e", "--env", multiple=True, help=Texts.HELP_E, callback=validate_env_paramater)
 @click.option("-r", "--requirements", type=click.Path(exists=True, dir_okay=False), required=False, help=Texts.HELP_R)
+@click.option("-sm", "--sampling", type=click.Choice([sampling.value for sampling in SweepSampling]),
+              default=SweepSampling.GRID.value, help=Texts.HELP_SM)
+@click.option("-mr", "--max-runs", type=click.IntRange(min=1), help=Texts.HELP_MR)
+@click.option("--seed", type=int, help=Texts.HELP_SEED)
+@click.option("-mcr", "--max-concurrent-runs", type=click.IntRange(min=1), help=Texts.HELP_MCR)
 @click.argument("script-parameters", nargs=-1, metavar='[-- script-parameters]', callback=clean_script_parameters)
 @common_options(admin_command=False)
 @click.pass_context
 def submit(ctx: click.Context, script_location: str, script_folder_location: str, template: str, name: str,
            pack_param: List[Tuple[str, str]], parameter_range: List[Tuple[str, str]], parameter_set: Tuple[str, ...],
-           env: List[str], script_parameters: Tuple[str, ...], requirements: Optional[str]):
+           env: List[str], script_parameters: Tuple[str, ...], requirements: Optional[str], sampling: str,
+           max_runs: Optional[int], seed: Optional[int], max_concurrent_runs: Optional[int]):
     logger.debug(Texts.SUBMIT_START_LOG_MSG)
     validate_script_location(script_location)
     validate_pack_params(pack_param)
     validate_pack(template)
+    validate_sampling(SweepSampling(sampling), max_runs, parameter_range, parameter_set)
 
     if os.path.isdir(script_location):
         if not requirements:
@@ -137,7 +156,9 @@ def submit(ctx: click.Context, script_location: str, script_folder_location: str
                                                       template=template, name=name, pack_params=pack_param,
                                                       parameter_range=parameter_range, parameter_set=parameter_set,
                                                       script_parameters=script_parameters,
-                                                      env_variables=env, requirements_file=requirements)
+                                                      env_variables=env, requirements_file=requirements,
+                                                      sampling=SweepSampling(sampling), max_runs=max_runs,
+                                                      seed=seed, max_concurrent_runs=max_concurrent_runs)
     except K8sProxyCloseError as exe:
         handle_error(user_msg=exe.message)
         click.echo(exe.message)
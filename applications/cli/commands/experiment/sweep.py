@@ -0,0 +1,154 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from collections.abc import Sequence
+from decimal import Decimal
+from enum import Enum
+from functools import reduce
+import operator
+import random
+from typing import List, Tuple, Union
+
+
+class SweepSampling(Enum):
+    GRID = 'grid'
+    RANDOM = 'random'
+    LATIN_HYPERCUBE = 'lhs'
+
+
+class ValuesRange(Sequence):
+    """
+    Values of a parameter given in "start...stop:step" form. Values are calculated when they are accessed,
+    so a range doesn't take memory regardless of a number of its values. Decimal arithmetic is used, so values
+    of ranges with fractional steps are not affected by rounding errors.
+    """
+
+    def __init__(self, range_definition: str):
+        """
+        :param range_definition: range in "start...stop:step" form
+        In case of an incorrect format of a range - it throws an exception
+        """
+        range_values, step = range_definition.split(':')
+        start, stop = range_values.split('...')
+        self.start = Decimal(start.strip())
+        self.stop = Decimal(stop.strip())
+        self.step = Decimal(step.strip())
+        if not (self.start.is_finite() and self.stop.is_finite() and self.step.is_finite()) or self.step <= 0:
+            raise ValueError(f'Incorrect range: {range_definition}')
+        self._length = int((self.stop - self.start) / self.step) + 1 if self.stop >= self.start else 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('range index out of range')
+
+        # values are formatted in the same way as numbers given by a user - e.g. the first value of "1...2:0.5"
+        # is "1" and the next ones are "1.5" and "2.0"
+        value = str(self.start + index * self.step if index else self.start)
+        try:
+            return str(int(value))
+        except ValueError:
+            return str(float(value))
+
+
+class ParameterValues(Sequence):
+    """
+    Values of a parameter in "name=value" form.
+    """
+
+    def __init__(self, param_name: str, values: Sequence):
+        self.param_name = param_name
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return f'{self.param_name}={self.values[index]}'
+
+
+class ParameterSweep:
+    """
+    Space of parameters of an experiment's runs - cartesian product of sets of parameters (given by -ps options)
+    and values of single parameters (given by -pr options). A point of the space is identified by its index in order
+    of the product, parameters of a point are calculated from its index when they are needed, so the space isn't
+    expanded in memory.
+    """
+
+    def __init__(self, parameter_sets: Sequence = (), parameter_values: Sequence = ()):
+        """
+        :param parameter_sets: sets of parameters, each of them is a tuple of "name=value" strings
+        :param parameter_values: sequences of "name=value" strings - possible values of consecutive parameters
+        """
+        # sets of parameters are the outermost dimension, values of the last parameter change most frequently
+        self.dimensions: List[Sequence] = ([parameter_sets] if parameter_sets else []) + list(parameter_values)
+
+    @property
+    def size(self) -> int:
+        return reduce(operator.mul, (len(dimension) for dimension in self.dimensions), 1)
+
+    def get_parameters(self, index: int) -> Tuple[str, ...]:
+        """
+        :param index: index of a point in the space
+        :return: parameters of a point
+        """
+        points: List[Union[str, Tuple[str, ...]]] = []
+        for dimension in reversed(self.dimensions):
+            index, position = divmod(index, len(dimension))
+            points.append(dimension[position])
+
+        parameters: Tuple[str, ...] = ()
+        for point in reversed(points):
+            parameters += point if isinstance(point, tuple) else (point, )
+        return parameters
+
+    def get_indices(self, sampling: SweepSampling = SweepSampling.GRID, max_points: int = None,
+                    seed: int = None) -> Sequence:
+        """
+        Selects points of the space.
+        :param sampling: GRID selects all points of the space, RANDOM selects max_points random points,
+                         LATIN_HYPERCUBE selects up to max_points points of a latin hypercube sample - each of
+                         max_points intervals of values of every parameter is sampled once
+        :param max_points: number of points selected by sampling methods
+        :param seed: seed of a random number generator used by sampling methods
+        :return: sorted indices of selected points
+        """
+        if sampling == SweepSampling.GRID or not max_points or max_points >= self.size:
+            return range(self.size)
+
+        generator = random.Random(seed)
+        if sampling == SweepSampling.RANDOM:
+            return sorted(generator.sample(range(self.size), max_points))
+
+        # positions of points in intervals of every dimension - each interval contains exactly one point
+        intervals = [generator.sample(range(max_points), max_points) for _ in self.dimensions]
+        indices = set()
+        for point in range(max_points):
+            index = 0
+            for dimension, dimension_intervals in zip(self.dimensions, intervals):
+                position = int((dimension_intervals[point] + generator.random()) * len(dimension) / max_points)
+                index = index * len(dimension) + min(position, len(dimension) - 1)
+            # if there are less values of a parameter than points, the same point may be selected more than once
+            indices.add(index)
+        return sorted(indices)
@@ -17,7 +17,6 @@
 from click.testing import CliRunner
 import copy
 import pytest
-from unittest.mock import DEFAULT
 
 from platform_resources.run import Run, RunStatus
 from platform_resources.experiment import Experiment, ExperimentStatus
@@ -107,6 +106,8 @@ class CancelMocks:
         self.get_k8s_api_key = mocker.patch('commands.experiment.cancel.get_api_key')
         self.get_experiment = mocker.patch('commands.experiment.cancel.Experiment.get',
                                            return_value=None)
+        self.list_experiments = mocker.patch('commands.experiment.cancel.Experiment.list',
+                                             return_value=[])
 
 
 @pytest.fixture(autouse=True)
@@ -211,6 +212,7 @@ def test_cancel_all_cancelled_successfully(prepare_command_mocks: CancelMocks):
 
     result = CliRunner().invoke(cancel.cancel, [EXPERIMENT_NAME], input="y")
     check_command_asserts(prepare_command_mocks, cne_count=2)
+    prepare_command_mocks.list_experiments.assert_called_once_with(namespace="namespace")
 
     assert f"The following {experiment_name_plural} were cancelled successfully:" in result.output
     assert "exp-mnist-single-node.py-18.05.17-16.05.45-1-tf-training" in result.output
@@ -284,8 +286,10 @@ class CancelExperimentMocks:
     def __init__(self, mocker):
         self.mocker = mocker
         self.list_runs = mocker.patch("commands.experiment.cancel.Run.list", return_value=[])
-        self.delete_k8s_object = mocker.patch("commands.experiment.cancel.kubectl.delete_k8s_object")
-        self.delete_helm_release = mocker.patch("commands.experiment.cancel.delete_helm_release")
+        self.delete_run = mocker.patch("commands.experiment.cancel.Run.delete")
+        self.delete_run_collection = mocker.patch("commands.experiment.cancel.Run.delete_collection", return_value=[])
+        self.delete_experiment = mocker.patch("commands.experiment.cancel.Experiment.delete")
+        self.delete_helm_release = mocker.patch("commands.experiment.cancel.delete_helm_release_once")
         self.get_experiment = mocker.patch("commands.experiment.cancel.Experiment.get",
                                            return_value=None)
         self.k8s_es_client = mocker.patch('commands.experiment.cancel.K8sElasticSearchClient')
@@ -294,6 +298,7 @@ class CancelExperimentMocks:
                                                                  'delete_exp_tag_from_git_repo_manager')
         self.get_run_environment_path = mocker.patch('commands.experiment.cancel.get_run_environment_path')
         self.is_current_user_administrator = mocker.patch('commands.experiment.cancel.is_current_user_administrator')
+        self.sleep = mocker.patch('commands.experiment.cancel.time.sleep')
         # CAN-1099 - it should be uncommented after repairing docker gc
         # self.delete_images_for_experiment = mocker.patch('commands.experiment.cancel.'
         #                                                 'delete_images_for_experiment')
@@ -307,13 +312,16 @@ def prepare_cancel_experiment_mocks(mocker) -> CancelExperimentMocks:
 
 def check_cancel_experiment_asserts(prepare_cancel_experiment_mocks: CancelExperimentMocks,
                                     list_runs_count=1,
-                                    delete_k8s_object_count=0,
+                                    delete_run_count=0,
+                                    delete_experiment_count=0,
                                     delete_helm_release_count=1,
                                     get_experiment_count=1,
                                     delete_images_for_experiment_count=0):
     assert prepare_cancel_experiment_mocks.list_runs.call_count == list_runs_count, \
         "list of runs wasn't taken"
-    assert prepare_cancel_experiment_mocks.delete_k8s_object.call_count == delete_k8s_object_count, \
+    assert prepare_cancel_experiment_mocks.delete_run.call_count == delete_run_count, \
+        "run objects weren't deleted"
+    assert prepare_cancel_experiment_mocks.delete_experiment.call_count == delete_experiment_count, \
         "experiment object wasn't deleted"
     assert prepare_cancel_experiment_mocks.delete_helm_release.call_count == delete_helm_release_count, \
         "helm release wasn't deleted"
@@ -363,67 +371,92 @@ def test_cancel_experiment_failure(prepare_cancel_experiment_mocks: CancelExperi
     assert len(not_del_list) == 1
     assert update_exp_mock.call_count == 1
     assert update_run_mock.call_count == 0
-    check_cancel_experiment_asserts(prepare_cancel_experiment_mocks)
+    check_cancel_experiment_asserts(prepare_cancel_experiment_mocks,
+                                    delete_helm_release_count=cancel.RUN_OPERATION_TRIES)
 
 
 def test_cancel_experiment_success_with_purge(prepare_cancel_experiment_mocks: CancelExperimentMocks):
     RUN_QUEUED_COPY = copy.deepcopy(RUN_QUEUED)
-    prepare_cancel_experiment_mocks.mocker.patch('commands.experiment.cancel.cancel_experiment_runs').return_value \
-        = [RUN_QUEUED_COPY], []
     prepare_cancel_experiment_mocks.get_experiment.return_value = TEST_EXPERIMENTS[0]
     prepare_cancel_experiment_mocks.list_runs.return_value = [RUN_QUEUED_COPY]
+    prepare_cancel_experiment_mocks.delete_run_collection.return_value = [RUN_QUEUED_COPY.name]
     update_run_mock = prepare_cancel_experiment_mocks.mocker.patch.object(RUN_QUEUED_COPY, 'update')
     update_exp_mock = prepare_cancel_experiment_mocks.mocker.patch.object(TEST_EXPERIMENTS[0], 'update')
-    cancel.purge_experiment(exp_name="experiment-1", runs_to_purge=[RUN_QUEUED_COPY], namespace="namespace",
-                            k8s_es_client=prepare_cancel_experiment_mocks.k8s_es_client)
+    del_list, not_del_list = cancel.purge_experiment(exp_name="experiment-1", runs_to_purge=[RUN_QUEUED_COPY],
+                                                     namespace="namespace")
 
+    assert del_list == [RUN_QUEUED_COPY]
+    assert not_del_list == []
     assert update_exp_mock.call_count == 1
     assert update_run_mock.call_count == 0
+    prepare_cancel_experiment_mocks.delete_run_collection.assert_called_once_with(
+        namespace="namespace", label_selector="experimentName=experiment-1")
+    prepare_cancel_experiment_mocks.argo_workflow.delete_collection.assert_called_once()
     check_cancel_experiment_asserts(prepare_cancel_experiment_mocks, delete_helm_release_count=1,
-                                    delete_k8s_object_count=2)
+                                    delete_experiment_count=1)
 
 
 def test_cancel_experiment_purge_failure(prepare_cancel_experiment_mocks: CancelExperimentMocks):
     RUN_QUEUED_COPY = copy.deepcopy(RUN_QUEUED)
-    prepare_cancel_experiment_mocks.mocker.patch('commands.experiment.cancel.cancel_experiment_runs').return_value \
-        = [RUN_QUEUED_COPY], []
     prepare_cancel_experiment_mocks.get_experiment.return_value = TEST_EXPERIMENTS[0]
     prepare_cancel_experiment_mocks.list_runs.return_value = [RUN_QUEUED_COPY]
-    prepare_cancel_experiment_mocks.delete_helm_release.side_effect = [RuntimeError]
+    prepare_cancel_experiment_mocks.delete_helm_release.side_effect = RuntimeError()
     update_run_mock = prepare_cancel_experiment_mocks.mocker.patch.object(RUN_QUEUED_COPY, 'update')
     update_exp_mock = prepare_cancel_experiment_mocks.mocker.patch.object(TEST_EXPERIMENTS[0], 'update')
     del_list, not_del_list = cancel.purge_experiment(exp_name="experiment-1", runs_to_purge=[RUN_QUEUED_COPY],
-                                                     namespace="namespace",
-                                                     k8s_es_client=prepare_cancel_experiment_mocks.k8s_es_client)
+                                                     namespace="namespace")
 
     assert len(del_list) == 0
     assert len(not_del_list) == 1
     assert update_exp_mock.call_count == 1
     assert update_run_mock.call_count == 0
-    check_cancel_experiment_asserts(prepare_cancel_experiment_mocks, delete_helm_release_count=1)
+    assert prepare_cancel_experiment_mocks.delete_run_collection.call_count == 0
+    check_cancel_experiment_asserts(prepare_cancel_experiment_mocks,
+                                    delete_helm_release_count=cancel.RUN_OPERATION_TRIES)
 
 
 def test_cancel_experiment_with_purge_delete_failure(prepare_cancel_experiment_mocks: CancelExperimentMocks):
     RUN_QUEUED_COPY = copy.deepcopy(RUN_QUEUED)
-    prepare_cancel_experiment_mocks.mocker.patch('commands.experiment.cancel.cancel_experiment_runs').return_value \
-        = [RUN_QUEUED_COPY], []
     prepare_cancel_experiment_mocks.get_experiment.return_value = TEST_EXPERIMENTS[0]
     prepare_cancel_experiment_mocks.list_runs.return_value = [RUN_QUEUED_COPY]
+    prepare_cancel_experiment_mocks.delete_run_collection.side_effect = RuntimeError()
     update_run_mock = prepare_cancel_experiment_mocks.mocker.patch.object(RUN_QUEUED_COPY, 'update')
     update_exp_mock = prepare_cancel_experiment_mocks.mocker.patch.object(TEST_EXPERIMENTS[0], 'update')
     # CAN-1099 - it should be uncommented after repairing docker gc
     # prepare_cancel_experiment_mocks.delete_images_for_experiment.side_effect = RuntimeError()
-    cancel.purge_experiment(exp_name="experiment-1", runs_to_purge=[RUN_QUEUED_COPY], namespace="namespace",
-                            k8s_es_client=prepare_cancel_experiment_mocks.k8s_es_client)
+    del_list, not_del_list = cancel.purge_experiment(exp_name="experiment-1", runs_to_purge=[RUN_QUEUED_COPY],
+                                                     namespace="namespace")
 
+    # runs are deleted one by one, if they cannot be deleted at once
+    assert len(del_list) == 1
     assert update_run_mock.call_count == 0
     assert update_exp_mock.call_count == 1
     check_cancel_experiment_asserts(prepare_cancel_experiment_mocks, delete_helm_release_count=1,
-                                    delete_k8s_object_count=2)
+                                    delete_run_count=1, delete_experiment_count=1)
+
+
+def test_purge_experiment_part_of_runs(prepare_cancel_experiment_mocks: CancelExperimentMocks):
+    prepare_cancel_experiment_mocks.get_experiment.return_value = TEST_EXPERIMENTS[0]
+    prepare_cancel_experiment_mocks.list_runs.return_value = TEST_RUNS_CORRECT
+    update_exp_mock = prepare_cancel_experiment_mocks.mocker.patch.object(TEST_EXPERIMENTS[0], 'update')
+    del_list, not_del_list = cancel.purge_experiment(exp_name="experiment-1", runs_to_purge=TEST_RUNS_CORRECT[:1],
+                                                     namespace="namespace")
+
+    assert del_list == TEST_RUNS_CORRECT[:1]
+    assert update_exp_mock.call_count == 0
+    assert prepare_cancel_experiment_mocks.delete_run_collection.call_count == 0
+    assert prepare_cancel_experiment_mocks.argo_workflow.delete_collection.call_count == 0
+    check_cancel_experiment_asserts(prepare_cancel_experiment_mocks, delete_run_count=1)
 
 
 def test_cancel_experiment_one_cancelled_one_not(prepare_cancel_experiment_mocks: CancelExperimentMocks):
-    prepare_cancel_experiment_mocks.delete_helm_release.side_effect = [DEFAULT, RuntimeError(), DEFAULT, DEFAULT]
+    failing_run = TEST_RUNS_CORRECT[1]
+
+    def delete_helm_release(release_name, *args, **kwargs):
+        if release_name == failing_run.name:
+            raise RuntimeError()
+
+    prepare_cancel_experiment_mocks.delete_helm_release.side_effect = delete_helm_release
     prepare_cancel_experiment_mocks.list_runs.return_value = TEST_RUNS_CORRECT
     prepare_cancel_experiment_mocks.get_experiment.return_value = TEST_EXPERIMENTS[0]
     update_exp_mock = prepare_cancel_experiment_mocks.mocker.patch.object(TEST_EXPERIMENTS[0], 'update')
@@ -435,8 +468,62 @@ def test_cancel_experiment_one_cancelled_one_not(prepare_cancel_experiment_mocks
 
     assert update_exp_mock.call_count == 1
     assert len(del_list) == 1
-    assert len(not_del_list) == 1
-    check_cancel_experiment_asserts(prepare_cancel_experiment_mocks, delete_helm_release_count=2)
+    assert not_del_list == [failing_run]
+    check_cancel_experiment_asserts(prepare_cancel_experiment_mocks,
+                                    delete_helm_release_count=1 + cancel.RUN_OPERATION_TRIES)
+
+
+def test_execute_for_runs(mocker):
+    sleep_mock = mocker.patch('commands.experiment.cancel.time.sleep')
+    runs = [copy.deepcopy(RUN_QUEUED) for _ in range(4)]
+    for index, run in enumerate(runs):
+        run.name = f'run-{index}'
+    attempts = {run.name: 0 for run in runs}
+
+    def operation(run):
+        attempts[run.name] += 1
+        if run.name == 'run-1' and attempts[run.name] < cancel.RUN_OPERATION_TRIES:
+            raise RuntimeError()
+        if run.name == 'run-2':
+            raise RuntimeError()
+        if run.name == 'run-3':
+            raise RuntimeError('NotFound')
+
+    succeeded, failed = cancel.execute_for_runs(runs, operation, progress_msg='', max_workers=2)
+
+    assert succeeded == runs[:2]
+    assert [run for run, _ in failed] == runs[2:]
+    # operations on resources, which don't exist, are not retried
+    assert attempts == {'run-0': 1, 'run-1': cancel.RUN_OPERATION_TRIES, 'run-2': cancel.RUN_OPERATION_TRIES,
+                        'run-3': 1}
+    assert sleep_mock.call_count == 2 * (cancel.RUN_OPERATION_TRIES - 1)
+
+
+def test_cancel_purge_deletes_logs(prepare_command_mocks: CancelMocks):
+    prepare_command_mocks.list_runs.return_value = [RUN_QUEUED]
+    purge_experiment_mock = prepare_command_mocks.mocker.patch('commands.experiment.cancel.purge_experiment',
+                                                               return_value=([RUN_QUEUED], []))
+    prepare_command_mocks.mocker.patch('commands.experiment.cancel.is_current_user_administrator',
+                                       return_value=True)
+    purge_logs_mock = prepare_command_mocks.mocker.patch('commands.experiment.cancel.purge_logs')
+
+    CliRunner().invoke(cancel.cancel, [RUN_QUEUED.name, '--purge', '--wait'], input='y', catch_exceptions=False)
+
+    assert purge_experiment_mock.call_count == 1
+    purge_logs_mock.assert_called_once_with(k8s_es_client=prepare_command_mocks.k8s_es_client.return_value,
+                                            runs=[RUN_QUEUED], namespace='namespace', wait=True)
+
+
+@pytest.mark.parametrize('wait', [False, True])
+def test_purge_logs(mocker, wait):
+    es_client = mocker.MagicMock()
+    es_client.delete_logs_for_runs.return_value = ['node:1']
+
+    cancel.purge_logs(k8s_es_client=es_client, runs=TEST_RUNS_CORRECT, namespace='namespace', wait=wait)
+
+    es_client.delete_logs_for_runs.assert_called_once_with(runs=[run.name for run in TEST_RUNS_CORRECT],
+                                                           namespace='namespace', wait_for_completion=False)
+    assert es_client.wait_for_tasks.call_count == (1 if wait else 0)
 
 
 def test_cancel_match_and_name(prepare_command_mocks: CancelMocks):
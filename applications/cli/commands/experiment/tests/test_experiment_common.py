@@ -20,10 +20,14 @@ import os
 import pytest
 from unittest.mock import patch, mock_open
 
+import commands.experiment.common
+
 from commands.experiment.common import submit_experiment, values_range, \
     analyze_ps_parameters_list, analyze_pr_parameters_list, prepare_list_of_values, prepare_list_of_runs, \
     check_enclosing_brackets, delete_environment, create_environment, get_run_environment_path, check_run_environment, \
-    RunKinds, validate_pack_params_names, get_log_filename, validate_pack, prepare_experiment_environment
+    RunKinds, validate_pack_params_names, get_log_filename, validate_pack, prepare_experiment_environment, \
+    prepare_experiment_environments, PrepareExperimentResult, wait_for_free_run_slots
+from commands.experiment.sweep import SweepSampling
 
 from util.exceptions import SubmitExperimentError
 import util.config
@@ -88,15 +92,14 @@ def test_create_environment_success(config_mock, mocker):
     mocker.patch("os.makedirs")
     mocker.patch("os.chmod")
     sem_file_creation_mock = mocker.patch("commands.experiment.common.Path.touch")
-    sh_copy_mock = mocker.patch("shutil.copy2")
-    sh_copytree_mock = mocker.patch("commands.experiment.common.copy_tree")
+    workspace_store_mock = mocker.patch("commands.experiment.common.get_workspace_store").return_value
 
     experiment_path = create_environment(EXPERIMENT_NAME, SCRIPT_LOCATION, EXPERIMENT_FOLDER)
 
     assert sem_file_creation_mock.call_count == 1, "semaphore file wasn't created"
     assert os_pexists_mock.call_count == 1, "existence of an experiment's folder wasn't checked"
-    assert sh_copytree_mock.call_count == 1, "additional folder wan't copied"
-    assert sh_copy_mock.call_count == 1, "files weren't copied"
+    assert workspace_store_mock.copytree.call_count == 1, "additional folder wan't copied"
+    assert workspace_store_mock.link_file.call_count == 1, "files weren't copied"
     assert experiment_path == FAKE_CLI_EXPERIMENT_PATH
 
 
@@ -105,8 +108,7 @@ def test_create_environment_folder_size_warning(config_mock, mocker, tmpdir):
     mocker.patch("os.makedirs")
     mocker.patch("os.chmod")
     sem_file_creation_mock = mocker.patch("commands.experiment.common.Path.touch")
-    mocker.patch("shutil.copy2")
-    mocker.patch("commands.experiment.common.copy_tree")
+    mocker.patch("commands.experiment.common.get_workspace_store")
     confirm_mock = mocker.patch('commands.experiment.common.click.confirm')
 
     sfl_size = 1024
@@ -126,43 +128,42 @@ def test_create_environment_folder_size_warning(config_mock, mocker, tmpdir):
 def test_create_environment_makedir_error(config_mock, mocker):
     os_pexists_mock = mocker.patch("os.path.exists", side_effect=[False])
     mocker.patch("os.makedirs", side_effect=Exception("Test exception"))
-    sh_copy_mock = mocker.patch("shutil.copy2")
-    copytree_mock = mocker.patch("commands.experiment.common.copy_tree")
+    workspace_store_mock = mocker.patch("commands.experiment.common.get_workspace_store").return_value
 
     with pytest.raises(SubmitExperimentError):
         create_environment(EXPERIMENT_NAME, SCRIPT_LOCATION, EXPERIMENT_FOLDER)
 
     assert os_pexists_mock.call_count == 1, "existence of an experiment's folder wasn't checked"
-    assert copytree_mock.call_count == 0, "additional folder was copied"
-    assert sh_copy_mock.call_count == 0, "files were copied"
+    assert workspace_store_mock.copytree.call_count == 0, "additional folder was copied"
+    assert workspace_store_mock.link_file.call_count == 0, "files were copied"
 
 
 def test_create_environment_lack_of_home_folder_error(config_mock, mocker):
     os_pexists_mock = mocker.patch("os.path.exists", side_effect=[False])
     os_mkdirs_mock = mocker.patch("os.makedirs", side_effect=RuntimeError())
-    sh_copy_mock = mocker.patch("shutil.copy2")
+    workspace_store_mock = mocker.patch("commands.experiment.common.get_workspace_store").return_value
 
     with pytest.raises(SubmitExperimentError):
         create_environment(EXPERIMENT_NAME, SCRIPT_LOCATION, EXPERIMENT_FOLDER)
 
     assert os_pexists_mock.call_count == 1, "existence of an experiment's folder wasn't checked"
     assert os_mkdirs_mock.call_count == 1, "experiment's folder was created"
-    assert sh_copy_mock.call_count == 0, "files were copied"
+    assert workspace_store_mock.link_file.call_count == 0, "files were copied"
 
 
 def test_create_environment_copy_error(config_mock, mocker):
     os_pexists_mock = mocker.patch("os.path.exists", side_effect=[False])
     mocker.patch("os.makedirs")
-    sh_copy_mock = mocker.patch("shutil.copy2", side_effect=Exception("Test exception"))
-    copytree_mock = mocker.patch("commands.experiment.common.copy_tree")
+    workspace_store_mock = mocker.patch("commands.experiment.common.get_workspace_store").return_value
+    workspace_store_mock.link_file.side_effect = Exception("Test exception")
     mocker.patch("commands.experiment.common.Path.touch")
 
     with pytest.raises(SubmitExperimentError):
         create_environment(EXPERIMENT_NAME, SCRIPT_LOCATION, EXPERIMENT_FOLDER)
 
-    assert copytree_mock.call_count == 0, "additional folder was copied"
+    assert workspace_store_mock.copytree.call_count == 0, "additional folder was copied"
     assert os_pexists_mock.call_count == 1, "existence of an experiment's folder wasn't checked"
-    assert sh_copy_mock.call_count == 1, "files were copied"
+    assert workspace_store_mock.link_file.call_count == 1, "files were copied"
 
 
 def test_get_run_environment_path(config_mock):
@@ -324,6 +325,72 @@ def test_submit_two_experiment_success(prepare_mocks: SubmitExperimentMocks, cap
     assert "param2=3" in out
 
 
+def prepare_mocks_for_runs(prepare_mocks: SubmitExperimentMocks, run_count: int):
+    prepare_mocks.mocker.patch("click.confirm", return_value=True)
+    prepare_mocks.create_env.side_effect = None
+    prepare_mocks.cmd_create.side_effect = [("", 0)] * run_count
+    prepare_mocks.update_conf.side_effect = None
+    prepare_mocks.check_run_env.side_effect = None
+
+
+def test_submit_sweep_in_waves(prepare_mocks: SubmitExperimentMocks, mocker):
+    prepare_mocks_for_runs(prepare_mocks, run_count=5)
+    mocker.patch("commands.experiment.common.SUBMISSION_WAVE_SIZE", 2)
+    prepare_envs = mocker.spy(commands.experiment.common, "prepare_experiment_environments")
+
+    runs_list, _, _ = submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None, pack_params=[],
+                                        template=None, name=None, parameter_range=[("param1", "{1...5:1}")],
+                                        parameter_set=(), script_parameters=(), run_kind=RunKinds.TRAINING)
+
+    assert [run.name for run in runs_list] == [f"{EXPERIMENT_NAME}-{i}" for i in range(1, 6)]
+    assert [len(call[1]["runs_list"]) for call in prepare_envs.call_args_list] == [2, 2, 1]
+    check_asserts(prepare_mocks, create_env_count=5, cmd_create_count=5, update_conf_count=5, submit_one_count=5,
+                  add_run_count=5)
+
+
+def test_submit_sweep_next_wave_fail(prepare_mocks: SubmitExperimentMocks, mocker):
+    prepare_mocks_for_runs(prepare_mocks, run_count=3)
+    mocker.patch("commands.experiment.common.SUBMISSION_WAVE_SIZE", 1)
+    prepare_mocks.create_env.side_effect = [None, SubmitExperimentError("error"), None]
+
+    runs_list, run_errors, _ = submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None,
+                                                 pack_params=[], template=None, name=None,
+                                                 parameter_range=[("param1", "{1...3:1}")], parameter_set=(),
+                                                 script_parameters=(), run_kind=RunKinds.TRAINING)
+
+    assert [run.state for run in runs_list] == [RunStatus.QUEUED, RunStatus.FAILED, RunStatus.QUEUED]
+    assert f"{EXPERIMENT_NAME}-2" in run_errors
+    assert prepare_mocks.submit_one.call_count == 2
+
+
+def test_submit_sweep_sampling_and_max_concurrent_runs(prepare_mocks: SubmitExperimentMocks, mocker):
+    prepare_mocks_for_runs(prepare_mocks, run_count=3)
+    wait_mock = mocker.patch("commands.experiment.common.wait_for_free_run_slots", side_effect=[2, 1])
+
+    runs_list, _, _ = submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None, pack_params=[],
+                                        template=None, name=None, parameter_range=[("param1", "{1...1000000:1}")],
+                                        parameter_set=(), script_parameters=(), run_kind=RunKinds.TRAINING,
+                                        sampling=SweepSampling.LATIN_HYPERCUBE, max_runs=3, max_concurrent_runs=2)
+
+    assert len(runs_list) == 3
+    assert wait_mock.call_count == 2
+    assert prepare_mocks.submit_one.call_count == 3
+
+
+def test_wait_for_free_run_slots(mocker):
+    sleep_mock = mocker.patch("time.sleep")
+    runs = [Run(name="run-1", experiment_name=EXPERIMENT_NAME, state=RunStatus.RUNNING),
+            Run(name="run-2", experiment_name=EXPERIMENT_NAME, state=RunStatus.QUEUED),
+            Run(name="run-3", experiment_name=EXPERIMENT_NAME, state=RunStatus.COMPLETE)]
+    finished_runs = [Run(name="run-1", experiment_name=EXPERIMENT_NAME, state=RunStatus.FAILED)] + runs[1:]
+    list_mock = mocker.patch("commands.experiment.common.Run.list",
+                             side_effect=[runs, RuntimeError("connection error"), finished_runs])
+
+    assert wait_for_free_run_slots(EXPERIMENT_NAME, EXPERIMENT_NAMESPACE, max_concurrent_runs=2) == 1
+    assert list_mock.call_count == 3
+    assert sleep_mock.call_count == 2
+
+
 def test_submit_with_name_success(prepare_mocks: SubmitExperimentMocks):
     submit_experiment(script_location=SCRIPT_LOCATION, script_folder_location=None, pack_params=[],
                       template=None, name=EXPERIMENT_NAME, parameter_range=[],
@@ -673,3 +740,46 @@ def test_prepare_experiment_environment_requirements_file_not_provided(tmpdir, c
 
     assert exp_env_mocks.copy_requirements_file_mock.call_count == 0
     assert exp_env_mocks.create_requirements_file_mock.call_count == 1
+
+
+def test_prepare_experiment_environments(config_mock, mocker):
+    check_run_env_mock = mocker.patch('commands.experiment.common.check_run_environment')
+    prepare_env_mock = mocker.patch('commands.experiment.common.prepare_experiment_environment',
+                                    side_effect=lambda run_name, script_parameters, **kwargs:
+                                    PrepareExperimentResult(folder_name=run_name, script_name=script_parameters,
+                                                            pod_count=1))
+    runs = [Run(name=f'exp-{i}', experiment_name='exp', parameters=(f'param={i}',)) for i in range(20)]
+
+    results = prepare_experiment_environments(experiment_name='exp', runs_list=runs, script_parameters=('-v',),
+                                              pack_type='fake_pack', cluster_registry_port=1, username='fake-user',
+                                              max_workers=4)
+
+    assert check_run_env_mock.call_count == 20
+    assert prepare_env_mock.call_count == 20
+    assert [result.folder_name for result in results] == [run.name for run in runs]
+    assert [result.script_name for result in results] == [('-v', f'param={i}') for i in range(20)]
+
+
+def test_prepare_experiment_environments_failures(config_mock, mocker):
+    mocker.patch('commands.experiment.common.check_run_environment')
+    del_env_mock = mocker.patch('commands.experiment.common.delete_environment')
+
+    def prepare_env(run_name, **kwargs):
+        if run_name != 'exp-2':
+            try:
+                raise RuntimeError(f'{run_name} failure')
+            except RuntimeError as exe:
+                raise SubmitExperimentError(Texts.ENV_CREATION_ERROR_MSG) from exe
+        return PrepareExperimentResult(folder_name=run_name, script_name=None, pod_count=1)
+
+    mocker.patch('commands.experiment.common.prepare_experiment_environment', side_effect=prepare_env)
+    runs = [Run(name=f'exp-{i}', experiment_name='exp') for i in range(1, 4)]
+
+    with pytest.raises(SubmitExperimentError) as exe:
+        prepare_experiment_environments(experiment_name='exp', runs_list=runs, script_parameters=(),
+                                        pack_type='fake_pack', cluster_registry_port=1, username='fake-user')
+
+    assert 'exp-1: exp-1 failure' in str(exe.value)
+    assert 'exp-3: exp-3 failure' in str(exe.value)
+    assert 'exp-2' not in str(exe.value)
+    del_env_mock.assert_called_once_with('exp-2')
@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import time
+
+from click.testing import CliRunner
+
+from cli_text_consts import ExperimentGcCmdTexts as Texts
+from commands.experiment import gc
+from commands.experiment.common import remove_old_run_environments, EXP_SUB_SEMAPHORE_FILENAME
+
+
+def test_remove_old_run_environments(tmpdir, mocker):
+    mocker.patch('commands.experiment.common.get_run_environment_path', return_value=tmpdir.strpath)
+    old_time = time.time() - 10 * 24 * 60 * 60
+    for run_name in ('old-run', 'submitted-run', '.nauta-git-user'):
+        tmpdir.mkdir(run_name)
+        os.utime(tmpdir.join(run_name).strpath, (old_time, old_time))
+    tmpdir.join('submitted-run', EXP_SUB_SEMAPHORE_FILENAME).write('')
+    os.utime(tmpdir.join('submitted-run').strpath, (old_time, old_time))
+    tmpdir.mkdir('new-run')
+
+    removed_environments = remove_old_run_environments(older_than=7 * 24 * 60 * 60)
+
+    assert removed_environments == ['old-run']
+    assert sorted(os.listdir(tmpdir.strpath)) == ['.nauta-git-user', 'new-run', 'submitted-run']
+
+
+def test_gc(mocker):
+    remove_environments_mock = mocker.patch('commands.experiment.gc.remove_old_run_environments',
+                                            return_value=['run-1', 'run-2'])
+    store_mock = mocker.patch('commands.experiment.gc.get_workspace_store').return_value
+    store_mock.collect_garbage.return_value = (3, 2 * 1024 * 1024)
+
+    result = CliRunner().invoke(gc.gc, ['-o', '1'])
+
+    assert result.exit_code == 0
+    remove_environments_mock.assert_called_once_with(older_than=24 * 60 * 60)
+    assert Texts.GC_SUCCESS_MSG.format(environments_count=2, files_count=3, size_mb=2) in result.output
+
+
+def test_gc_failure(mocker):
+    mocker.patch('commands.experiment.gc.remove_old_run_environments', side_effect=OSError)
+
+    result = CliRunner().invoke(gc.gc, [])
+
+    assert result.exit_code == 1
+    assert Texts.GC_ERROR_MSG in result.output
@@ -58,6 +58,47 @@ def test_show_logs_success(mocker):
     assert es_client_instance.get_experiment_logs_generator.call_count == 1, 'Experiment logs were not retrieved'
 
 
+def test_show_logs_slices(mocker):
+    es_client_mock = mocker.patch('commands.common.logs_utils.K8sElasticSearchClient')
+    es_client_instance = es_client_mock.return_value
+    es_client_instance.get_experiment_logs_generator.return_value = TEST_LOG_ENTRIES
+
+    mocker.patch('commands.common.logs_utils.get_kubectl_host')
+    mocker.patch('commands.common.logs_utils.get_api_key')
+    mocker.patch('commands.common.logs_utils.get_kubectl_current_context_namespace')
+    fake_experiment_name = 'fake-experiment'
+    list_runs_mock = mocker.patch('commands.common.logs_utils.Run.list')
+    list_runs_mock.return_value = [Run(name=fake_experiment_name, experiment_name=fake_experiment_name)]
+
+    runner = CliRunner()
+    result = runner.invoke(logs.logs, [fake_experiment_name, '--slices', '4'])
+
+    assert result.exit_code == 0
+    assert es_client_instance.get_experiment_logs_generator.call_args[1]['slices'] == 4
+
+
+def test_show_logs_follow_many_runs(mocker):
+    es_client_mock = mocker.patch('commands.common.logs_utils.K8sElasticSearchClient')
+    es_client_instance = es_client_mock.return_value
+    es_client_instance.get_experiments_stream_logs_generator.return_value = TEST_LOG_ENTRIES
+
+    mocker.patch('commands.common.logs_utils.get_kubectl_host')
+    mocker.patch('commands.common.logs_utils.get_api_key')
+    mocker.patch('commands.common.logs_utils.get_kubectl_current_context_namespace')
+    list_runs_mock = mocker.patch('commands.common.logs_utils.Run.list')
+    runs = [Run(name='fake-experiment-1', experiment_name='fake-experiment-1'),
+            Run(name='fake-experiment-2', experiment_name='fake-experiment-2')]
+    list_runs_mock.return_value = runs
+
+    runner = CliRunner()
+    result = runner.invoke(logs.logs, ['-m', 'fake-experiment', '--follow'])
+
+    assert result.exit_code == 0
+    assert es_client_instance.get_experiments_stream_logs_generator.call_count == 1
+    assert es_client_instance.get_experiments_stream_logs_generator.call_args[1]['runs'] == runs
+    assert es_client_instance.get_experiment_logs_generator.call_count == 0
+
+
 def test_show_logs_failure(mocker):
     es_client_mock = mocker.patch('commands.common.logs_utils.K8sElasticSearchClient')
     es_client_instance = es_client_mock.return_value
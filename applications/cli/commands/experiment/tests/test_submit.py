@@ -23,6 +23,7 @@ from commands.experiment.submit import submit, DEFAULT_SCRIPT_NAME, validate_scr
     get_default_script_location, clean_script_parameters, validate_pack_params, \
     check_duplicated_params
 from commands.experiment.common import RunStatus
+from commands.experiment.sweep import SweepSampling
 from platform_resources.run import Run
 from util.exceptions import SubmitExperimentError
 from cli_text_consts import ExperimentSubmitCmdTexts as Texts
@@ -230,3 +231,24 @@ def test_submit_requirements_wrong_path(prepare_mocks: SubmitMocks, tmpdir, mock
 
     assert wrong_requirements_file_path in result.output
     assert result.exit_code == 2
+
+
+def test_submit_sampling(prepare_mocks: SubmitMocks, mock_exp_script_file):
+    result = CliRunner().invoke(submit, [mock_exp_script_file, '-pr', 'lr', '{0.001...0.1:0.001}', '-sm', 'lhs',
+                                         '-mr', '10', '--seed', '5', '-mcr', '4'])
+
+    _, submit_experiment_kwargs = prepare_mocks.submit_experiment.call_args
+    assert submit_experiment_kwargs.get('sampling') == SweepSampling.LATIN_HYPERCUBE
+    assert submit_experiment_kwargs.get('max_runs') == 10
+    assert submit_experiment_kwargs.get('seed') == 5
+    assert submit_experiment_kwargs.get('max_concurrent_runs') == 4
+    assert result.exit_code == 0
+
+
+@pytest.mark.parametrize("options", [['-sm', 'random'], ['-mr', '10'], ['-sm', 'random', '-mr', '10', '--seed', '1']])
+def test_submit_sampling_incorrect_options(prepare_mocks: SubmitMocks, mock_exp_script_file, options):
+    parameter_range = [] if '--seed' in options else ['-pr', 'lr', '{1...10:1}']
+    result = CliRunner().invoke(submit, [mock_exp_script_file] + parameter_range + options)
+
+    assert prepare_mocks.submit_experiment.call_count == 0
+    assert result.exit_code == 2
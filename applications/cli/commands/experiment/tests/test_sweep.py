@@ -0,0 +1,82 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import itertools
+
+import pytest
+
+from commands.experiment.sweep import ValuesRange, ParameterValues, ParameterSweep, SweepSampling
+
+
+def test_values_range():
+    assert list(ValuesRange("1...3:0.5")) == ["1", "1.5", "2.0", "2.5", "3.0"]
+    assert list(ValuesRange("0.1...1:0.1"))[-1] == "1.0"
+    assert list(ValuesRange("5...1:1")) == []
+
+
+def test_values_range_is_not_expanded():
+    values = ValuesRange("0...1:0.0000001")
+
+    assert len(values) == 10000001
+    assert values[5] == "5e-07"
+    assert values[-1] == "1.0"
+
+
+@pytest.mark.parametrize("range_definition", ["1...10:0", "1...10:-1", "1...10", "a...10:1", "1...inf:1"])
+def test_values_range_incorrect(range_definition):
+    with pytest.raises(Exception):
+        ValuesRange(range_definition)
+
+
+def test_parameter_sweep_get_parameters():
+    parameter_sets = [("param3=0", "param4=1"), ("param3=2", "param4=3")]
+    parameter_values = [ParameterValues("param1", ["0", "1"]), ParameterValues("param2", ValuesRange("0...2:1"))]
+    sweep = ParameterSweep(parameter_sets=parameter_sets, parameter_values=parameter_values)
+
+    expected_parameters = [set_parameters + range_parameters for set_parameters, range_parameters in
+                           itertools.product(parameter_sets, itertools.product(*parameter_values))]
+    assert sweep.size == 12
+    assert [sweep.get_parameters(index) for index in sweep.get_indices()] == expected_parameters
+
+
+def test_parameter_sweep_random_sampling():
+    sweep = ParameterSweep(parameter_values=[ParameterValues("param1", ValuesRange("1...100000:1")),
+                                             ParameterValues("param2", ValuesRange("1...100000:1"))])
+
+    indices = sweep.get_indices(SweepSampling.RANDOM, max_points=20, seed=1)
+
+    assert len(set(indices)) == 20
+    assert indices == sorted(indices)
+    assert all(0 <= index < sweep.size for index in indices)
+    assert sweep.get_indices(SweepSampling.RANDOM, max_points=20, seed=1) == indices
+
+
+def test_parameter_sweep_latin_hypercube_sampling():
+    sweep = ParameterSweep(parameter_values=[ParameterValues("param1", ValuesRange("1...10:1")),
+                                             ParameterValues("param2", ValuesRange("0.01...1:0.01"))])
+
+    indices = sweep.get_indices(SweepSampling.LATIN_HYPERCUBE, max_points=10, seed=1)
+
+    assert len(indices) == 10
+    # every value of the first parameter is used once, values of the second one are taken from different tenths
+    assert sorted(index // 100 for index in indices) == list(range(10))
+    assert sorted(index % 100 // 10 for index in indices) == list(range(10))
+
+
+def test_parameter_sweep_sampling_of_small_space():
+    sweep = ParameterSweep(parameter_values=[ParameterValues("param1", ["0", "1"])])
+
+    assert list(sweep.get_indices(SweepSampling.RANDOM, max_points=5)) == [0, 1]
@@ -25,6 +25,7 @@ from commands.launch.launch import tensorboard as tensorboard_command
 from util.cli_state import common_options
 from platform_resources.run import Run, RunKinds
 from platform_resources.experiment import Experiment
+from platform_resources.platform_resource import PlatformResource
 from util.aliascmd import AliasCmd
 from util.config import TBLT_TABLE_FORMAT
 from util.k8s.k8s_info import get_kubectl_current_context_namespace, get_namespaced_pods, sum_mem_resources,\
@@ -149,6 +150,7 @@ def container_resources_to_msg(resources, spaces=9) -> str:
 @click.option('-u', '--username', help=Texts.HELP_U)
 @common_options()
 @click.pass_context
+@PlatformResource.resource_cache()
 def view(ctx: click.Context, experiment_name: str, tensorboard: bool,
          username: str, accepted_run_kinds=(RunKinds.TRAINING.value, RunKinds.JUPYTER.value)):
     """
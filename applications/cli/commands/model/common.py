@@ -125,7 +125,7 @@ def get_logs(operation_name: str, start_date: str, end_date: str, match: str, ou
                 else:
                     if len(workflows) > 1:
                         click.echo(f'Operation : {workflow.name}')
-                    print_logs(run_logs_generator=ops_logs_generator, pager=pager)
+                    print_logs(run_logs_generator=ops_logs_generator, pager=pager, follow=follow_logs)
 
     except K8sProxyCloseError:
         handle_error(logger, Texts.PROXY_CLOSE_LOG_ERROR_MSG, Texts.PROXY_CLOSE_LOG_ERROR_MSG)
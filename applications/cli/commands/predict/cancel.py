@@ -30,9 +30,10 @@ logger = initialize_logger(__name__)
 @click.argument("name", required=False, metavar='[name]')
 @click.option('-m', '--match', default=None, help=Texts.HELP_M)
 @click.option('-p', '--purge', default=None, help=Texts.HELP_P, is_flag=True)
+@click.option('-w', '--wait', default=None, help=Texts.HELP_W, is_flag=True)
 @common_options(admin_command=False)
 @click.pass_context
-def cancel(ctx: click.Context, name: str, match: str, purge: bool):
+def cancel(ctx: click.Context, name: str, match: str, purge: bool, wait: bool):
     """
     Cancels chosen prediction instances based on a name provided as a parameter.
     """
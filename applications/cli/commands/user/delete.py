@@ -40,14 +40,16 @@ NAUTA_NAMESPACE = "nauta"
 @click.command(help=Texts.HELP, short_help=Texts.SHORT_HELP, cls=AliasCmd, alias='d', options_metavar='[options]')
 @click.argument("username", nargs=1)
 @click.option("-p", "--purge", is_flag=True, help=Texts.HELP_PR)
+@click.option("-w", "--wait", is_flag=True, help=Texts.HELP_W)
 @common_options(admin_command=True)
 @click.pass_context
-def delete(ctx: click.Context, username: str, purge: bool):
+def delete(ctx: click.Context, username: str, purge: bool, wait: bool):
     """
     Deletes a user with a name given as a parameter.
 
     :param username: name of a user that should be deleted
     :param purge: if set - command removes also all artifacts associated with a user
+    :param wait: if set - command waits until logs of a purged user are deleted
     """
     try:
         click.echo(Texts.DELETION_CHECK_PRESENCE)
@@ -84,7 +86,7 @@ def delete(ctx: click.Context, username: str, purge: bool):
             try:
                 click.echo(Texts.DELETION_START_PURGING)
                 # failure during purging a user doesn't mean that user wasn't deleted
-                purge_user(username)
+                purge_user(username, wait_for_logs_deletion=wait)
             except Exception:
                 handle_error(logger, Texts.PURGE_ERROR_MSG, Texts.PURGE_ERROR_MSG)
 
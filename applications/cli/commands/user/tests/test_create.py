@@ -23,7 +23,7 @@ from unittest.mock import patch, mock_open
 from platform_resources.user import User, UserStatus
 from commands.user.create import generate_kubeconfig, create, UserState
 from platform_resources.user_utils import check_users_presence
-from util.helm import delete_user, delete_helm_release
+from util.helm import delete_user, delete_helm_release, delete_helm_release_once
 from cli_text_consts import VERBOSE_RERUN_MSG, UserCreateCmdTexts as Texts
 from util.k8s.k8s_info import NamespaceStatus
 
@@ -122,6 +122,17 @@ def test_delete_helm_release_failure(mocker):
         delete_helm_release(test_username)
 
 
+def test_delete_helm_release_once_failure(mocker):
+    esc_mock = mocker.patch("util.helm.execute_system_command", return_value=("", 1, ""))
+    fake_config_path = '/usr/ogorek/nctl_config'
+    fake_config = mocker.patch('util.helm.Config')
+    fake_config.return_value.config_path = fake_config_path
+    with pytest.raises(RuntimeError):
+        delete_helm_release_once(test_username, purge=True)
+
+    assert esc_mock.call_count == 1
+
+
 def test_delete_user_success(mocker):
     dns_mock = mocker.patch("util.helm.delete_namespace")
     dhr_mock = mocker.patch("util.helm.delete_helm_release")
@@ -126,11 +126,25 @@ def test_deleteuser_purge_success(mocker):
 
     assert cup_mock.call_count == 2
     assert deu_mock.call_count == 1
-    assert prg_mock.call_count == 1
+    prg_mock.assert_called_once_with(TEST_USERNAME, wait_for_logs_deletion=False)
     assert gcm_mock.call_count == 1
     assert pcm_mock.call_count == 1
 
 
+def test_deleteuser_purge_wait_for_logs(mocker):
+    mocker.patch("commands.user.delete.check_users_presence", side_effect=[True, False])
+    mocker.patch("commands.user.delete.delete_user")
+    prg_mock = mocker.patch("commands.user.delete.purge_user", return_value=True)
+    mocker.patch("commands.user.delete.get_config_map_data", return_value={})
+    mocker.patch("commands.user.delete.patch_config_map_data")
+
+    mocker.patch("click.confirm", return_value=True)
+
+    CliRunner().invoke(delete.delete, [TEST_USERNAME, "-p", "-w"])
+
+    prg_mock.assert_called_once_with(TEST_USERNAME, wait_for_logs_deletion=True)
+
+
 def test_deleteuser_purge_failure(mocker):
     cup_mock = mocker.patch("commands.user.delete.check_users_presence", side_effect=[True, False])
     deu_mock = mocker.patch("commands.user.delete.delete_user")
@@ -20,8 +20,8 @@ from typing import Tuple
 from cli_text_consts import DraftCmdTexts as Texts
 from util import helm
 from util.config import Config
-from util.filesystem import copytree_content
 from util.logger import initialize_logger
+from util.workspace_store import get_workspace_store, ENVIRONMENT_PRIVATE_FILES
 
 logger = initialize_logger(__name__)
 
@@ -44,8 +44,11 @@ def create(working_directory: str, pack_type: str) -> Tuple[str, int]:
         helm_chart_destination_dirpath = f"{working_directory}/charts/{pack_type}"
         os.makedirs(helm_chart_destination_dirpath)
 
-        copytree_content(f"{requested_pack_path}", f"{working_directory}", ignored_objects=['charts'])
-        copytree_content(f"{requested_pack_path}/charts", helm_chart_destination_dirpath)
+        workspace_store = get_workspace_store()
+        workspace_store.copytree_content(f"{requested_pack_path}", f"{working_directory}", ignored_objects=['charts'],
+                                         private_files=ENVIRONMENT_PRIVATE_FILES)
+        workspace_store.copytree_content(f"{requested_pack_path}/charts", helm_chart_destination_dirpath,
+                                         private_files=ENVIRONMENT_PRIVATE_FILES)
     except NoPackError as ex:
         # TODO: these exceptions should be reraised instead caught here
         logger.exception(ex)
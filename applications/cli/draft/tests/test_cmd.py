@@ -27,7 +27,7 @@ def cmd_mock(mocker):
     # 'create' mock
     mocker.patch('draft.cmd.Config', return_value=mocker.MagicMock(get_config_path=lambda: '/home/user/config'))
     mocker.patch('os.path.isdir', return_value=True)
-    mocker.patch('draft.cmd.copytree_content')
+    mocker.patch('draft.cmd.get_workspace_store')
     mocker.patch('os.makedirs')
 
     # 'up' mock
@@ -42,7 +42,7 @@ def test_create(cmd_mock):
 
     assert output == ""
     assert exit_code == 0
-    assert draft.cmd.copytree_content.call_count == 2
+    assert draft.cmd.get_workspace_store.return_value.copytree_content.call_count == 2
 
 
 # noinspection PyUnusedLocal,PyUnresolvedReferences
@@ -53,18 +53,18 @@ def test_create_no_pack(mocker, cmd_mock):
 
     assert output == DraftCmdTexts.PACK_NOT_EXISTS
     assert exit_code == 1
-    assert draft.cmd.copytree_content.call_count == 0
+    assert draft.cmd.get_workspace_store.return_value.copytree_content.call_count == 0
 
 
 # noinspection PyUnusedLocal,PyUnresolvedReferences
 def test_create_other_error(mocker, cmd_mock):
-    mocker.patch('draft.cmd.copytree_content', side_effect=PermissionError)
+    draft.cmd.get_workspace_store.return_value.copytree_content.side_effect = PermissionError
 
     output, exit_code = create('/home/fake_dir', 'fake_pack')
 
     assert output == DraftCmdTexts.DEPLOYMENT_NOT_CREATED
     assert exit_code == 100
-    assert draft.cmd.copytree_content.call_count == 1
+    assert draft.cmd.get_workspace_store.return_value.copytree_content.call_count == 1
 
 
 # noinspection PyUnusedLocal
@@ -18,18 +18,29 @@ try:
     from http import HTTPStatus  # python3.5+ import
 except ImportError:
     import httplib as HTTPStatus  # python2.7 import
+import atexit
 import logging
 import os
+import time
 
 from kubernetes import config, client
 from kubernetes.client.rest import ApiException
 
+from experiment_metrics.publisher import BackgroundPublisher, OVERFLOW_DROP_NEW
+
 
 API_GROUP_NAME = 'aipg.intel.com'
 RUN_PLURAL = 'runs'
 RUN_VERSION = 'v1'
 
 MAX_RETRIES_COUNT = 3
+# statuses after which publishing of metrics is retried
+RETRIABLE_STATUSES = {HTTPStatus.CONFLICT, HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.SERVICE_UNAVAILABLE,
+                      HTTPStatus.GATEWAY_TIMEOUT,
+                      429}  # Too Many Requests - constant is missing in python2.7 httplib
+RETRY_BACKOFF = 0.5  # seconds, doubled after each retry
+
+NAMESPACE_FILE_PATH = '/var/run/secrets/kubernetes.io/serviceaccount/namespace'
 
 ch = logging.StreamHandler()
 ch.setLevel(logging.INFO)
@@ -39,24 +50,79 @@ logger.addHandler(ch)
 
 run_k8s_name = os.getenv('RUN_NAME')
 
+_namespace = None
+_background_publisher = None
+
 if run_k8s_name:
     config.load_incluster_config()
     api = client.CustomObjectsApi(client.ApiClient())
 
 
+def _get_namespace():
+    global _namespace
+    # namespace of a pod doesn't change, so it is read only once
+    if not _namespace:
+        with open(NAMESPACE_FILE_PATH, 'r') as ns_file:
+            _namespace = ns_file.read()
+    return _namespace
+
+
 def publish(metrics, raise_exception=False):
     """
     Update metrics in specific Run object
     :param metrics Dict[str,str] of a data to apply
     :param raise_exception raise exception if any error occurs during metrics publishing, e.g. key conflict
     :return: with raise_exception=True in case of any problems during update it throws an exception
+    If background publishing is enabled (see enable_background_publishing), metrics are only queued
+    and raise_exception is ignored.
     """
+    if _background_publisher:
+        _background_publisher.add(metrics)
+        return
+
+    _publish_now(metrics, raise_exception=raise_exception)
+
+
+def enable_background_publishing(flush_interval=5.0, max_batch_size=100, max_pending_keys=1000,
+                                 overflow_policy=OVERFLOW_DROP_NEW):
+    """
+    Makes publish() non-blocking - metrics are queued and published by a background thread. Only the last
+    value of each metric is published, if the metric was updated several times between publications.
+    Pending metrics are published at exit of a program, or can be published explicitly by flush().
+    :param flush_interval: maximal time in seconds for which metrics wait for publishing
+    :param max_batch_size: pending metrics are published immediately, when there are at least that many of them
+    :param max_pending_keys: maximal number of pending metrics
+    :param overflow_policy: what to do with a new metric when max_pending_keys metrics are pending -
+     drop it (OVERFLOW_DROP_NEW) or block until pending metrics are published (OVERFLOW_BLOCK)
+    :return: BackgroundPublisher, its counters attribute contains numbers of coalesced and dropped updates
+    """
+    global _background_publisher
+    if not _background_publisher:
+        _background_publisher = BackgroundPublisher(publish_function=_publish_now, flush_interval=flush_interval,
+                                                    max_batch_size=max_batch_size,
+                                                    max_pending_keys=max_pending_keys,
+                                                    overflow_policy=overflow_policy)
+        atexit.register(flush)
+    return _background_publisher
+
+
+def flush(timeout=None):
+    """
+    Publishes metrics queued by background publishing and waits until they are published.
+    :param timeout: maximal time of waiting in seconds, wait without limit if None
+    :return: False in case of timeout, True otherwise
+    """
+    if _background_publisher:
+        return _background_publisher.flush(timeout=timeout)
+    return True
+
+
+def _publish_now(metrics, raise_exception=False):
     if not run_k8s_name:
         logger.info('[no-persist mode] Metrics: {}'.format(metrics))
         return
 
-    with open('/var/run/secrets/kubernetes.io/serviceaccount/namespace', 'r') as ns_file:
-        namespace = ns_file.read()
+    namespace = _get_namespace()
 
     body = {
         "spec": {
@@ -66,11 +132,15 @@ def publish(metrics, raise_exception=False):
 
     for i in range(MAX_RETRIES_COUNT):
         try:
-            api.patch_namespaced_custom_object(group='aipg.intel.com', namespace=namespace, body=body,
+            # merge-patch - only given metrics are changed, so the patch doesn't depend on a state of a Run
+            # and can be simply sent again after a conflict
+            api.patch_namespaced_custom_object(group=API_GROUP_NAME, namespace=namespace, body=body,
                                                plural=RUN_PLURAL, version=RUN_VERSION, name=run_k8s_name)
             break
         except ApiException as e:
-            if e.status != HTTPStatus.CONFLICT or i == MAX_RETRIES_COUNT-1:
+            if e.status not in RETRIABLE_STATUSES or i == MAX_RETRIES_COUNT-1:
                 logger.exception("Exception during saving metrics. All {} retries failed!".format(MAX_RETRIES_COUNT), e)
                 if raise_exception:
                     raise e
+                break
+            time.sleep(RETRY_BACKOFF * 2 ** i)
@@ -0,0 +1,143 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger('metrics')
+
+# what to do with an update of a new metric, when max_pending_keys metrics are already waiting for publishing
+OVERFLOW_DROP_NEW = 'drop_new'  # update is dropped
+OVERFLOW_BLOCK = 'block'  # caller waits until pending metrics are published
+
+
+class PublisherCounters(object):
+    def __init__(self):
+        self.updates = 0
+        self.coalesced_updates = 0
+        self.dropped_updates = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+
+class BackgroundPublisher(object):
+    """
+    Publishes metrics on a background daemon thread, so publishing doesn't block a training loop.
+    Metrics are aggregated per key (last value wins) and published as a single update when flush_interval
+    elapses or when max_batch_size metrics are waiting. Number of pending metrics is limited
+    by max_pending_keys, updates exceeding this limit are handled according to overflow_policy.
+    """
+
+    def __init__(self, publish_function, flush_interval=5.0, max_batch_size=100, max_pending_keys=1000,
+                 overflow_policy=OVERFLOW_DROP_NEW):
+        """
+        :param publish_function: function publishing a dict of metrics, called as f(metrics, raise_exception=True)
+        :param flush_interval: maximal time in seconds for which metrics wait for publishing
+        :param max_batch_size: pending metrics are published immediately, when there are at least that many of them
+        :param max_pending_keys: maximal number of pending metrics
+        :param overflow_policy: OVERFLOW_DROP_NEW or OVERFLOW_BLOCK
+        """
+        if overflow_policy not in (OVERFLOW_DROP_NEW, OVERFLOW_BLOCK):
+            raise ValueError('Unknown overflow policy: {}'.format(overflow_policy))
+        self.publish_function = publish_function
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_pending_keys = max_pending_keys
+        self.overflow_policy = overflow_policy
+        self.counters = PublisherCounters()
+
+        self._pending = {}
+        self._publishing = False
+        self._flush_requested = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='metrics-publisher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def add(self, metrics):
+        """
+        Queues metrics for publishing.
+        :param metrics: Dict[str,str] of metrics
+        """
+        with self._condition:
+            for key, value in metrics.items():
+                self.counters.updates += 1
+                if key in self._pending:
+                    self.counters.coalesced_updates += 1
+                    self._pending[key] = value
+                    continue
+                while len(self._pending) >= self.max_pending_keys and self.overflow_policy == OVERFLOW_BLOCK:
+                    self._flush_requested = True
+                    self._condition.notify_all()
+                    self._condition.wait()
+                if len(self._pending) >= self.max_pending_keys:
+                    self.counters.dropped_updates += 1
+                    continue
+                self._pending[key] = value
+            if len(self._pending) >= self.max_batch_size:
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Publishes all pending metrics and waits until they are published.
+        :param timeout: maximal time of waiting in seconds, wait without limit if None
+        :return: True if all metrics were published, False in case of timeout
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending or self._publishing:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._flush_requested = False
+                    self._condition.wait()
+                deadline = time.time() + self.flush_interval
+                while not self._flush_requested and len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending
+                self._pending = {}
+                self._flush_requested = False
+                self._publishing = True
+                # callers blocked by overflow can add their metrics now
+                self._condition.notify_all()
+
+            try:
+                self.publish_function(batch, raise_exception=True)
+                failed = False
+            except Exception:
+                logger.exception('Failed to publish metrics in background.')
+                failed = True
+
+            with self._condition:
+                self.counters.flushes += 1
+                if failed:
+                    self.counters.failed_flushes += 1
+                    self.counters.dropped_updates += len(batch)
+                self._publishing = False
+                self._condition.notify_all()
@@ -0,0 +1,130 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+
+import pytest
+
+from experiment_metrics.publisher import BackgroundPublisher, OVERFLOW_BLOCK, OVERFLOW_DROP_NEW
+
+TIMEOUT = 5
+
+
+class FakePublishFunction(object):
+    def __init__(self, error=None):
+        self.error = error
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+        self.published = threading.Event()
+
+    def __call__(self, metrics, raise_exception=False):
+        assert raise_exception
+        self.release.wait(TIMEOUT)
+        self.batches.append(dict(metrics))
+        self.published.set()
+        if self.error:
+            raise self.error
+
+
+def test_publisher_last_value_wins():
+    publish_function = FakePublishFunction()
+    publisher = BackgroundPublisher(publish_function, flush_interval=60)
+
+    publisher.add({'loss': '1.0', 'accuracy': '0.1'})
+    publisher.add({'loss': '0.5'})
+
+    assert publisher.flush(timeout=TIMEOUT)
+    assert publish_function.batches == [{'loss': '0.5', 'accuracy': '0.1'}]
+    assert publisher.counters.updates == 3
+    assert publisher.counters.coalesced_updates == 1
+    assert publisher.counters.flushes == 1
+
+
+def test_publisher_publishes_full_batch():
+    publish_function = FakePublishFunction()
+    publisher = BackgroundPublisher(publish_function, flush_interval=60, max_batch_size=2)
+
+    publisher.add({'loss': '1.0', 'accuracy': '0.1'})
+
+    assert publish_function.published.wait(TIMEOUT)
+    assert publish_function.batches == [{'loss': '1.0', 'accuracy': '0.1'}]
+
+
+def test_publisher_overflow_drop_new():
+    publish_function = FakePublishFunction()
+    publisher = BackgroundPublisher(publish_function, flush_interval=60, max_pending_keys=2,
+                                    overflow_policy=OVERFLOW_DROP_NEW)
+
+    publisher.add({'loss': '1.0', 'accuracy': '0.1', 'step': '1'})
+    # update of a pending metric is accepted despite of the limit
+    publisher.add({'loss': '0.5'})
+
+    assert publisher.flush(timeout=TIMEOUT)
+    assert publish_function.batches == [{'loss': '0.5', 'accuracy': '0.1'}]
+    assert publisher.counters.dropped_updates == 1
+
+
+def test_publisher_overflow_block():
+    publish_function = FakePublishFunction()
+    publisher = BackgroundPublisher(publish_function, flush_interval=60, max_pending_keys=2,
+                                    overflow_policy=OVERFLOW_BLOCK)
+
+    publisher.add({'loss': '1.0', 'accuracy': '0.1', 'step': '1'})
+
+    assert publisher.flush(timeout=TIMEOUT)
+    assert publish_function.batches == [{'loss': '1.0', 'accuracy': '0.1'}, {'step': '1'}]
+    assert publisher.counters.dropped_updates == 0
+
+
+def test_publisher_flush_timeout():
+    publish_function = FakePublishFunction()
+    publish_function.release.clear()
+    publisher = BackgroundPublisher(publish_function, flush_interval=60)
+
+    publisher.add({'loss': '1.0'})
+
+    assert not publisher.flush(timeout=0.1)
+
+    publish_function.release.set()
+    assert publisher.flush(timeout=TIMEOUT)
+    assert publish_function.batches == [{'loss': '1.0'}]
+
+
+def test_publisher_counters_after_failed_publish():
+    publish_function = FakePublishFunction(error=RuntimeError('Conflict'))
+    publisher = BackgroundPublisher(publish_function, flush_interval=60)
+
+    publisher.add({'loss': '1.0', 'accuracy': '0.1'})
+    assert publisher.flush(timeout=TIMEOUT)
+
+    assert publisher.counters.flushes == 1
+    assert publisher.counters.failed_flushes == 1
+    assert publisher.counters.dropped_updates == 2
+
+    publish_function.error = None
+    publisher.add({'loss': '0.5'})
+    assert publisher.flush(timeout=TIMEOUT)
+
+    assert publish_function.batches[-1] == {'loss': '0.5'}
+    assert publisher.counters.flushes == 2
+    assert publisher.counters.failed_flushes == 1
+    assert publisher.counters.dropped_updates == 2
+
+
+def test_publisher_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        BackgroundPublisher(FakePublishFunction(), overflow_policy='unknown')
@@ -15,16 +15,19 @@
 #
 
 from functools import partial
+import heapq
+import queue
+import threading
 import time
-from typing import List, Callable, Generator, Dict
+from typing import List, Callable, Generator, Dict, Iterator, Optional, Tuple
 
 import elasticsearch
 import elasticsearch.helpers
 import elasticsearch.client
 
-from logs_aggregator.log_filters import SeverityLevel, filter_log_by_severity, \
-    filter_log_by_pod_status, filter_log_by_pod_ids
+from logs_aggregator.log_filters import SeverityLevel, build_log_filters_query
 from logs_aggregator.k8s_log_entry import LogEntry
+from logs_aggregator.log_tailer import LogTailer
 from platform_resources.workflow import ArgoWorkflow
 from util.logger import initialize_logger
 from util.k8s.k8s_info import PodStatus, get_secret
@@ -32,10 +35,38 @@ from platform_resources.run import Run
 
 logger = initialize_logger(__name__)
 
+# Marks the end of hits produced by a single slice of a sliced scroll
+_SLICE_END = object()
+
+
+def _hit_sort_key(hit: dict):
+    # Sort values returned by ES (epoch millis for @timestamp) are preferred, as they do not depend on date format
+    return hit['sort'] if hit.get('sort') else [hit['_source']['@timestamp']]
+
+
+def _put_until_stopped(output: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """
+    Puts item into a bounded queue, giving up when stop_event is set (e.g. when consumer of logs is gone).
+    :return: True if item was put into queue, False otherwise
+    """
+    while not stop_event.is_set():
+        try:
+            output.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
 
 class K8sElasticSearchClient(elasticsearch.Elasticsearch):
 
     ES_PROXY_SECRET_NAME = "es-proxy-secret"
+    # Maximum number of hits buffered per slice while waiting for the merge step to consume them
+    SLICE_BUFFER_SIZE = 2000
+    # Maximum number of runs, which logs are deleted by a single delete by query request
+    DELETE_LOGS_BATCH_SIZE = 500
+    # Time between consecutive checks of a status of ElasticSearch tasks [s]
+    TASK_POLL_INTERVAL = 2
 
     def __init__(self, host: str, use_ssl=True, verify_certs=True,
                  with_admin_privledges=False, headers: Dict[str, str] = None,
@@ -50,7 +81,8 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
         super().__init__(hosts=hosts, use_ssl=use_ssl, verify_certs=verify_certs, headers=headers, **kwargs)
 
     def get_log_generator(self, query_body: dict = None, index='_all', scroll='1m',
-                          filters: List[Callable[[LogEntry], bool]] = None) -> Generator[LogEntry, None, None]:
+                          filters: List[Callable[[LogEntry], bool]] = None,
+                          slices: int = 1) -> Generator[LogEntry, None, None]:
         """
         A generator that yields LogEntry objects constructed from Kubernetes resource logs.
         Logs to be returned are defined by passed query and filtered according to passed
@@ -59,10 +91,16 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
         :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
         :param scroll: ElasticSearch scroll lifetime
         :param filters: List of filter functions with signatures f(LogEntry) -> Bool
+        :param slices: number of sliced scroll cursors fetched concurrently, results of all slices are
+         merged by timestamp, so order of returned logs is the same as with a single cursor
         :return: Generator yielding LogEntry (date, log_content, pod_name, namespace) named tuples.
         """
-        for log in elasticsearch.helpers.scan(self, query=query_body, index=index, scroll=scroll, size=1000,
-                                              preserve_order=True, clear_scroll=False):
+        if slices > 1:
+            hits = self._sliced_scan(query_body=query_body, index=index, scroll=scroll, slices=slices)
+        else:
+            hits = elasticsearch.helpers.scan(self, query=query_body, index=index, scroll=scroll, size=1000,
+                                              preserve_order=True, clear_scroll=False)
+        for log in hits:
             log_entry = LogEntry(date=log['_source']['@timestamp'],
                                  content=log['_source']['log'],
                                  pod_name=log['_source']['kubernetes']['pod_name'],
@@ -70,7 +108,54 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
             if not filters or all(f(log_entry) for f in filters):
                 yield log_entry
 
-    def get_stream_log_generator(self, query_body: dict = None, index='_all', scroll='1m', time_interval=0.5,
+    def _sliced_scan(self, query_body: dict, index: str, scroll: str, slices: int) -> Iterator[dict]:
+        """
+        Fetches hits matching given query using ES sliced scroll. Each slice is scrolled in a separate
+        thread and returned hits are merged (k-way heap merge) by their sort values.
+        :param query_body: ES search query, it should be sorted by @timestamp
+        :param index: ElasticSearch index from which logs will be retrieved
+        :param scroll: ElasticSearch scroll lifetime
+        :param slices: number of slices
+        :return: Iterator yielding raw ES hits in order defined by query sort
+        """
+        stop_event = threading.Event()
+        slice_queues: List[queue.Queue] = [queue.Queue(maxsize=self.SLICE_BUFFER_SIZE) for _ in range(slices)]
+        for slice_id, slice_queue in enumerate(slice_queues):
+            slice_query = dict(query_body or {})
+            slice_query['slice'] = {'id': slice_id, 'max': slices}
+            worker = threading.Thread(target=self._scan_slice, daemon=True,
+                                      kwargs={'query_body': slice_query, 'index': index, 'scroll': scroll,
+                                              'output': slice_queue, 'stop_event': stop_event})
+            worker.start()
+
+        try:
+            yield from heapq.merge(*[self._read_slice(slice_queue) for slice_queue in slice_queues],
+                                   key=_hit_sort_key)
+        finally:
+            stop_event.set()
+
+    def _scan_slice(self, query_body: dict, index: str, scroll: str, output: queue.Queue,
+                    stop_event: threading.Event):
+        try:
+            for hit in elasticsearch.helpers.scan(self, query=query_body, index=index, scroll=scroll, size=1000,
+                                                  preserve_order=True, clear_scroll=False):
+                if not _put_until_stopped(output, hit, stop_event):
+                    return
+            _put_until_stopped(output, _SLICE_END, stop_event)
+        except Exception as exe:
+            _put_until_stopped(output, exe, stop_event)
+
+    @staticmethod
+    def _read_slice(slice_queue: queue.Queue) -> Iterator[dict]:
+        while True:
+            hit = slice_queue.get()
+            if hit is _SLICE_END:
+                return
+            if isinstance(hit, Exception):
+                raise hit
+            yield hit
+
+    def get_stream_log_generator(self, query_body: dict = None, index='_all', time_interval=0.5,
                                  filters: List[Callable[[LogEntry], bool]] = None) -> Generator[LogEntry, None, None]:
         """
         A generator that yields LogEntry objects constructed from Kubernetes resource logs.
@@ -79,26 +164,18 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
         Generator will always try to obtain new log entries, whenever it will be iterated over.
         :param query_body: ES search query
         :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
-        :param scroll: ElasticSearch scroll lifetime
-        :param time_interval: Time interval between attempting to get a new batch of logs
+        :param time_interval: Minimal time interval between attempting to get a new batch of logs
         :param filters: List of filter functions with signatures f(LogEntry) -> Bool
         :return: Generator yielding LogEntry (date, log_content, pod_name, namespace) named tuples.
         """
-        last_timestamp = None
-        while True:
-            for log in self.get_log_generator(query_body=query_body, index=index, scroll=scroll, filters=filters):
-                last_timestamp = log.date
-                yield log
-            else:
-                # Scan is exhausted - try to fetch a new batch of logs
-                # Note that we expect specific query structure here
-                if last_timestamp:
-                    query_body['query']['bool']['filter']['range']['@timestamp']['gt'] = last_timestamp
-                time.sleep(time_interval)
+        query = (query_body or {}).get('query', {'match_all': {}})
+        return LogTailer(es_client=self, queries=[query], index=index, filters=filters,
+                         min_interval=time_interval).follow()
 
     def get_experiment_logs_generator(self, run: Run, namespace: str, start_date: str, end_date: str = None,
                                       index='_all', pod_ids: List[str] = None, pod_status: PodStatus = None,
-                                      min_severity: SeverityLevel = None, follow=False) -> Generator[LogEntry, None, None]:
+                                      min_severity: SeverityLevel = None, follow=False,
+                                      slices: int = 1) -> Generator[LogEntry, None, None]:
         """
         Return logs for given experiment (interpreted as Run object).
         :param run: instance of Run resource
@@ -110,35 +187,73 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
         :param pod_status: filter logs by pod status
         :param min_severity: yield logs with minimum provided severity
         :param follow: if True, generator will stream logs tail
+        :param slices: number of sliced scroll cursors used to fetch logs concurrently, ignored when following logs
         :return: Generator yielding LogEntry (date, log_content, pod_name, namespace) named tuples.
         """
         logger.debug(f'Searching for {run.name} Run logs.')
 
+        filter_clauses, filters = build_log_filters_query(run_name=run.name, namespace=namespace,
+                                                          min_severity=min_severity, pod_ids=pod_ids,
+                                                          pod_status=pod_status, follow=follow)
+
+        log_generator = self.get_stream_log_generator if follow else partial(self.get_log_generator, slices=slices)
+
+        experiment_logs_generator = log_generator(query_body=self._get_experiment_logs_query(  # type: ignore
+            run_name=run.name, namespace=namespace, start_date=start_date, end_date=end_date,
+            filter_clauses=filter_clauses), index=index, filters=filters)
+
+        return experiment_logs_generator
+
+    def get_experiments_stream_logs_generator(self, runs: List[Run], namespace: str, start_date: str = None,
+                                              end_date: str = None, index='_all', pod_ids: List[str] = None,
+                                              pod_status: PodStatus = None, min_severity: SeverityLevel = None,
+                                              time_interval=0.5) -> Generator[LogEntry, None, None]:
+        """
+        Return logs of many experiments (interpreted as Run objects) as a single stream, ordered by
+        timestamp. Generator streams logs tail, as with follow option of get_experiment_logs_generator.
+        :param runs: list of Run resources
+        :param namespace: Name of namespace where experiments were started
+        :param start_date: if provided, only logs produced after this date will be returned, if not - logs
+         produced after creation of each run will be returned
+        :param end_date: if provided, only logs produced before this date will be returned
+        :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
+        :param pod_ids: filter logs by pod ids
+        :param pod_status: filter logs by pod status
+        :param min_severity: yield logs with minimum provided severity
+        :param time_interval: Minimal time interval between attempting to get a new batch of logs
+        :return: Generator yielding LogEntry (date, log_content, pod_name, namespace) named tuples.
+        """
+        logger.debug(f'Following logs of {len(runs)} Runs.')
+
+        queries = []
+        filters: List[Callable[[LogEntry], bool]] = []
+        for run in runs:
+            filter_clauses, filters = build_log_filters_query(run_name=run.name, namespace=namespace,
+                                                              min_severity=min_severity, pod_ids=pod_ids,
+                                                              pod_status=pod_status, follow=True)
+            query_body = self._get_experiment_logs_query(run_name=run.name, namespace=namespace,
+                                                         start_date=start_date or run.creation_timestamp,
+                                                         end_date=end_date, filter_clauses=filter_clauses)
+            queries.append(query_body['query'])
+
+        return LogTailer(es_client=self, queries=queries, index=index, filters=filters,
+                         min_interval=time_interval).follow()
+
+    @staticmethod
+    def _get_experiment_logs_query(run_name: str, namespace: str, start_date: str, end_date: str = None,
+                                   filter_clauses: List[dict] = None) -> dict:
         timestamp_range_filter = {"range": {"@timestamp": {"gte": start_date}}}
         if end_date:
             timestamp_range_filter = {"range": {"@timestamp": {"gte": start_date, "lte": end_date}}}
 
-        filters: List[Callable] = []
-        if min_severity:
-            filters.append(partial(filter_log_by_severity, min_severity=min_severity))
-        if pod_status:
-            filters.append(partial(filter_log_by_pod_status, pod_status=pod_status))
-        if pod_ids:
-            filters.append(partial(filter_log_by_pod_ids, pod_ids=set(pod_ids)))
-
-        log_generator = self.get_stream_log_generator if follow else self.get_log_generator
-
-        experiment_logs_generator = log_generator(query_body={  #type: ignore
+        return {
             "query": {"bool": {"must":
-                                   [{'term': {'kubernetes.labels.runName.keyword': run.name}},
+                                   [{'term': {'kubernetes.labels.runName.keyword': run_name}},
                                     {'term': {'kubernetes.namespace_name.keyword': namespace}}
-                                    ],
+                                    ] + (filter_clauses or []),
                                "filter": timestamp_range_filter
                                }},
-            "sort": {"@timestamp": {"order": "asc"}}},
-            index=index, filters=filters)
-
-        return experiment_logs_generator
+            "sort": {"@timestamp": {"order": "asc"}}}
 
     def get_argo_workflow_logs_generator(self, workflow: ArgoWorkflow, namespace: str,
                                          start_date: str, end_date: str = None,
@@ -174,26 +289,30 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
 
         return workflow_logs_generator
 
-    def delete_logs_for_namespace(self, namespace: str, index='_all'):
+    def delete_logs_for_namespace(self, namespace: str, index='_all',
+                                  wait_for_completion: bool = True) -> Optional[str]:
         """
         Removes logs for a given namespace.
         :param namespace: namespace for which logs should be deleted
         :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
+        :param wait_for_completion: if False, logs are deleted by an ElasticSearch task running in background
+        :return: id of a task deleting logs, if wait_for_completion is False
         Throws exception in case of any errors during removing of logs.
         """
         logger.debug(f'Deleting logs for {namespace} namespace.')
 
         delete_query = {"query": {"term": {'kubernetes.namespace_name.keyword': namespace}}}
-        output = self.delete_by_query(index=index, body=delete_query)
+        return self._delete_logs(index=index, delete_query=delete_query, wait_for_completion=wait_for_completion)
 
-        logger.debug(f"Deleting logs - result: {str(output)}")
-
-    def delete_logs_for_run(self, run: str, namespace: str, index='_all'):
+    def delete_logs_for_run(self, run: str, namespace: str, index='_all',
+                            wait_for_completion: bool = True) -> Optional[str]:
         """
         Removes logs for a given run.
         :param run: run for which logs should be deleted
         :param namespace: namespace for which logs should be deleted
         :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
+        :param wait_for_completion: if False, logs are deleted by an ElasticSearch task running in background
+        :return: id of a task deleting logs, if wait_for_completion is False
         Throws exception in case of any errors during removing of logs.
         """
         logger.debug(f'Deleting logs for {run} run and namespace {namespace}.')
@@ -207,6 +326,82 @@ class K8sElasticSearchClient(elasticsearch.Elasticsearch):
         }
         }
 
-        output = self.delete_by_query(index=index, body=delete_query)
+        return self._delete_logs(index=index, delete_query=delete_query, wait_for_completion=wait_for_completion)
+
+    def delete_logs_for_runs(self, runs: List[str], namespace: str, index='_all',
+                             wait_for_completion: bool = True) -> List[str]:
+        """
+        Removes logs for given runs. Runs are deleted in batches of DELETE_LOGS_BATCH_SIZE runs,
+        using a single request per batch.
+        :param runs: runs for which logs should be deleted
+        :param namespace: namespace for which logs should be deleted
+        :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
+        :param wait_for_completion: if False, logs are deleted by ElasticSearch tasks running in background
+        :return: ids of tasks deleting logs, if wait_for_completion is False
+        Throws exception in case of any errors during removing of logs.
+        """
+        logger.debug(f'Deleting logs for {len(runs)} runs and namespace {namespace}.')
+
+        task_ids = []
+        for batch_start in range(0, len(runs), self.DELETE_LOGS_BATCH_SIZE):
+            batch = runs[batch_start:batch_start + self.DELETE_LOGS_BATCH_SIZE]
+            delete_query = {"query": {"bool": {"must": [
+                {"terms": {'kubernetes.labels.runName.keyword': batch}},
+                {"term": {'kubernetes.namespace_name.keyword': namespace}}
+            ]}}}
+            task_id = self._delete_logs(index=index, delete_query=delete_query,
+                                        wait_for_completion=wait_for_completion)
+            if task_id:
+                task_ids.append(task_id)
+        return task_ids
+
+    def _delete_logs(self, index: str, delete_query: dict, wait_for_completion: bool) -> Optional[str]:
+        # documents modified in the meantime (e.g. by the curator) are skipped instead of failing the whole deletion
+        output = self.delete_by_query(index=index, body=delete_query, conflicts='proceed', slices='auto',
+                                      wait_for_completion=wait_for_completion)
 
         logger.debug(f"Deleting logs - result: {str(output)}")
+        return None if wait_for_completion else output['task']
+
+    def wait_for_tasks(self, task_ids: List[str], poll_interval: float = None,
+                       progress_callback: Callable[[int, int], None] = None):
+        """
+        Waits until given ElasticSearch tasks (e.g. deleting logs) are completed. Raises RuntimeError if any of tasks
+        failed or failed to process some of documents.
+        :param task_ids: ids of tasks
+        :param poll_interval: time between consecutive checks of tasks' status [s], defaults to TASK_POLL_INTERVAL
+        :param progress_callback: function called after every check of tasks' status with a number of processed
+         documents and a total number of documents to be processed by all tasks
+        """
+        pending_task_ids = set(task_ids)
+        # task id -> (number of processed documents, total number of documents)
+        tasks_progress: Dict[str, Tuple[int, int]] = {}
+        # task id -> error or failures reported by a task
+        task_failures: Dict[str, object] = {}
+        while True:
+            for task_id in list(pending_task_ids):
+                try:
+                    task = self.tasks.get(task_id=task_id)
+                except elasticsearch.NotFoundError:
+                    logger.debug(f'Task {task_id} not found, it is treated as completed.')
+                    pending_task_ids.discard(task_id)
+                    continue
+                status = task.get('task', {}).get('status', {})
+                tasks_progress[task_id] = (status.get('deleted', 0) + status.get('version_conflicts', 0),
+                                           status.get('total', 0))
+                if task.get('completed'):
+                    pending_task_ids.discard(task_id)
+                    failures = task.get('error') or task.get('response', {}).get('failures')
+                    if failures:
+                        logger.error(f'Task {task_id} failed: {failures}')
+                        task_failures[task_id] = failures
+
+            if progress_callback:
+                progress_callback(sum(processed for processed, _ in tasks_progress.values()),
+                                  sum(total for _, total in tasks_progress.values()))
+            if not pending_task_ids:
+                break
+            time.sleep(poll_interval if poll_interval is not None else self.TASK_POLL_INTERVAL)
+
+        if task_failures:
+            raise RuntimeError(f'Tasks {", ".join(sorted(task_failures))} failed: {task_failures}')
@@ -15,12 +15,12 @@
 #
 
 from enum import Enum
-from functools import lru_cache
-from typing import Set
+from functools import lru_cache, partial
+from typing import Set, List, Callable, Tuple, Iterable
 
 from logs_aggregator.k8s_log_entry import LogEntry
 from util.logger import initialize_logger
-from util.k8s.k8s_info import PodStatus, get_pod_status
+from util.k8s.k8s_info import PodStatus, get_pod_status, get_namespaced_pods
 
 log = initialize_logger(__name__)
 
@@ -55,3 +55,59 @@ def filter_log_by_pod_status(log_entry: LogEntry, pod_status: PodStatus) -> bool
 
 def filter_log_by_pod_ids(log_entry: LogEntry, pod_ids: Set[str]) -> bool:
     return log_entry.pod_name in pod_ids
+
+
+def get_pod_names_by_status(run_name: str, namespace: str, pod_status: PodStatus) -> List[str]:
+    """
+    Returns names of pods of a given run that currently have a given status.
+    """
+    pods = get_namespaced_pods(namespace=namespace, label_selector=f'runName={run_name}')
+    return [pod.metadata.name for pod in pods if PodStatus(pod.status.phase.upper()) == pod_status]
+
+
+def build_severity_query(min_severity: SeverityLevel) -> dict:
+    """
+    Builds ES query clause equivalent to filter_log_by_severity - a log matches if any of severity names
+    is its case-insensitive substring. Wildcards are used instead of a match query, because the analyzer
+    does not split lines such as "ERROR:root:message" into separate words. Patterns are lowercase, as
+    they are compared with lowercased terms of analyzed log field.
+    :param min_severity: minimal severity of returned logs
+    :return: ES query clause
+    """
+    return {'bool': {'should': [{'wildcard': {'log': f'*{severity.lower()}*'}}
+                                for severity in sorted(min_severity.value)],
+                     'minimum_should_match': 1}}
+
+
+def build_log_filters_query(run_name: str, namespace: str, min_severity: SeverityLevel = None,
+                            pod_ids: Iterable[str] = None, pod_status: PodStatus = None,
+                            follow=False) -> Tuple[List[dict], List[Callable[[LogEntry], bool]]]:
+    """
+    Translates log filters into ElasticSearch query clauses, so logs are filtered on ES side instead of
+    being downloaded and filtered by nctl. Filters that cannot be expressed as a query are returned as
+    filter functions, which have to be applied to retrieved logs.
+    Pod status filter is resolved to a list of pod names once, unless logs are followed - in such case
+    new pods may appear during streaming, so pod status is checked for each log entry.
+    :param run_name: name of a run whose logs are retrieved
+    :param namespace: namespace of a run
+    :param min_severity: minimal severity of returned logs
+    :param pod_ids: names of pods whose logs should be returned
+    :param pod_status: status of pods whose logs should be returned
+    :param follow: True if logs will be streamed
+    :return: tuple of (list of ES query clauses, list of filter functions with signatures f(LogEntry) -> Bool)
+    """
+    query_clauses: List[dict] = []
+    filters: List[Callable[[LogEntry], bool]] = []
+
+    if min_severity:
+        query_clauses.append(build_severity_query(min_severity))
+    if pod_ids:
+        query_clauses.append({'terms': {'kubernetes.pod_name.keyword': sorted(set(pod_ids))}})
+    if pod_status:
+        if follow:
+            filters.append(partial(filter_log_by_pod_status, pod_status=pod_status))
+        else:
+            pod_names = get_pod_names_by_status(run_name=run_name, namespace=namespace, pod_status=pod_status)
+            query_clauses.append({'terms': {'kubernetes.pod_name.keyword': sorted(pod_names)}})
+
+    return query_clauses, filters
@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from collections import OrderedDict
+import copy
+import heapq
+import time
+from typing import List, Callable, Generator, Optional
+
+import elasticsearch
+
+from logs_aggregator.k8s_log_entry import LogEntry
+from util.logger import initialize_logger
+
+logger = initialize_logger(__name__)
+
+
+class RecentIdsWindow:
+    """
+    Remembers a bounded number of most recently seen document ids.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._ids: OrderedDict = OrderedDict()
+
+    def add(self, doc_id: str) -> bool:
+        """
+        :return: True if id was not seen recently, False otherwise
+        """
+        if doc_id in self._ids:
+            return False
+        self._ids[doc_id] = None
+        if len(self._ids) > self.size:
+            self._ids.popitem(last=False)
+        return True
+
+
+class LogTailer:
+    """
+    Follows logs matching a list of ES queries (e.g. one query per run) and yields them as one stream ordered
+    by timestamp. Each query keeps its own search_after cursor on (@timestamp, _id), so every poll fetches only
+    logs that were not fetched before. Each poll starts slightly before the cursor (overlap) to catch logs indexed
+    late, logs that were already returned are skipped using a window of recently seen ids. When no new logs
+    are found, interval between polls grows exponentially up to max_interval.
+    """
+
+    SORT = [{'@timestamp': {'order': 'asc'}}, {'_id': {'order': 'asc'}}]
+
+    def __init__(self, es_client: elasticsearch.Elasticsearch, queries: List[dict], index='_all',
+                 filters: List[Callable[[LogEntry], bool]] = None, page_size=1000, min_interval=0.5,
+                 max_interval=5.0, overlap_ms=1000, dedup_window=10000):
+        """
+        :param es_client: ElasticSearch client
+        :param queries: list of ES queries (values of "query" key of a search body)
+        :param index: ElasticSearch index from which logs will be retrieved, defaults to all indices
+        :param filters: List of filter functions with signatures f(LogEntry) -> Bool
+        :param page_size: maximal number of logs fetched by a single request
+        :param min_interval: time interval between polls when new logs are coming
+        :param max_interval: maximal time interval between polls when no new logs are coming
+        :param overlap_ms: each poll starts this number of milliseconds before the cursor
+        :param dedup_window: number of most recently returned log ids remembered to avoid duplicates
+        """
+        self.es_client = es_client
+        self.queries = [copy.deepcopy(query) for query in queries]
+        self.index = index
+        self.filters = filters
+        self.page_size = page_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.overlap_ms = overlap_ms
+        self.seen_ids = RecentIdsWindow(size=dedup_window)
+        self.cursors: List[Optional[list]] = [None] * len(self.queries)
+
+    def poll(self) -> List[dict]:
+        """
+        Fetches all new hits of all queries.
+        :return: list of new hits ordered by (@timestamp, _id)
+        """
+        hits_per_query = [self._fetch_new_hits(query_no) for query_no in range(len(self.queries))]
+        return list(heapq.merge(*hits_per_query, key=lambda hit: hit['sort']))
+
+    def _fetch_new_hits(self, query_no: int) -> List[dict]:
+        cursor = self.cursors[query_no]
+        search_after = [cursor[0] - self.overlap_ms, ''] if cursor else None
+        new_hits = []
+        while True:
+            body = {'query': self.queries[query_no], 'sort': self.SORT, 'size': self.page_size}
+            if search_after:
+                body['search_after'] = search_after
+            hits = self.es_client.search(index=self.index, body=body)['hits']['hits']
+            for hit in hits:
+                if self.seen_ids.add(hit['_id']):
+                    new_hits.append(hit)
+            if hits:
+                search_after = hits[-1]['sort']
+                if not cursor or search_after > cursor:
+                    cursor = search_after
+            if len(hits) < self.page_size:
+                break
+        self.cursors[query_no] = cursor
+        return new_hits
+
+    def follow(self) -> Generator[LogEntry, None, None]:
+        """
+        Generator that infinitely yields new logs.
+        """
+        interval = self.min_interval
+        while True:
+            hits = self.poll()
+            for hit in hits:
+                log_entry = LogEntry(date=hit['_source']['@timestamp'],
+                                     content=hit['_source']['log'],
+                                     pod_name=hit['_source']['kubernetes']['pod_name'],
+                                     namespace=hit['_source']['kubernetes']['namespace_name'])
+                if not self.filters or all(f(log_entry) for f in self.filters):
+                    yield log_entry
+            if hits:
+                interval = self.min_interval
+            else:
+                interval = min(interval * 2, self.max_interval)
+                logger.debug(f'No new logs, next poll in {interval} s.')
+            time.sleep(interval)
@@ -20,6 +20,8 @@ import pytest
 
 from logs_aggregator.k8s_es_client import K8sElasticSearchClient
 from logs_aggregator.k8s_log_entry import LogEntry
+from logs_aggregator.log_filters import SeverityLevel
+from util.k8s.k8s_info import PodStatus
 from platform_resources.run import Run
 from platform_resources.workflow import ArgoWorkflow
 
@@ -129,6 +131,45 @@ def test_full_log_search_filter_idempotent(mock_k8s_info, mocker):
     assert filter_all_results == TEST_LOG_ENTRIES
 
 
+def test_full_log_search_sliced(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    es_scan_mock = mocker.patch('logs_aggregator.k8s_es_client.elasticsearch.helpers.scan')
+    # Each slice returns its part of logs - merged result has to be ordered by timestamp
+    es_scan_mock.side_effect = lambda client, query, **kwargs: iter([TEST_SCAN_OUTPUT[query['slice']['id']]])
+
+    assert list(client.get_log_generator(query_body={}, slices=2)) == TEST_LOG_ENTRIES
+    assert es_scan_mock.call_count == 2
+    assert {call[1]['query']['slice']['id'] for call in es_scan_mock.call_args_list} == {0, 1}
+    assert all(call[1]['query']['slice']['max'] == 2 for call in es_scan_mock.call_args_list)
+
+
+def test_full_log_search_sliced_unordered_slices(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    es_scan_mock = mocker.patch('logs_aggregator.k8s_es_client.elasticsearch.helpers.scan')
+    es_scan_mock.side_effect = lambda client, query, **kwargs: iter([TEST_SCAN_OUTPUT[1 - query['slice']['id']]])
+
+    assert list(client.get_log_generator(query_body={}, slices=2)) == TEST_LOG_ENTRIES
+
+
+def test_full_log_search_sliced_filter(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    es_scan_mock = mocker.patch('logs_aggregator.k8s_es_client.elasticsearch.helpers.scan')
+    es_scan_mock.side_effect = lambda client, query, **kwargs: iter([TEST_SCAN_OUTPUT[query['slice']['id']]])
+
+    filtered_results = list(client.get_log_generator(query_body={}, slices=2,
+                                                     filters=[lambda x: 'MySQL' in x.content]))
+    assert filtered_results == TEST_LOG_ENTRIES[1:]
+
+
+def test_full_log_search_sliced_error(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    es_scan_mock = mocker.patch('logs_aggregator.k8s_es_client.elasticsearch.helpers.scan')
+    es_scan_mock.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        list(client.get_log_generator(query_body={}, slices=2))
+
+
 def test_get_experiment_logs(mock_k8s_info, mocker):
     client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
     mocked_log_search = mocker.patch.object(client, 'get_log_generator')
@@ -156,7 +197,72 @@ def test_get_experiment_logs(mock_k8s_info, mocker):
                            "filter": {"range": {"@timestamp": {"gte": run_start_date}}}
                            }},
         "sort": {"@timestamp": {"order": "asc"}}},
-        filters=[], index='_all')
+        filters=[], index='_all', slices=1)
+
+
+def test_get_experiment_logs_filters(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    mocked_log_search = mocker.patch.object(client, 'get_log_generator')
+    mocked_log_search.return_value = iter(TEST_LOG_ENTRIES)
+    get_pod_names_mock = mocker.patch('logs_aggregator.log_filters.get_pod_names_by_status')
+    get_pod_names_mock.return_value = ['pod-2']
+
+    experiment_name = 'fake-experiment'
+    namespace = 'fake-namespace'
+
+    run_mock = MagicMock(spec=Run)
+    run_mock.name = experiment_name
+
+    run_start_date = '2018-04-17T09:28:39+00:00'
+
+    list(client.get_experiment_logs_generator(run=run_mock, namespace=namespace, start_date=run_start_date,
+                                              min_severity=SeverityLevel.CRITICAL, pod_ids=['pod-1'],
+                                              pod_status=PodStatus.RUNNING))
+
+    mocked_log_search.assert_called_with(query_body={
+        "query": {"bool": {"must":
+                               [{'term': {'kubernetes.labels.runName.keyword': experiment_name}},
+                                {'term': {'kubernetes.namespace_name.keyword': namespace}},
+                                {'bool': {'should': [{'wildcard': {'log': '*critical*'}}],
+                                          'minimum_should_match': 1}},
+                                {'terms': {'kubernetes.pod_name.keyword': ['pod-1']}},
+                                {'terms': {'kubernetes.pod_name.keyword': ['pod-2']}}
+                                ],
+                           "filter": {"range": {"@timestamp": {"gte": run_start_date}}}
+                           }},
+        "sort": {"@timestamp": {"order": "asc"}}},
+        filters=[], index='_all', slices=1)
+
+
+def test_get_experiments_stream_logs(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    log_tailer_mock = mocker.patch('logs_aggregator.k8s_es_client.LogTailer')
+    log_tailer_mock.return_value.follow.return_value = iter(TEST_LOG_ENTRIES)
+
+    namespace = 'fake-namespace'
+    runs = [Run(name='run-1', experiment_name='exp', creation_timestamp='2018-04-17T09:28:39Z'),
+            Run(name='run-2', experiment_name='exp', creation_timestamp='2018-04-17T09:28:49Z')]
+
+    logs = list(client.get_experiments_stream_logs_generator(runs=runs, namespace=namespace))
+
+    assert logs == TEST_LOG_ENTRIES
+    queries = log_tailer_mock.call_args[1]['queries']
+    assert queries == [{"bool": {"must": [{'term': {'kubernetes.labels.runName.keyword': run.name}},
+                                          {'term': {'kubernetes.namespace_name.keyword': namespace}}],
+                                 "filter": {"range": {"@timestamp": {"gte": run.creation_timestamp}}}}}
+                       for run in runs]
+
+
+def test_get_stream_logs(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    log_tailer_mock = mocker.patch('logs_aggregator.k8s_es_client.LogTailer')
+    log_tailer_mock.return_value.follow.return_value = iter(TEST_LOG_ENTRIES)
+    query = {"bool": {"must": [{'term': {'kubernetes.namespace_name.keyword': 'namespace'}}]}}
+
+    logs = list(client.get_stream_log_generator(query_body={'query': query}))
+
+    assert logs == TEST_LOG_ENTRIES
+    assert log_tailer_mock.call_args[1]['queries'] == [query]
 
 
 def test_get_workflow_logs(mocker):
@@ -221,7 +327,7 @@ def test_get_experiment_logs_time_range(mock_k8s_info, mocker):
                            "filter": {"range": {"@timestamp":{"gte": start_date, "lte": end_date}}}
                            }},
         "sort": {"@timestamp": {"order": "asc"}}},
-        filters=[], index='_all')
+        filters=[], index='_all', slices=1)
 
 
 def test_delete_logs_for_namespace(mock_k8s_info, mocker):
@@ -251,5 +357,60 @@ def test_delete_logs_for_run(mock_k8s_info, mocker):
     }
     }
 
-    mocked_delete_logs.assert_called_with(index='_all',
-                                          body=delete_query)
+    mocked_delete_logs.assert_called_with(index='_all', body=delete_query, conflicts='proceed', slices='auto',
+                                          wait_for_completion=True)
+
+
+def test_delete_logs_for_runs_in_background(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    mocker.patch.object(K8sElasticSearchClient, 'DELETE_LOGS_BATCH_SIZE', 2)
+    mocked_delete_logs = mocker.patch.object(client, 'delete_by_query', side_effect=[{'task': 'node:1'},
+                                                                                      {'task': 'node:2'}])
+
+    task_ids = client.delete_logs_for_runs(['run-1', 'run-2', 'run-3'], 'fake-namespace', wait_for_completion=False)
+
+    assert task_ids == ['node:1', 'node:2']
+    run_names = [call[1]['body']['query']['bool']['must'][0]['terms']['kubernetes.labels.runName.keyword']
+                 for call in mocked_delete_logs.call_args_list]
+    assert run_names == [['run-1', 'run-2'], ['run-3']]
+    assert all(call[1]['wait_for_completion'] is False for call in mocked_delete_logs.call_args_list)
+
+
+def test_wait_for_tasks(mock_k8s_info, mocker):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    mocker.patch('logs_aggregator.k8s_es_client.time.sleep')
+    task_statuses = {
+        'node:1': [{'completed': False, 'task': {'status': {'total': 10, 'deleted': 5}}},
+                   {'completed': True, 'task': {'status': {'total': 10, 'deleted': 10}}}],
+        'node:2': [{'completed': True, 'task': {'status': {'total': 4, 'deleted': 3, 'version_conflicts': 1}}}]
+    }
+    mocker.patch.object(client, 'tasks').get.side_effect = lambda task_id: task_statuses[task_id].pop(0)
+    progress = []
+
+    client.wait_for_tasks(['node:1', 'node:2'], progress_callback=lambda deleted, total:
+                          progress.append((deleted, total)))
+
+    assert progress == [(9, 14), (14, 14)]
+
+
+@pytest.mark.parametrize('failed_task', [
+    {'completed': True, 'task': {'status': {'total': 4, 'deleted': 0}},
+     'error': {'type': 'search_phase_execution_exception', 'reason': 'all shards failed'}},
+    {'completed': True, 'task': {'status': {'total': 4, 'deleted': 3}},
+     'response': {'failures': [{'index': 'logstash-2019.01.01', 'cause': {'type': 'es_rejected_execution_exception'}}]}}
+])
+def test_wait_for_tasks_failure(mock_k8s_info, mocker, failed_task):
+    client = K8sElasticSearchClient(host='fake', port=8080, namespace='kube-system')
+    mocker.patch('logs_aggregator.k8s_es_client.time.sleep')
+    task_statuses = {
+        'node:1': [{'completed': True, 'task': {'status': {'total': 10, 'deleted': 10}},
+                    'response': {'failures': []}}],
+        'node:2': [failed_task]
+    }
+    tasks_mock = mocker.patch.object(client, 'tasks')
+    tasks_mock.get.side_effect = lambda task_id: task_statuses[task_id].pop(0)
+
+    with pytest.raises(RuntimeError, match='node:2'):
+        client.wait_for_tasks(['node:1', 'node:2'])
+
+    assert tasks_mock.get.call_count == 2
@@ -14,11 +14,15 @@
 # limitations under the License.
 #
 
+import fnmatch
+from unittest.mock import MagicMock
+
 import pytest
 
 
 from logs_aggregator.log_filters import filter_log_by_severity,filter_log_by_pod_status,\
-    SeverityLevel, filter_log_by_pod_ids
+    SeverityLevel, filter_log_by_pod_ids, build_log_filters_query, get_pod_names_by_status, \
+    build_severity_query
 from logs_aggregator.k8s_log_entry import LogEntry
 from util.k8s.k8s_info import PodStatus
 
@@ -115,3 +119,76 @@ def test_filter_log_by_pod_ids():
 
     assert filter_log_by_pod_ids(pod_ids={pod_id}, log_entry=log_entry) == True
     assert filter_log_by_pod_ids(pod_ids={'another-pod-id'}, log_entry=log_entry) == False
+
+
+def _pod_mock(name: str, phase: str):
+    pod = MagicMock()
+    pod.metadata.name = name
+    pod.status.phase = phase
+    return pod
+
+
+def test_get_pod_names_by_status(mocker):
+    get_pods_mock = mocker.patch('logs_aggregator.log_filters.get_namespaced_pods')
+    get_pods_mock.return_value = [_pod_mock('pod-1', 'Running'), _pod_mock('pod-2', 'Failed'),
+                                  _pod_mock('pod-3', 'Running')]
+
+    assert get_pod_names_by_status(run_name='run', namespace='ns', pod_status=PodStatus.RUNNING) == \
+        ['pod-1', 'pod-3']
+    get_pods_mock.assert_called_once_with(namespace='ns', label_selector='runName=run')
+
+
+def test_build_log_filters_query_no_filters():
+    assert build_log_filters_query(run_name='run', namespace='ns') == ([], [])
+
+
+def test_build_log_filters_query_severity():
+    clauses, filters = build_log_filters_query(run_name='run', namespace='ns', min_severity=SeverityLevel.ERROR)
+
+    assert clauses == [{'bool': {'should': [{'wildcard': {'log': '*critical*'}}, {'wildcard': {'log': '*error*'}}],
+                                 'minimum_should_match': 1}}]
+    assert filters == []
+
+
+@pytest.mark.parametrize('content,expected', [('ERROR:root:msg', True), ('Traceback: some_error', True),
+                                              ('[CRITICAL ] bla', True), ('WARNING:root:msg', False)])
+def test_build_severity_query_substring(content, expected):
+    # Standard analyzer keeps words joined with colons as a single lowercased term, e.g. "error:root:msg"
+    terms = {term.lower() for term in content.replace('[', ' ').replace(']', ' ').split()}
+    query = build_severity_query(SeverityLevel.ERROR)
+
+    matched = any(fnmatch.fnmatchcase(term, clause['wildcard']['log'])
+                  for clause in query['bool']['should'] for term in terms)
+
+    assert matched == expected
+    assert matched == filter_log_by_severity(LogEntry(date='2018-04-19T14:27:46+00:00', content=content,
+                                                      pod_name='pod', namespace='default'), SeverityLevel.ERROR)
+
+
+def test_build_log_filters_query_pod_ids():
+    clauses, filters = build_log_filters_query(run_name='run', namespace='ns', pod_ids=['pod-2', 'pod-1', 'pod-2'])
+
+    assert clauses == [{'terms': {'kubernetes.pod_name.keyword': ['pod-1', 'pod-2']}}]
+    assert filters == []
+
+
+def test_build_log_filters_query_pod_status(mocker):
+    get_pod_names_mock = mocker.patch('logs_aggregator.log_filters.get_pod_names_by_status')
+    get_pod_names_mock.return_value = ['pod-1']
+
+    clauses, filters = build_log_filters_query(run_name='run', namespace='ns', pod_status=PodStatus.FAILED)
+
+    assert clauses == [{'terms': {'kubernetes.pod_name.keyword': ['pod-1']}}]
+    assert filters == []
+    get_pod_names_mock.assert_called_once_with(run_name='run', namespace='ns', pod_status=PodStatus.FAILED)
+
+
+def test_build_log_filters_query_pod_status_follow(mocker):
+    get_pod_names_mock = mocker.patch('logs_aggregator.log_filters.get_pod_names_by_status')
+
+    clauses, filters = build_log_filters_query(run_name='run', namespace='ns', pod_status=PodStatus.FAILED,
+                                               follow=True)
+
+    assert clauses == []
+    assert len(filters) == 1
+    assert get_pod_names_mock.call_count == 0
@@ -0,0 +1,153 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from logs_aggregator.k8s_log_entry import LogEntry
+from logs_aggregator.log_tailer import LogTailer, RecentIdsWindow
+
+
+def _hit(doc_id: str, timestamp: int, run: str) -> dict:
+    return {'_id': doc_id, 'sort': [timestamp, doc_id],
+            '_source': {'@timestamp': str(timestamp), 'log': f'{run} log {doc_id}\n',
+                        'kubernetes': {'pod_name': f'{run}-pod', 'namespace_name': 'ns'}}}
+
+
+class FakeSearchClient:
+    """
+    Serves search requests with search_after support. Documents are assigned to queries by 'run' key of query.
+    """
+    def __init__(self):
+        self.documents = {}
+        self.search_count = 0
+
+    def add(self, run: str, doc_id: str, timestamp: int):
+        self.documents.setdefault(run, []).append(_hit(doc_id, timestamp, run))
+
+    def search(self, index, body):
+        self.search_count += 1
+        hits = sorted(self.documents.get(body['query']['run'], []), key=lambda hit: hit['sort'])
+        if 'search_after' in body:
+            hits = [hit for hit in hits if hit['sort'] > body['search_after']]
+        return {'hits': {'hits': hits[:body['size']]}}
+
+
+@pytest.fixture()
+def fake_client():
+    return FakeSearchClient()
+
+
+def test_recent_ids_window():
+    window = RecentIdsWindow(size=2)
+
+    assert window.add('a') is True
+    assert window.add('a') is False
+    assert window.add('b') is True
+    assert window.add('c') is True
+    # 'a' dropped out of the window
+    assert window.add('a') is True
+
+
+def test_poll_merges_queries(fake_client):
+    fake_client.add('run-1', 'a', 1000)
+    fake_client.add('run-2', 'b', 1500)
+    fake_client.add('run-1', 'c', 2000)
+    tailer = LogTailer(es_client=fake_client, queries=[{'run': 'run-1'}, {'run': 'run-2'}])
+
+    assert [hit['_id'] for hit in tailer.poll()] == ['a', 'b', 'c']
+
+
+def test_poll_returns_only_new_logs(fake_client):
+    fake_client.add('run-1', 'a', 1000)
+    tailer = LogTailer(es_client=fake_client, queries=[{'run': 'run-1'}], overlap_ms=0)
+    tailer.poll()
+
+    fake_client.add('run-1', 'b', 1000)
+    fake_client.add('run-1', 'c', 3000)
+
+    assert [hit['_id'] for hit in tailer.poll()] == ['b', 'c']
+    assert tailer.poll() == []
+
+
+def test_poll_catches_late_logs_without_duplicates(fake_client):
+    fake_client.add('run-1', 'b', 5000)
+    tailer = LogTailer(es_client=fake_client, queries=[{'run': 'run-1'}], overlap_ms=1000)
+    tailer.poll()
+
+    # Log with earlier timestamp indexed after the cursor moved past it
+    fake_client.add('run-1', 'a', 4500)
+
+    assert [hit['_id'] for hit in tailer.poll()] == ['a']
+
+
+def test_poll_pagination(fake_client):
+    for i in range(7):
+        fake_client.add('run-1', f'doc-{i}', 1000 + i)
+    tailer = LogTailer(es_client=fake_client, queries=[{'run': 'run-1'}], page_size=3)
+
+    assert len(tailer.poll()) == 7
+    assert fake_client.search_count == 3
+
+
+def test_queries_not_mutated(fake_client):
+    query = {'run': 'run-1'}
+    fake_client.add('run-1', 'a', 1000)
+    tailer = LogTailer(es_client=fake_client, queries=[query])
+    tailer.poll()
+    tailer.poll()
+
+    assert query == {'run': 'run-1'}
+
+
+def test_follow_backoff(fake_client, mocker):
+    fake_client.add('run-1', 'a', 1000)
+    sleep_mock = mocker.patch('logs_aggregator.log_tailer.time.sleep')
+    tailer = LogTailer(es_client=fake_client, queries=[{'run': 'run-1'}], min_interval=0.5, max_interval=2)
+
+    class StopFollowing(Exception):
+        pass
+
+    sleep_mock.side_effect = [None, None, None, None, StopFollowing]
+    logs = []
+    with pytest.raises(StopFollowing):
+        for log in tailer.follow():
+            logs.append(log)
+
+    assert logs == [LogEntry(date='1000', content='run-1 log a\n', pod_name='run-1-pod', namespace='ns')]
+    assert [call[0][0] for call in sleep_mock.call_args_list] == [0.5, 1, 2, 2, 2]
+
+
+def test_follow_filters(fake_client, mocker):
+    fake_client.add('run-1', 'a', 1000)
+    fake_client.add('run-1', 'b', 2000)
+    mocker.patch('logs_aggregator.log_tailer.time.sleep')
+    tailer = LogTailer(es_client=fake_client, queries=[{'run': 'run-1'}],
+                       filters=[lambda log_entry: 'log b' in log_entry.content])
+
+    logs = tailer.follow()
+
+    assert next(logs).content == 'run-1 log b\n'
+
+
+def test_follow_search_error():
+    es_client = MagicMock()
+    es_client.search.side_effect = RuntimeError
+    tailer = LogTailer(es_client=es_client, queries=[{'match_all': {}}])
+
+    with pytest.raises(RuntimeError):
+        next(tailer.follow())
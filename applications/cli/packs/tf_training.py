@@ -15,6 +15,7 @@
 #
 
 import ast
+from functools import lru_cache
 import os
 import re
 import shutil
@@ -41,6 +42,9 @@ POD_COUNT_PARAM = "podCount"
 
 NAUTA_REGISTRY_ADDRESS = f'nauta-registry-nginx.{NAUTA_NAMESPACE}:5000'
 
+# values.yaml is parsed a few times for every run of an experiment, libyaml based loader is much faster, if available
+YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 def update_configuration(run_folder: str, script_location: str,
                          script_parameters: Tuple[str, ...],
@@ -141,7 +145,7 @@ def modify_values_yaml(experiment_folder: str, script_location: str, script_para
 
     with open(values_yaml_filename, "r") as values_yaml_file:
 
-        template = jinja2.Template(values_yaml_file.read())
+        template = _get_values_yaml_template(values_yaml_file.read())
 
         rendered_values = template.render(NAUTA = {
             'ExperimentName': experiment_name,
@@ -151,7 +155,7 @@ def modify_values_yaml(experiment_folder: str, script_location: str, script_para
             'ImageRepository': f'127.0.0.1:{cluster_registry_port}/{username}/{experiment_name}:latest'
         })
 
-        v = yaml.safe_load(rendered_values)
+        v = yaml.load(rendered_values, Loader=YAML_SAFE_LOADER)
 
         workersCount = None
         pServersCount = None
@@ -211,12 +215,18 @@ def modify_values_yaml(experiment_folder: str, script_location: str, script_para
     log.debug("Modify values.yaml - end")
 
 
+@lru_cache(maxsize=16)
+def _get_values_yaml_template(source: str) -> jinja2.Template:
+    # all runs of an experiment use the same values.yaml, so its template is compiled once
+    return jinja2.Template(source)
+
+
 def get_pod_count(run_folder: str, pack_type: str) -> Optional[int]:
     log.debug(f"Getting pod count for Run: {run_folder}")
     values_yaml_filename = os.path.join(run_folder, f"charts/{pack_type}/values.yaml")
 
     with open(values_yaml_filename, "r") as values_yaml_file:
-        values = yaml.safe_load(values_yaml_file)
+        values = yaml.load(values_yaml_file, Loader=YAML_SAFE_LOADER)
 
     pod_count = values.get(POD_COUNT_PARAM)
 
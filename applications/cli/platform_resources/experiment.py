@@ -29,6 +29,7 @@ from marshmallow_enum import EnumField
 
 from cli_text_consts import PlatformResourcesExperimentsTexts as Texts
 from platform_resources.custom_object_meta_model import validate_kubernetes_name
+from platform_resources.local_resource_cache import list_raw_from_local_cache
 from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject, \
     PlatformResourceApiClient
 from platform_resources.resource_filters import filter_by_name_regex, filter_by_state
@@ -187,6 +188,7 @@ class Experiment(PlatformResource):
         experiments = [Experiment.from_k8s_response_dict(experiment_dict)
                        for experiment_dict in raw_experiments['items']
                        if all(f(experiment_dict) for f in experiment_filters)]
+        cls.cache_resources(experiments)
 
         return experiments
 
@@ -200,7 +202,11 @@ class Experiment(PlatformResource):
          Defaults to everything.
         """
         k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
+        cached_raw_experiments = list_raw_from_local_cache(Experiment, custom_objects_api=k8s_custom_object_api,
+                                                           namespace=namespace, label_selector=label_selector)
+        if cached_raw_experiments is not None:
+            raw_experiments = {'items': cached_raw_experiments}
+        elif namespace:
             raw_experiments = k8s_custom_object_api.list_namespaced_custom_object(group=Experiment.api_group_name,
                                                                                   namespace=namespace,
                                                                                   plural=Experiment.crd_plural_name,
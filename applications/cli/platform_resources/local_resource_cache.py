@@ -0,0 +1,224 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from kubernetes.client import CustomObjectsApi
+from kubernetes.watch.watch import iter_resp_lines
+
+from git_repo_manager.utils import compute_hash_of_k8s_env_address
+from util.config import Config, ConfigInitError
+from util.logger import initialize_logger
+
+logger = initialize_logger(__name__)
+
+# environmental variable enabling local cache of listed resources, e.g. NCTL_RESOURCE_CACHE=1
+LOCAL_RESOURCE_CACHE_ENV_NAME = 'NCTL_RESOURCE_CACHE'
+# name of a directory (within nctl config directory) with cached listings
+LOCAL_RESOURCE_CACHE_DIR_NAME = 'resource-cache'
+
+
+def is_local_resource_cache_enabled() -> bool:
+    return os.environ.get(LOCAL_RESOURCE_CACHE_ENV_NAME, '').lower() in ('1', 'true', 'yes')
+
+
+class ResourceVersionExpiredError(Exception):
+    """
+    Raised when cached resourceVersion is too old to start a watch from it (410 Gone).
+    """
+    pass
+
+
+class LocalResourceCache:
+    """
+    On-disk cache of a listing of platform resources of a given kind, stored in nctl config directory together
+    with resourceVersion of the listing. Instead of listing all resources again, cached listing is brought
+    up to date by a short watch starting from the cached resourceVersion - the watch returns only changes
+    made since then. If the cached resourceVersion has expired, or the watch fails, resources are listed again.
+    Cache files are keyed by a hash of the cluster address, resource kind, namespace and label selector.
+    """
+
+    # maximal duration of a watch bringing a cached listing up to date, the watch is finished by K8S API server
+    # if it doesn't catch up with the current resourceVersion earlier
+    WATCH_DURATION = 1
+    CONNECT_TIMEOUT = 5
+    # timeout of reading a response of a watch - it covers also waiting for the first bytes of a response,
+    # so it is much longer than a duration of the watch
+    READ_TIMEOUT = 30
+
+    def __init__(self, resource_class, custom_objects_api: CustomObjectsApi, namespace: str = None,
+                 label_selector: str = None, cache_dir: str = None):
+        """
+        :param resource_class: PlatformResource subclass, which resources are cached
+        :param custom_objects_api: K8S custom objects API client
+        :param namespace: If provided, only resources from this namespace are cached
+        :param label_selector: If provided, only resources matching this label selector are cached
+        :param cache_dir: directory with cache files, defaults to resource-cache directory in nctl config directory
+        """
+        self.resource_class = resource_class
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.custom_objects_api = custom_objects_api
+        self.cache_dir = cache_dir if cache_dir else os.path.join(Config().config_path,
+                                                                  LOCAL_RESOURCE_CACHE_DIR_NAME)
+
+    @property
+    def cache_file_path(self) -> str:
+        selector_hash = hashlib.md5((self.label_selector or '').encode('utf-8')).hexdigest()[:8]  # nosec
+        file_name = f'{self.resource_class.crd_plural_name}-{self.namespace or "_all"}-{selector_hash}-' \
+                    f'{compute_hash_of_k8s_env_address()}.json'
+        return os.path.join(self.cache_dir, file_name)
+
+    def list_raw(self) -> List[dict]:
+        """
+        Returns raw resources (dicts), using cached listing if it is available.
+        """
+        cached_listing = self._load()
+        items = None
+        if cached_listing:
+            try:
+                items, resource_version = self._watch_changes(*cached_listing)
+                logger.debug(f'Local cache of {self.resource_class.__name__}s updated to {resource_version}.')
+            except ResourceVersionExpiredError:
+                logger.debug(f'Local cache of {self.resource_class.__name__}s expired.')
+            except Exception:
+                logger.exception(f'Failed to update local cache of {self.resource_class.__name__}s.')
+
+        if items is None:
+            items, resource_version = self._list_all()
+
+        self._save(items, resource_version)
+        return list(items.values())
+
+    @staticmethod
+    def _item_key(item: dict) -> str:
+        return f"{item['metadata'].get('namespace', '')}/{item['metadata']['name']}"
+
+    def _list_all(self) -> Tuple[Dict[str, dict], str]:
+        items = {}
+        resource_version = ''
+        for page in self.resource_class.list_raw_pages(namespace=self.namespace,
+                                                       custom_objects_api=self.custom_objects_api,
+                                                       label_selector=self.label_selector):
+            # all pages of a paged list are a consistent snapshot having the same resourceVersion
+            resource_version = page.get('metadata', {}).get('resourceVersion', '')
+            for item in page.get('items', []):
+                items[self._item_key(item)] = item
+        return items, resource_version
+
+    def _watch_changes(self, items: Dict[str, dict], resource_version: str) -> Tuple[Dict[str, dict], str]:
+        # resourceVersion of a current state of resources is taken before the watch starts - if the watch doesn't
+        # return any event, cached listing is up to date with it, so the cached resourceVersion doesn't get older
+        current_resource_version = self._get_current_resource_version()
+        if current_resource_version and current_resource_version == resource_version:
+            return items, resource_version
+
+        path, path_params = self.resource_class.get_list_path(namespace=self.namespace)
+        query_params = [('watch', 'true'), ('resourceVersion', resource_version),
+                        ('timeoutSeconds', self.WATCH_DURATION), ('allowWatchBookmarks', 'true')]
+        if self.label_selector:
+            query_params.append(('labelSelector', self.label_selector))
+        response = self.custom_objects_api.api_client.call_api(path, 'GET', path_params, query_params,
+                                                               {'Accept': 'application/json'},
+                                                               auth_settings=['BearerToken'],
+                                                               _return_http_data_only=True, _preload_content=False,
+                                                               _request_timeout=(self.CONNECT_TIMEOUT,
+                                                                                 self.READ_TIMEOUT))
+        events_received = False
+        try:
+            # watch ends as soon as it catches up with the current resourceVersion, or when its duration passes,
+            # a broken or timed out watch raises an exception
+            for line in iter_resp_lines(response):
+                event = json.loads(line)
+                event_object = event['object']
+                if event['type'] == 'ERROR':
+                    if event_object.get('code') == 410:
+                        raise ResourceVersionExpiredError()
+                    raise RuntimeError(event_object.get('message'))
+                elif event['type'] == 'DELETED':
+                    items.pop(self._item_key(event_object), None)
+                elif event['type'] != 'BOOKMARK':
+                    items[self._item_key(event_object)] = event_object
+                resource_version = event_object['metadata']['resourceVersion']
+                events_received = True
+                if self._is_up_to_date(resource_version, current_resource_version):
+                    break
+        finally:
+            response.close()
+            response.release_conn()
+
+        if not events_received and current_resource_version:
+            resource_version = current_resource_version
+        return items, resource_version
+
+    @staticmethod
+    def _is_up_to_date(resource_version: str, current_resource_version: str) -> bool:
+        # resourceVersions are opaque strings in K8S API, but in practice they are etcd revisions - numbers
+        # which only grow, so they can be compared; other values are only checked for equality
+        if resource_version.isdigit() and current_resource_version.isdigit():
+            return int(resource_version) >= int(current_resource_version)
+        return resource_version == current_resource_version
+
+    def _get_current_resource_version(self) -> str:
+        first_page = next(self.resource_class.list_raw_pages(namespace=self.namespace,
+                                                             custom_objects_api=self.custom_objects_api,
+                                                             label_selector=self.label_selector, limit=1))
+        return first_page.get('metadata', {}).get('resourceVersion', '')
+
+    def _load(self) -> Optional[Tuple[Dict[str, dict], str]]:
+        try:
+            with open(self.cache_file_path, mode='r', encoding='utf-8') as cache_file:
+                cached_listing = json.load(cache_file)
+            return cached_listing['items'], cached_listing['resourceVersion']
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception(f'Failed to load local cache of {self.resource_class.__name__}s.')
+            return None
+
+    def _save(self, items: Dict[str, dict], resource_version: str):
+        temp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temporary file first, so concurrently running nctl commands never read a partial file
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(file_descriptor, mode='w', encoding='utf-8') as cache_file:
+                json.dump({'resourceVersion': resource_version, 'items': items}, cache_file)
+            os.replace(temp_path, self.cache_file_path)
+        except Exception:
+            logger.exception(f'Failed to save local cache of {self.resource_class.__name__}s.')
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def list_raw_from_local_cache(resource_class, custom_objects_api: CustomObjectsApi, namespace: str = None,
+                              label_selector: str = None) -> Optional[List[dict]]:
+    """
+    Returns raw resources from a local cache, or None if local cache is disabled or unavailable.
+    """
+    if not is_local_resource_cache_enabled():
+        return None
+    try:
+        cache = LocalResourceCache(resource_class=resource_class, namespace=namespace, label_selector=label_selector,
+                                   custom_objects_api=custom_objects_api)
+    except ConfigInitError:
+        logger.exception('Local cache of resources is not available.')
+        return None
+    return cache.list_raw()
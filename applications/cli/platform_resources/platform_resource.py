@@ -14,8 +14,9 @@
 # limitations under the License.
 #
 
+from contextlib import contextmanager
 import http
-from typing import Dict, List, Optional, NamedTuple, TypeVar
+from typing import Dict, List, Optional, NamedTuple, TypeVar, Iterator, Tuple
 
 import yaml
 from kubernetes import client, config
@@ -24,6 +25,7 @@ from kubernetes.client import CustomObjectsApi
 from kubernetes.client.rest import ApiException
 from marshmallow import Schema, fields, post_load
 from platform_resources.custom_object_meta_model import V1ObjectMetaSchema
+from platform_resources.local_resource_cache import list_raw_from_local_cache
 from util.logger import initialize_logger
 
 logger = initialize_logger(__name__)
@@ -80,6 +82,13 @@ class PlatformResource:
     crd_plural_name: str
     crd_version: str
 
+    # Number of resources retrieved by a single request of paged list
+    LIST_PAGE_SIZE = 500
+
+    # Resources retrieved during a single command invocation, keyed by (class name, namespace, name).
+    # None if cache is disabled - see resource_cache()
+    _resource_cache: Optional[Dict[Tuple[str, Optional[str], str], 'PlatformResource']] = None
+
     def __init__(self, body: dict = None, name: str = None, namespace: str = None,
                  creation_timestamp: str = None, k8s_custom_object_api: CustomObjectsApi = None):
         self.body = body
@@ -103,6 +112,39 @@ class PlatformResource:
                    {k: v for k,v in other.__dict__.items() if k != 'k8s_custom_object_api'}
         return False
 
+    @staticmethod
+    @contextmanager
+    def resource_cache():
+        """
+        Enables per-invocation cache of platform resources. While enabled, get() returns resources which were
+        already retrieved by get() or list() calls (or added by cache_resources()), instead of calling K8S API again.
+        Can be used as a context manager or as a decorator of a command. Nested usage reuses the outer cache.
+        """
+        if PlatformResource._resource_cache is not None:
+            yield
+            return
+        PlatformResource._resource_cache = {}
+        try:
+            yield
+        finally:
+            PlatformResource._resource_cache = None
+
+    @classmethod
+    def cache_resources(cls, resources: List[PlatformResourceTypeVar]):
+        """
+        Stores given resources in per-invocation cache, if it is enabled.
+        """
+        if PlatformResource._resource_cache is None:
+            return
+        for resource in resources:
+            PlatformResource._resource_cache[(cls.__name__, resource.namespace, resource.name)] = resource
+
+    @classmethod
+    def _get_cached(cls, name: str, namespace: str = None) -> Optional[PlatformResourceTypeVar]:
+        if PlatformResource._resource_cache is None:
+            return None
+        return PlatformResource._resource_cache.get((cls.__name__, namespace, name))  # type: ignore
+
     @classmethod
     def from_k8s_response_dict(cls, object_dict: dict) -> PlatformResourceTypeVar:
         raise NotImplementedError
@@ -119,7 +161,11 @@ class PlatformResource:
              **kwargs) -> List[PlatformResourceTypeVar]:
         logger.debug(f'Getting list of {cls.__name__}s.')
         k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
+        cached_raw_resources = list_raw_from_local_cache(cls, custom_objects_api=k8s_custom_object_api,
+                                                         namespace=namespace, label_selector=label_selector)
+        if cached_raw_resources is not None:
+            raw_resources = {'items': cached_raw_resources}
+        elif namespace:
             raw_resources = k8s_custom_object_api.list_namespaced_custom_object(group=cls.api_group_name,
                                                                                 namespace=namespace,
                                                                                 plural=cls.crd_plural_name,
@@ -131,11 +177,83 @@ class PlatformResource:
                                                                              version=cls.crd_version,
                                                                              label_selector=label_selector)
 
-        return [cls.from_k8s_response_dict(raw_resource) for raw_resource in raw_resources['items']]
+        resources = [cls.from_k8s_response_dict(raw_resource) for raw_resource in raw_resources['items']]
+        cls.cache_resources(resources)
+        return resources
+
+    @classmethod
+    def get_list_path(cls, namespace: str = None) -> Tuple[str, Dict[str, str]]:
+        """
+        Returns K8S API path template and path parameters of a list of resources.
+        """
+        path_params = {'group': cls.api_group_name, 'version': cls.crd_version, 'plural': cls.crd_plural_name}
+        if namespace:
+            path_params['namespace'] = namespace
+            return '/apis/{group}/{version}/namespaces/{namespace}/{plural}', path_params
+        return '/apis/{group}/{version}/{plural}', path_params
+
+    @classmethod
+    def list_raw_pages(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                       label_selector: str = None, limit: int = None) -> Iterator[dict]:
+        """
+        Yields pages of a list of resources returned by K8S API (using limit/continue parameters of K8S list API).
+        Each page is a dict with 'items' and 'metadata' keys.
+        :param namespace: If provided, only resources from this namespace will be returned
+        :param custom_objects_api: K8S custom objects API client
+        :param label_selector: If provided, only resources matching this label selector will be returned
+        :param limit: Maximum number of resources retrieved by a single request, defaults to LIST_PAGE_SIZE
+        """
+        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
+        path, path_params = cls.get_list_path(namespace=namespace)
+
+        continue_token = None
+        while True:
+            # Kubernetes client in use doesn't support limit and continue parameters for custom objects
+            query_params = [('limit', limit or cls.LIST_PAGE_SIZE)]
+            if label_selector:
+                query_params.append(('labelSelector', label_selector))
+            if continue_token:
+                query_params.append(('continue', continue_token))
+            response = k8s_custom_object_api.api_client.call_api(path, 'GET', path_params, query_params,
+                                                                 {'Accept': 'application/json'},
+                                                                 response_type='object',
+                                                                 auth_settings=['BearerToken'],
+                                                                 _return_http_data_only=True)
+            yield response
+            continue_token = response.get('metadata', {}).get('continue')
+            if not continue_token:
+                return
+
+    @classmethod
+    def list_raw_paged(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                       label_selector: str = None, limit: int = None) -> Iterator[dict]:
+        """
+        Yields raw resources (dicts) returned by K8S API, retrieving them in chunks of a given size
+        (using limit/continue parameters of K8S list API), so all resources don't have to be kept in memory.
+        If local cache of resources is enabled, resources are taken from it instead.
+        :param namespace: If provided, only resources from this namespace will be returned
+        :param custom_objects_api: K8S custom objects API client
+        :param label_selector: If provided, only resources matching this label selector will be returned
+        :param limit: Maximum number of resources retrieved by a single request, defaults to LIST_PAGE_SIZE
+        """
+        logger.debug(f'Getting paged list of {cls.__name__}s.')
+        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
+        cached_raw_resources = list_raw_from_local_cache(cls, custom_objects_api=k8s_custom_object_api,
+                                                         namespace=namespace, label_selector=label_selector)
+        if cached_raw_resources is not None:
+            yield from cached_raw_resources
+            return
+        for page in cls.list_raw_pages(namespace=namespace, custom_objects_api=k8s_custom_object_api,
+                                       label_selector=label_selector, limit=limit):
+            yield from page.get('items', [])
 
     @classmethod
     def get(cls, name: str, namespace: str = None,
             custom_objects_api: CustomObjectsApi = None) -> Optional[PlatformResourceTypeVar]:
+        cached_resource = cls._get_cached(name=name, namespace=namespace)
+        if cached_resource:
+            logger.debug(f'Using cached {cls.__name__} {name} in namespace {namespace}.')
+            return cached_resource
         logger.debug(f'Getting {cls.__name__} {name} in namespace {namespace}.')
         k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
         try:
@@ -160,7 +278,11 @@ class PlatformResource:
                                  f'{name} object in namespace {namespace}.')
                 raise
 
-        return cls.from_k8s_response_dict(raw_object) if raw_object else None
+        if not raw_object:
+            return None
+        resource = cls.from_k8s_response_dict(raw_object)
+        cls.cache_resources([resource])
+        return resource
 
     @property
     def cli_representation(self) -> NamedTuple:
@@ -208,11 +330,49 @@ class PlatformResource:
                                                                                   plural=self.crd_plural_name,
                                                                                   version=self.crd_version,
                                                                                   name=self.name, body={})
+            if PlatformResource._resource_cache is not None:
+                PlatformResource._resource_cache.pop((self.__class__.__name__, self.namespace, self.name), None)
             return response
         except ApiException:
             logger.exception(f'Failed to delete {self.__class__.__name__} {self.name}.')
             raise
 
+    @classmethod
+    def delete_collection(cls, namespace: str, label_selector: str,
+                          custom_objects_api: CustomObjectsApi = None) -> List[str]:
+        """
+        Deletes all resources from a namespace matching a label selector using a single request.
+        :param namespace: namespace of resources
+        :param label_selector: label selector of deleted resources, it must not be empty
+        :param custom_objects_api: K8S custom objects API client
+        :return: names of deleted resources
+        """
+        if not label_selector:
+            raise ValueError('Label selector of deleted resources must be given.')
+
+        logger.debug(f'Deleting {cls.__name__}s matching {label_selector} from {namespace} namespace.')
+        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
+        path, path_params = cls.get_list_path(namespace=namespace)
+        try:
+            # Kubernetes client in use doesn't support deletion of collections of custom objects
+            response = k8s_custom_object_api.api_client.call_api(path, 'DELETE', path_params,
+                                                                 [('labelSelector', label_selector)],
+                                                                 {'Accept': 'application/json',
+                                                                  'Content-Type': 'application/json'},
+                                                                 body={}, response_type='object',
+                                                                 auth_settings=['BearerToken'],
+                                                                 _return_http_data_only=True)
+        except ApiException:
+            logger.exception(f'Failed to delete {cls.__name__}s matching {label_selector}.')
+            raise
+
+        # deleted resources are returned as a list, older K8S API servers may return only a status
+        deleted_names = [item['metadata']['name'] for item in (response or {}).get('items', [])]
+        if PlatformResource._resource_cache is not None:
+            for name in deleted_names:
+                PlatformResource._resource_cache.pop((cls.__name__, namespace, name), None)
+        return deleted_names
+
     def update(self) -> KubernetesObject:
         logger.debug(f'Updating {self.__class__.__name__} {self.name}.')
         try:
@@ -15,22 +15,21 @@
 #
 
 from collections import namedtuple
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from dateutil import parser
 from enum import Enum
 import re
 import sre_constants
 import textwrap
 from functools import partial
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator, Optional
 
 from kubernetes.client import CustomObjectsApi
 from marshmallow import Schema, fields, post_load
 from marshmallow_enum import EnumField
 
 from cli_text_consts import PlatformResourcesExperimentsTexts as Texts
-from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject, client, \
-    PlatformResourceApiClient
+from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject, client
 from platform_resources.resource_filters import filter_by_name_regex, filter_by_experiment_name
 from util.exceptions import InvalidRegularExpressionError
 from util.logger import initialize_logger
@@ -39,6 +38,9 @@ from util.system import format_timestamp_for_cli, format_duration_for_cli
 
 logger = initialize_logger(__name__)
 
+# label of runs, which contains a name of an experiment, so all runs of an experiment can be selected
+EXPERIMENT_NAME_LABEL = 'experimentName'
+
 
 class RunKinds(Enum):
     """ This enum contains all allowed run kinds which are used to filter runs in "list" commands. """
@@ -85,14 +87,18 @@ class Run(PlatformResource):
         self.metadata = metadata
         self.start_timestamp = start_timestamp
         self.end_timestamp = end_timestamp
-        if end_timestamp and start_timestamp:
-            self.duration = parser.parse(end_timestamp) - parser.parse(start_timestamp)
-        elif start_timestamp:
-            self.duration = datetime.now(timezone.utc) - parser.parse(start_timestamp)
-        else:
-            self.duration = None
         self.template_version = template_version
 
+    @property
+    def duration(self) -> Optional[timedelta]:
+        # Computed on demand, so timestamps of listed runs are parsed only if their duration is displayed
+        if self.end_timestamp and self.start_timestamp:
+            return parser.parse(self.end_timestamp) - parser.parse(self.start_timestamp)
+        elif self.start_timestamp:
+            return datetime.now(timezone.utc) - parser.parse(self.start_timestamp)
+        else:
+            return None
+
     @classmethod
     def from_k8s_response_dict(cls, object_dict: dict):
         run_state = object_dict.get('spec', {}).get('state')
@@ -124,22 +130,23 @@ class Run(PlatformResource):
         :return: List of Run objects
         In case of problems during getting a list of runs - throws an error
         """
+        runs = list(cls.list_iter(namespace=namespace, custom_objects_api=custom_objects_api, **kwargs))
+        cls.cache_resources(runs)
+        return runs
+
+    @classmethod
+    def list_iter(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                  **kwargs) -> Iterator['Run']:
+        """
+        Generator version of Run.list - accepts the same parameters. Runs are retrieved from K8S API in chunks
+        and Run objects are created only for runs matching given filters. Run kinds filter is passed to K8S API
+        as a label selector.
+        """
         state_list = kwargs.pop('state_list', None)
         name_filter = kwargs.pop('name_filter', None)
         exp_name_filter = kwargs.pop('exp_name_filter', None)
         excl_state = kwargs.pop('excl_state', None)
         run_kinds_filter = kwargs.pop('run_kinds_filter', None)
-        
-        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
-            raw_runs = k8s_custom_object_api.list_namespaced_custom_object(group=Run.api_group_name,
-                                                                           namespace=namespace,
-                                                                           plural=Run.crd_plural_name,
-                                                                           version=Run.crd_version)
-        else:
-            raw_runs = k8s_custom_object_api.list_cluster_custom_object(group=Run.api_group_name,
-                                                                        plural=Run.crd_plural_name,
-                                                                        version=Run.crd_version)
 
         try:
             name_regex = re.compile(name_filter) if name_filter else None
@@ -151,13 +158,12 @@ class Run(PlatformResource):
         run_filters = [partial(filter_by_name_regex, name_regex=name_regex, spec_location=False),
                        partial(filter_run_by_state, state_list=state_list),
                        partial(filter_run_by_excl_state, state=excl_state),
-                       partial(filter_by_experiment_name, exp_name=exp_name_filter),
-                       partial(filter_by_run_kinds, run_kinds=run_kinds_filter)]
+                       partial(filter_by_experiment_name, exp_name=exp_name_filter)]
 
-        runs = [Run.from_k8s_response_dict(run_dict)
-                for run_dict in raw_runs['items']
-                if all(f(run_dict) for f in run_filters)]
-        return runs
+        raw_runs = cls.list_raw_paged(namespace=namespace, custom_objects_api=custom_objects_api,
+                                      label_selector=run_kinds_label_selector(run_kinds_filter))
+
+        return (Run.from_k8s_response_dict(run_dict) for run_dict in raw_runs if all(f(run_dict) for f in run_filters))
 
     @property
     def cli_representation(self):
@@ -256,3 +262,10 @@ def filter_run_by_excl_state(resource_object_dict: dict, state: Enum = None):
 def filter_by_run_kinds(resource_object_dict: dict, run_kinds: List[Enum] = None):
     return any([resource_object_dict.get('metadata', {}).get('labels', {}).get('runKind')
                 == run_kind.value for run_kind in run_kinds]) if run_kinds else True
+
+
+def run_kinds_label_selector(run_kinds: List[Enum] = None) -> Optional[str]:
+    """
+    Returns K8S label selector matching runs of any of given kinds - equivalent of filter_by_run_kinds.
+    """
+    return f'runKind in ({",".join(run_kind.value for run_kind in run_kinds)})' if run_kinds else None
@@ -133,6 +133,41 @@ def test_list_experiments_invalid_name_filter(mock_platform_resources_api_client
     with pytest.raises(InvalidRegularExpressionError):
         Experiment.list(name_filter='*')
 
+
+def test_get_experiment_from_resource_cache(mock_platform_resources_api_client: CustomObjectsApi):
+    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+
+    with Experiment.resource_cache():
+        experiments = Experiment.list()
+        experiment = Experiment.get(name='test-experiment-new', namespace='namespace-2')
+
+    assert experiment is experiments[1]
+    assert mock_platform_resources_api_client.get_namespaced_custom_object.call_count == 0
+
+
+def test_get_experiment_twice_with_resource_cache(mock_platform_resources_api_client: CustomObjectsApi):
+    mock_platform_resources_api_client.get_namespaced_custom_object.return_value = \
+        LIST_EXPERIMENTS_RESPONSE_RAW['items'][0]
+
+    with Experiment.resource_cache():
+        first = Experiment.get(name='test-experiment-old', namespace='namespace-1')
+        second = Experiment.get(name='test-experiment-old', namespace='namespace-1')
+
+    assert first is second
+    assert mock_platform_resources_api_client.get_namespaced_custom_object.call_count == 1
+
+
+def test_get_experiment_without_resource_cache(mock_platform_resources_api_client: CustomObjectsApi):
+    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.get_namespaced_custom_object.return_value = \
+        LIST_EXPERIMENTS_RESPONSE_RAW['items'][1]
+
+    with Experiment.resource_cache():
+        Experiment.list()
+    Experiment.get(name='test-experiment-new', namespace='namespace-2')
+
+    assert mock_platform_resources_api_client.get_namespaced_custom_object.call_count == 1
+
 ADD_EXPERIMENT_RESPONSE_RAW = {'apiVersion': 'aipg.intel.com/v1', 'kind': 'Experiment',
                                'metadata': {'name': EXPERIMENT_NAME, 'namespace': NAMESPACE},
                                'spec': {'name': EXPERIMENT_NAME, 'parameters-spec': [], 'state': 'CREATING',
@@ -0,0 +1,238 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import urllib3
+
+from platform_resources import local_resource_cache
+from platform_resources.local_resource_cache import LocalResourceCache, list_raw_from_local_cache, \
+    LOCAL_RESOURCE_CACHE_ENV_NAME
+from platform_resources.run import Run
+
+
+def _raw_run(name: str, resource_version: str, namespace: str = 'ns') -> dict:
+    return {'metadata': {'name': name, 'namespace': namespace, 'resourceVersion': resource_version}, 'spec': {}}
+
+
+class FakeWatchResponse:
+    def __init__(self, events, timed_out=False):
+        self.events = events
+        self.timed_out = timed_out
+        self.closed = False
+
+    def read_chunked(self, decode_content=False):
+        for event in self.events:
+            yield (json.dumps(event) + '\n').encode('utf-8')
+        if self.timed_out:
+            raise urllib3.exceptions.ReadTimeoutError(None, None, 'Read timed out.')
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        pass
+
+
+@pytest.fixture()
+def custom_objects_api(mocker):
+    mocker.patch('platform_resources.local_resource_cache.compute_hash_of_k8s_env_address', return_value='hash')
+    return MagicMock()
+
+
+@pytest.fixture()
+def cache(tmpdir, custom_objects_api):
+    return LocalResourceCache(resource_class=Run, custom_objects_api=custom_objects_api, namespace='ns',
+                              cache_dir=str(tmpdir))
+
+
+def test_list_raw_without_cache_file(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+
+    assert cache.list_raw() == [_raw_run('run-1', '5')]
+
+    with open(cache.cache_file_path) as cache_file:
+        assert json.load(cache_file)['resourceVersion'] == '10'
+    query_params = custom_objects_api.api_client.call_api.call_args[0][3]
+    assert ('watch', 'true') not in query_params
+
+
+def test_list_raw_applies_watch_events(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5'), _raw_run('run-2', '6')]}
+    cache.list_raw()
+
+    watch_response = FakeWatchResponse([{'type': 'MODIFIED', 'object': _raw_run('run-1', '11')},
+                                        {'type': 'DELETED', 'object': _raw_run('run-2', '12')},
+                                        {'type': 'ADDED', 'object': _raw_run('run-3', '13')}])
+    current_state_response = {'metadata': {'resourceVersion': '13'}, 'items': [_raw_run('run-1', '11')]}
+    custom_objects_api.api_client.call_api.side_effect = [current_state_response, watch_response]
+
+    assert cache.list_raw() == [_raw_run('run-1', '11'), _raw_run('run-3', '13')]
+
+    query_params = custom_objects_api.api_client.call_api.call_args[0][3]
+    assert ('watch', 'true') in query_params
+    assert ('resourceVersion', '10') in query_params
+    assert watch_response.closed
+    with open(cache.cache_file_path) as cache_file:
+        assert json.load(cache_file)['resourceVersion'] == '13'
+
+
+def test_list_raw_stops_watch_when_up_to_date(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+    cache.list_raw()
+
+    # watch would time out if it was read after catching up with the current resourceVersion
+    watch_response = FakeWatchResponse([{'type': 'MODIFIED', 'object': _raw_run('run-1', '12')}], timed_out=True)
+    current_state_response = {'metadata': {'resourceVersion': '12'}, 'items': [_raw_run('run-1', '12')]}
+    custom_objects_api.api_client.call_api.side_effect = [current_state_response, watch_response]
+
+    assert cache.list_raw() == [_raw_run('run-1', '12')]
+
+    assert custom_objects_api.api_client.call_api.call_count == 3
+    assert watch_response.closed
+    with open(cache.cache_file_path) as cache_file:
+        assert json.load(cache_file)['resourceVersion'] == '12'
+
+
+def test_list_raw_skips_watch_when_resource_version_unchanged(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+    cache.list_raw()
+
+    custom_objects_api.api_client.call_api.side_effect = [{'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}]
+
+    assert cache.list_raw() == [_raw_run('run-1', '5')]
+
+    assert custom_objects_api.api_client.call_api.call_count == 2
+    query_params = custom_objects_api.api_client.call_api.call_args[0][3]
+    assert ('watch', 'true') not in query_params
+
+
+def test_list_raw_relists_when_resource_version_expired(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+    cache.list_raw()
+
+    expired_watch_response = FakeWatchResponse([{'type': 'ERROR', 'object': {'code': 410, 'message': 'Gone'}}])
+    relist_response = {'metadata': {'resourceVersion': '20'}, 'items': [_raw_run('run-2', '15')]}
+    custom_objects_api.api_client.call_api.side_effect = [relist_response, expired_watch_response, relist_response]
+
+    assert cache.list_raw() == [_raw_run('run-2', '15')]
+
+
+def test_list_raw_relists_when_watch_fails(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+    cache.list_raw()
+
+    relist_response = {'metadata': {'resourceVersion': '20'}, 'items': [_raw_run('run-1', '15')]}
+    custom_objects_api.api_client.call_api.side_effect = [RuntimeError, relist_response]
+
+    assert cache.list_raw() == [_raw_run('run-1', '15')]
+
+
+def test_list_raw_relists_when_watch_times_out(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+    cache.list_raw()
+
+    current_state_response = {'metadata': {'resourceVersion': '20'}, 'items': [_raw_run('run-1', '15')]}
+    watch_response = FakeWatchResponse([], timed_out=True)
+    custom_objects_api.api_client.call_api.side_effect = [current_state_response, watch_response,
+                                                          current_state_response]
+
+    assert cache.list_raw() == [_raw_run('run-1', '15')]
+    assert custom_objects_api.api_client.call_api.call_count == 4
+
+
+def test_list_raw_without_changes_updates_resource_version(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+    cache.list_raw()
+
+    current_state_response = {'metadata': {'resourceVersion': '20', 'continue': 'token'},
+                              'items': [_raw_run('run-1', '5')]}
+    custom_objects_api.api_client.call_api.side_effect = [current_state_response, FakeWatchResponse([])]
+
+    assert cache.list_raw() == [_raw_run('run-1', '5')]
+    # only a single page of the current state is retrieved
+    assert ('limit', 1) in custom_objects_api.api_client.call_api.call_args_list[1][0][3]
+    assert custom_objects_api.api_client.call_api.call_count == 3
+    with open(cache.cache_file_path) as cache_file:
+        assert json.load(cache_file)['resourceVersion'] == '20'
+
+
+def test_list_raw_applies_bookmark(cache: LocalResourceCache, custom_objects_api):
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+    cache.list_raw()
+
+    current_state_response = {'metadata': {'resourceVersion': '20'}, 'items': [_raw_run('run-1', '5')]}
+    bookmark = {'type': 'BOOKMARK', 'object': {'metadata': {'resourceVersion': '25'}}}
+    custom_objects_api.api_client.call_api.side_effect = [current_state_response, FakeWatchResponse([bookmark])]
+
+    assert cache.list_raw() == [_raw_run('run-1', '5')]
+    with open(cache.cache_file_path) as cache_file:
+        assert json.load(cache_file)['resourceVersion'] == '25'
+
+
+def test_list_raw_corrupted_cache_file(cache: LocalResourceCache, custom_objects_api):
+    with open(cache.cache_file_path, 'w') as cache_file:
+        cache_file.write('{')
+    custom_objects_api.api_client.call_api.return_value = {'metadata': {'resourceVersion': '10'},
+                                                           'items': [_raw_run('run-1', '5')]}
+
+    assert cache.list_raw() == [_raw_run('run-1', '5')]
+
+
+def test_cache_file_path_differs_by_label_selector(tmpdir, custom_objects_api):
+    first = LocalResourceCache(resource_class=Run, custom_objects_api=custom_objects_api, cache_dir=str(tmpdir),
+                               label_selector='runKind in (training)')
+    second = LocalResourceCache(resource_class=Run, custom_objects_api=custom_objects_api, cache_dir=str(tmpdir))
+
+    assert first.cache_file_path != second.cache_file_path
+
+
+def test_list_raw_from_local_cache_disabled(mocker, custom_objects_api):
+    mocker.patch.dict('os.environ', {LOCAL_RESOURCE_CACHE_ENV_NAME: ''})
+    cache_class_mock = mocker.patch.object(local_resource_cache, 'LocalResourceCache')
+
+    assert list_raw_from_local_cache(Run, custom_objects_api=custom_objects_api) is None
+    assert cache_class_mock.call_count == 0
+
+
+def test_list_raw_from_local_cache_enabled(mocker, custom_objects_api):
+    mocker.patch.dict('os.environ', {LOCAL_RESOURCE_CACHE_ENV_NAME: '1'})
+    cache_class_mock = mocker.patch.object(local_resource_cache, 'LocalResourceCache')
+    cache_class_mock.return_value.list_raw.return_value = [_raw_run('run-1', '5')]
+
+    assert list_raw_from_local_cache(Run, custom_objects_api=custom_objects_api, namespace='ns') == \
+        [_raw_run('run-1', '5')]
+
+
+def test_run_list_uses_local_cache(mocker, custom_objects_api):
+    list_raw_mock = mocker.patch('platform_resources.platform_resource.list_raw_from_local_cache',
+                                 return_value=[])
+
+    assert Run.list(namespace='ns', custom_objects_api=custom_objects_api) == []
+    assert list_raw_mock.call_count == 1
+    assert custom_objects_api.api_client.call_api.call_count == 0
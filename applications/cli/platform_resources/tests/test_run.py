@@ -20,7 +20,7 @@ from kubernetes.client import CustomObjectsApi
 from kubernetes.client.rest import ApiException
 
 from platform_resources.platform_resource import KubernetesObject
-from platform_resources.run import Run, RunStatus
+from platform_resources.run import Run, RunStatus, RunKinds
 from util.exceptions import InvalidRegularExpressionError
 
 TEST_RUNS = [Run(name="exp-mnist-single-node.py-18.05.17-16.05.45-1-tf-training",
@@ -71,38 +71,100 @@ def mock_k8s_api_client(mocker) -> CustomObjectsApi:
 
 
 def test_list_runs(mock_k8s_api_client):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     runs = Run.list()
     assert runs == TEST_RUNS
+    assert mock_k8s_api_client.api_client.call_api.call_args[0][0] == '/apis/{group}/{version}/{plural}'
 
 
 def test_list_runs_from_namespace(mock_k8s_api_client: CustomObjectsApi):
     raw_runs_single_namespace = dict(LIST_RUNS_RESPONSE_RAW)
     raw_runs_single_namespace['items'] = [raw_runs_single_namespace['items'][0]]
-    mock_k8s_api_client.list_namespaced_custom_object.return_value = raw_runs_single_namespace
+    mock_k8s_api_client.api_client.call_api.return_value = raw_runs_single_namespace
 
     runs = Run.list(namespace='namespace-1')
 
     assert [TEST_RUNS[0]] == runs
+    call_args = mock_k8s_api_client.api_client.call_api.call_args[0]
+    assert call_args[0] == '/apis/{group}/{version}/namespaces/{namespace}/{plural}'
+    assert call_args[2]['namespace'] == 'namespace-1'
 
 
 def test_list_runs_filter_status(mock_k8s_api_client: CustomObjectsApi):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     runs = Run.list(state_list=[RunStatus.QUEUED])
     assert [TEST_RUNS[0]] == runs
 
 
 def test_list_runs_name_filter(mock_k8s_api_client: CustomObjectsApi):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     runs = Run.list(name_filter=TEST_RUNS[1].name)
     assert [TEST_RUNS[1]] == runs
 
 
 def test_list_runs_invalid_name_filter(mock_k8s_api_client: CustomObjectsApi):
-    mock_k8s_api_client.list_cluster_custom_object.return_value = LIST_RUNS_RESPONSE_RAW
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
     with pytest.raises(InvalidRegularExpressionError):
         Run.list(name_filter='*')
 
+
+def test_list_runs_run_kinds_label_selector(mock_k8s_api_client: CustomObjectsApi):
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
+
+    Run.list(run_kinds_filter=[RunKinds.TRAINING, RunKinds.JUPYTER])
+
+    query_params = mock_k8s_api_client.api_client.call_api.call_args[0][3]
+    assert ('labelSelector', 'runKind in (training,jupyter)') in query_params
+
+
+def test_list_runs_paged(mock_k8s_api_client: CustomObjectsApi):
+    first_page = {'items': [LIST_RUNS_RESPONSE_RAW['items'][0]], 'metadata': {'continue': 'token'}}
+    second_page = {'items': [LIST_RUNS_RESPONSE_RAW['items'][1]], 'metadata': {'continue': ''}}
+    mock_k8s_api_client.api_client.call_api.side_effect = [first_page, second_page]
+
+    runs = Run.list()
+
+    assert runs == TEST_RUNS
+    first_call_params, second_call_params = [call[0][3] for call in
+                                             mock_k8s_api_client.api_client.call_api.call_args_list]
+    assert ('limit', Run.LIST_PAGE_SIZE) in first_call_params
+    assert not any(param == 'continue' for param, _ in first_call_params)
+    assert ('continue', 'token') in second_call_params
+
+
+def test_list_iter_runs_lazy(mock_k8s_api_client: CustomObjectsApi):
+    first_page = {'items': [LIST_RUNS_RESPONSE_RAW['items'][0]], 'metadata': {'continue': 'token'}}
+    second_page = {'items': [LIST_RUNS_RESPONSE_RAW['items'][1]], 'metadata': {}}
+    mock_k8s_api_client.api_client.call_api.side_effect = [first_page, second_page]
+
+    runs = Run.list_iter()
+
+    assert next(runs) == TEST_RUNS[0]
+    assert mock_k8s_api_client.api_client.call_api.call_count == 1
+
+
+def test_delete_collection_of_runs(mock_k8s_api_client: CustomObjectsApi):
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
+
+    deleted_names = Run.delete_collection(namespace='namespace-1', label_selector='experimentName=exp-1')
+
+    assert deleted_names == [item['metadata']['name'] for item in LIST_RUNS_RESPONSE_RAW['items']]
+    call_args = mock_k8s_api_client.api_client.call_api.call_args[0]
+    assert call_args[0] == '/apis/{group}/{version}/namespaces/{namespace}/{plural}'
+    assert call_args[1] == 'DELETE'
+    assert call_args[3] == [('labelSelector', 'experimentName=exp-1')]
+
+
+def test_delete_collection_of_runs_without_selector(mock_k8s_api_client: CustomObjectsApi):
+    with pytest.raises(ValueError):
+        Run.delete_collection(namespace='namespace-1', label_selector='')
+    assert mock_k8s_api_client.api_client.call_api.call_count == 0
+
+
+def test_run_duration():
+    assert TEST_RUNS[0].duration is None
+    assert TEST_RUNS[1].duration.total_seconds() == 328
+
 def test_get_run_from_namespace(mock_k8s_api_client: CustomObjectsApi):
     mock_k8s_api_client.get_namespaced_custom_object.return_value = GET_RUN_RESPONSE_RAW
     run = Run.get(name=RUN_NAME, namespace=NAMESPACE)
@@ -49,11 +49,13 @@ SAMBA_USERNAME_BLACKLIST = [ 'root', 'bin', 'daemon', 'adm', 'lp', 'sync', 'shut
                              'systemd-journal', 'systemd-network', 'dbus', 'printadmin' ]
 
 
-def purge_user(username: str):
+def purge_user(username: str, wait_for_logs_deletion: bool = False):
     """
     Removes all system's artifacts that belong to a removed user.
     K8s objects are removed during removal of a namespace.
     :param username: name of a user for which artifacts should be removed
+    :param wait_for_logs_deletion: if True, function waits until logs of a user are deleted, otherwise
+    they are deleted in background
     It throws exception in case of any problems detected during removal of a user
     """
     try:
@@ -63,7 +65,16 @@ def purge_user(username: str):
                                                f'/api/v1/namespaces/nauta/services/nauta-elasticsearch:nauta/proxy',
                                                verify_certs=False, use_ssl=True,
                                                headers={'Authorization': get_api_key()})
-            es_client.delete_logs_for_namespace(username)
+            task_id = es_client.delete_logs_for_namespace(username, wait_for_completion=False)
+
+        if wait_for_logs_deletion:
+            with spinner(text=TextsDel.DELETION_WAITING_FOR_USERS_EXPERIMENTS.format(deleted=0, total=0)) \
+                    as logs_spinner:
+                def show_progress(deleted: int, total: int):
+                    logs_spinner.text = TextsDel.DELETION_WAITING_FOR_USERS_EXPERIMENTS.format(deleted=deleted,
+                                                                                               total=total)
+
+                es_client.wait_for_tasks([task_id], progress_callback=show_progress)
 
         # remove data from git repo manager
         with k8s_proxy_context_manager.K8sProxy(NAUTAAppNames.GIT_REPO_MANAGER) as proxy,\
@@ -0,0 +1,212 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Benchmark of cancelling and purging experiments with many runs. Experiment, Run and Workflow objects are served
+by a fake K8S API server, which answers every request after a given latency. Helm calls are stubbed, every of them
+sleeps for a given time. Run from applications/cli directory:
+python -m scripts.benchmark_cancel_experiment
+"""
+
+import argparse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+from socketserver import ThreadingMixIn
+import threading
+import time
+from typing import Dict, Tuple
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from kubernetes import client
+
+import commands.experiment.cancel as experiment_cancel
+from platform_resources.experiment import Experiment, ExperimentStatus
+from platform_resources.platform_resource import PlatformResourceApiClient
+from platform_resources.run import Run, RunStatus, EXPERIMENT_NAME_LABEL
+
+NAMESPACE = 'user'
+
+
+class FakeApiServer(ThreadingMixIn, HTTPServer):
+    """
+    Minimal K8S API server of custom objects - it supports creating, getting, listing, patching and deleting
+    objects and collections of objects selected by equality-based label selectors.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency: float):
+        super().__init__(('127.0.0.1', 0), FakeApiRequestHandler)
+        self.latency = latency
+        self.requests = 0
+        # (namespace, plural) -> name -> object
+        self.objects: Dict[Tuple[str, str], Dict[str, dict]] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.server_address[0]}:{self.server_address[1]}'
+
+
+class FakeApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def do_PATCH(self):
+        self.handle_request()
+
+    def do_DELETE(self):
+        self.handle_request()
+
+    def handle_request(self):
+        body_length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(body_length)) if body_length else None
+        url = urlparse(self.path)
+        # /apis/{group}/{version}/namespaces/{namespace}/{plural}[/{name}]
+        path = url.path.strip('/').split('/')
+        collection = (path[4], path[5])
+        name = path[6] if len(path) > 6 else None
+        label_selector = parse_qs(url.query).get('labelSelector', [''])[0]
+
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests += 1
+            objects = self.server.objects.setdefault(collection, {})
+            if name and name not in objects and self.command != 'POST':
+                return self.respond(404, {'kind': 'Status', 'reason': 'NotFound', 'code': 404})
+
+            if self.command == 'POST':
+                body['metadata']['namespace'] = collection[0]
+                body['metadata']['creationTimestamp'] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+                objects[body['metadata']['name']] = body
+                response = body
+            elif self.command == 'PATCH':
+                objects[name]['spec'].update(body.get('spec', {}))
+                response = objects[name]
+            elif self.command == 'DELETE' and name:
+                response = objects.pop(name)
+            elif name:
+                response = objects[name]
+            else:
+                selected = [item for item in objects.values() if matches(item, label_selector)]
+                if self.command == 'DELETE':
+                    for item in selected:
+                        objects.pop(item['metadata']['name'])
+                response = {'kind': 'List', 'items': selected, 'metadata': {}}
+        self.respond(200, response)
+
+    def respond(self, status: int, response: dict):
+        content = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def matches(item: dict, label_selector: str) -> bool:
+    labels = item['metadata'].get('labels') or {}
+    requirements = [requirement.split('=', 1) for requirement in label_selector.split(',') if '=' in requirement]
+    return all(labels.get(key) == value for key, value in requirements)
+
+
+def create_experiment(server: FakeApiServer, experiment_name: str, runs: int):
+    latency = server.latency
+    server.latency = 0
+    try:
+        experiment = Experiment(name=experiment_name, template_name='tf-training', template_namespace='template',
+                                parameters_spec=[], state=ExperimentStatus.CREATING,
+                                template_version='0.1.0')
+        experiment.create(namespace=NAMESPACE, labels={'runKind': 'training'})
+        for i in range(runs):
+            run = Run(name=f'{experiment_name}-{i}', experiment_name=experiment_name, state=RunStatus.QUEUED,
+                      pod_count=1,
+                      pod_selector={'matchLabels': {'app': 'tf-training', 'release': f'{experiment_name}-{i}'}},
+                      parameters=['training.py'], template_name='tf-training')
+            run.create(namespace=NAMESPACE, labels={'runKind': 'training', EXPERIMENT_NAME_LABEL: experiment_name})
+    finally:
+        server.latency = latency
+
+
+def run_benchmark(server: FakeApiServer, runs: int, workers: int, purge: bool) -> Tuple[float, int]:
+    experiment_name = f'{"purge" if purge else "cancel"}-{runs}-{workers}'
+    create_experiment(server, experiment_name, runs)
+    server.requests = 0
+    with mock.patch.object(experiment_cancel, 'RUN_OPERATION_WORKERS', workers):
+        start = time.perf_counter()
+        runs_to_cancel = Run.list(namespace=NAMESPACE, exp_name_filter=[experiment_name])
+        if purge:
+            cancelled_runs, not_cancelled_runs = experiment_cancel.purge_experiment(
+                exp_name=experiment_name, runs_to_purge=runs_to_cancel, namespace=NAMESPACE)
+        else:
+            cancelled_runs, not_cancelled_runs = experiment_cancel.cancel_experiment(
+                exp_name=experiment_name, runs_to_cancel=runs_to_cancel, namespace=NAMESPACE)
+        elapsed = time.perf_counter() - start
+    assert len(cancelled_runs) == runs and not not_cancelled_runs, 'Not all runs were cancelled'
+    return elapsed, server.requests
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of cancelling and purging experiments.')
+    parser.add_argument('--runs', type=int, nargs='+', default=[10, 50, 200], help='Run counts to compare.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8], help='Worker counts to compare.')
+    parser.add_argument('--latency', type=float, default=0.01, help='Latency of the fake K8S API server [s].')
+    parser.add_argument('--helm-latency', type=float, default=0.1, help='Duration of a stubbed helm call [s].')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    api_server = FakeApiServer(latency=args.latency)
+    threading.Thread(target=api_server.serve_forever, daemon=True).start()
+
+    configuration = client.Configuration()
+    configuration.host = api_server.url
+    configuration.connection_pool_maxsize = max(args.workers) + 1
+    PlatformResourceApiClient.k8s_custom_object_api = client.CustomObjectsApi(client.ApiClient(configuration))
+
+    patches = [
+        mock.patch('commands.experiment.cancel.delete_helm_release_once',
+                   side_effect=lambda *args_, **kwargs: time.sleep(args.helm_latency)),
+        mock.patch('commands.experiment.cancel.delete_exp_tag_from_git_repo_manager'),
+        mock.patch('commands.experiment.cancel.get_run_environment_path'),
+        mock.patch('commands.experiment.cancel.click.echo'),
+        mock.patch('commands.experiment.cancel.spinner'),
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        for operation_purge in (False, True):
+            for run_count in args.runs:
+                for worker_count in args.workers:
+                    elapsed_time, request_count = run_benchmark(api_server, runs=run_count, workers=worker_count,
+                                                                purge=operation_purge)
+                    print(f'{"purge " if operation_purge else "cancel"}  runs: {run_count:>5}  '
+                          f'workers: {worker_count:>3}  time: {elapsed_time:8.3f} s  '
+                          f'API requests: {request_count:>5}')
+    finally:
+        for patch in patches:
+            patch.stop()
+        api_server.shutdown()
@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Benchmark of get_highest_usage against a fake metrics API, compared with the previous approach - one
+"kubectl top pod" call per running pod. Every call sleeps for given latency to simulate a round-trip
+to metrics-server (and a kubectl process start-up in case of per pod calls). Run from applications/cli directory:
+python -m scripts.benchmark_highest_usage
+"""
+
+import argparse
+import time
+from typing import List
+from unittest import mock
+
+from util.k8s import k8s_statistics
+from util.k8s.k8s_info import sum_cpu_resources_unformatted, sum_mem_resources_unformatted
+
+
+class FakeMetricsApi:
+    def __init__(self, pod_metrics: List[dict], latency: float):
+        self.pod_metrics = pod_metrics
+        self.latency = latency
+
+    def list_cluster_custom_object(self, group, version, plural, **kwargs):
+        time.sleep(self.latency)
+        return {'items': self.pod_metrics}
+
+    def top_pod(self, pod: dict):
+        time.sleep(self.latency)
+        usage = pod['containers'][0]['usage']
+        return usage['cpu'], usage['memory']
+
+
+def generate_pod_metrics(users: int, pods_per_user: int) -> List[dict]:
+    return [{'metadata': {'name': f'pod-{i}', 'namespace': f'user-{u}'},
+             'containers': [{'name': 'tensorflow', 'usage': {'cpu': f'{(i * 7) % 4000}m',
+                                                             'memory': f'{(i * 13) % 8192}Mi'}}]}
+            for u in range(users) for i in range(pods_per_user)]
+
+
+def run_per_pod_benchmark(api: FakeMetricsApi) -> float:
+    start = time.perf_counter()
+    usage = {}
+    for pod in api.pod_metrics:
+        namespace = pod['metadata']['namespace']
+        cpu, mem = api.top_pod(pod)
+        current_cpu, current_mem = usage.get(namespace, (0, 0))
+        usage[namespace] = (current_cpu + sum_cpu_resources_unformatted([cpu]),
+                            current_mem + sum_mem_resources_unformatted([mem]))
+    return time.perf_counter() - start
+
+
+def run_bulk_benchmark(api: FakeMetricsApi) -> float:
+    with mock.patch.object(k8s_statistics.config, 'load_kube_config'), \
+            mock.patch.object(k8s_statistics.client, 'ApiClient'), \
+            mock.patch.object(k8s_statistics.client, 'CustomObjectsApi', return_value=api):
+        start = time.perf_counter()
+        top_cpu_users, _ = k8s_statistics.get_highest_usage()
+        elapsed = time.perf_counter() - start
+    assert len(top_cpu_users) == len({pod['metadata']['namespace'] for pod in api.pod_metrics})
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of gathering resource usage statistics.')
+    parser.add_argument('--users', type=int, default=20, help='Number of users (namespaces).')
+    parser.add_argument('--pods-per-user', type=int, default=25, help='Number of running pods per user.')
+    parser.add_argument('--latency', type=float, default=0.1, help='Simulated latency of a single call [s].')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    fake_api = FakeMetricsApi(pod_metrics=generate_pod_metrics(args.users, args.pods_per_user),
+                              latency=args.latency)
+    pod_count = len(fake_api.pod_metrics)
+    for name, benchmark in (('per pod', run_per_pod_benchmark), ('bulk', run_bulk_benchmark)):
+        elapsed_time = benchmark(fake_api)
+        print(f'{name:>8}  pods: {pod_count:>6}  time: {elapsed_time:8.3f} s')
@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Micro-benchmark of formatting and writing logs to a file, comparing per-line date parsing and writes
+with cached date formatting and batched writes used by nctl. Run from applications/cli directory:
+python -m scripts.benchmark_log_formatting
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List, Callable
+
+import dateutil.parser
+
+from commands.common.logs_utils import batch_formatted_logs, open_logs_file
+from logs_aggregator.k8s_log_entry import LogEntry
+
+
+def generate_log_entries(count: int) -> List[LogEntry]:
+    start = datetime(2019, 1, 1)
+    return [LogEntry(date=(start + timedelta(microseconds=i * 1500)).strftime('%Y-%m-%dT%H:%M:%S.%f000+00:00'),
+                     content=f'Step {i}: loss 0.{i}\n', pod_name=f'horovod-worker-{i % 16}', namespace='user')
+            for i in range(count)]
+
+
+def write_per_line(log_entries: List[LogEntry], filename: str):
+    with open(filename, 'w') as file:
+        for log_entry in log_entries:
+            if not log_entry.content.isspace():
+                log_date = dateutil.parser.parse(log_entry.date).replace(microsecond=0)
+                file.write(f'{log_date.isoformat()} {log_entry.pod_name} {log_entry.content}')
+
+
+def write_batched(log_entries: List[LogEntry], filename: str, compression: str = None):
+    with open_logs_file(filename, compression=compression) as file:
+        for logs_batch in batch_formatted_logs(log_entries):
+            file.write(logs_batch)
+
+
+def measure(name: str, write_function: Callable[[str], None], lines: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = os.path.join(temp_dir, 'benchmark.log')
+        start = time.perf_counter()
+        write_function(filename)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(filename)
+    print(f'{name:<24} lines/s: {lines / elapsed:12.0f}  file size: {size / 1024 / 1024:8.2f} MiB')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Micro-benchmark of formatting and saving logs.')
+    parser.add_argument('--lines', type=int, default=500000, help='Number of log lines.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    entries = generate_log_entries(args.lines)
+    measure('per-line (before)', lambda filename: write_per_line(entries, filename), args.lines)
+    measure('batched (after)', lambda filename: write_batched(entries, filename), args.lines)
+    measure('batched + gzip', lambda filename: write_batched(entries, filename, compression='gzip'), args.lines)
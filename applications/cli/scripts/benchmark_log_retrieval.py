@@ -0,0 +1,102 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Benchmark of K8sElasticSearchClient.get_log_generator against a local, in-process Elasticsearch stand-in,
+which serves scroll pages with a simulated round-trip latency. Run from applications/cli directory:
+python -m scripts.benchmark_log_retrieval
+"""
+
+import argparse
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from logs_aggregator.k8s_es_client import K8sElasticSearchClient
+
+
+class FakeScrollElasticSearchClient(K8sElasticSearchClient):
+    """
+    Elasticsearch stand-in implementing search/scroll calls used by elasticsearch.helpers.scan, including
+    sliced scroll. Every request sleeps for given latency to simulate a round-trip through kube-apiserver proxy.
+    """
+
+    def __init__(self, documents: List[dict], latency: float):
+        super().__init__(host='localhost')
+        self.documents = documents
+        self.latency = latency
+        self._scrolls: Dict[str, List[dict]] = {}
+        self._scroll_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def search(self, body=None, scroll=None, size=10, **kwargs):
+        documents = self.documents
+        slice_def = (body or {}).get('slice')
+        if slice_def:
+            documents = [doc for doc in documents if hash(doc['_id']) % slice_def['max'] == slice_def['id']]
+        with self._lock:
+            scroll_id = str(next(self._scroll_ids))
+            self._scrolls[scroll_id] = [documents[i:i + size] for i in range(0, len(documents), size)]
+        return self.scroll(scroll_id)
+
+    def scroll(self, scroll_id=None, body=None, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            pages = self._scrolls[scroll_id]
+            page = pages.pop(0) if pages else []
+        return {'_scroll_id': scroll_id, '_shards': {'total': 1, 'successful': 1}, 'hits': {'hits': page}}
+
+
+def generate_documents(count: int) -> List[dict]:
+    start = datetime(2019, 1, 1)
+    documents = []
+    for i in range(count):
+        timestamp = start + timedelta(milliseconds=i * 10)
+        documents.append({'_id': f'doc-{i}',
+                          'sort': [int(timestamp.timestamp() * 1000)],
+                          '_source': {'@timestamp': timestamp.isoformat() + '+00:00',
+                                      'log': f'Step {i}: loss 0.{i}\n',
+                                      'kubernetes': {'pod_name': f'horovod-worker-{i % 16}',
+                                                     'namespace_name': 'user'}}})
+    return documents
+
+
+def run_benchmark(client: K8sElasticSearchClient, slices: int) -> float:
+    start = time.perf_counter()
+    dates = [entry.date for entry in client.get_log_generator(query_body={}, slices=slices)]
+    elapsed = time.perf_counter() - start
+    assert len(dates) == len(client.documents), 'Not all logs were returned'
+    assert dates == sorted(dates), 'Logs were returned in a wrong order'
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of sliced log retrieval.')
+    parser.add_argument('--documents', type=int, default=200000, help='Number of log entries.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated latency of a scroll request [s].')
+    parser.add_argument('--slices', type=int, nargs='+', default=[1, 2, 4, 8], help='Slice counts to compare.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    fake_client = FakeScrollElasticSearchClient(documents=generate_documents(args.documents), latency=args.latency)
+    for slice_count in args.slices:
+        elapsed_time = run_benchmark(fake_client, slices=slice_count)
+        print(f'slices: {slice_count:>3}  time: {elapsed_time:8.3f} s  '
+              f'logs/s: {args.documents / elapsed_time:12.0f}')
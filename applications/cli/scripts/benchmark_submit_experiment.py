@@ -0,0 +1,158 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Benchmark of submit_experiment with a synthetic -pr sweep. Runs' environments are really created on a local disk
+from a generated pack and script folder, while calls to a cluster (experiment/run objects, image build, helm)
+are stubbed. Every stubbed call sleeps for given latency. Run from applications/cli directory:
+python -m scripts.benchmark_submit_experiment
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import click
+
+import commands.experiment.common as experiment_common
+from platform_resources.run import RunKinds
+from util.config import NCTL_CONFIG_ENV_NAME
+
+PACK_NAME = 'benchmark-training'
+
+DOCKERFILE = 'FROM nauta/tensorflow-py3\n\nWORKDIR /app\nADD training.py .\n'
+
+VALUES_YAML = """
+commandline:
+  args:
+    {% for arg in NAUTA.CommandLine %}
+    - {{ arg }}
+    {% endfor %}
+image: {{ NAUTA.ExperimentImage }}
+experimentName: {{ NAUTA.ExperimentName }}
+registryPort: {{ NAUTA.RegistryPort }}
+podCount: 1
+env: []
+resources:
+  requests:
+    cpu: 2
+    memory: 4Gi
+  limits:
+    cpu: 2
+    memory: 4Gi
+"""
+
+JOB_YAML = 'apiVersion: kubeflow.org/v1beta1\nkind: TFJob\nmetadata:\n  name: {{ .Release.Name }}\n'
+
+
+def create_config_dir(path: str):
+    os.makedirs(os.path.join(path, 'helm'))
+    pack_path = os.path.join(path, 'packs', PACK_NAME)
+    os.makedirs(os.path.join(pack_path, 'charts', 'templates'))
+    with open(os.path.join(pack_path, 'Dockerfile'), 'w') as file:
+        file.write(DOCKERFILE)
+    with open(os.path.join(pack_path, 'charts', 'values.yaml'), 'w') as file:
+        file.write(VALUES_YAML)
+    with open(os.path.join(pack_path, 'charts', 'Chart.yaml'), 'w') as file:
+        file.write(f'name: {PACK_NAME}\nversion: 0.1.0\n')
+    with open(os.path.join(pack_path, 'charts', 'templates', 'job.yaml'), 'w') as file:
+        file.write(JOB_YAML)
+
+
+def create_script_folder(path: str, files: int, file_size: int) -> str:
+    os.makedirs(path)
+    for i in range(files):
+        with open(os.path.join(path, f'module_{i}.py'), 'wb') as file:
+            file.write(os.urandom(file_size))
+    script_path = os.path.join(path, 'training.py')
+    with open(script_path, 'w') as file:
+        file.write('print("training")\n')
+    return script_path
+
+
+def stub_cluster(latency: float):
+    def cluster_call(*args, **kwargs):
+        time.sleep(latency)
+
+    config_map_data = {'registry': 'registry', 'image.tiller': 'tiller', 'external_ip': '127.0.0.1',
+                       'image.tensorboard_service': 'tensorboard', 'image.tensorflow_1.12_py3': 'tensorflow'}
+    experiment_numbers = itertools.count()
+    return [
+        mock.patch('commands.experiment.common.get_kubectl_current_context_namespace', return_value='user'),
+        mock.patch('commands.experiment.common.generate_exp_name_and_labels', side_effect=lambda **kwargs:
+                   (f'sweep-{next(experiment_numbers)}', {})),
+        mock.patch('commands.experiment.common.get_app_service_node_port', return_value=31000),
+        mock.patch('commands.experiment.common.upload_experiment_to_git_repo_manager', side_effect=cluster_call),
+        mock.patch('commands.experiment.common.ExperimentImageBuildWorkflow'),
+        mock.patch('commands.experiment.common.submit_draft_pack', side_effect=cluster_call),
+        mock.patch('commands.experiment.common.signal.signal'),
+        mock.patch('platform_resources.experiment.Experiment.create', side_effect=cluster_call),
+        mock.patch('platform_resources.experiment.Experiment.update', side_effect=cluster_call),
+        mock.patch('platform_resources.run.Run.create', side_effect=cluster_call),
+        mock.patch('platform_resources.run.Run.update', side_effect=cluster_call),
+        mock.patch('util.config.get_config_map_data', return_value=config_map_data),
+    ]
+
+
+def run_benchmark(script_location: str, runs: int, workers: int) -> float:
+    context = click.Context(click.Command('submit'), obj=SimpleNamespace(force=True, verbosity=0))
+    with context, mock.patch.object(experiment_common, 'ENV_PREPARATION_WORKERS', workers), \
+            mock.patch('commands.experiment.common.click.echo'):
+        start = time.perf_counter()
+        runs_list, run_errors, _ = experiment_common.submit_experiment(
+            template=PACK_NAME, script_location=script_location,
+            script_folder_location=os.path.dirname(script_location),
+            parameter_range=[('learning_rate', f'{{1...{runs}:1}}')], run_kind=RunKinds.TRAINING)
+        elapsed = time.perf_counter() - start
+    assert len(runs_list) == runs and not run_errors, 'Not all runs were submitted'
+    for run in runs_list:
+        experiment_common.delete_environment(experiment_common.get_run_environment_path(run.name))
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of preparation of environments of experiment runs.')
+    parser.add_argument('--runs', type=int, default=500, help='Number of runs in a sweep.')
+    parser.add_argument('--files', type=int, default=50, help='Number of files in a script folder.')
+    parser.add_argument('--file-size', type=int, default=16 * 1024, help='Size of a file in a script folder [B].')
+    parser.add_argument('--latency', type=float, default=0.002, help='Simulated latency of a cluster call [s].')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help='Worker counts to compare.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_dir = os.path.join(temp_dir, 'config')
+        create_config_dir(config_dir)
+        os.environ[NCTL_CONFIG_ENV_NAME] = config_dir
+        script = create_script_folder(os.path.join(temp_dir, 'script'), files=args.files, file_size=args.file_size)
+
+        patches = stub_cluster(args.latency)
+        for patch in patches:
+            patch.start()
+        try:
+            for worker_count in args.workers:
+                elapsed_time = run_benchmark(script, runs=args.runs, workers=worker_count)
+                print(f'workers: {worker_count:>3}  time: {elapsed_time:8.3f} s  '
+                      f'runs/s: {args.runs / elapsed_time:8.1f}')
+        finally:
+            for patch in patches:
+                patch.stop()
@@ -16,6 +16,7 @@
 
 import os
 import sys
+import threading
 
 from util.k8s.k8s_info import get_config_map_data
 from util.logger import initialize_logger
@@ -30,6 +31,8 @@ NCTL_CONFIG_DIR_NAME = 'config'
 EXPERIMENTS_DIR_NAME = 'experiments'
 # name of a directory with data copied from script folder location
 FOLDER_DIR_NAME = 'folder'
+# name of a directory with files shared by experiments' environments
+WORKSPACE_STORE_DIR_NAME = 'workspace-store'
 
 # registry config file
 DOCKER_REGISTRY_CONFIG_FILE = 'docker_registry.yaml'
@@ -112,22 +115,31 @@ class NAUTAConfigMap:
     OPENVINOMS_IMAGE_CONFIG_KEY = 'image.openvino-ms'
 
     __shared_state: dict = {}
+    # experiments' environments are prepared concurrently - config map is loaded once, into a separate dict,
+    # which is copied to the shared state in one step, so a partially loaded state is never shared
+    __init_lock = threading.Lock()
 
     def __init__(self, config_map_request_timeout: int = None):
         self.__dict__ = self.__shared_state
-        if not self.__dict__:
-            config_map_data = get_config_map_data(name=NAUTA_CONFIGURATION_CM, namespace=NAUTA_NAMESPACE,
-                                                  request_timeout=config_map_request_timeout)
-            self.registry = config_map_data[self.REGISTRY_FIELD]
-            self.image_tiller = '{}/{}'.format(config_map_data[self.REGISTRY_FIELD],
-                                               config_map_data[self.IMAGE_TILLER_FIELD])
-            self.external_ip = config_map_data[self.EXTERNAL_IP_FIELD]
-            self.image_tensorboard_service = '{}/{}'.format(config_map_data[self.REGISTRY_FIELD],
-                                                            config_map_data[self.IMAGE_TENSORBOARD_SERVICE_FIELD])
-            self.platform_version = config_map_data.get(self.PLATFORM_VERSION)
-            self.py3_image_name = config_map_data.get(self.PY3_IMAGE_NAME)
-            self.py3_horovod_image_name = config_map_data.get(NAUTAConfigMap.PY3_HOROVOD_IMAGE_CONFIG_KEY)
-            self.minimal_node_memory_amount = config_map_data.get(NAUTAConfigMap.MINIMAL_NODE_MEMORY_AMOUNT)
-            self.minimal_node_cpu_number = config_map_data.get(NAUTAConfigMap.MINIMAL_NODE_CPU_NUMBER)
-            self.py3_pytorch_image_name = config_map_data.get(NAUTAConfigMap.PY3_PYTORCH_IMAGE_CONFIG_KEY)
-            self.openvinoms_image_name = config_map_data.get(NAUTAConfigMap.OPENVINOMS_IMAGE_CONFIG_KEY)
+        with self.__init_lock:
+            if not self.__dict__:
+                self.__dict__.update(self._load(config_map_request_timeout))
+
+    def _load(self, config_map_request_timeout: int = None) -> dict:
+        config_map_data = get_config_map_data(name=NAUTA_CONFIGURATION_CM, namespace=NAUTA_NAMESPACE,
+                                              request_timeout=config_map_request_timeout)
+        return {
+            'registry': config_map_data[self.REGISTRY_FIELD],
+            'image_tiller': '{}/{}'.format(config_map_data[self.REGISTRY_FIELD],
+                                           config_map_data[self.IMAGE_TILLER_FIELD]),
+            'external_ip': config_map_data[self.EXTERNAL_IP_FIELD],
+            'image_tensorboard_service': '{}/{}'.format(config_map_data[self.REGISTRY_FIELD],
+                                                        config_map_data[self.IMAGE_TENSORBOARD_SERVICE_FIELD]),
+            'platform_version': config_map_data.get(self.PLATFORM_VERSION),
+            'py3_image_name': config_map_data.get(self.PY3_IMAGE_NAME),
+            'py3_horovod_image_name': config_map_data.get(NAUTAConfigMap.PY3_HOROVOD_IMAGE_CONFIG_KEY),
+            'minimal_node_memory_amount': config_map_data.get(NAUTAConfigMap.MINIMAL_NODE_MEMORY_AMOUNT),
+            'minimal_node_cpu_number': config_map_data.get(NAUTAConfigMap.MINIMAL_NODE_CPU_NUMBER),
+            'py3_pytorch_image_name': config_map_data.get(NAUTAConfigMap.PY3_PYTORCH_IMAGE_CONFIG_KEY),
+            'openvinoms_image_name': config_map_data.get(NAUTAConfigMap.OPENVINOMS_IMAGE_CONFIG_KEY)
+        }
@@ -46,7 +46,18 @@ def delete_user(username: str):
 @retry(tries=5, delay=1)
 def delete_helm_release(release_name: str, purge=False, namespace: str = None):
     """
-    Deletes release of a helm's chart.
+    Deletes release of a helm's chart, a failed deletion is retried up to 4 times.
+
+    :param release_name: name of a release to be removed
+    :param purge: if True, helm release will be purged
+    In case of any problems it throws an exception
+    """
+    delete_helm_release_once(release_name, purge=purge, namespace=namespace)
+
+
+def delete_helm_release_once(release_name: str, purge=False, namespace: str = None):
+    """
+    Deletes release of a helm's chart without retrying - to be used by callers which retry on their own.
 
     :param release_name: name of a release to be removed
     :param purge: if True, helm release will be purged
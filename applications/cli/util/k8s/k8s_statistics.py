@@ -15,15 +15,33 @@
 #
 
 from operator import itemgetter
+import re
+from typing import Dict, List, Tuple
 
-from typing import List, Tuple
-from util.k8s.kubectl import get_top_for_pod
-from util.k8s.k8s_info import get_pods, sum_cpu_resources_unformatted, sum_mem_resources_unformatted, \
-    format_mem_resources, format_cpu_resources, PodStatus
+from kubernetes import client, config
+from kubernetes.client.rest import ApiException
+
+from util.k8s.k8s_info import format_mem_resources, format_cpu_resources
 from util.logger import initialize_logger
 
 logger = initialize_logger(__name__)
 
+METRICS_API_GROUP = 'metrics.k8s.io'
+METRICS_API_VERSION = 'v1beta1'
+POD_METRICS_PLURAL = 'pods'
+
+# heapster deployed by platform-charts/heapster, its API is accessed through K8S API service proxy, users are
+# allowed to use it by nauta-heapster-view cluster role
+HEAPSTER_POD_METRICS_PATH = '/api/v1/namespaces/kube-system/services/http:heapster:/proxy/apis/metrics/v1alpha1/pods'
+
+# namespaces omitted in statistics
+TECHNICAL_NAMESPACES = {'nauta', 'kube-system'}
+
+QUANTITY_REGEX = re.compile(r'^([+-]?[0-9.]+(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)$')
+QUANTITY_SUFFIXES = {'': 1, 'n': 10 ** -9, 'u': 10 ** -6, 'm': 10 ** -3, 'k': 10 ** 3, 'K': 10 ** 3, 'M': 10 ** 6,
+                     'G': 10 ** 9, 'T': 10 ** 12, 'P': 10 ** 15, 'E': 10 ** 18, 'Ki': 2 ** 10, 'Mi': 2 ** 20,
+                     'Gi': 2 ** 30, 'Ti': 2 ** 40, 'Pi': 2 ** 50, 'Ei': 2 ** 60}
+
 
 class ResourceUsage():
 
@@ -42,35 +60,79 @@ class ResourceUsage():
         return self.user_name+":"+self.get_formatted_cpu_usage()+":"+self.get_formatted_mem_usage()
 
 
+def parse_k8s_quantity(quantity: str) -> float:
+    """
+    Parses quantity given in k8s format (e.g. 250m, 1.5, 12345n, 100Mi, 1e3) into a number.
+    """
+    match = QUANTITY_REGEX.match(quantity.strip()) if quantity else None
+    if not match or match.group(2) not in QUANTITY_SUFFIXES:
+        raise ValueError(f'Invalid quantity: {quantity}')
+    return float(match.group(1)) * QUANTITY_SUFFIXES[match.group(2)]
+
+
+def parse_cpu_quantity(quantity: str) -> int:
+    """ Returns cpu quantity given in k8s format as a number of miliCPUs. """
+    return int(round(parse_k8s_quantity(quantity) * 1000))
+
+
+def parse_mem_quantity(quantity: str) -> int:
+    """ Returns memory quantity given in k8s format as a number of bytes. """
+    return int(parse_k8s_quantity(quantity))
+
+
+def get_pod_metrics() -> List[dict]:
+    """
+    Returns current usage of resources by all pods in a cluster, using a single request to metrics API.
+    Metrics API (metrics.k8s.io) is served only if metrics-server is deployed - if it isn't available,
+    metrics of pods are taken from heapster, which returns them in the same format.
+    """
+    config.load_kube_config()
+    api = client.CustomObjectsApi(client.ApiClient())
+    try:
+        pod_metrics = api.list_cluster_custom_object(group=METRICS_API_GROUP, version=METRICS_API_VERSION,
+                                                     plural=POD_METRICS_PLURAL)
+    except ApiException as exe:
+        logger.debug(f'Metrics API is not available (status: {exe.status}), using heapster.')
+        pod_metrics = api.api_client.call_api(HEAPSTER_POD_METRICS_PATH, 'GET', {}, [],
+                                              {'Accept': 'application/json'},
+                                              response_type='object',
+                                              auth_settings=['BearerToken'],
+                                              _return_http_data_only=True)
+    return pod_metrics.get('items', [])
+
+
+def sum_usage_per_namespace(pod_metrics: List[dict]) -> Dict[str, Tuple[int, int]]:
+    """
+    Sums cpu (in miliCPUs) and memory (in bytes) usage of pods per namespace, omitting technical namespaces.
+    """
+    usage_per_namespace: Dict[str, Tuple[int, int]] = {}
+    for pod in pod_metrics:
+        namespace = pod.get('metadata', {}).get('namespace')
+        if namespace in TECHNICAL_NAMESPACES:
+            continue
+        cpu, mem = usage_per_namespace.get(namespace, (0, 0))
+        for container in pod.get('containers', []):
+            usage = container.get('usage', {})
+            try:
+                cpu += parse_cpu_quantity(usage.get('cpu', '0'))
+                mem += parse_mem_quantity(usage.get('memory', '0'))
+            except ValueError:
+                logger.exception('Error during gathering pod resources usage.')
+        usage_per_namespace[namespace] = (cpu, mem)
+    return usage_per_namespace
+
+
 def get_highest_usage() -> Tuple[List[ResourceUsage], List[ResourceUsage]]:
+    """
+    Returns users (namespaces) sorted by their usage of cpu and by their usage of memory.
+    """
 
-    available_pods = get_pods(label_selector=None)
     CPU_KEY = "cpu"
     MEM_KEY = "mem"
     NAME_KEY = "name"
 
-    users_data: dict = {}
-    summarized_usage = []
-
-    for item in available_pods:
-        name = item.metadata.name
-        namespace = item.metadata.namespace
-        # omit technical namespaces
-        if namespace not in ["nauta", "kube-system"] and item.status.phase.upper() == PodStatus.RUNNING.value:
-            try:
-                cpu, mem = get_top_for_pod(name=name, namespace=namespace)
-                if namespace in users_data:
-                    users_data.get(namespace, {}).get(CPU_KEY).append(cpu)
-                    users_data.get(namespace, {}).get(MEM_KEY).append(mem)
-                else:
-                    users_data[namespace] = {CPU_KEY: [cpu], MEM_KEY: [mem]}
-            except Exception as exe:
-                logger.exception("Error during gathering pod resources usage.")
-
-    for user_name, usage in users_data.items():
-        summarized_usage.append({NAME_KEY: user_name,
-                                 CPU_KEY: sum_cpu_resources_unformatted(usage.get(CPU_KEY)),
-                                 MEM_KEY: sum_mem_resources_unformatted(usage.get(MEM_KEY))})
+    summarized_usage = [{NAME_KEY: user_name, CPU_KEY: cpu, MEM_KEY: mem}
+                        for user_name, (cpu, mem) in sum_usage_per_namespace(get_pod_metrics()).items()]
 
     top_cpu_users = sorted(summarized_usage, key=itemgetter(CPU_KEY), reverse=True)
     top_mem_users = sorted(summarized_usage, key=itemgetter(MEM_KEY), reverse=True)
@@ -14,37 +14,41 @@
 # limitations under the License.
 #
 
-from kubernetes.client.models import V1ObjectMeta, V1Pod, V1PodStatus
-from util.k8s.k8s_info import PodStatus
+import pytest
+from kubernetes.client.rest import ApiException
 
-
-from util.k8s.k8s_statistics import get_highest_usage
+from util.k8s import k8s_statistics
+from util.k8s.k8s_statistics import get_highest_usage, parse_cpu_quantity, parse_mem_quantity
 
 CPU_USER_NAME = "cpu_user_name"
 MEM_USER_NAME = "mem_user_name"
 
-PODS = [V1Pod(metadata=V1ObjectMeta(name="cpu_first_pod", namespace=CPU_USER_NAME),
-              status=V1PodStatus(phase=PodStatus.RUNNING.value)),
-        V1Pod(metadata=V1ObjectMeta(name="mem_first_pod", namespace=MEM_USER_NAME),
-              status=V1PodStatus(phase=PodStatus.RUNNING.value)),
-        V1Pod(metadata=V1ObjectMeta(name="cpu_second_pod", namespace=CPU_USER_NAME),
-              status=V1PodStatus(phase=PodStatus.RUNNING.value)),
-        V1Pod(metadata=V1ObjectMeta(name="mem_second_pod", namespace=MEM_USER_NAME),
-              status=V1PodStatus(phase=PodStatus.RUNNING.value)),
-        V1Pod(metadata=V1ObjectMeta(name="tech_pod", namespace="kube-system"),
-              status=V1PodStatus(phase=PodStatus.RUNNING.value))]
 
-TOP_RESULTS = [("3m", "200Ki"), ("2m", "400Ki"), ("3m", "200Ki"), ("2m", "400Ki")]
+def _pod_metrics(name: str, namespace: str, cpu: str, memory: str) -> dict:
+    return {"metadata": {"name": name, "namespace": namespace},
+            "containers": [{"name": "container", "usage": {"cpu": cpu, "memory": memory}}]}
+
+
+POD_METRICS = {"items": [_pod_metrics("cpu_first_pod", CPU_USER_NAME, "3m", "200Ki"),
+                         _pod_metrics("mem_first_pod", MEM_USER_NAME, "2m", "400Ki"),
+                         _pod_metrics("cpu_second_pod", CPU_USER_NAME, "3m", "200Ki"),
+                         _pod_metrics("mem_second_pod", MEM_USER_NAME, "2m", "400Ki"),
+                         _pod_metrics("tech_pod", "kube-system", "900m", "4Gi")]}
 
 
-def test_get_highest_usage_success(mocker):
-    get_pods_mock = mocker.patch("util.k8s.k8s_statistics.get_pods")
-    get_pods_mock.return_value = PODS
-    top_mock = mocker.patch("util.k8s.k8s_statistics.get_top_for_pod")
-    top_mock.side_effect = TOP_RESULTS
+@pytest.fixture()
+def metrics_api_mock(mocker):
+    mocker.patch("util.k8s.k8s_statistics.config.load_kube_config")
+    mocker.patch("util.k8s.k8s_statistics.client.ApiClient")
+    api_mock = mocker.patch("util.k8s.k8s_statistics.client.CustomObjectsApi").return_value
+    api_mock.list_cluster_custom_object.return_value = POD_METRICS
+    return api_mock
 
+
+def test_get_highest_usage_success(metrics_api_mock):
     top_cpu_users, top_mem_users = get_highest_usage()
 
+    assert metrics_api_mock.list_cluster_custom_object.call_count == 1
     assert len(top_cpu_users) == 2
     assert len(top_mem_users) == 2
     assert top_cpu_users[0].user_name == CPU_USER_NAME
@@ -53,3 +57,43 @@ def test_get_highest_usage_success(mocker):
     assert top_cpu_users[0].mem_usage == 409600
     assert top_mem_users[0].cpu_usage == 4
     assert top_mem_users[0].mem_usage == 819200
+
+
+def test_get_highest_usage_from_heapster(metrics_api_mock):
+    metrics_api_mock.list_cluster_custom_object.side_effect = ApiException(status=404)
+    metrics_api_mock.api_client.call_api.return_value = POD_METRICS
+
+    top_cpu_users, top_mem_users = get_highest_usage()
+
+    assert metrics_api_mock.api_client.call_api.call_count == 1
+    assert metrics_api_mock.api_client.call_api.call_args[0][0] == k8s_statistics.HEAPSTER_POD_METRICS_PATH
+    assert [user.user_name for user in top_cpu_users] == [CPU_USER_NAME, MEM_USER_NAME]
+    assert top_cpu_users[0].cpu_usage == 6
+    assert top_mem_users[0].mem_usage == 819200
+
+
+def test_get_highest_usage_heapster_failure(metrics_api_mock):
+    metrics_api_mock.list_cluster_custom_object.side_effect = ApiException(status=404)
+    metrics_api_mock.api_client.call_api.side_effect = ApiException(status=503)
+
+    with pytest.raises(ApiException):
+        get_highest_usage()
+
+
+@pytest.mark.parametrize("quantity,expected", [("250m", 250), ("2", 2000), ("1.5", 1500), ("12345678n", 12),
+                                               ("500000u", 500), ("1e3m", 1000), ("0", 0)])
+def test_parse_cpu_quantity(quantity, expected):
+    assert parse_cpu_quantity(quantity) == expected
+
+
+@pytest.mark.parametrize("quantity,expected", [("200Ki", 204800), ("1Mi", 1048576), ("1Gi", 1073741824),
+                                               ("1k", 1000), ("2M", 2000000), ("128974848", 128974848),
+                                               ("129e6", 129000000), ("1E", 10 ** 18)])
+def test_parse_mem_quantity(quantity, expected):
+    assert parse_mem_quantity(quantity) == expected
+
+
+@pytest.mark.parametrize("quantity", ["", "abc", "12Xi", "1.2.3Mi"])
+def test_parse_quantity_invalid(quantity):
+    with pytest.raises(ValueError):
+        parse_mem_quantity(quantity)
@@ -20,7 +20,7 @@ from unittest.mock import patch
 import pytest
 
 from util import system
-from util.config import NCTL_CONFIG_DIR_NAME, NCTL_CONFIG_ENV_NAME, Config, ConfigInitError
+from util.config import NCTL_CONFIG_DIR_NAME, NCTL_CONFIG_ENV_NAME, Config, ConfigInitError, NAUTAConfigMap
 
 APP_DIR_PATH = '/my/App/'
 APP_BINARY_PATH = os.path.join(APP_DIR_PATH, os.path.join('nctl', 'binary'))
@@ -136,3 +136,26 @@ def test_validate_config_path_error(os_env_get, exists_mock, expanduser_mock):
         Config.get_config_path()
 
     assert exists_mock.call_count == 2
+
+
+@pytest.fixture()
+def nauta_config_map_state():
+    shared_state = NAUTAConfigMap._NAUTAConfigMap__shared_state
+    shared_state.clear()
+    yield shared_state
+    shared_state.clear()
+
+
+def test_nauta_config_map_failed_load_not_shared(mocker, nauta_config_map_state):
+    config_map_data = {NAUTAConfigMap.REGISTRY_FIELD: 'registry:5000', NAUTAConfigMap.IMAGE_TILLER_FIELD: 'tiller',
+                       NAUTAConfigMap.IMAGE_TENSORBOARD_SERVICE_FIELD: 'tensorboard'}
+    get_config_map_data_mock = mocker.patch('util.config.get_config_map_data', return_value=config_map_data)
+
+    with pytest.raises(KeyError):
+        NAUTAConfigMap()
+    assert not nauta_config_map_state
+
+    config_map_data[NAUTAConfigMap.EXTERNAL_IP_FIELD] = '1.2.3.4'
+    assert NAUTAConfigMap().external_ip == '1.2.3.4'
+    assert NAUTAConfigMap().image_tiller == 'registry:5000/tiller'
+    assert get_config_map_data_mock.call_count == 2
@@ -0,0 +1,103 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import shutil
+
+import pytest
+
+from util.workspace_store import WorkspaceStore, ENVIRONMENT_PRIVATE_FILES
+
+
+@pytest.fixture
+def source_dir(tmpdir):
+    source = tmpdir.mkdir('source')
+    source.join('training.py').write('print("training")')
+    source.join('Dockerfile').write('FROM nauta/tensorflow-py')
+    data = source.mkdir('data')
+    data.join('dataset.bin').write_binary(os.urandom(4096))
+    data.join('copy.bin').write_binary(data.join('dataset.bin').read_binary())
+    return source
+
+
+def test_copytree_links_files(tmpdir, source_dir):
+    store = WorkspaceStore(tmpdir.join('store').strpath)
+
+    for run in ('run-1', 'run-2'):
+        store.copytree(source_dir.strpath, tmpdir.join(run).strpath, private_files=ENVIRONMENT_PRIVATE_FILES)
+
+    dataset_1 = os.stat(tmpdir.join('run-1', 'data', 'dataset.bin').strpath)
+    dataset_2 = os.stat(tmpdir.join('run-2', 'data', 'dataset.bin').strpath)
+    copy_1 = os.stat(tmpdir.join('run-1', 'data', 'copy.bin').strpath)
+    assert dataset_1.st_ino == dataset_2.st_ino == copy_1.st_ino
+    assert dataset_1.st_nlink == 5  # object in the store and 4 files with the same content
+    assert tmpdir.join('run-2', 'training.py').read() == 'print("training")'
+
+    dockerfile_1 = os.stat(tmpdir.join('run-1', 'Dockerfile').strpath)
+    dockerfile_2 = os.stat(tmpdir.join('run-2', 'Dockerfile').strpath)
+    assert dockerfile_1.st_ino != dockerfile_2.st_ino
+    assert dockerfile_1.st_nlink == 1
+
+
+def test_copytree_content(tmpdir, source_dir):
+    store = WorkspaceStore(tmpdir.join('store').strpath)
+    destination = tmpdir.mkdir('run')
+
+    store.copytree_content(source_dir.strpath, destination.strpath, ignored_objects=['data'])
+
+    assert sorted(os.listdir(destination.strpath)) == ['Dockerfile', 'training.py']
+
+
+def test_link_file_replaces_destination(tmpdir, source_dir):
+    store = WorkspaceStore(tmpdir.join('store').strpath)
+    destination = tmpdir.join('training.py')
+    store.link_file(source_dir.join('data', 'dataset.bin').strpath, destination.strpath)
+
+    store.link_file(source_dir.join('training.py').strpath, destination.strpath)
+
+    assert destination.read() == 'print("training")'
+    # a stored file linked before isn't modified
+    dataset = source_dir.join('data', 'dataset.bin')
+    with open(store.get_object_path(store.get_object_name(dataset.strpath)), 'rb') as stored_file:
+        assert stored_file.read() == dataset.read_binary()
+
+
+def test_link_file_copies_if_link_fails(tmpdir, source_dir, mocker):
+    mocker.patch('os.link', side_effect=OSError('Invalid cross-device link'))
+    store = WorkspaceStore(tmpdir.join('store').strpath)
+
+    store.link_file(source_dir.join('training.py').strpath, tmpdir.join('training.py').strpath)
+
+    assert tmpdir.join('training.py').read() == 'print("training")'
+    assert os.stat(tmpdir.join('training.py').strpath).st_nlink == 1
+
+
+def test_collect_garbage(tmpdir, source_dir):
+    store = WorkspaceStore(tmpdir.join('store').strpath)
+    store.copytree(source_dir.strpath, tmpdir.join('run-1').strpath)
+    store.copytree(source_dir.join('data').strpath, tmpdir.join('run-2').strpath)
+
+    shutil.rmtree(tmpdir.join('run-1').strpath)
+    removed_files, removed_bytes = store.collect_garbage()
+
+    assert removed_files == 2  # training.py and Dockerfile, dataset is still used by run-2
+    assert removed_bytes == len('print("training")') + len('FROM nauta/tensorflow-py')
+
+    shutil.rmtree(tmpdir.join('run-2').strpath)
+    assert store.collect_garbage() == (1, 4096)
+    # files removed from the store are stored again when needed
+    store.copytree(source_dir.strpath, tmpdir.join('run-3').strpath)
+    assert os.stat(tmpdir.join('run-3', 'data', 'dataset.bin').strpath).st_nlink == 3
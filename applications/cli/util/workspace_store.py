@@ -0,0 +1,202 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from fnmatch import fnmatch
+from functools import lru_cache
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from util.config import Config, WORKSPACE_STORE_DIR_NAME
+from util.logger import initialize_logger
+
+logger = initialize_logger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+TEMP_FILE_PREFIX = '.tmp-'
+# temporary files older than that are left by interrupted submissions and are removed by garbage collection
+TEMP_FILE_MAX_AGE = 60 * 60  # seconds
+
+# files of environments, which are rewritten for every run, they are copied instead of being linked
+ENVIRONMENT_PRIVATE_FILES = ('values.yaml', 'Dockerfile', 'requirements.txt', '*.ipynb')
+
+
+class WorkspaceStore:
+    """
+    Content-addressed store of files of experiments' environments. Each distinct file is kept in the store once
+    and environments of runs get hardlinks to it, so e.g. a dataset in a script folder isn't duplicated for every
+    run of an experiment. Files which are modified for every run are copied instead - files of environments
+    must never be modified in place, they have to be replaced (e.g. written to a temporary file and moved).
+    If hardlinks are not supported (e.g. store and environments are located on different filesystems),
+    files are copied.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: directory of the store
+        """
+        self.path = path
+        self.objects_path = os.path.join(path, 'objects')
+        # (path, inode, size, modification time) of a source file -> name of its object
+        self._object_names: Dict[Tuple[str, int, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def get_object_name(self, file_path: str) -> str:
+        """
+        :return: name of an object with content of a file - hash of its content, with a suffix for executable files
+        """
+        file_stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+        object_name = self._object_names.get(key)
+        if object_name:
+            return object_name
+
+        content_hash = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                content_hash.update(chunk)
+        # mode is shared by all hardlinks, so executable and non-executable files are stored separately
+        object_name = content_hash.hexdigest() + ('-x' if file_stat.st_mode & stat.S_IXUSR else '')
+        with self._lock:
+            self._object_names[key] = object_name
+        return object_name
+
+    def get_object_path(self, object_name: str) -> str:
+        return os.path.join(self.objects_path, object_name[:2], object_name)
+
+    def add_file(self, file_path: str) -> str:
+        """
+        Adds a file to the store, if file with the same content isn't stored yet.
+        :param file_path: path of a file
+        :return: path of a stored file
+        """
+        object_path = self.get_object_path(self.get_object_name(file_path))
+        if not os.path.isfile(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            # file is copied under a temporary name first, so an object is never partially written
+            temp_file, temp_path = tempfile.mkstemp(dir=os.path.dirname(object_path), prefix=TEMP_FILE_PREFIX)
+            os.close(temp_file)
+            try:
+                shutil.copy2(file_path, temp_path)
+                os.replace(temp_path, object_path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+        return object_path
+
+    def link_file(self, file_path: str, destination_path: str):
+        """
+        Creates a file with content of a given file, linked to the store. An existing destination file is replaced.
+        """
+        if os.path.lexists(destination_path):
+            os.remove(destination_path)
+        try:
+            try:
+                os.link(self.add_file(file_path), destination_path)
+            except FileNotFoundError:
+                # object was removed by garbage collection in the meantime
+                os.link(self.add_file(file_path), destination_path)
+        except OSError:
+            logger.debug(f'Failed to create a hardlink of {file_path}, copying it.', exc_info=True)
+            shutil.copy2(file_path, destination_path)
+
+    def copytree(self, src: str, dst: str, private_files: Iterable[str] = ()):
+        """
+        Creates a tree of directories like src in dst and links files from src to the store.
+        :param src: source directory
+        :param dst: destination directory, it may exist
+        :param private_files: patterns of names of files, which are copied instead of being linked
+        """
+        for dir_path, _, file_names in os.walk(src, followlinks=True):
+            destination_dir_path = os.path.join(dst, os.path.relpath(dir_path, src))
+            os.makedirs(destination_dir_path, exist_ok=True)
+            for file_name in file_names:
+                self._place_file(os.path.join(dir_path, file_name),
+                                 os.path.join(destination_dir_path, file_name), private_files)
+
+    def copytree_content(self, src: str, dst: str, ignored_objects: List[str] = None,
+                         private_files: Iterable[str] = ()):
+        """
+        Similarly to util.filesystem.copytree_content operates on content of 'src' directory, but links files
+        to the store.
+        :param src: source directory
+        :param dst: destination directory
+        :param ignored_objects: list of ignored files and directories in 'src' directory
+        :param private_files: patterns of names of files, which are copied instead of being linked
+        """
+        for item in os.listdir(src):
+            if not ignored_objects or item not in ignored_objects:
+                source_path = os.path.join(src, item)
+                destination_path = os.path.join(dst, item)
+                if os.path.isdir(source_path):
+                    self.copytree(source_path, destination_path, private_files=private_files)
+                else:
+                    self._place_file(source_path, destination_path, private_files)
+
+    def _place_file(self, file_path: str, destination_path: str, private_files: Iterable[str]):
+        if any(fnmatch(os.path.basename(file_path), pattern) for pattern in private_files):
+            # an existing destination may be a hardlink, so it's removed instead of being overwritten
+            if os.path.lexists(destination_path):
+                os.remove(destination_path)
+            shutil.copy2(file_path, destination_path)
+        else:
+            self.link_file(file_path, destination_path)
+
+    def collect_garbage(self) -> Tuple[int, int]:
+        """
+        Removes stored files, which are not linked by any environment.
+        :return: number of removed files and their total size in bytes
+        """
+        removed_files = 0
+        removed_bytes = 0
+        if not os.path.isdir(self.objects_path):
+            return removed_files, removed_bytes
+
+        for dir_path, _, file_names in os.walk(self.objects_path):
+            for file_name in file_names:
+                object_path = os.path.join(dir_path, file_name)
+                try:
+                    object_stat = os.stat(object_path)
+                    if object_stat.st_nlink > 1:
+                        continue
+                    if file_name.startswith(TEMP_FILE_PREFIX) and \
+                            time.time() - object_stat.st_mtime < TEMP_FILE_MAX_AGE:
+                        continue
+                    os.remove(object_path)
+                except OSError:
+                    logger.exception(f'Failed to remove {object_path} from workspace store.')
+                    continue
+                removed_files += 1
+                removed_bytes += object_stat.st_size
+
+        return removed_files, removed_bytes
+
+
+@lru_cache(maxsize=None)
+def _get_workspace_store(path: str) -> WorkspaceStore:
+    return WorkspaceStore(path)
+
+
+def get_workspace_store() -> WorkspaceStore:
+    """
+    :return: store of files of experiments' environments located in nctl config directory
+    """
+    return _get_workspace_store(os.path.join(Config().config_path, WORKSPACE_STORE_DIR_NAME))
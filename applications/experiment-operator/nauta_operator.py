@@ -16,13 +16,48 @@
 
 import asyncio
 import datetime
+import logging
+import os
+import time
+from typing import Dict, Optional, Set
 
 import kopf
 import pykube
 
+from nauta_resources.patch_writer import CustomResourcePatchWriter
+from nauta_resources.platform_resource import CustomResource
 from nauta_resources.run import Run, RunStatus
+from operator_metrics import MetricsServer, OperatorMetrics
+from run_pods_index import RunPodsIndex, RunKey
 
-tasks = {}  # dict{namespace: dict{name: asyncio.Task}}
+# Runs which state is monitored. State of a monitored run is recalculated when phase of any of its pods changes,
+# all monitored runs are also periodically resynchronized with K8S API in case of missed pod events.
+monitored_runs: Set[RunKey] = set()
+run_pods_index = RunPodsIndex()
+run_locks: Dict[RunKey, asyncio.Lock] = {}
+resync_task: asyncio.Task = None
+
+
+def run_patched(run: CustomResource, latency: float):
+    operator_metrics.patch_sent((run.namespace, run.name), latency)
+
+
+# Changes of runs are coalesced and sent to K8S API at most every flush_interval seconds
+run_patch_writer = CustomResourcePatchWriter(flush_interval=0.5, on_patch_sent=run_patched)
+operator_metrics = OperatorMetrics(patch_writer=run_patch_writer, active_monitors=lambda: len(monitored_runs))
+metrics_server_task: asyncio.Task = None
+
+RESYNC_INTERVAL = 60  # seconds
+# Metrics are served on this port, 0 disables the metrics server
+METRICS_PORT = int(os.getenv('NAUTA_OPERATOR_METRICS_PORT', 8080))
+# Sampling profiler is started together with the metrics server
+PROFILER_ENABLED = os.getenv('NAUTA_OPERATOR_PROFILER', 'false').lower() == 'true'
+# Unauthenticated /profile/start, /profile/stop and /profile endpoints of the metrics server are served only on demand
+PROFILER_ENDPOINTS_ENABLED = os.getenv('NAUTA_OPERATOR_PROFILER_ENDPOINTS', 'false').lower() == 'true'
+
+logger = logging.getLogger(__name__)
+
+FINAL_RUN_STATES = {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}
 
 try:
     cfg = pykube.KubeConfig.from_service_account()
@@ -35,56 +70,115 @@ kopf.EventsConfig.events_loglevel = kopf.config.LOGLEVEL_WARNING
 
 @kopf.on.resume('aipg.intel.com', 'v1', 'runs')
 async def handle_run_on_resume(namespace, name, logger, spec, **kwargs):
+    ensure_metrics_server()
     try:
         run_state = RunStatus(spec['state'])
     except ValueError:
         raise kopf.PermanentError(f'Run {name} is invalid - cannot infer status from spec: {spec}')
 
-    if run_state in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}:
+    if run_state in FINAL_RUN_STATES:
         logger.info(f'Run {name} already in final state: {run_state.value}.')
-        if namespace in tasks and name in tasks[namespace]:
-            del tasks[namespace][name]
+        stop_monitoring(namespace, name)
         return
-    elif not tasks.get(namespace, {}).get(name):
-        logger.info(f'Resuming monitoring task for run {name}.')
-        task = asyncio.create_task(monitor_run(namespace, name, logger))
-        tasks.setdefault(namespace, {})
-        tasks[namespace][name] = task
+    elif (namespace, name) not in monitored_runs:
+        logger.info(f'Resuming monitoring of run {name}.')
+        await start_monitoring(namespace, name, logger)
 
 
 @kopf.on.create('aipg.intel.com', 'v1', 'runs')
 async def run_created(namespace, name, logger, **kwargs):
+    ensure_metrics_server()
     logger.warning(f'Run {name} created.')
-    task = asyncio.create_task(monitor_run(namespace, name, logger))
-    tasks.setdefault(namespace, {})
-    tasks[namespace][name] = task
+    await start_monitoring(namespace, name, logger)
 
 
 @kopf.on.delete('aipg.intel.com', 'v1', 'runs')
 async def run_deleted(namespace, name, logger, **kwargs):
     logger.warning(f'Run {name} deleted.')
-    if namespace in tasks and name in tasks[namespace]:
-        task = tasks[namespace][name]
-        task.cancel()  # it will also remove from `tasks`
+    stop_monitoring(namespace, name)
+    operator_metrics.forget((namespace, name))
 
 
-async def monitor_run(namespace, name, logger):
-    interval = 1
-    retry_counter = 0
-    retry_limit = 5
-    while True:
+@kopf.on.event('', 'v1', 'pods', labels={RunPodsIndex.RUN_NAME_LABEL: None})
+async def run_pod_event(event, logger, **kwargs):
+    event_time = time.monotonic()
+    ensure_metrics_server()
+    run_key = run_pods_index.apply_event(event_type=event['type'], pod=event['object'])
+    if run_key in monitored_runs:
+        namespace, name = run_key
         try:
-            await asyncio.sleep(interval)
-            logger.debug(f'Monitoring Run {name}')
-            run: Run = await Run.get(name=name, namespace=namespace)
+            await update_run_state(namespace, name, logger, event_time=event_time)
+        except Exception:
+            # state of the run will be updated again by the next pod event or resync
+            operator_metrics.retries['run_update_failure'] += 1
+            logger.exception(f'Unexpected error encountered when updating state of Run {name}.')
+
+
+def ensure_metrics_server():
+    """
+    Starts the metrics server in the operator event loop, if it was not started yet.
+    """
+    global metrics_server_task
+    if METRICS_PORT and not metrics_server_task:
+        metrics_server = MetricsServer(metrics=operator_metrics, port=METRICS_PORT,
+                                       profiler_endpoints=PROFILER_ENDPOINTS_ENABLED)
+        metrics_server_task = asyncio.create_task(metrics_server.start())
+        if PROFILER_ENABLED:
+            metrics_server_task.add_done_callback(lambda _: operator_metrics.profiler.start())
+
+
+async def start_monitoring(namespace, name, logger):
+    global resync_task
+    monitored_runs.add((namespace, name))
+    run_pods_index.track((namespace, name))
+    if not resync_task or resync_task.done():
+        resync_task = asyncio.create_task(resync_runs())
+    # Pods of the run could have been created before the run was registered - calculate initial state from
+    # a listing of pods, next updates are driven by pod events
+    try:
+        await update_run_state(namespace, name, logger, resync=True)
+    except Exception:
+        operator_metrics.retries['run_update_failure'] += 1
+        logger.exception(f'Unexpected error encountered when updating state of Run {name}.')
+
+
+def stop_monitoring(namespace, name):
+    monitored_runs.discard((namespace, name))
+    run_pods_index.forget((namespace, name))
+    run_locks.pop((namespace, name), None)
+
+
+async def update_run_state(namespace, name, logger, resync: bool = False, event_time: Optional[float] = None):
+    """
+    Recalculates state of a Run based on phases of its pods and updates Run if its state has changed.
+    :param resync: if True, pods of a Run are listed using K8S API, otherwise phases of pods are taken
+     from an index maintained by pod events
+    :param event_time: time.monotonic() of receiving of a pod event, which triggered the update
+    """
+    run_key = (namespace, name)
+    # Pod events and resync can update the same run concurrently, duration includes waiting for the other update
+    with operator_metrics.run_update_duration.time('resync' if resync else 'event'):
+        async with run_locks.setdefault(run_key, asyncio.Lock()):
+            logger.debug(f'Updating state of Run {name}')
+            with operator_metrics.apiserver_latency.time('get_run'):
+                run: Run = await Run.get(name=name, namespace=namespace)
+            if not run:
+                stop_monitoring(namespace, name)
+                return
+            # include changes which were not sent to K8S API yet
+            run_patch_writer.overlay_pending(run)
 
-            if run.state in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}:
+            if run.state in FINAL_RUN_STATES:
                 logger.info(f'Run {name} reached final state: {run.state.value}.')
-                if namespace in tasks and name in tasks[namespace]:
-                    del tasks[namespace][name]
+                stop_monitoring(namespace, name)
                 return
 
-            state_to_set = await run.calculate_current_state()
+            if resync:
+                with operator_metrics.apiserver_latency.time('list_pods'):
+                    pods = await run.get_pods()
+                run_pods_index.set_pods(run_key, pods or [])
+
+            state_to_set = await run.calculate_current_state(pod_phases=run_pods_index.get_pod_phases(run_key))
             if run.state is not state_to_set:
                 logger.warning(f'Run {name} state changed from {run.state.value} to {state_to_set.value}')
                 utc_timestamp = datetime.datetime.utcnow().replace(microsecond=0).isoformat()
@@ -96,16 +190,25 @@ async def monitor_run(namespace, name, logger):
                     logger.info(f'Setting Run {name} end time.')
                     run.end_timestamp = f'{utc_timestamp}Z'
                 run.state = state_to_set
-                await run.update()
-
-        except asyncio.CancelledError:
-            logger.info(f'Monitoring of Run {name} is cancelled')
-            if namespace in tasks and name in tasks[namespace]:
-                del tasks[namespace][name]
-            return
-        except Exception:
-            logger.exception(f'Unexpected error encountered when monitoring Run {name}.')
-            retry_counter += 1
-            logger.exception(f'Monitoring attempt: #{retry_counter}, retry limit: #{retry_limit}.')
-            if retry_counter >= retry_limit:
+                operator_metrics.state_changed(run_key, event_time)
+                run_patch_writer.submit(run)
+
+            if state_to_set in FINAL_RUN_STATES:
+                logger.info(f'Run {name} reached final state: {state_to_set.value}.')
+                stop_monitoring(namespace, name)
+
+
+async def resync_runs():
+    """
+    Periodically recalculates state of all monitored runs using current listing of their pods.
+    """
+    while monitored_runs:
+        await asyncio.sleep(RESYNC_INTERVAL)
+        for namespace, name in list(monitored_runs):
+            try:
+                await update_run_state(namespace, name, logger, resync=True)
+            except asyncio.CancelledError:
                 raise
+            except Exception:
+                operator_metrics.retries['run_update_failure'] += 1
+                logger.exception(f'Unexpected error encountered when resynchronizing Run {name}.')
@@ -0,0 +1,194 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from http import HTTPStatus
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from kubernetes_asyncio.client.rest import ApiException
+
+from nauta_resources.platform_resource import CustomResource
+
+logger = logging.getLogger(__name__)
+
+ResourceKey = Tuple[str, str, str]  # (resource class name, namespace, name)
+
+
+def merge_patch_bodies(target: dict, patch: dict) -> dict:
+    """
+    Merges patch into target (in place) the same way as JSON merge-patch does, except of null values handling.
+    """
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_patch_bodies(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+class PatchWriterCounters:
+    def __init__(self):
+        self.submitted_updates = 0
+        self.coalesced_updates = 0
+        self.sent_patches = 0
+        self.failed_patches = 0
+        self.requeued_patches = 0
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+
+class CustomResourcePatchWriter:
+    """
+    Coalesces changes of custom resources. Changed fields of resources passed to submit() are merged per resource
+    and sent as a single merge-patch at most every flush_interval seconds. Patches don't carry resourceVersion,
+    so they don't conflict with other changes. A patch which failed with a transient error is queued again,
+    under changes submitted in the meantime, and sent with next flush.
+    """
+
+    def __init__(self, flush_interval: float = 0.5, on_patch_sent: Callable[[CustomResource, float], None] = None):
+        """
+        :param flush_interval: time in seconds after which submitted changes are sent to K8S API
+        :param on_patch_sent: function called with a resource and duration of its patch request in seconds,
+                              after the resource was patched
+        """
+        self.flush_interval = flush_interval
+        self.on_patch_sent = on_patch_sent
+        self.counters = PatchWriterCounters()
+        self._pending: Dict[ResourceKey, Tuple[CustomResource, dict]] = {}
+        # patches being sent, they stay visible to overlay_pending() until their request has finished
+        self._in_flight: Dict[ResourceKey, dict] = {}
+        self._flush_task: Optional[asyncio.Future] = None
+
+    @staticmethod
+    def _resource_key(resource: CustomResource) -> ResourceKey:
+        return resource.__class__.__name__, resource.namespace, resource.name
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of resources with changes waiting to be sent.
+        """
+        return len(self._pending)
+
+    def submit(self, resource: CustomResource):
+        """
+        Queues changed fields of a resource, they will be sent with next flush.
+        """
+        patch_body = resource.get_patch_body()
+        if not patch_body:
+            return
+        resource._fields_to_update = set()
+        self.counters.submitted_updates += 1
+
+        key = self._resource_key(resource)
+        if key in self._pending:
+            merge_patch_bodies(self._pending[key][1], patch_body)
+            self._pending[key] = (resource, self._pending[key][1])
+            self.counters.coalesced_updates += 1
+        else:
+            self._pending[key] = (resource, patch_body)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_after_interval())
+
+    def _requeue(self, resource: CustomResource, patch_body: dict):
+        key = self._resource_key(resource)
+        if key in self._pending:
+            # changes submitted during the flush are newer than the failed ones
+            newer_resource, newer_patch_body = self._pending[key]
+            self._pending[key] = (newer_resource, merge_patch_bodies(patch_body, newer_patch_body))
+        else:
+            self._pending[key] = (resource, patch_body)
+        self.counters.requeued_patches += 1
+
+    @staticmethod
+    def _is_transient_error(error: Exception) -> bool:
+        if not isinstance(error, ApiException):
+            return True
+        return error.status == HTTPStatus.TOO_MANY_REQUESTS or error.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+    def overlay_pending(self, resource: CustomResource) -> CustomResource:
+        """
+        Applies changes which were not sent yet or are being sent to a resource, e.g. freshly read from K8S API.
+        """
+        key = self._resource_key(resource)
+        in_flight = self._in_flight.get(key)
+        if in_flight:
+            merge_patch_bodies(resource._body, in_flight)
+        pending = self._pending.get(key)
+        if pending:
+            merge_patch_bodies(resource._body, pending[1])
+        return resource
+
+    async def _flush_after_interval(self):
+        await asyncio.sleep(self.flush_interval)
+        # changes submitted or queued again during the flush are sent with a next flush
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        """
+        Sends all pending changes.
+        """
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        start = time.monotonic()
+        for key, (resource, patch_body) in pending.items():
+            self._in_flight[key] = patch_body
+            try:
+                await self._patch(resource, patch_body)
+                self.counters.sent_patches += 1
+            except Exception as e:
+                self._handle_failure(resource, patch_body, e)
+            finally:
+                if self._in_flight.get(key) is patch_body:
+                    del self._in_flight[key]
+
+        latency = time.monotonic() - start
+        self.counters.flushes += 1
+        self.counters.last_flush_latency = latency
+        self.counters.max_flush_latency = max(self.counters.max_flush_latency, latency)
+        self.counters.total_flush_latency += latency
+        logger.debug(f'Flushed {len(pending)} patches in {latency:.3f} s, queue depth: {self.queue_depth}.')
+        if self._pending:
+            self._schedule_flush()
+
+    def _handle_failure(self, resource: CustomResource, patch_body: dict, error: Exception):
+        if isinstance(error, ApiException) and error.status == HTTPStatus.NOT_FOUND:
+            logger.warning(f'{patch_body} was not applied, {resource.__class__.__name__} {resource.name} '
+                           f'no longer exists.')
+            return
+        self.counters.failed_patches += 1
+        if self._is_transient_error(error):
+            logger.warning(f'Failed to update {resource.__class__.__name__} {resource.name}, retrying with '
+                           f'next flush: {error}')
+            self._requeue(resource, patch_body)
+        else:
+            logger.exception(f'Failed to update {resource.__class__.__name__} {resource.name}.')
+
+    async def _patch(self, resource: CustomResource, patch_body: dict):
+        start = time.monotonic()
+        result = await resource.patch(patch_body)
+        if self.on_patch_sent:
+            self.on_patch_sent(resource, time.monotonic() - start)
+        return result
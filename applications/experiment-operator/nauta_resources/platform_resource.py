@@ -246,27 +246,37 @@ class CustomResource:
             logger.exception(f'Failed to delete {self.__class__.__name__} {self.name}.')
             raise
 
+    def get_patch_body(self) -> dict:
+        """
+        Returns a merge-patch body containing fields changed since last update.
+        """
+        patch_body = {}
+        for field in self._fields_to_update:
+            dpath.util.new(patch_body, field, dpath.util.get(self._body, field, separator='.'), separator='.')
+        return patch_body
+
+    async def patch(self, patch_body: dict):
+        k8s_custom_object_api = await CustomResourceApiClient.get()
+        try:
+            return await k8s_custom_object_api.patch_namespaced_custom_object(group=self.api_group_name,
+                                                                              namespace=self.namespace,
+                                                                              body=patch_body,
+                                                                              plural=self.crd_plural_name,
+                                                                              version=self.crd_version,
+                                                                              name=self.name)
+        except ApiException:
+            logger.exception(f'Failed to update {self.__class__.__name__} {self.name}.')
+            raise
+
     async def update(self):
         logger.debug(f'Updating {self.__class__.__name__} {self.name}.')
-        k8s_custom_object_api = await CustomResourceApiClient.get()
 
-        patch_body = {}
         if self._fields_to_update:
-            for field in self._fields_to_update:
-                dpath.util.new(patch_body, field, dpath.util.get(self._body, field, separator='.'), separator='.')
+            patch_body = self.get_patch_body()
             logger.debug(f'Patch body for {self.__class__.__name__} {self.name}: {patch_body}')
         else:
             logger.debug(f'No fields were changed in {self.__class__.__name__} {self.name}, skipping update.')
             return
-        try:
-            response = await k8s_custom_object_api.patch_namespaced_custom_object(group=self.api_group_name,
-                                                                                  namespace=self.namespace,
-                                                                                  body=patch_body,
-                                                                                  plural=self.crd_plural_name,
-                                                                                  version=self.crd_version,
-                                                                                  name=self.name)
-            self._fields_to_update = set()  # Clear after successful update
-            return response
-        except ApiException:
-            logger.exception(f'Failed to update {self.__class__.__name__} {self.name}.')
-            raise
+        response = await self.patch(patch_body)
+        self._fields_to_update = set()  # Clear after successful update
+        return response
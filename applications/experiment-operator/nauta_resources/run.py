@@ -216,19 +216,29 @@ class Run(CustomResource):
             if e.status != HTTPStatus.NOT_FOUND:
                 raise
 
-    async def calculate_current_state(self) -> RunStatus:
+    async def calculate_current_state(self, pod_phases: List[str] = None) -> RunStatus:
+        """
+        Calculates state of a Run based on phases of its pods.
+        :param pod_phases: phases of Run's pods, if not given - pods are retrieved from K8S API
+        """
         # Check final statuses first
         if self.state in {RunStatus.COMPLETE, RunStatus.FAILED, RunStatus.CANCELLED}:
             return self.state
 
-        pods = await self.get_pods()
+        if pod_phases is None:
+            pods = await self.get_pods()
+            pod_phases = [pod.status.phase for pod in pods] if pods else []
 
-        if pods and any(pod.status.phase == 'Failed' for pod in pods):
-            return RunStatus.FAILED
-        elif not pods or (pods and any(pod.status.phase in {'Pending', 'Unknown'} for pod in pods)
-                          and self.state is not RunStatus.RUNNING):
-            return RunStatus.QUEUED
-        elif pods and all(pod.status.phase == 'Succeeded' for pod in pods):
-            return RunStatus.COMPLETE
-        else:
-            return RunStatus.RUNNING
+        return calculate_state_from_pod_phases(current_state=self.state, pod_phases=pod_phases)
+
+
+def calculate_state_from_pod_phases(current_state: RunStatus, pod_phases: List[str]) -> RunStatus:
+    if any(phase == 'Failed' for phase in pod_phases):
+        return RunStatus.FAILED
+    elif not pod_phases or (any(phase in {'Pending', 'Unknown'} for phase in pod_phases)
+                            and current_state is not RunStatus.RUNNING):
+        return RunStatus.QUEUED
+    elif all(phase == 'Succeeded' for phase in pod_phases):
+        return RunStatus.COMPLETE
+    else:
+        return RunStatus.RUNNING
@@ -0,0 +1,222 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from asynctest import CoroutineMock
+from kubernetes_asyncio.client.rest import ApiException
+
+from nauta_resources.patch_writer import CustomResourcePatchWriter, merge_patch_bodies
+from nauta_resources.platform_resource import CustomResourceApiClient
+from nauta_resources.run import Run, RunStatus
+
+RUN_NAME = 'run-1'
+NAMESPACE = 'namespace'
+
+
+@pytest.fixture(scope='function')
+def mock_custom_resource_api_client():
+    custom_objects_api_mock = MagicMock()
+    CustomResourceApiClient.k8s_custom_object_api = custom_objects_api_mock
+
+    custom_objects_api_mock.get_namespaced_custom_object = CoroutineMock()
+    custom_objects_api_mock.patch_namespaced_custom_object = CoroutineMock()
+    yield custom_objects_api_mock
+
+    CustomResourceApiClient.k8s_custom_object_api = None
+
+
+def test_merge_patch_bodies():
+    target = {'spec': {'state': 'QUEUED', 'metrics': {'loss': '1.0'}}}
+
+    merge_patch_bodies(target, {'spec': {'state': 'RUNNING', 'metrics': {'acc': '0.5'}}})
+
+    assert target == {'spec': {'state': 'RUNNING', 'metrics': {'loss': '1.0', 'acc': '0.5'}}}
+
+
+@pytest.mark.asyncio
+async def test_submit_coalesces_changes(mock_custom_resource_api_client):
+    writer = CustomResourcePatchWriter(flush_interval=0.01)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+
+    run.state = RunStatus.RUNNING
+    writer.submit(run)
+    run.start_timestamp = '2019-01-01T00:00:00Z'
+    writer.submit(run)
+    assert writer.queue_depth == 1
+
+    await asyncio.sleep(0.05)
+
+    mock_custom_resource_api_client.patch_namespaced_custom_object.assert_called_once()
+    patch_body = mock_custom_resource_api_client.patch_namespaced_custom_object.call_args[1]['body']
+    assert patch_body == {'spec': {'state': 'RUNNING', 'start-time': '2019-01-01T00:00:00Z'}}
+    assert writer.queue_depth == 0
+    assert writer.counters.coalesced_updates == 1
+    assert writer.counters.sent_patches == 1
+    assert writer.counters.flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_without_changes(mock_custom_resource_api_client):
+    writer = CustomResourcePatchWriter(flush_interval=0.01)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+
+    writer.submit(run)
+    await writer.flush()
+
+    assert writer.queue_depth == 0
+    assert mock_custom_resource_api_client.patch_namespaced_custom_object.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_overlay_pending(mock_custom_resource_api_client):
+    writer = CustomResourcePatchWriter(flush_interval=10)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE, state=RunStatus.QUEUED)
+    run.state = RunStatus.RUNNING
+    writer.submit(run)
+
+    fresh_run = Run(name=RUN_NAME, namespace=NAMESPACE, state=RunStatus.QUEUED)
+    writer.overlay_pending(fresh_run)
+
+    assert fresh_run.state == RunStatus.RUNNING
+
+
+@pytest.mark.asyncio
+async def test_overlay_pending_during_flush(mock_custom_resource_api_client):
+    writer = CustomResourcePatchWriter(flush_interval=0.01)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+    run.state = RunStatus.RUNNING
+    run.start_timestamp = '2019-01-01T00:00:00Z'
+    writer.submit(run)
+    runs_read_during_flush = []
+
+    async def patch_reading_resource(**kwargs):
+        runs_read_during_flush.append(writer.overlay_pending(Run(name=RUN_NAME, namespace=NAMESPACE)))
+        return {}
+
+    mock_custom_resource_api_client.patch_namespaced_custom_object.side_effect = patch_reading_resource
+    await asyncio.sleep(0.05)
+
+    assert runs_read_during_flush[0].state == RunStatus.RUNNING
+    assert runs_read_during_flush[0].start_timestamp == '2019-01-01T00:00:00Z'
+    fresh_run = writer.overlay_pending(Run(name=RUN_NAME, namespace=NAMESPACE, state=RunStatus.QUEUED))
+    assert fresh_run.state == RunStatus.QUEUED
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_requeues_patch(mock_custom_resource_api_client):
+    mock_custom_resource_api_client.patch_namespaced_custom_object.side_effect = [ApiException(status=500), {}]
+    writer = CustomResourcePatchWriter(flush_interval=10)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+    run.state = RunStatus.FAILED
+    writer.submit(run)
+
+    await writer.flush()
+
+    assert writer.counters.failed_patches == 1
+    assert writer.counters.requeued_patches == 1
+    assert writer.queue_depth == 1
+
+    await writer.flush()
+
+    assert writer.counters.sent_patches == 1
+    assert writer.queue_depth == 0
+    assert mock_custom_resource_api_client.patch_namespaced_custom_object.call_args[1]['body'] == \
+        {'spec': {'state': 'FAILED'}}
+
+
+@pytest.mark.asyncio
+async def test_requeued_patch_sent_with_next_flush(mock_custom_resource_api_client):
+    mock_custom_resource_api_client.patch_namespaced_custom_object.side_effect = [ApiException(status=500), {}]
+    writer = CustomResourcePatchWriter(flush_interval=0.01)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+    run.state = RunStatus.FAILED
+    writer.submit(run)
+
+    await asyncio.sleep(0.1)
+
+    assert mock_custom_resource_api_client.patch_namespaced_custom_object.call_count == 2
+    assert writer.counters.sent_patches == 1
+    assert writer.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_requeued_under_newer_changes(mock_custom_resource_api_client):
+    writer = CustomResourcePatchWriter(flush_interval=10)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+    run.state = RunStatus.RUNNING
+    run.start_timestamp = '2019-01-01T00:00:00Z'
+    writer.submit(run)
+
+    async def patch_failing_after_new_change(**kwargs):
+        newer_run = Run(name=RUN_NAME, namespace=NAMESPACE)
+        newer_run.state = RunStatus.COMPLETE
+        writer.submit(newer_run)
+        raise ApiException(status=503)
+
+    mock_custom_resource_api_client.patch_namespaced_custom_object.side_effect = patch_failing_after_new_change
+    await writer.flush()
+
+    assert writer.queue_depth == 1
+    fresh_run = writer.overlay_pending(Run(name=RUN_NAME, namespace=NAMESPACE))
+    assert fresh_run.state == RunStatus.COMPLETE
+    assert fresh_run.start_timestamp == '2019-01-01T00:00:00Z'
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_not_retried(mock_custom_resource_api_client):
+    mock_custom_resource_api_client.patch_namespaced_custom_object.side_effect = ApiException(status=422)
+    writer = CustomResourcePatchWriter(flush_interval=10)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+    run.state = RunStatus.RUNNING
+    writer.submit(run)
+
+    await writer.flush()
+
+    assert writer.counters.failed_patches == 1
+    assert writer.counters.requeued_patches == 0
+    assert writer.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_resource_not_found(mock_custom_resource_api_client):
+    mock_custom_resource_api_client.patch_namespaced_custom_object.side_effect = ApiException(status=404)
+    writer = CustomResourcePatchWriter(flush_interval=10)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+    run.state = RunStatus.RUNNING
+    writer.submit(run)
+
+    await writer.flush()
+
+    assert writer.counters.failed_patches == 0
+    assert writer.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_reports_sent_patches(mock_custom_resource_api_client):
+    on_patch_sent = MagicMock()
+    writer = CustomResourcePatchWriter(flush_interval=10, on_patch_sent=on_patch_sent)
+    run = Run(name=RUN_NAME, namespace=NAMESPACE)
+    run.state = RunStatus.RUNNING
+    writer.submit(run)
+
+    await writer.flush()
+
+    on_patch_sent.assert_called_once()
+    assert on_patch_sent.call_args[0][0].name == RUN_NAME
+    assert on_patch_sent.call_args[0][1] >= 0
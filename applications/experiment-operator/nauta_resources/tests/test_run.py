@@ -22,7 +22,7 @@ from kubernetes_asyncio.client import CustomObjectsApi, V1Pod, V1PodStatus, Core
 from kubernetes_asyncio.client.rest import ApiException
 from asynctest import CoroutineMock
 
-from nauta_resources.run import Run, RunStatus
+from nauta_resources.run import Run, RunStatus, calculate_state_from_pod_phases
 from nauta_resources.platform_resource import CustomResourceApiClient, K8SApiClient
 
 TEST_RUNS = [Run(name="exp-mnist-single-node.py-18.05.17-16.05.45-1-tf-training",
@@ -327,3 +327,24 @@ GET_RUN_RESPONSE_RAW = {
         'end-time': '2018-05-17T14:15:41Z'
     }
 }
+
+
+@pytest.mark.asyncio
+async def test_calculate_run_state_from_given_pod_phases(mocker):
+    get_pods_mock = mocker.patch('nauta_resources.run.Run.get_pods', new=CoroutineMock())
+
+    run = Run(name=RUN_NAME, experiment_name='fake', state=RunStatus.QUEUED)
+
+    assert await run.calculate_current_state(pod_phases=['Running', 'Succeeded']) == RunStatus.RUNNING
+    assert get_pods_mock.call_count == 0
+
+
+@pytest.mark.parametrize('current_state,pod_phases,state', [
+    (RunStatus.QUEUED, [], RunStatus.QUEUED),
+    (RunStatus.QUEUED, ['Pending', 'Running'], RunStatus.QUEUED),
+    (RunStatus.RUNNING, ['Pending', 'Running'], RunStatus.RUNNING),
+    (RunStatus.RUNNING, ['Failed', 'Running'], RunStatus.FAILED),
+    (RunStatus.RUNNING, ['Succeeded', 'Succeeded'], RunStatus.COMPLETE),
+])
+def test_calculate_state_from_pod_phases(current_state, pod_phases, state):
+    assert calculate_state_from_pod_phases(current_state=current_state, pod_phases=pod_phases) == state
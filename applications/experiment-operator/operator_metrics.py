@@ -0,0 +1,234 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from collections import Counter
+from contextlib import contextmanager
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from nauta_resources.patch_writer import CustomResourcePatchWriter
+from run_pods_index import RunKey
+from sampling_profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+LAG_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)  # seconds
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+class Histogram:
+    """
+    Histogram of observed values in Prometheus exposition format, optionally partitioned by a single label.
+    """
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...], label_name: str = None):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.label_name = label_name
+        # label value -> (counts of buckets, sum of values, count of values)
+        self._series: Dict[Optional[str], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, label_value: str = None):
+        bucket_counts, total, count = self._series.get(label_value, ([0] * len(self.buckets), 0.0, 0))
+        for i, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                bucket_counts[i] += 1
+        self._series[label_value] = (bucket_counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, label_value: str = None):
+        """
+        Observes duration of a block of code, e.g. of an awaited API call.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, label_value)
+
+    def get_count(self, label_value: str = None) -> int:
+        return self._series.get(label_value, ([], 0.0, 0))[2]
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for label_value, (bucket_counts, total, count) in sorted(self._series.items(), key=lambda s: s[0] or ''):
+            labels = ((self.label_name, label_value),) if self.label_name else ()
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f'{self.name}_bucket{_format_labels(labels + (("le", str(upper_bound)),))} '
+                             f'{bucket_count}')
+            lines.append(f'{self.name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+
+def _render_simple_metric(name: str, description: str, metric_type: str,
+                          values: Dict[Tuple[Tuple[str, str], ...], float]) -> List[str]:
+    lines = [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}']
+    for labels, value in values.items():
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+    return lines
+
+
+class OperatorMetrics:
+    """
+    Metrics of the operator exposed in Prometheus text format. Latencies and lags are observed by the operator,
+    counters of patches and the number of monitored runs are read when metrics are rendered.
+    """
+
+    def __init__(self, patch_writer: CustomResourcePatchWriter, active_monitors: Callable[[], int]):
+        """
+        :param patch_writer: writer of Run changes, its counters are exposed
+        :param active_monitors: function returning number of monitored runs
+        """
+        self.patch_writer = patch_writer
+        self.active_monitors = active_monitors
+        self.apiserver_latency = Histogram('nauta_operator_apiserver_request_duration_seconds',
+                                           'Duration of K8S API calls made by the operator.',
+                                           buckets=LATENCY_BUCKETS, label_name='operation')
+        self.run_update_duration = Histogram('nauta_operator_run_update_duration_seconds',
+                                             'Duration of recalculation of a Run state, triggered by a pod event '
+                                             'or resynchronization.', buckets=LATENCY_BUCKETS, label_name='trigger')
+        self.state_transition_lag = Histogram('nauta_operator_run_state_transition_lag_seconds',
+                                              'Time from receiving a pod event changing state of a Run '
+                                              'to patching the Run.', buckets=LAG_BUCKETS)
+        self.retries = Counter()  # reason -> count
+        self.profiler = SamplingProfiler()
+        self._transition_start_times: Dict[RunKey, float] = {}
+
+    def state_changed(self, run_key: RunKey, event_time: Optional[float]):
+        """
+        Records start of a state transition of a Run, which will end when the Run is patched.
+        :param event_time: time.monotonic() of receiving of a pod event, which caused the change, None for changes
+                           detected by resynchronization
+        """
+        if event_time is not None:
+            # when a state changes again before it was patched, the lag is counted from the first change
+            self._transition_start_times.setdefault(run_key, event_time)
+
+    def patch_sent(self, run_key: RunKey, latency: float):
+        self.apiserver_latency.observe(latency, 'patch_run')
+        start_time = self._transition_start_times.pop(run_key, None)
+        if start_time is not None:
+            self.state_transition_lag.observe(time.monotonic() - start_time)
+
+    def forget(self, run_key: RunKey):
+        self._transition_start_times.pop(run_key, None)
+
+    def render(self) -> str:
+        counters = self.patch_writer.counters
+        lines = []
+        lines += _render_simple_metric('nauta_operator_active_monitors', 'Number of monitored runs.', 'gauge',
+                                       {(): self.active_monitors()})
+        lines += _render_simple_metric('nauta_operator_patch_queue_depth',
+                                       'Number of runs with changes waiting to be sent.', 'gauge',
+                                       {(): self.patch_writer.queue_depth})
+        lines += _render_simple_metric('nauta_operator_patches_total', 'Number of patches of runs.', 'counter',
+                                       {(('result', 'sent'),): counters.sent_patches,
+                                        (('result', 'failed'),): counters.failed_patches})
+        lines += _render_simple_metric('nauta_operator_coalesced_updates_total',
+                                       'Number of changes of runs merged with not yet sent changes.', 'counter',
+                                       {(): counters.coalesced_updates})
+        lines += _render_simple_metric('nauta_operator_patch_flush_duration_seconds_max',
+                                       'Maximal duration of sending of all pending patches.', 'gauge',
+                                       {(): counters.max_flush_latency})
+        retries = {(('reason', 'patch_failure'),): counters.requeued_patches}
+        retries.update({(('reason', reason),): count for reason, count in sorted(self.retries.items())})
+        lines += _render_simple_metric('nauta_operator_retries_total', 'Number of retried operations.', 'counter',
+                                       retries)
+        lines += self.apiserver_latency.render()
+        lines += self.run_update_duration.render()
+        lines += self.state_transition_lag.render()
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """
+    Minimal HTTP server running in the operator event loop. Serves metrics at /metrics and, if profiler endpoints
+    are enabled, controls the sampling profiler - /profile/start, /profile/stop and /profile returning collapsed
+    stacks of collected samples. Requests are not authenticated.
+    """
+
+    def __init__(self, metrics: OperatorMetrics, port: int, host: str = '0.0.0.0',
+                 profiler_endpoints: bool = False):
+        """
+        :param profiler_endpoints: if False, /profile endpoints are not served
+        """
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self.profiler_endpoints = profiler_endpoints
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        # the profiler samples the thread running the event loop
+        self.metrics.profiler.thread_id = threading.get_ident()
+        self._server = await asyncio.start_server(self._handle_connection, host=self.host, port=self.port)
+        logger.info(f'Serving operator metrics on port {self.port}.')
+
+    def stop(self):
+        if self._server:
+            self._server.close()
+
+    def handle_request(self, path: str) -> Tuple[int, str]:
+        """
+        :return: HTTP status and body of a response
+        """
+        if path == '/metrics':
+            return 200, self.metrics.render()
+        elif not self.profiler_endpoints:
+            return 404, 'not found\n'
+        elif path == '/profile/start':
+            self.metrics.profiler.start()
+            return 200, 'profiler started\n'
+        elif path == '/profile/stop':
+            self.metrics.profiler.stop()
+            return 200, 'profiler stopped\n'
+        elif path == '/profile':
+            return 200, self.metrics.profiler.render()
+        return 404, 'not found\n'
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # headers are not used
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                status, body = 400, 'bad request\n'
+            else:
+                status, body = self.handle_request(parts[1].split('?')[0])
+
+            encoded_body = body.encode('utf-8')
+            writer.write(f'HTTP/1.0 {status} {"OK" if status == 200 else "Error"}\r\n'
+                         f'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                         f'Content-Length: {len(encoded_body)}\r\n\r\n'.encode('latin-1') + encoded_body)
+            await writer.drain()
+        except Exception:
+            logger.exception('Failed to handle a metrics request.')
+        finally:
+            writer.close()
@@ -0,0 +1,84 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Dict, List, Optional, Tuple
+
+from kubernetes_asyncio.client import V1Pod
+
+RunKey = Tuple[str, str]  # (namespace, run name)
+
+
+class RunPodsIndex:
+    """
+    In-memory index of phases of pods belonging to monitored runs, kept up to date by pod watch events.
+    Pods are assigned to runs by value of their runName label. Only runs registered with track() are indexed,
+    events of pods of other runs are ignored.
+    """
+
+    RUN_NAME_LABEL = 'runName'
+
+    def __init__(self):
+        self._pod_phases: Dict[RunKey, Dict[str, str]] = {}
+
+    def track(self, run_key: RunKey):
+        """
+        Starts indexing pods of a given run, until it's forgotten.
+        """
+        self._pod_phases.setdefault(run_key, {})
+
+    def apply_event(self, event_type: Optional[str], pod: dict) -> Optional[RunKey]:
+        """
+        Updates index with a pod watch event.
+        :param event_type: type of watch event - ADDED, MODIFIED, DELETED or None for initial listing
+        :param pod: body of a pod
+        :return: key of a tracked run, if phases of its pods have changed, None otherwise
+        """
+        metadata = pod.get('metadata', {})
+        run_name = metadata.get('labels', {}).get(self.RUN_NAME_LABEL)
+        if not run_name:
+            return None
+        run_key = (metadata.get('namespace'), run_name)
+        pod_name = metadata.get('name')
+        run_pods = self._pod_phases.get(run_key)
+        if run_pods is None:
+            return None
+
+        if event_type == 'DELETED':
+            if pod_name not in run_pods:
+                return None
+            del run_pods[pod_name]
+            return run_key
+
+        phase = pod.get('status', {}).get('phase') or 'Unknown'
+        if run_pods.get(pod_name) == phase:
+            return None
+        run_pods[pod_name] = phase
+        return run_key
+
+    def set_pods(self, run_key: RunKey, pods: List[V1Pod]):
+        """
+        Replaces indexed pods of a given run with a listing of pods, e.g. during resync. Listing is ignored
+        if the run isn't tracked.
+        """
+        if run_key not in self._pod_phases:
+            return
+        self._pod_phases[run_key] = {pod.metadata.name: pod.status.phase or 'Unknown' for pod in pods}
+
+    def get_pod_phases(self, run_key: RunKey) -> List[str]:
+        return list(self._pod_phases.get(run_key, {}).values())
+
+    def forget(self, run_key: RunKey):
+        self._pod_phases.pop(run_key, None)
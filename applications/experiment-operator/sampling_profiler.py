@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from collections import Counter
+import sys
+import threading
+from types import FrameType
+from typing import Optional
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """
+    :return: stack of a frame in collapsed format - functions from the outermost one separated by semicolons
+    """
+    functions = []
+    while frame:
+        code = frame.f_code
+        functions.append(f'{code.co_filename.rsplit("/", 1)[-1]}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(functions))
+
+
+class SamplingProfiler:
+    """
+    Samples a stack of a thread at regular intervals on a background thread. Collected samples are returned
+    in collapsed stacks format, which can be visualized e.g. by flamegraph.pl. Sampling is cheap enough
+    to be turned on in a running operator.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        """
+        :param interval: time in seconds between samples
+        :param thread_id: identifier of a sampled thread, a thread creating the profiler by default
+        """
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._sampling_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._sampling_thread and self._sampling_thread.is_alive())
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self.samples = Counter()
+            self._stopped.clear()
+            self._sampling_thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+            self._sampling_thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampling_thread:
+            self._sampling_thread.join()
+
+    def take_sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame:
+            self.samples[collapse_stack(frame)] += 1
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            self.take_sample()
+
+    def render(self, limit: int = 500) -> str:
+        """
+        :param limit: maximal number of returned stacks, stacks with the highest number of samples are returned
+        :return: lines with a collapsed stack and a number of its samples
+        """
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common(limit))
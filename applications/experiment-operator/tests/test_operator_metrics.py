@@ -0,0 +1,129 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+
+import pytest
+
+from nauta_resources.patch_writer import CustomResourcePatchWriter
+from operator_metrics import Histogram, MetricsServer, OperatorMetrics
+
+RUN_KEY = ('namespace', 'run-1')
+
+
+@pytest.fixture
+def metrics() -> OperatorMetrics:
+    return OperatorMetrics(patch_writer=CustomResourcePatchWriter(), active_monitors=lambda: 3)
+
+
+def test_histogram():
+    histogram = Histogram('latency_seconds', 'Latency.', buckets=(0.1, 1.0), label_name='operation')
+
+    histogram.observe(0.05, 'get')
+    histogram.observe(0.5, 'get')
+    histogram.observe(5, 'get')
+    histogram.observe(0.5, 'list')
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{operation="get",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{operation="get",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{operation="get",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{operation="get"} 5.55' in lines
+    assert 'latency_seconds_count{operation="list"} 1' in lines
+
+
+def test_histogram_time(mocker):
+    mocker.patch('operator_metrics.time.monotonic', side_effect=[10.0, 10.2])
+    histogram = Histogram('latency_seconds', 'Latency.', buckets=(0.1, 1.0))
+
+    with histogram.time():
+        pass
+
+    assert 'latency_seconds_bucket{le="1.0"} 1' in histogram.render()
+    assert histogram.get_count() == 1
+
+
+# noinspection PyShadowingNames
+def test_state_transition_lag(mocker, metrics):
+    mocker.patch('operator_metrics.time.monotonic', return_value=12.0)
+
+    metrics.state_changed(RUN_KEY, event_time=10.0)
+    metrics.state_changed(RUN_KEY, event_time=11.0)
+    metrics.state_changed(('namespace', 'run-2'), event_time=None)
+    metrics.patch_sent(RUN_KEY, latency=0.02)
+    metrics.patch_sent(('namespace', 'run-2'), latency=0.02)
+
+    rendered = metrics.render()
+    assert 'nauta_operator_run_state_transition_lag_seconds_sum 2.0' in rendered
+    assert 'nauta_operator_run_state_transition_lag_seconds_count 1' in rendered
+    assert metrics.apiserver_latency.get_count('patch_run') == 2
+
+
+# noinspection PyShadowingNames
+def test_render(metrics):
+    metrics.patch_writer.counters.requeued_patches = 2
+    metrics.patch_writer.counters.sent_patches = 5
+    metrics.retries['run_update_failure'] += 1
+
+    rendered = metrics.render()
+
+    assert 'nauta_operator_active_monitors 3' in rendered
+    assert 'nauta_operator_patch_queue_depth 0' in rendered
+    assert 'nauta_operator_patches_total{result="sent"} 5' in rendered
+    assert 'nauta_operator_retries_total{reason="patch_failure"} 2' in rendered
+    assert 'nauta_operator_retries_total{reason="run_update_failure"} 1' in rendered
+    assert '# TYPE nauta_operator_apiserver_request_duration_seconds histogram' in rendered
+
+
+# noinspection PyShadowingNames
+@pytest.mark.asyncio
+async def test_metrics_server(metrics):
+    server = MetricsServer(metrics=metrics, port=0, profiler_endpoints=True)
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+
+    async def get(path: str) -> bytes:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+        response = await reader.read()
+        writer.close()
+        return response
+
+    try:
+        metrics_response = await get('/metrics')
+        not_found_response = await get('/unknown')
+        await get('/profile/start')
+        await asyncio.sleep(0.05)
+        await get('/profile/stop')
+        profile_response = await get('/profile')
+    finally:
+        server.stop()
+
+    assert metrics_response.startswith(b'HTTP/1.0 200 OK')
+    assert b'nauta_operator_active_monitors 3' in metrics_response
+    assert not_found_response.startswith(b'HTTP/1.0 404')
+    # the event loop was sampled while it was waiting
+    assert b'base_events.py:run_forever' in profile_response
+
+
+# noinspection PyShadowingNames
+def test_metrics_server_profiler_endpoints_disabled(metrics):
+    server = MetricsServer(metrics=metrics, port=0)
+
+    for path in ('/profile/start', '/profile/stop', '/profile'):
+        assert server.handle_request(path)[0] == 404
+    assert not metrics.profiler.running
+    assert server.handle_request('/metrics')[0] == 200
@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from kubernetes_asyncio.client import V1Pod, V1PodStatus, V1ObjectMeta
+
+from run_pods_index import RunPodsIndex
+
+RUN_KEY = ('namespace', 'run-1')
+
+
+def _pod(name: str, phase: str, run_name: str = 'run-1') -> dict:
+    labels = {'runName': run_name} if run_name else {}
+    return {'metadata': {'name': name, 'namespace': 'namespace', 'labels': labels}, 'status': {'phase': phase}}
+
+
+def test_apply_event_new_pod():
+    index = RunPodsIndex()
+    index.track(RUN_KEY)
+
+    assert index.apply_event(None, _pod('pod-1', 'Pending')) == RUN_KEY
+    assert index.apply_event('ADDED', _pod('pod-2', 'Pending')) == RUN_KEY
+    assert sorted(index.get_pod_phases(RUN_KEY)) == ['Pending', 'Pending']
+
+
+def test_apply_event_phase_not_changed():
+    index = RunPodsIndex()
+    index.track(RUN_KEY)
+    index.apply_event('ADDED', _pod('pod-1', 'Running'))
+
+    assert index.apply_event('MODIFIED', _pod('pod-1', 'Running')) is None
+
+
+def test_apply_event_phase_changed():
+    index = RunPodsIndex()
+    index.track(RUN_KEY)
+    index.apply_event('ADDED', _pod('pod-1', 'Running'))
+
+    assert index.apply_event('MODIFIED', _pod('pod-1', 'Succeeded')) == RUN_KEY
+    assert index.get_pod_phases(RUN_KEY) == ['Succeeded']
+
+
+def test_apply_event_deleted():
+    index = RunPodsIndex()
+    index.track(RUN_KEY)
+    index.apply_event('ADDED', _pod('pod-1', 'Running'))
+
+    assert index.apply_event('DELETED', _pod('pod-1', 'Running')) == RUN_KEY
+    assert index.get_pod_phases(RUN_KEY) == []
+    assert index.apply_event('DELETED', _pod('pod-1', 'Running')) is None
+
+
+def test_apply_event_pod_without_run():
+    index = RunPodsIndex()
+    index.track(RUN_KEY)
+
+    assert index.apply_event('ADDED', _pod('pod-1', 'Running', run_name=None)) is None
+
+
+def test_set_pods_and_forget():
+    index = RunPodsIndex()
+    index.track(RUN_KEY)
+    index.apply_event('ADDED', _pod('pod-1', 'Running'))
+
+    index.set_pods(RUN_KEY, [V1Pod(metadata=V1ObjectMeta(name='pod-2'), status=V1PodStatus(phase='Failed'))])
+    assert index.get_pod_phases(RUN_KEY) == ['Failed']
+
+    index.forget(RUN_KEY)
+    assert index.get_pod_phases(RUN_KEY) == []
+
+
+def test_apply_event_untracked_run():
+    index = RunPodsIndex()
+
+    assert index.apply_event('ADDED', _pod('pod-1', 'Running')) is None
+    assert index.apply_event('DELETED', _pod('pod-1', 'Running')) is None
+    assert index._pod_phases == {}
+
+
+def test_apply_event_after_forget():
+    index = RunPodsIndex()
+    index.track(RUN_KEY)
+    index.apply_event('ADDED', _pod('pod-1', 'Running'))
+    index.forget(RUN_KEY)
+
+    assert index.apply_event('MODIFIED', _pod('pod-1', 'Succeeded')) is None
+    assert index.apply_event('DELETED', _pod('pod-1', 'Succeeded')) is None
+    assert index._pod_phases == {}
+
+
+def test_set_pods_untracked_run():
+    index = RunPodsIndex()
+
+    index.set_pods(RUN_KEY, [V1Pod(metadata=V1ObjectMeta(name='pod-1'), status=V1PodStatus(phase='Running'))])
+    assert index._pod_phases == {}
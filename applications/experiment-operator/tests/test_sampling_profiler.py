@@ -0,0 +1,47 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import sys
+import time
+
+from sampling_profiler import SamplingProfiler, collapse_stack
+
+
+def busy_function(duration: float):
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        pass
+
+
+def test_collapse_stack():
+    stack = collapse_stack(sys._getframe())
+
+    assert stack.endswith('test_sampling_profiler.py:test_collapse_stack')
+    assert stack.count(';') > 0
+
+
+def test_sampling_profiler():
+    profiler = SamplingProfiler(interval=0.001)
+
+    profiler.start()
+    busy_function(0.2)
+    profiler.stop()
+
+    assert not profiler.running
+    assert sum(profiler.samples.values()) > 10
+    top_stack = profiler.render(limit=1)
+    assert 'test_sampling_profiler.py:busy_function' in top_stack
+    assert top_stack.count('\n') == 1
@@ -56,7 +56,7 @@ def create():
     except (KeyError, TypeError):
         return _generate_error_response(HTTPStatus.BAD_REQUEST, 'incorrect request body!')
 
-    tensb_mgr = TensorboardManager.incluster_init()
+    tensb_mgr = TensorboardManager.get_shared_instance()
 
     valid_runs, invalid_runs = tensb_mgr.validate_runs(request_body.run_names)
 
@@ -88,7 +88,7 @@ def create():
 
 @app.route('/tensorboard/<id>', methods=['GET'])
 def get(id: str):
-    tensb_mgr = TensorboardManager.incluster_init()
+    tensb_mgr = TensorboardManager.get_shared_instance()
 
     current_tensorboard_instance = tensb_mgr.get_by_id(id)
 
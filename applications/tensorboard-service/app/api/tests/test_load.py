@@ -0,0 +1,168 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from unittest.mock import MagicMock
+
+from kubernetes.client import V1ConfigMap, V1ContainerStatus, V1Deployment, V1ObjectMeta, V1Pod, V1PodStatus, \
+    V1beta1Ingress
+import pytest
+
+import api.main
+from nauta.config import NautaPlatformConfig
+from tensorboard.models import TensorboardStatus
+from tensorboard.tensorboard import TensorboardManager
+
+FAKE_NAMESPACE = 'fake-namespace'
+FAKE_LATENCY = 0.002
+CLIENTS = 8
+POLLS_PER_CLIENT = 20
+MAX_POLLS_UNTIL_RUNNING = 100
+
+
+class FakeK8SAPIClient:
+    """
+    In-memory stand-in of K8SAPIClient with a simulated latency of every call. Pods of created deployments
+    are running and ready immediately.
+    """
+
+    def __init__(self):
+        self.deployments: Dict[str, V1Deployment] = {}
+        self.ingresses: Dict[str, V1beta1Ingress] = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _call(self, name: str):
+        time.sleep(FAKE_LATENCY)
+        with self._lock:
+            self.calls[name] += 1
+
+    @staticmethod
+    def _matches(labels: Dict[str, str], label_selector: str) -> bool:
+        return all(labels.get(key) == value
+                   for key, value in (requirement.split('=') for requirement in label_selector.split(',')))
+
+    def create_deployment(self, namespace: str, body: V1Deployment):
+        self._call('create_deployment')
+        with self._lock:
+            self.deployments[body.metadata.name] = body
+
+    def create_service(self, namespace: str, body):
+        self._call('create_service')
+
+    def create_ingress(self, namespace: str, body: V1beta1Ingress):
+        self._call('create_ingress')
+        with self._lock:
+            self.ingresses[body.metadata.name] = body
+
+    def get_deployment(self, name: str, namespace: str) -> Optional[V1Deployment]:
+        self._call('get_deployment')
+        return self.deployments.get(name)
+
+    def list_deployments(self, namespace: str, label_selector: str) -> List[V1Deployment]:
+        self._call('list_deployments')
+        with self._lock:
+            return [d for d in self.deployments.values() if self._matches(d.metadata.labels, label_selector)]
+
+    def list_pods(self, namespace: str, label_selector: str) -> List[V1Pod]:
+        self._call('list_pods')
+        with self._lock:
+            deployments = list(self.deployments.values())
+        return [V1Pod(metadata=V1ObjectMeta(labels=d.spec.template.metadata.labels),
+                      status=V1PodStatus(phase='Running', container_statuses=[
+                          V1ContainerStatus(ready=True, image='', image_id='', name='', restart_count=0)]))
+                for d in deployments if self._matches(d.spec.template.metadata.labels, label_selector)]
+
+
+@pytest.fixture
+def fake_k8s_client(mocker) -> FakeK8SAPIClient:
+    k8s_client = FakeK8SAPIClient()
+    platform_config_client = MagicMock()
+    platform_config_client.read_namespaced_config_map.return_value = V1ConfigMap(data={
+        'registry': '127.0.0.1:30303', 'image.activity-proxy': 'activity-proxy:dev',
+        'image.tensorflow': 'tensorflow:dev', 'tensorboard.timeout': '1800'})
+    # noinspection PyTypeChecker
+    platform_config = NautaPlatformConfig(k8s_api_client=platform_config_client, cache_ttl=60)
+
+    mocker.patch('tensorboard.tensorboard.path.isdir').return_value = True
+    mocker.patch.object(TensorboardManager, '_check_tensorboard_nginx_reachable').return_value = True
+    # reachability is checked in background, so statuses of not yet reachable tensorboards are not cached
+    mocker.patch.dict(TensorboardManager.STATUS_CACHE_TTL, {TensorboardStatus.CREATING: 0})
+    mocker.patch.object(TensorboardManager, '_shared_instance', new=None)
+    # noinspection PyTypeChecker
+    mocker.patch.object(TensorboardManager, 'incluster_init').return_value = \
+        TensorboardManager(namespace=FAKE_NAMESPACE, api_client=k8s_client, config=platform_config)
+
+    k8s_client.platform_config_client = platform_config_client
+    return k8s_client
+
+
+def _launch_tensorboard(client_number: int) -> Tuple[List[HTTPStatus], int]:
+    """
+    Creates a tensorboard, polls its status until it is running and then POLLS_PER_CLIENT times more.
+    :return: HTTP statuses of responses and number of polls before the tensorboard was running
+    """
+    flask_client = api.main.app.test_client()
+    request_body = json.dumps({'runNames': [{'name': f'run-{client_number}', 'owner': 'user'}]})
+    statuses = []
+
+    response = flask_client.post('/tensorboard', data=request_body)
+    statuses.append(response.status_code)
+    tensorboard_id = json.loads(response.data)['id']
+
+    response = flask_client.post('/tensorboard', data=request_body)
+    statuses.append(response.status_code)
+
+    polls_until_running = 0
+    while polls_until_running < MAX_POLLS_UNTIL_RUNNING:
+        polls_until_running += 1
+        response = flask_client.get(f'/tensorboard/{tensorboard_id}')
+        statuses.append(response.status_code)
+        if json.loads(response.data)['status'] == 'RUNNING':
+            break
+        time.sleep(0.01)
+
+    for _ in range(POLLS_PER_CLIENT):
+        response = flask_client.get(f'/tensorboard/{tensorboard_id}')
+        statuses.append(response.status_code)
+        assert json.loads(response.data)['status'] == 'RUNNING'
+    return statuses, polls_until_running
+
+
+# noinspection PyShadowingNames
+def test_concurrent_create_and_get(fake_k8s_client: FakeK8SAPIClient):
+    with ThreadPoolExecutor(max_workers=CLIENTS) as executor:
+        results = list(executor.map(_launch_tensorboard, range(CLIENTS)))
+
+    for statuses, polls_until_running in results:
+        assert statuses[:2] == [HTTPStatus.ACCEPTED, HTTPStatus.CONFLICT]
+        assert set(statuses[2:]) == {HTTPStatus.OK}
+        assert polls_until_running < MAX_POLLS_UNTIL_RUNNING
+
+    assert TensorboardManager.incluster_init.call_count == 1
+    assert len(fake_k8s_client.deployments) == CLIENTS
+    # every lookup is a single pod listing - two of them per create call and one per status poll until
+    # a tensorboard is running, later its cached status is returned
+    assert fake_k8s_client.calls['list_pods'] == 2 * CLIENTS + sum(polls for _, polls in results)
+    assert fake_k8s_client.calls['get_deployment'] == 0
+    # platform config is read once for the manager and the cached value is used for every created tensorboard
+    assert fake_k8s_client.platform_config_client.read_namespaced_config_map.call_count == 1
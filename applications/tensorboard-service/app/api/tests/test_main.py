@@ -35,7 +35,7 @@ def flask_client():
 # noinspection PyShadowingNames
 def test_create(mocker: MockFixture, flask_client: FlaskClient):
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_shared_instance=lambda *args, **kwargs: MagicMock(
             get_by_runs=lambda *args, **kwargs: None,
             create=lambda *args, **kwargs: Tensorboard(id='0c13c567-378e-4582-9ae3-3a40f2ca7e21',
                                                        url='/test/url/'),
@@ -97,7 +97,7 @@ def test_create_conflict(mocker: MockFixture, flask_client: FlaskClient):
     fake_tensorboard_id = '3cf769b5-436e-42ca-9710-c0a61b6c075d'
     fake_tensorboard_url = '/test/url/'
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_shared_instance=lambda *args, **kwargs: MagicMock(
             get_by_runs=lambda *args, **kwargs: Tensorboard(id=fake_tensorboard_id,
                                                             url=fake_tensorboard_url,
                                                             status=TensorboardStatus.RUNNING),
@@ -142,7 +142,7 @@ def test_get(mocker: MockFixture, flask_client: FlaskClient):
                                    status=TensorboardStatus.RUNNING)
 
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_shared_instance=lambda *args, **kwargs: MagicMock(
             get_by_id=lambda *args, **kwargs: fake_tensorboard
         )
     )
@@ -163,7 +163,7 @@ def test_get(mocker: MockFixture, flask_client: FlaskClient):
 # noinspection PyShadowingNames
 def test_get_not_found(mocker: MockFixture, flask_client: FlaskClient):
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_shared_instance=lambda *args, **kwargs: MagicMock(
             get_by_id=lambda *args, **kwargs: None
         )
     )
@@ -177,7 +177,7 @@ def test_get_not_found(mocker: MockFixture, flask_client: FlaskClient):
 # noinspection PyShadowingNames
 def test_create_all_invalid_runs(mocker: MockFixture, flask_client: FlaskClient):
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_shared_instance=lambda *args, **kwargs: MagicMock(
             validate_runs=lambda runs: ([], runs),
             get_by_runs=lambda *args, **kwargs: None
         )
@@ -217,7 +217,7 @@ def test_create_partial_invalid_runs(mocker: MockFixture, flask_client: FlaskCli
     fake_tensorboard_url = '/test/url/'
 
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_shared_instance=lambda *args, **kwargs: MagicMock(
             validate_runs=lambda runs: ([runs[0], runs[1]], [runs[2]]),
             create=lambda *args, **kwargs: Tensorboard(id=fake_tensorboard_id, url=fake_tensorboard_url),
             get_by_runs=lambda *args, **kwargs: None
@@ -15,8 +15,8 @@
 #
 
 import logging as log
-from time import sleep
 
+from tensorboard.garbage_collector import TensorboardGarbageCollector
 from tensorboard.tensorboard import TensorboardManager
 
 
@@ -26,7 +26,5 @@ log.debug('daemon started!')
 
 mgr = TensorboardManager.incluster_init()
 
-while True:
-    mgr.delete_garbage()
-    log.debug('sleeping for 5 seconds...')
-    sleep(5)
+garbage_collector = TensorboardGarbageCollector(manager=mgr)
+garbage_collector.run()
@@ -17,9 +17,9 @@
 from enum import Enum
 import logging as log
 from http import HTTPStatus
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
-from kubernetes import client
+from kubernetes import client, watch
 from kubernetes.client import V1DeploymentList, V1Deployment, V1Service, V1beta1Ingress, V1DeleteOptions, V1Pod, \
     V1beta1IngressList, V1PodList
 from kubernetes.client.rest import ApiException
@@ -35,11 +35,15 @@ class K8SPodPhase(Enum):
 
 
 class K8SAPIClient:
-    def __init__(self):
-        self.apps_api_client = client.AppsV1Api()
-        self.extensions_v1beta1_api_client = client.ExtensionsV1beta1Api()
-        self.v1_api_client = client.CoreV1Api()
-        self.custom_objects_client = client.CustomObjectsApi()
+    def __init__(self, api_client: client.ApiClient = None):
+        """
+        :param api_client: client shared by all APIs, so they use a single pool of connections
+        """
+        self.api_client = api_client or client.ApiClient()
+        self.apps_api_client = client.AppsV1Api(self.api_client)
+        self.extensions_v1beta1_api_client = client.ExtensionsV1beta1Api(self.api_client)
+        self.v1_api_client = client.CoreV1Api(self.api_client)
+        self.custom_objects_client = client.CustomObjectsApi(self.api_client)
 
     def create_deployment(self, namespace: str, body: V1Deployment, **kwargs):
         self.apps_api_client.create_namespaced_deployment(namespace=namespace, body=body, **kwargs)
@@ -53,6 +57,30 @@ class K8SAPIClient:
         deployments_list: List[V1Deployment] = deployments.items
         return deployments_list
 
+    def list_deployments_with_version(self, namespace: str, label_selector: str = None,
+                                      **kwargs) -> Tuple[List[V1Deployment], str]:
+        """
+        Returns deployments together with resource version of the listing, which can be used to start a watch.
+        """
+        deployments: V1DeploymentList = self.apps_api_client.list_namespaced_deployment(
+            namespace=namespace,
+            label_selector=label_selector,
+            **kwargs
+        )
+        return deployments.items, deployments.metadata.resource_version
+
+    def watch_deployments(self, namespace: str, label_selector: str = None, resource_version: str = None,
+                          timeout_seconds: int = None) -> Iterator[dict]:
+        """
+        Yields watch events of deployments (dicts with type, object and raw_object keys), starting from
+        a given resource version. Stream ends after timeout_seconds.
+        """
+        return watch.Watch().stream(self.apps_api_client.list_namespaced_deployment,
+                                    namespace=namespace,
+                                    label_selector=label_selector,
+                                    resource_version=resource_version,
+                                    timeout_seconds=timeout_seconds)
+
     def get_deployment(self, name: str, namespace: str, **kwargs) -> Optional[V1Deployment]:
         try:
             deployment = self.apps_api_client.read_namespaced_deployment(name=name, namespace=namespace, **kwargs)
@@ -99,6 +127,13 @@ class K8SAPIClient:
                                                                      body=V1DeleteOptions(),
                                                                      **kwargs)
 
+    def list_pods(self, namespace: str, label_selector: str = None, **kwargs) -> List[V1Pod]:
+        pods: V1PodList = self.v1_api_client.list_namespaced_pod(namespace=namespace,
+                                                                 label_selector=label_selector,
+                                                                 **kwargs)
+        pods_list: List[V1Pod] = pods.items
+        return pods_list
+
     def get_pod(self, namespace: str, label_selector: str = None, **kwargs) -> Optional[V1Pod]:
         try:
             pods: V1PodList = self.v1_api_client.list_namespaced_pod(namespace=namespace,
@@ -46,8 +46,12 @@ class K8STensorboardInstance:
         run_names_hash = sha1(run_names_str.encode('utf-8')).hexdigest()
         return run_names_hash
 
+    @staticmethod
+    def generate_ingress_path(id: str) -> str:
+        return '/tb/' + id + '/'
+
     @classmethod
-    def from_runs(cls, id: str, runs: List[Run]):
+    def from_runs(cls, id: str, runs: List[Run], nauta_config: NautaPlatformConfig = None):
         k8s_name = 'tensorboard-' + id
         run_names_hash = K8STensorboardInstance.generate_run_names_hash(runs)
 
@@ -76,7 +80,8 @@ class K8STensorboardInstance:
             "--host", "127.0.0.1"
         ]
 
-        nauta_config = NautaPlatformConfig.incluster_init()
+        if not nauta_config:
+            nauta_config = NautaPlatformConfig.incluster_init()
 
         tensorboard_image = nauta_config.get_tensorboard_image()
         tensorboard_proxy_image = nauta_config.get_activity_proxy_image()
@@ -203,7 +208,7 @@ class K8STensorboardInstance:
                                                  http=k8s.V1beta1HTTPIngressRuleValue(
                                                      paths=[
                                                          k8s.V1beta1HTTPIngressPath(
-                                                             path='/tb/' + id + "/",
+                                                             path=cls.generate_ingress_path(id),
                                                              backend=k8s.V1beta1IngressBackend(
                                                                  service_name=k8s_name,
                                                                  service_port=80
@@ -58,6 +58,21 @@ def test_list_deployments(mocker, k8s_api_client_mock: K8SAPIClient):
     deployments = k8s_api_client_mock.list_deployments(namespace=MY_FAKE_NAMESPACE)
 
     assert deployments == fake_deployments
+
+
+# noinspection PyShadowingNames
+def test_list_deployments_with_version(mocker, k8s_api_client_mock: K8SAPIClient):
+    fake_deployments = [k8s_models.V1Deployment(metadata=k8s_models.V1ObjectMeta(name='fake-deployment'))]
+    fake_deployment_list = k8s_models.V1DeploymentList(items=fake_deployments,
+                                                       metadata=k8s_models.V1ListMeta(resource_version='123'))
+
+    mocker.patch.object(k8s_api_client_mock.apps_api_client, 'list_namespaced_deployment').return_value = \
+        fake_deployment_list
+
+    deployments, resource_version = k8s_api_client_mock.list_deployments_with_version(namespace=MY_FAKE_NAMESPACE)
+
+    assert deployments == fake_deployments
+    assert resource_version == '123'
     k8s_api_client_mock.apps_api_client.list_namespaced_deployment.assert_called_once_with(namespace=MY_FAKE_NAMESPACE,
                                                                                            label_selector=None)
 
@@ -176,6 +191,18 @@ def test_delete_ingress(mocker: MockFixture, k8s_api_client_mock: K8SAPIClient):
     )
 
 
+# noinspection PyShadowingNames
+def test_list_pods(mocker: MockFixture, k8s_api_client_mock: K8SAPIClient):
+    fake_pods = [k8s_models.V1Pod(metadata=k8s_models.V1ObjectMeta(name=FAKE_OBJECT_NAME))]
+    list_mock = mocker.patch.object(k8s_api_client_mock.v1_api_client, 'list_namespaced_pod')
+    list_mock.return_value = k8s_models.V1PodList(items=fake_pods)
+
+    pods = k8s_api_client_mock.list_pods(namespace=MY_FAKE_NAMESPACE, label_selector=FAKE_LABEL_SELECTOR)
+
+    assert pods == fake_pods
+    list_mock.assert_called_once_with(namespace=MY_FAKE_NAMESPACE, label_selector=FAKE_LABEL_SELECTOR)
+
+
 # noinspection PyShadowingNames
 def test_get_pod(mocker: MockFixture, k8s_api_client_mock: K8SAPIClient):
     fake_pod = k8s_models.V1Pod(metadata=k8s_models.V1ObjectMeta(name=FAKE_OBJECT_NAME))
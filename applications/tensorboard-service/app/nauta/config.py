@@ -14,7 +14,9 @@
 # limitations under the License.
 #
 
-from typing import Dict
+import threading
+import time
+from typing import Dict, Optional
 
 from kubernetes import client, config
 from kubernetes.client import V1ConfigMap
@@ -25,18 +27,39 @@ NAUTA_CONFIG_CONFIGMAP_NAMESPACE = 'nauta'
 NAUTA_CONFIG_TENSORBOARD_TIMEOUT = 'tensorboard.timeout'
 NAUTA_DEFAULT_TENSORBOARD_TIMEOUT = '1800'
 
+# time in seconds for which content of platform configmap is reused
+NAUTA_CONFIG_CACHE_TTL = 60
+
 
 class NautaPlatformConfig:
-    def __init__(self, k8s_api_client: client.CoreV1Api):
+    def __init__(self, k8s_api_client: client.CoreV1Api, cache_ttl: float = 0):
+        """
+        :param k8s_api_client: client used to read platform configmap
+        :param cache_ttl: time in seconds for which content of configmap is reused, 0 disables caching
+        """
         self.client = k8s_api_client
+        self.cache_ttl = cache_ttl
+        self._cached_data: Optional[Dict[str, str]] = None
+        self._cached_data_time = 0.0
+        self._cache_lock = threading.Lock()
 
     @classmethod
-    def incluster_init(cls):
+    def incluster_init(cls, cache_ttl: float = 0, api_client: client.ApiClient = None):
         config.load_incluster_config()
-        v1 = client.CoreV1Api()
-        return cls(k8s_api_client=v1)
+        v1 = client.CoreV1Api(api_client)
+        return cls(k8s_api_client=v1, cache_ttl=cache_ttl)
 
     def _fetch_platform_configmap(self) -> Dict[str, str]:
+        if not self.cache_ttl:
+            return self._read_platform_configmap()
+
+        with self._cache_lock:
+            if self._cached_data is None or time.monotonic() - self._cached_data_time >= self.cache_ttl:
+                self._cached_data = self._read_platform_configmap()
+                self._cached_data_time = time.monotonic()
+            return self._cached_data
+
+    def _read_platform_configmap(self) -> Dict[str, str]:
         configmap: V1ConfigMap = self.client.read_namespaced_config_map(name=NAUTA_CONFIG_CONFIGMAP_NAME,
                                                                         namespace=NAUTA_CONFIG_CONFIGMAP_NAMESPACE)
 
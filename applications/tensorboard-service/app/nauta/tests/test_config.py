@@ -17,6 +17,8 @@
 
 from unittest.mock import MagicMock
 
+import nauta.config
+
 from kubernetes.client import V1ConfigMap
 import pytest
 
@@ -75,3 +77,21 @@ def test_get_activity_proxy_image(mocker, nauta_platform_config_mocked: NautaPla
     ap_image = nauta_platform_config_mocked.get_activity_proxy_image()
 
     assert ap_image == '127.0.0.1:30303/activity-proxy:dev'
+
+
+@pytest.mark.parametrize(['cache_ttl', 'elapsed_time', 'expected_read_count'],
+                         [(0, 0, 2), (60, 30, 1), (60, 61, 2)])
+def test_fetch_platform_configmap_cache(mocker, cache_ttl: float, elapsed_time: float, expected_read_count: int):
+    # noinspection PyTypeChecker
+    nauta_config = NautaPlatformConfig(k8s_api_client=MagicMock(), cache_ttl=cache_ttl)
+    nauta_config.client.read_namespaced_config_map.return_value = fake_cm
+    monotonic_mock = mocker.patch.object(nauta.config.time, 'monotonic')
+    monotonic_mock.return_value = 100
+
+    # noinspection PyProtectedMember
+    nauta_config._fetch_platform_configmap()
+    monotonic_mock.return_value = 100 + elapsed_time
+    # noinspection PyProtectedMember
+    assert nauta_config._fetch_platform_configmap() == fake_cm.data
+
+    assert nauta_config.client.read_namespaced_config_map.call_count == expected_read_count
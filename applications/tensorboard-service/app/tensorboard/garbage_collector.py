@@ -0,0 +1,212 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+from http import HTTPStatus
+import logging as log
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from kubernetes.client import V1Deployment
+from kubernetes.client.rest import ApiException
+
+from tensorboard.proxy_client import try_get_last_request_datetime
+from tensorboard.tensorboard import TensorboardManager
+
+
+class TensorboardGarbageCollector:
+    """
+    Removes tensorboard instances which were not used for longer than garbage collection timeout.
+    Tensorboard deployments are kept in an in-memory index updated by a watch. Inactivity of every instance
+    is probed on a thread pool, and the next probe of an instance is scheduled when its idle time may exceed
+    the timeout, instead of probing all instances in every cycle.
+    """
+
+    TENSORBOARD_LABEL_SELECTOR = 'type=nauta-tensorboard'
+
+    def __init__(self, manager: TensorboardManager, max_workers: int = 16, probe_timeout: float = 5.0,
+                 retry_interval: float = 5.0, max_probe_interval: float = 60.0, watch_timeout: int = 300):
+        """
+        :param manager: manager used to delete tensorboard instances
+        :param max_workers: maximal number of concurrent inactivity probes
+        :param probe_timeout: timeout of a single inactivity probe in seconds
+        :param retry_interval: delay in seconds of a next probe, when a probe or a watch failed
+        :param max_probe_interval: maximal delay in seconds between probes of an instance, it limits time after
+                                   which a change of garbage collection timeout is taken into account
+        :param watch_timeout: time in seconds after which a watch of deployments is restarted
+        """
+        self.manager = manager
+        self.max_workers = max_workers
+        self.probe_timeout = probe_timeout
+        self.retry_interval = retry_interval
+        self.max_probe_interval = max_probe_interval
+        self.watch_timeout = watch_timeout
+
+        self._deployments: Dict[str, V1Deployment] = {}
+        self._schedule: List[Tuple[float, str]] = []  # heap of (time of a probe, deployment name)
+        self._probing: Set[str] = set()
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    @property
+    def deployment_names(self) -> Set[str]:
+        with self._condition:
+            return set(self._deployments)
+
+    def add_deployment(self, deployment: V1Deployment):
+        with self._condition:
+            name = deployment.metadata.name
+            if name not in self._deployments:
+                self._schedule_probe(name, delay=0)
+            self._deployments[name] = deployment
+
+    def remove_deployment(self, name: str):
+        with self._condition:
+            # entries of removed deployments are skipped when they are popped from the schedule
+            self._deployments.pop(name, None)
+
+    def replace_deployments(self, deployments: List[V1Deployment]):
+        with self._condition:
+            current_names = {deployment.metadata.name for deployment in deployments}
+            for name in set(self._deployments) - current_names:
+                self.remove_deployment(name)
+            for deployment in deployments:
+                self.add_deployment(deployment)
+
+    def handle_watch_event(self, event: dict):
+        event_type = event['type']
+        if event_type in ('ADDED', 'MODIFIED'):
+            self.add_deployment(event['object'])
+        elif event_type == 'DELETED':
+            self.remove_deployment(event['object'].metadata.name)
+
+    def _schedule_probe(self, name: str, delay: float):
+        with self._condition:
+            heapq.heappush(self._schedule, (time.monotonic() + delay, name))
+            self._condition.notify_all()
+
+    def submit_due_probes(self) -> Optional[float]:
+        """
+        Submits probes of instances, for which time of a probe has come.
+        :return: time in seconds to the next scheduled probe, None if nothing is scheduled
+        """
+        with self._condition:
+            now = time.monotonic()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, name = heapq.heappop(self._schedule)
+                if name not in self._deployments or name in self._probing:
+                    continue
+                self._probing.add(name)
+                self._executor.submit(self._probe, name)
+            return self._schedule[0][0] - now if self._schedule else None
+
+    def _probe(self, name: str):
+        try:
+            next_probe_delay = self.probe(name)
+        except Exception:
+            log.exception(f'failed to check inactivity of {name}')
+            next_probe_delay = self.retry_interval
+
+        with self._condition:
+            self._probing.discard(name)
+            if next_probe_delay is not None and name in self._deployments:
+                self._schedule_probe(name, delay=next_probe_delay)
+
+    def probe(self, name: str) -> Optional[float]:
+        """
+        Checks inactivity of a tensorboard instance and removes it, if it is inactive for too long.
+        :return: delay in seconds of the next probe of the instance, None if the instance was removed
+        """
+        last_request_datetime = try_get_last_request_datetime(proxy_address=name, timeout=self.probe_timeout)
+        if last_request_datetime is None:
+            return self.retry_interval
+
+        idle_time = (TensorboardManager._get_current_datetime() - last_request_datetime).total_seconds()
+        remaining_idle_time = self.manager.get_garbage_timeout() - idle_time
+        if remaining_idle_time > 0:
+            return min(remaining_idle_time, self.max_probe_interval)
+
+        with self._condition:
+            deployment = self._deployments.get(name)
+        if deployment is None:
+            return None
+        log.debug(f'garbage detected: {name} , removing...')
+        self.manager.delete(deployment)
+        self.remove_deployment(name)
+        log.debug(f'garbage removed: {name}')
+        return None
+
+    def run_scheduler(self):
+        while not self._stopped.is_set():
+            self.manager.refresh_garbage_timeout()
+            next_probe_delay = self.submit_due_probes()
+            with self._condition:
+                wait_time = self.max_probe_interval if next_probe_delay is None \
+                    else min(next_probe_delay, self.max_probe_interval)
+                self._condition.wait(max(wait_time, 0))
+
+    def watch_deployments(self):
+        resource_version = None
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    deployments, resource_version = self.manager.client.list_deployments_with_version(
+                        namespace=self.manager.namespace, label_selector=self.TENSORBOARD_LABEL_SELECTOR)
+                    self.replace_deployments(deployments)
+                    log.debug(f'tensorboard deployments listed: {len(deployments)}')
+
+                for event in self.manager.client.watch_deployments(namespace=self.manager.namespace,
+                                                                   label_selector=self.TENSORBOARD_LABEL_SELECTOR,
+                                                                   resource_version=resource_version,
+                                                                   timeout_seconds=self.watch_timeout):
+                    if event['type'] == 'ERROR':
+                        if event['raw_object'].get('code') == HTTPStatus.GONE:
+                            log.debug('resource version of tensorboard deployments expired, listing again')
+                        else:
+                            log.error(f'error during watching tensorboard deployments: {event["raw_object"]}')
+                        resource_version = None
+                        break
+                    self.handle_watch_event(event)
+                    resource_version = event['raw_object']['metadata']['resourceVersion']
+            except ApiException as ex:
+                if ex.status == HTTPStatus.GATEWAY_TIMEOUT:
+                    log.exception('gateway timeout occurred when watching tensorboard deployments')
+                else:
+                    log.exception('error during watching tensorboard deployments')
+                resource_version = None
+                self._stopped.wait(self.retry_interval)
+            except Exception:
+                log.exception('error during watching tensorboard deployments')
+                resource_version = None
+                self._stopped.wait(self.retry_interval)
+
+    def run(self):
+        """
+        Watches tensorboard deployments on a background thread and runs the scheduler of inactivity probes.
+        Blocks until stop() is called.
+        """
+        watch_thread = threading.Thread(target=self.watch_deployments, name='tensorboard-watch', daemon=True)
+        watch_thread.start()
+        self.run_scheduler()
+
+    def stop(self):
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._executor.shutdown(wait=False)
@@ -24,11 +24,11 @@ import requests
 import requests.exceptions
 
 
-def try_get_last_request_datetime(proxy_address: str) -> Optional[datetime]:
+def try_get_last_request_datetime(proxy_address: str, timeout: float = 5) -> Optional[datetime]:
     # sometimes proxy times out with the response and that's okay - it might be too busy with getting the last request
     # timestamp. try again shortly - it should return proper response.
     try:
-        proxy_response = requests.get(f'http://{proxy_address}/inactivity', timeout=5)
+        proxy_response = requests.get(f'http://{proxy_address}/inactivity', timeout=timeout)
     except requests.exceptions.ConnectionError:
         log.exception('connection to proxy failed')
         return None
@@ -0,0 +1,101 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+import logging as log
+import threading
+import time
+from typing import Callable, Dict, Set
+
+
+class ReadinessTracker:
+    """
+    Tracks reachability of tensorboard instances. Reachability is checked on a thread pool and callers get
+    the last known result immediately, so they are never blocked by a slow check. Reachable instances are checked
+    again every reachable_ttl seconds. Instances which weren't checked for forget_after seconds are forgotten -
+    tensorboards are deleted by another process, so the tracker doesn't learn about their deletion.
+    """
+
+    def __init__(self, check_function: Callable[[str], bool], max_workers: int = 4, recheck_interval: float = 1.0,
+                 reachable_ttl: float = 60.0, forget_after: float = 600.0):
+        """
+        :param check_function: function checking if a tensorboard with a given url is reachable
+        :param max_workers: maximal number of concurrent checks
+        :param recheck_interval: minimal time in seconds between checks of an unreachable instance
+        :param reachable_ttl: time in seconds after which a reachable instance is checked again, until the check
+                              is finished the instance is still reported as reachable
+        :param forget_after: time in seconds after which an instance which wasn't checked is forgotten
+        """
+        self.check_function = check_function
+        self.recheck_interval = recheck_interval
+        self.reachable_ttl = reachable_ttl
+        self.forget_after = forget_after
+        # url -> time of the last successful check
+        self._reachable: Dict[str, float] = {}
+        self._checking: Set[str] = set()
+        self._last_check_time: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def is_reachable(self, url: str) -> bool:
+        """
+        Returns cached reachability of a tensorboard and starts a check in background, if the tensorboard was not
+        reachable so far or its reachability was checked more than reachable_ttl seconds ago.
+        """
+        with self._lock:
+            now = time.monotonic()
+            reachable_time = self._reachable.get(url)
+            if reachable_time is not None:
+                if now - reachable_time >= self.reachable_ttl:
+                    self._start_check(url, now)
+                return True
+            if now - self._last_check_time.get(url, -self.recheck_interval) >= self.recheck_interval:
+                self._start_check(url, now)
+            return False
+
+    def _start_check(self, url: str, now: float):
+        if url in self._checking:
+            return
+        self._forget_stale(now)
+        self._checking.add(url)
+        self._last_check_time[url] = now
+        self._executor.submit(self._check, url)
+
+    def _forget_stale(self, now: float):
+        for checked_urls in (self._reachable, self._last_check_time):
+            for url, check_time in list(checked_urls.items()):
+                if now - check_time >= self.forget_after and url not in self._checking:
+                    del checked_urls[url]
+
+    def _check(self, url: str):
+        try:
+            reachable = self.check_function(url)
+        except Exception:
+            log.exception(f'Checking reachability of {url} failed!')
+            reachable = False
+
+        with self._lock:
+            self._checking.discard(url)
+            if reachable:
+                self._reachable[url] = time.monotonic()
+                self._last_check_time.pop(url, None)
+            else:
+                self._reachable.pop(url, None)
+
+    def forget(self, url: str):
+        with self._lock:
+            self._reachable.pop(url, None)
+            self._last_check_time.pop(url, None)
@@ -18,10 +18,12 @@ from datetime import datetime, timedelta
 from http import HTTPStatus
 import logging as log
 from os import path
-from typing import List, Optional
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from kubernetes import config
+from kubernetes import client, config
 from kubernetes.client import V1Deployment, V1ObjectMeta, V1Pod, V1ContainerStatus
 from kubernetes.client.rest import ApiException
 import requests
@@ -29,14 +31,22 @@ import requests
 from k8s.client import K8SAPIClient, K8SPodPhase
 import k8s.models
 from tensorboard.models import Tensorboard, TensorboardStatus, Run
+from tensorboard.readiness_tracker import ReadinessTracker
 from tensorboard.proxy_client import try_get_last_request_datetime
-from nauta.config import NautaPlatformConfig
+from nauta.config import NautaPlatformConfig, NAUTA_CONFIG_CACHE_TTL
 
 
 class TensorboardManager:
     OUTPUT_PUBLIC_MOUNT_PATH = '/mnt/output'
     NGINX_INGRESS_ADDRESS = 'nauta-ingress.nauta'
 
+    # time in seconds for which status of a tensorboard returned by get_by_id is reused - tensorboards are deleted
+    # by the garbage collector, not by API workers holding the cache, so cached statuses have to expire quickly
+    STATUS_CACHE_TTL = {TensorboardStatus.CREATING: 2, TensorboardStatus.RUNNING: 5}
+
+    _shared_instance: Optional['TensorboardManager'] = None
+    _shared_instance_lock = threading.Lock()
+
     def __init__(self, namespace: str, api_client: K8SAPIClient,
                  config: NautaPlatformConfig):
         self.client = api_client
@@ -44,17 +54,32 @@ class TensorboardManager:
         self._config = config
         self._tb_timeout = self._config.get_tensorboard_timeout()
         self._last_tb_timeout_load = TensorboardManager._get_current_datetime()
+        self._status_cache: Dict[str, Tuple[float, Tensorboard]] = {}
+        self._readiness_tracker = ReadinessTracker(
+            check_function=lambda url: TensorboardManager._check_tensorboard_nginx_reachable(url))
 
     @classmethod
-    def incluster_init(cls):
+    def incluster_init(cls, config_cache_ttl: float = 0):
         config.load_incluster_config()
 
-        nauta_config = NautaPlatformConfig.incluster_init()
+        k8s_api_client = client.ApiClient()
+        nauta_config = NautaPlatformConfig.incluster_init(cache_ttl=config_cache_ttl, api_client=k8s_api_client)
 
         with open("/var/run/secrets/kubernetes.io/serviceaccount/namespace", mode='r') as file:
             my_current_namespace = file.read()
 
-        return cls(namespace=my_current_namespace, api_client=K8SAPIClient(), config=nauta_config)
+        return cls(namespace=my_current_namespace, api_client=K8SAPIClient(k8s_api_client), config=nauta_config)
+
+    @classmethod
+    def get_shared_instance(cls) -> 'TensorboardManager':
+        """
+        Returns a manager shared by all requests handled by a process, so K8S API clients (and their connection
+        pools) and platform config are not created again for every request.
+        """
+        with cls._shared_instance_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls.incluster_init(config_cache_ttl=NAUTA_CONFIG_CACHE_TTL)
+            return cls._shared_instance
 
     @staticmethod
     def _get_current_datetime() -> datetime:
@@ -63,7 +88,8 @@ class TensorboardManager:
     def create(self, runs: List[Run]) -> Tensorboard:
         new_tensorboard = Tensorboard(id=str(uuid4()))
 
-        k8s_tensorboard_model = k8s.models.K8STensorboardInstance.from_runs(runs=runs, id=new_tensorboard.id)
+        k8s_tensorboard_model = k8s.models.K8STensorboardInstance.from_runs(runs=runs, id=new_tensorboard.id,
+                                                                            nauta_config=self._config)
 
         self.client.create_deployment(namespace=self.namespace, body=k8s_tensorboard_model.deployment)
         self.client.create_service(namespace=self.namespace, body=k8s_tensorboard_model.service)
@@ -94,8 +120,7 @@ class TensorboardManager:
         log.debug(f"Tensorboard is unreachable. Got: {response.status_code} status code")
         return False
 
-    @staticmethod
-    def _check_tensorboard_status(pod: V1Pod, tensorboard_ingress_url: str) -> TensorboardStatus:
+    def _check_tensorboard_status(self, pod: V1Pod, tensorboard_ingress_url: str) -> TensorboardStatus:
         pod_phase: str = pod.status.phase
 
         try:
@@ -112,61 +137,79 @@ class TensorboardManager:
             if not status.ready:
                 return TensorboardStatus.CREATING
 
-        if not TensorboardManager._check_tensorboard_nginx_reachable(tensorboard_ingress_url):
+        # reachability from Nginx is checked in background, here only the last known result is used
+        if not self._readiness_tracker.is_reachable(tensorboard_ingress_url):
             return TensorboardStatus.CREATING
 
         return TensorboardStatus.RUNNING
 
-    def get_by_id(self, id: str) -> Optional[Tensorboard]:
-        name = 'tensorboard-' + id
-        deployment = self.client.get_deployment(name=name, namespace=self.namespace)
-
-        if deployment is None:
-            return None
+    def _get_tensorboard_pod(self, label_selector: str) -> Optional[V1Pod]:
+        pods = self.client.list_pods(namespace=self.namespace,
+                                     label_selector=f'{label_selector},type=nauta-tensorboard')
+        # pods of deleted tensorboards may still exist for some time
+        pods = [pod for pod in pods if not pod.metadata.deletion_timestamp]
+        return pods[0] if pods else None
 
-        ingress = self.client.get_ingress(name=name, namespace=self.namespace)
-
-        pod = self.client.get_pod(namespace=self.namespace, label_selector=f'name={name},type=nauta-tensorboard')
+    def get_by_id(self, id: str) -> Optional[Tensorboard]:
+        cached = self._status_cache.get(id)
+        if cached and not self._is_status_expired(cached, time.monotonic()):
+            return cached[1]
+
+        tensorboard = self._get_by_id(id)
+        now = time.monotonic()
+        # drop expired statuses, e.g. of tensorboards which are not requested anymore
+        for cached_id, cached in list(self._status_cache.items()):
+            if self._is_status_expired(cached, now):
+                self._status_cache.pop(cached_id, None)
+        if tensorboard:
+            self._status_cache[id] = (now, tensorboard)
+        else:
+            self._status_cache.pop(id, None)
+        return tensorboard
+
+    def _is_status_expired(self, cached: Tuple[float, Tensorboard], now: float) -> bool:
+        return now - cached[0] >= self.STATUS_CACHE_TTL[cached[1].status]
+
+    def _get_by_id(self, id: str) -> Optional[Tensorboard]:
+        url = k8s.models.K8STensorboardInstance.generate_ingress_path(id)
+        pod = self._get_tensorboard_pod(label_selector=f'id={id}')
 
         # there might be some time when Kubernetes deployment has been created in cluster,
         # but pod is not present yet in cluster
         if pod is None:
-            return Tensorboard(id=id, status=TensorboardStatus.CREATING, url=ingress.spec.rules[0].http.paths[0].path)
-
-        tensorboard_status = \
-            self._check_tensorboard_status(pod, tensorboard_ingress_url=ingress.spec.rules[0].http.paths[0].path)
+            deployment = self.client.get_deployment(name='tensorboard-' + id, namespace=self.namespace)
+            if deployment is None:
+                return None
+            return Tensorboard(id=id, status=TensorboardStatus.CREATING, url=url)
 
-        return Tensorboard(id=id, status=tensorboard_status, url=ingress.spec.rules[0].http.paths[0].path)
+        return Tensorboard(id=id, status=self._check_tensorboard_status(pod, tensorboard_ingress_url=url), url=url)
 
     def get_by_runs(self, runs: List[Run]) -> Optional[Tensorboard]:
         runs_hash = k8s.models.K8STensorboardInstance.generate_run_names_hash(runs)
 
-        deployments = self.client.list_deployments(namespace=self.namespace,
-                                                   label_selector=f'runs-hash={runs_hash}')
-
-        if len(deployments) == 0:
-            return None
-
-        deployment = deployments[0]
-        deployment_metadata: V1ObjectMeta = deployment.metadata
-        id = deployment_metadata.labels['id']
-
-        ingresses = self.client.list_ingresses(namespace=self.namespace, label_selector=f'id={id}')
-
-        ingress = ingresses[0]
-
-        pod = self.client.get_pod(namespace=self.namespace, label_selector=f'id={id},type=nauta-tensorboard')
+        pod = self._get_tensorboard_pod(label_selector=f'runs-hash={runs_hash}')
 
         if pod is None:
-            return Tensorboard(id=id, status=TensorboardStatus.CREATING, url=ingress.spec.rules[0].http.paths[0].path)
+            deployments = self.client.list_deployments(namespace=self.namespace,
+                                                       label_selector=f'runs-hash={runs_hash}')
+            if len(deployments) == 0:
+                return None
+
+            deployment_metadata: V1ObjectMeta = deployments[0].metadata
+            id = deployment_metadata.labels['id']
+            return Tensorboard(id=id, status=TensorboardStatus.CREATING,
+                               url=k8s.models.K8STensorboardInstance.generate_ingress_path(id))
 
-        tensorboard_status = \
-            self._check_tensorboard_status(pod, tensorboard_ingress_url=ingress.spec.rules[0].http.paths[0].path)
+        id = pod.metadata.labels['id']
+        url = k8s.models.K8STensorboardInstance.generate_ingress_path(id)
 
-        return Tensorboard(id=id, status=tensorboard_status, url=ingress.spec.rules[0].http.paths[0].path)
+        return Tensorboard(id=id, status=self._check_tensorboard_status(pod, tensorboard_ingress_url=url), url=url)
 
     def delete(self, tensorboard_deployment: V1Deployment):
         common_name = tensorboard_deployment.metadata.name
+        id = common_name[len('tensorboard-'):]
+        self._status_cache.pop(id, None)
+        self._readiness_tracker.forget(k8s.models.K8STensorboardInstance.generate_ingress_path(id))
 
         self.client.delete_service(name=common_name, namespace=self.namespace)
 
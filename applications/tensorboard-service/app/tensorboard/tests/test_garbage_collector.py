@@ -0,0 +1,190 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from datetime import datetime, timedelta
+from http import HTTPStatus
+import threading
+import time
+from unittest import mock
+
+from kubernetes.client import V1Deployment, V1ObjectMeta
+from kubernetes.client.rest import ApiException
+import pytest
+
+import tensorboard.garbage_collector
+from tensorboard.garbage_collector import TensorboardGarbageCollector
+from tensorboard.tensorboard import TensorboardManager
+
+FAKE_NAMESPACE = 'fake-namespace'
+CURRENT_DATETIME = datetime(year=2018, month=6, day=19, hour=12, minute=0)
+
+
+def _deployment(name: str) -> V1Deployment:
+    return V1Deployment(metadata=V1ObjectMeta(name=name))
+
+
+def _event(event_type: str, name: str, resource_version: str = '1') -> dict:
+    return {'type': event_type, 'object': _deployment(name),
+            'raw_object': {'metadata': {'name': name, 'resourceVersion': resource_version}}}
+
+
+@pytest.fixture
+def garbage_collector(mocker) -> TensorboardGarbageCollector:
+    mocker.patch.object(TensorboardManager, '_get_current_datetime').return_value = CURRENT_DATETIME
+    manager = mock.MagicMock(namespace=FAKE_NAMESPACE)
+    manager.get_garbage_timeout.return_value = 1800
+    gc = TensorboardGarbageCollector(manager=manager, max_probe_interval=60, retry_interval=5)
+    yield gc
+    gc.stop()
+
+
+# noinspection PyShadowingNames
+def test_handle_watch_event(garbage_collector: TensorboardGarbageCollector):
+    garbage_collector.handle_watch_event(_event('ADDED', 'tb-1'))
+    garbage_collector.handle_watch_event(_event('ADDED', 'tb-2'))
+    garbage_collector.handle_watch_event(_event('MODIFIED', 'tb-2'))
+    garbage_collector.handle_watch_event(_event('DELETED', 'tb-1'))
+
+    assert garbage_collector.deployment_names == {'tb-2'}
+
+
+# noinspection PyShadowingNames
+def test_replace_deployments(garbage_collector: TensorboardGarbageCollector):
+    garbage_collector.add_deployment(_deployment('tb-1'))
+    garbage_collector.add_deployment(_deployment('tb-2'))
+
+    garbage_collector.replace_deployments([_deployment('tb-2'), _deployment('tb-3')])
+
+    assert garbage_collector.deployment_names == {'tb-2', 'tb-3'}
+
+
+# noinspection PyShadowingNames
+def test_submit_due_probes(mocker, garbage_collector: TensorboardGarbageCollector):
+    executor_mock = mocker.patch.object(garbage_collector, '_executor')
+    garbage_collector.add_deployment(_deployment('tb-1'))
+    garbage_collector.add_deployment(_deployment('tb-2'))
+    garbage_collector.add_deployment(_deployment('tb-3'))
+    garbage_collector.remove_deployment('tb-3')
+    garbage_collector._schedule_probe('tb-1', delay=30)
+
+    next_probe_delay = garbage_collector.submit_due_probes()
+
+    submitted = [call[0][1] for call in executor_mock.submit.call_args_list]
+    assert sorted(submitted) == ['tb-1', 'tb-2']
+    assert 0 < next_probe_delay <= 30
+    # probe of tb-1 is in progress, so the second one is not submitted
+    garbage_collector._schedule_probe('tb-1', delay=0)
+    garbage_collector.submit_due_probes()
+    assert executor_mock.submit.call_count == 2
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize('last_request_datetime,expected_delay,delete_count', [
+    (CURRENT_DATETIME, 60, 0),
+    (CURRENT_DATETIME - timedelta(minutes=29, seconds=30), 30, 0),
+    (CURRENT_DATETIME - timedelta(minutes=30), None, 1),
+    (CURRENT_DATETIME - timedelta(hours=1), None, 1),
+    (None, 5, 0)
+])
+def test_probe(mocker, garbage_collector: TensorboardGarbageCollector, last_request_datetime, expected_delay,
+               delete_count):
+    mocker.patch.object(tensorboard.garbage_collector, 'try_get_last_request_datetime').return_value = \
+        last_request_datetime
+    garbage_collector.add_deployment(_deployment('tb-1'))
+
+    assert garbage_collector.probe('tb-1') == expected_delay
+    assert garbage_collector.manager.delete.call_count == delete_count
+    assert garbage_collector.deployment_names == ({'tb-1'} if not delete_count else set())
+
+
+# noinspection PyShadowingNames
+def test_probe_failure_is_retried(mocker, garbage_collector: TensorboardGarbageCollector):
+    mocker.patch.object(garbage_collector, 'probe').side_effect = RuntimeError
+    schedule_mock = mocker.patch.object(garbage_collector, '_schedule_probe')
+    garbage_collector.add_deployment(_deployment('tb-1'))
+
+    garbage_collector._probe('tb-1')
+
+    schedule_mock.assert_called_with('tb-1', delay=5)
+
+
+# noinspection PyShadowingNames
+def test_watch_deployments(garbage_collector: TensorboardGarbageCollector):
+    client = garbage_collector.manager.client
+    client.list_deployments_with_version.side_effect = [([_deployment('tb-1'), _deployment('tb-2')], '10'),
+                                                        ([_deployment('tb-4')], '20')]
+
+    def fake_watch(resource_version, **kwargs):
+        if resource_version == '10':
+            yield _event('ADDED', 'tb-3', resource_version='11')
+            yield _event('DELETED', 'tb-1', resource_version='12')
+        elif resource_version == '12':
+            yield {'type': 'ERROR', 'object': None, 'raw_object': {'code': HTTPStatus.GONE.value}}
+        else:
+            garbage_collector._stopped.set()
+            return
+            yield
+
+    client.watch_deployments.side_effect = fake_watch
+
+    garbage_collector.watch_deployments()
+
+    assert [call[1]['resource_version'] for call in client.watch_deployments.call_args_list] == ['10', '12', '20']
+    assert client.list_deployments_with_version.call_count == 2
+    assert garbage_collector.deployment_names == {'tb-4'}
+
+
+# noinspection PyShadowingNames
+def test_watch_deployments_gateway_timeout(mocker, garbage_collector: TensorboardGarbageCollector):
+    client = garbage_collector.manager.client
+    client.list_deployments_with_version.side_effect = ApiException(status=HTTPStatus.GATEWAY_TIMEOUT.value)
+    mocker.patch.object(garbage_collector._stopped, 'wait').side_effect = lambda *args: garbage_collector.stop()
+
+    garbage_collector.watch_deployments()
+
+    assert client.watch_deployments.call_count == 0
+
+
+# noinspection PyShadowingNames
+def test_probes_are_concurrent(mocker, garbage_collector: TensorboardGarbageCollector):
+    def slow_probe(proxy_address, timeout):
+        time.sleep(0.2)
+        return CURRENT_DATETIME - timedelta(hours=1)
+
+    # MagicMock doesn't record calls from concurrent threads reliably
+    deleted_names = set()
+    delete_lock = threading.Lock()
+
+    def delete(deployment: V1Deployment):
+        with delete_lock:
+            deleted_names.add(deployment.metadata.name)
+
+    mocker.patch.object(tensorboard.garbage_collector, 'try_get_last_request_datetime', new=slow_probe)
+    garbage_collector.manager.delete = delete
+    for i in range(8):
+        garbage_collector.add_deployment(_deployment(f'tb-{i}'))
+
+    scheduler_thread = threading.Thread(target=garbage_collector.run_scheduler, daemon=True)
+    start = time.monotonic()
+    scheduler_thread.start()
+    while garbage_collector.deployment_names and time.monotonic() - start < 5:
+        time.sleep(0.01)
+    elapsed = time.monotonic() - start
+    garbage_collector.stop()
+    scheduler_thread.join(timeout=1)
+
+    assert deleted_names == {f'tb-{i}' for i in range(8)}
+    assert elapsed < 1
@@ -0,0 +1,140 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+from unittest.mock import MagicMock
+
+from tensorboard.readiness_tracker import ReadinessTracker
+
+FAKE_URL = '/tb/cda7ad77-c499-4ef7-8f73-be7ce254be6a/'
+
+
+def _wait_for_checks(tracker: ReadinessTracker):
+    tracker._executor.submit(lambda: None).result(timeout=5)
+    tracker._executor.shutdown(wait=True)
+
+
+def test_is_reachable():
+    check_mock = MagicMock(return_value=True)
+    tracker = ReadinessTracker(check_function=check_mock, max_workers=1)
+
+    assert not tracker.is_reachable(FAKE_URL)
+    _wait_for_checks(tracker)
+
+    assert tracker.is_reachable(FAKE_URL)
+    assert tracker.is_reachable(FAKE_URL)
+    check_mock.assert_called_once_with(FAKE_URL)
+
+
+def test_is_reachable_does_not_block():
+    check_started = threading.Event()
+    release_check = threading.Event()
+
+    def slow_check(url):
+        check_started.set()
+        release_check.wait(timeout=5)
+        return True
+
+    tracker = ReadinessTracker(check_function=slow_check, max_workers=1, recheck_interval=0)
+
+    assert not tracker.is_reachable(FAKE_URL)
+    assert check_started.wait(timeout=5)
+    # check is still in progress, so the next call neither waits nor starts another check
+    assert not tracker.is_reachable(FAKE_URL)
+    release_check.set()
+    _wait_for_checks(tracker)
+
+    assert tracker.is_reachable(FAKE_URL)
+
+
+def test_is_reachable_recheck_interval(mocker):
+    check_mock = MagicMock(side_effect=[False, Exception, True])
+    tracker = ReadinessTracker(check_function=check_mock, max_workers=1, recheck_interval=10)
+    monotonic_mock = mocker.patch('tensorboard.readiness_tracker.time.monotonic')
+    monotonic_mock.return_value = 100
+
+    tracker.is_reachable(FAKE_URL)
+    tracker._executor.submit(lambda: None).result(timeout=5)
+    monotonic_mock.return_value = 105
+    assert not tracker.is_reachable(FAKE_URL)
+    assert check_mock.call_count == 1
+
+    monotonic_mock.return_value = 111
+    assert not tracker.is_reachable(FAKE_URL)
+    tracker._executor.submit(lambda: None).result(timeout=5)
+    monotonic_mock.return_value = 122
+    assert not tracker.is_reachable(FAKE_URL)
+    _wait_for_checks(tracker)
+
+    assert check_mock.call_count == 3
+    assert tracker.is_reachable(FAKE_URL)
+
+
+def test_is_reachable_rechecked_after_ttl(mocker):
+    check_mock = MagicMock(side_effect=[True, True, False])
+    tracker = ReadinessTracker(check_function=check_mock, max_workers=1, recheck_interval=10, reachable_ttl=60)
+    monotonic_mock = mocker.patch('tensorboard.readiness_tracker.time.monotonic')
+    monotonic_mock.return_value = 100
+
+    tracker.is_reachable(FAKE_URL)
+    tracker._executor.submit(lambda: None).result(timeout=5)
+    monotonic_mock.return_value = 150
+    assert tracker.is_reachable(FAKE_URL)
+    assert check_mock.call_count == 1
+
+    monotonic_mock.return_value = 161
+    # last known result is returned until the check is finished
+    assert tracker.is_reachable(FAKE_URL)
+    tracker._executor.submit(lambda: None).result(timeout=5)
+    assert check_mock.call_count == 2
+
+    monotonic_mock.return_value = 222
+    assert tracker.is_reachable(FAKE_URL)
+    _wait_for_checks(tracker)
+
+    assert check_mock.call_count == 3
+    assert not tracker.is_reachable(FAKE_URL)
+
+
+def test_is_reachable_forgets_stale_instances(mocker):
+    other_url = '/tb/9f4e9b8e-0b8a-4a7b-a6a1-0e0f3bd1d1b5/'
+    tracker = ReadinessTracker(check_function=MagicMock(return_value=False), max_workers=1, forget_after=600)
+    monotonic_mock = mocker.patch('tensorboard.readiness_tracker.time.monotonic')
+    tracker._reachable[FAKE_URL] = 100
+    tracker._last_check_time[other_url] = 100
+
+    monotonic_mock.return_value = 699
+    tracker.is_reachable('/tb/new/')
+    tracker._executor.submit(lambda: None).result(timeout=5)
+    assert FAKE_URL in tracker._reachable
+    assert other_url in tracker._last_check_time
+
+    monotonic_mock.return_value = 701
+    tracker.is_reachable('/tb/another/')
+    _wait_for_checks(tracker)
+
+    assert FAKE_URL not in tracker._reachable
+    assert other_url not in tracker._last_check_time
+    assert '/tb/new/' in tracker._last_check_time
+
+
+def test_forget():
+    tracker = ReadinessTracker(check_function=MagicMock(return_value=True), max_workers=1)
+    tracker._reachable[FAKE_URL] = 0
+
+    tracker.forget(FAKE_URL)
+
+    assert FAKE_URL not in tracker._reachable
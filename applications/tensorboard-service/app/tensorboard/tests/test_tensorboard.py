@@ -18,9 +18,7 @@ from datetime import datetime
 from http import HTTPStatus
 from unittest import mock
 
-from kubernetes.client import V1Deployment, V1ObjectMeta, V1beta1Ingress, V1Pod, V1beta1IngressSpec, \
-    V1beta1IngressRule, V1beta1HTTPIngressRuleValue, V1beta1HTTPIngressPath, V1PodStatus, V1beta1IngressBackend, \
-    V1ContainerStatus
+from kubernetes.client import V1Deployment, V1ObjectMeta, V1Pod, V1PodStatus, V1ContainerStatus
 from kubernetes.client.rest import ApiException
 import pytest
 from pytest_mock import MockFixture
@@ -28,7 +26,7 @@ from pytest_mock import MockFixture
 from k8s.models import K8STensorboardInstance
 import tensorboard.tensorboard
 from tensorboard.tensorboard import TensorboardManager
-from tensorboard.models import TensorboardStatus, Run
+from tensorboard.models import Tensorboard, TensorboardStatus, Run
 
 FAKE_NAMESPACE = "fake-namespace"
 
@@ -58,6 +56,16 @@ def test_incluster_init(mocker: MockFixture):
     assert mgr.client
 
 
+def test_get_shared_instance(mocker: MockFixture):
+    mocker.patch.object(TensorboardManager, '_shared_instance', new=None)
+    incluster_init_mock = mocker.patch.object(TensorboardManager, 'incluster_init')
+
+    mgr = TensorboardManager.get_shared_instance()
+
+    assert TensorboardManager.get_shared_instance() is mgr
+    assert incluster_init_mock.call_count == 1
+
+
 # noinspection PyShadowingNames
 def test_create(tensorboard_manager_mocked: TensorboardManager):
     fake_runs = [
@@ -94,42 +102,14 @@ def test_list(tensorboard_manager_mocked: TensorboardManager):
         assert_called_once_with(namespace=FAKE_NAMESPACE, label_selector='type=nauta-tensorboard')
 
 
-# noinspection PyShadowingNames
-@pytest.mark.parametrize(['fake_tensorboard_pod_phase', 'expected_tensorboard_status'],
-                         [('RUNNING', TensorboardStatus.RUNNING),
-                          ('running', TensorboardStatus.RUNNING),  # check if case-insensitive
-                          ('Pending', TensorboardStatus.CREATING),
-                          ('PENDING', TensorboardStatus.CREATING),
-                          ('FAILED', TensorboardStatus.CREATING),
-                          ('SUCCEEDED', TensorboardStatus.CREATING),
-                          ('UNKNOWN', TensorboardStatus.CREATING),
-                          ('invalid_phase', TensorboardStatus.CREATING)]
-                         )
-def test_get_by_id(mocker: MockFixture,
-                   tensorboard_manager_mocked: TensorboardManager,
-                   fake_tensorboard_pod_phase: str,
-                   expected_tensorboard_status: TensorboardStatus):
-    fake_tensorboard_id = 'cda7ad77-c499-4ef7-8f73-be7ce254be6a'
-    fake_tensorboard_path = '/tb/' + fake_tensorboard_id
-
-    fake_deployment = V1Deployment()
-    fake_ingress = V1beta1Ingress(spec=V1beta1IngressSpec(
-        rules=[
-            V1beta1IngressRule(
-                http=V1beta1HTTPIngressRuleValue(
-                    paths=[V1beta1HTTPIngressPath(
-                        backend=V1beta1IngressBackend(service_name='fake-service', service_port=80),
-                        path=fake_tensorboard_path)]
-                )
-            )
-        ]
-    ))
-    fake_pod = V1Pod(
+def _fake_pod(phase: str, labels: dict = None, ready: bool = True) -> V1Pod:
+    return V1Pod(
+        metadata=V1ObjectMeta(labels=labels),
         status=V1PodStatus(
-            phase=fake_tensorboard_pod_phase,
+            phase=phase,
             container_statuses=[
                 V1ContainerStatus(
-                    ready=True,
+                    ready=ready,
                     image='',
                     image_id='',
                     name='',
@@ -146,19 +126,68 @@ def test_get_by_id(mocker: MockFixture,
         )
     )
 
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = fake_deployment
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_ingress').return_value = fake_ingress
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_pod').return_value = fake_pod
-    mocker.patch('tensorboard.tensorboard.TensorboardManager._check_tensorboard_nginx_reachable').return_value = True
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize(['fake_tensorboard_pod_phase', 'expected_tensorboard_status'],
+                         [('RUNNING', TensorboardStatus.RUNNING),
+                          ('running', TensorboardStatus.RUNNING),  # check if case-insensitive
+                          ('Pending', TensorboardStatus.CREATING),
+                          ('PENDING', TensorboardStatus.CREATING),
+                          ('FAILED', TensorboardStatus.CREATING),
+                          ('SUCCEEDED', TensorboardStatus.CREATING),
+                          ('UNKNOWN', TensorboardStatus.CREATING),
+                          ('invalid_phase', TensorboardStatus.CREATING)]
+                         )
+def test_get_by_id(mocker: MockFixture,
+                   tensorboard_manager_mocked: TensorboardManager,
+                   fake_tensorboard_pod_phase: str,
+                   expected_tensorboard_status: TensorboardStatus):
+    fake_tensorboard_id = 'cda7ad77-c499-4ef7-8f73-be7ce254be6a'
+    fake_tensorboard_path = '/tb/' + fake_tensorboard_id + '/'
+
+    list_pods_mock = mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods')
+    list_pods_mock.return_value = [_fake_pod(fake_tensorboard_pod_phase, labels={'id': fake_tensorboard_id})]
+    mocker.patch.object(tensorboard_manager_mocked._readiness_tracker, 'is_reachable').return_value = True
     tensorboard = tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id)
 
     assert tensorboard.id == fake_tensorboard_id
     assert tensorboard.status == expected_tensorboard_status
     assert tensorboard.url == fake_tensorboard_path
+    list_pods_mock.assert_called_once_with(namespace=FAKE_NAMESPACE,
+                                           label_selector=f'id={fake_tensorboard_id},type=nauta-tensorboard')
+    assert tensorboard_manager_mocked.client.get_deployment.call_count == 0
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize(['reachable', 'containers_ready'], [(False, True), (True, False)])
+def test_get_by_id_not_ready(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager,
+                             reachable: bool, containers_ready: bool):
+    fake_tensorboard_id = 'cda7ad77-c499-4ef7-8f73-be7ce254be6a'
+
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods').return_value = \
+        [_fake_pod('Running', labels={'id': fake_tensorboard_id}, ready=containers_ready)]
+    mocker.patch.object(tensorboard_manager_mocked._readiness_tracker, 'is_reachable').return_value = reachable
+
+    tensorboard = tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id)
+
+    assert tensorboard.status == TensorboardStatus.CREATING
 
 
 # noinspection PyShadowingNames
 def test_get_by_id_not_found(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods').return_value = []
+    mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = None
+
+    tensorboard = tensorboard_manager_mocked.get_by_id(id='296ef39e-d4d8-48cd-bc6e-e27bc8fc1c2d')
+
+    assert tensorboard is None
+
+
+# noinspection PyShadowingNames
+def test_get_by_id_pod_terminating(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    terminating_pod = _fake_pod('Running')
+    terminating_pod.metadata.deletion_timestamp = datetime(year=2018, month=6, day=19, hour=12, minute=0)
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods').return_value = [terminating_pod]
     mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = None
 
     tensorboard = tensorboard_manager_mocked.get_by_id(id='296ef39e-d4d8-48cd-bc6e-e27bc8fc1c2d')
@@ -171,24 +200,10 @@ def test_get_by_id_not_found(mocker: MockFixture, tensorboard_manager_mocked: Te
 # noinspection PyShadowingNames
 def test_get_by_id_pod_not_created_yet(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
     fake_tensorboard_id = '72a5cabc-548c-4a66-8ea9-645736569dfd'
-    fake_tensorboard_path = '/tb/' + fake_tensorboard_id
-
-    fake_deployment = V1Deployment()
-    fake_ingress = V1beta1Ingress(spec=V1beta1IngressSpec(
-        rules=[
-            V1beta1IngressRule(
-                http=V1beta1HTTPIngressRuleValue(
-                    paths=[V1beta1HTTPIngressPath(
-                        backend=V1beta1IngressBackend(service_name='fake-service', service_port=80),
-                        path=fake_tensorboard_path)]
-                )
-            )
-        ]
-    ))
+    fake_tensorboard_path = '/tb/' + fake_tensorboard_id + '/'
 
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = fake_deployment
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_ingress').return_value = fake_ingress
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_pod').return_value = None
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods').return_value = []
+    mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = V1Deployment()
 
     tensorboard = tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id)
 
@@ -197,12 +212,60 @@ def test_get_by_id_pod_not_created_yet(mocker: MockFixture, tensorboard_manager_
     assert tensorboard.url == fake_tensorboard_path
 
 
+# noinspection PyShadowingNames
+@pytest.mark.parametrize(['status', 'elapsed_time', 'expected_get_count'],
+                         [(TensorboardStatus.CREATING, 1, 1),
+                          (TensorboardStatus.CREATING, 3, 2),
+                          (TensorboardStatus.RUNNING, 4, 1),
+                          (TensorboardStatus.RUNNING, 6, 2)])
+def test_get_by_id_status_cache(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager,
+                                status: TensorboardStatus, elapsed_time: float, expected_get_count: int):
+    fake_tensorboard_id = '72a5cabc-548c-4a66-8ea9-645736569dfd'
+    get_mock = mocker.patch.object(tensorboard_manager_mocked, '_get_by_id')
+    get_mock.return_value = Tensorboard(id=fake_tensorboard_id, status=status)
+    monotonic_mock = mocker.patch.object(tensorboard.tensorboard.time, 'monotonic')
+    monotonic_mock.return_value = 100
+
+    tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id)
+    monotonic_mock.return_value = 100 + elapsed_time
+    assert tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id).status == status
+
+    assert get_mock.call_count == expected_get_count
+
+
+# noinspection PyShadowingNames
+def test_get_by_id_status_cache_drops_expired_statuses(mocker: MockFixture,
+                                                       tensorboard_manager_mocked: TensorboardManager):
+    get_mock = mocker.patch.object(tensorboard_manager_mocked, '_get_by_id')
+    get_mock.side_effect = lambda id: Tensorboard(id=id, status=TensorboardStatus.RUNNING)
+    monotonic_mock = mocker.patch.object(tensorboard.tensorboard.time, 'monotonic')
+    monotonic_mock.return_value = 100
+
+    tensorboard_manager_mocked.get_by_id(id='deleted-tensorboard')
+    monotonic_mock.return_value = 100 + TensorboardManager.STATUS_CACHE_TTL[TensorboardStatus.RUNNING]
+    tensorboard_manager_mocked.get_by_id(id='other-tensorboard')
+
+    assert list(tensorboard_manager_mocked._status_cache) == ['other-tensorboard']
+
+
+# noinspection PyShadowingNames
+def test_get_by_id_status_cache_cleared_on_delete(mocker: MockFixture,
+                                                  tensorboard_manager_mocked: TensorboardManager):
+    fake_tensorboard_id = '72a5cabc-548c-4a66-8ea9-645736569dfd'
+    get_mock = mocker.patch.object(tensorboard_manager_mocked, '_get_by_id')
+    get_mock.return_value = Tensorboard(id=fake_tensorboard_id, status=TensorboardStatus.RUNNING)
+
+    tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id)
+    tensorboard_manager_mocked.delete(V1Deployment(metadata=V1ObjectMeta(name='tensorboard-' + fake_tensorboard_id)))
+    get_mock.return_value = None
+
+    assert tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id) is None
+
+
 # noinspection PyShadowingNames
 def test_get_by_runs(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
     fake_tensorboard_id = '5c0b46de-4017-4062-9ac8-94698cc0c513'
     fake_tensorboard_path = '/tb/' + fake_tensorboard_id + '/'
-    fake_tensorboard_pod_phase = 'RUNNING'
-    expected_tensorboard_status = TensorboardStatus.RUNNING
     runs = [
         Run(
             name='run-name-1',
@@ -219,49 +282,23 @@ def test_get_by_runs(mocker: MockFixture, tensorboard_manager_mocked: Tensorboar
     ]
 
     k8s_tensorboard = K8STensorboardInstance.from_runs(id=fake_tensorboard_id, runs=runs)
+    fake_pod = _fake_pod('RUNNING', labels=k8s_tensorboard.deployment.spec.template.metadata.labels)
 
     # mocking manually this method is done because we want to mock Kubernetes behaviour to check, if our code
-    # requests Kubernetes API server for deployment with proper label_selector. If label_selector matches
-    # created deployment, this mocked method will return it. Our code should pass the same label_selector regardless of
+    # requests Kubernetes API server for pods with proper label_selector. If label_selector matches
+    # created pod, this mocked method will return it. Our code should pass the same label_selector regardless of
     # order of run_names in get_by_run_names parameter. That's why we create below get_run_names with other order to
-    # check if returned deployment would still be the same.
+    # check if returned pod would still be the same.
     # noinspection PyUnusedLocal
-    def _fake_list_deployments(namespace: str, label_selector: str):
-        deployments = [k8s_tensorboard.deployment]
-
-        splitted_label_selector = label_selector.split('=')
-        label_selector_key = splitted_label_selector[0]
-        label_selector_value = splitted_label_selector[1]
+    def _fake_list_pods(namespace: str, label_selector: str):
+        for requirement in label_selector.split(','):
+            label_selector_key, label_selector_value = requirement.split('=')
+            if fake_pod.metadata.labels[label_selector_key] != label_selector_value:
+                return []
+        return [fake_pod]
 
-        if deployments[0].metadata.labels[label_selector_key] == label_selector_value:
-            return deployments
-
-    fake_pod = V1Pod(
-        status=V1PodStatus(
-            phase=fake_tensorboard_pod_phase,
-            container_statuses=[
-                V1ContainerStatus(
-                    ready=True,
-                    image='',
-                    image_id='',
-                    name='',
-                    restart_count=0
-                ),
-                V1ContainerStatus(
-                    ready=True,
-                    image='',
-                    image_id='',
-                    name='',
-                    restart_count=0
-                )
-            ]
-        )
-    )
-
-    mocker.patch.object(tensorboard_manager_mocked.client, 'list_deployments', new=_fake_list_deployments)
-    mocker.patch.object(tensorboard_manager_mocked.client, 'list_ingresses').return_value = [k8s_tensorboard.ingress]
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_pod').return_value = fake_pod
-    mocker.patch('tensorboard.tensorboard.TensorboardManager._check_tensorboard_nginx_reachable').return_value = True
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods', new=_fake_list_pods)
+    mocker.patch.object(tensorboard_manager_mocked._readiness_tracker, 'is_reachable').return_value = True
 
     get_runs = [
         Run(
@@ -281,13 +318,16 @@ def test_get_by_runs(mocker: MockFixture, tensorboard_manager_mocked: Tensorboar
     tensorboard = tensorboard_manager_mocked.get_by_runs(get_runs)
 
     assert tensorboard.id == fake_tensorboard_id
-    assert tensorboard.status == expected_tensorboard_status
+    assert tensorboard.status == TensorboardStatus.RUNNING
     assert tensorboard.url == fake_tensorboard_path
+    assert tensorboard_manager_mocked.client.list_deployments.call_count == 0
+    assert tensorboard_manager_mocked.client.list_ingresses.call_count == 0
 
 
 # noinspection PyShadowingNames
 def test_get_by_run_names_not_found(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = None
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods').return_value = []
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_deployments').return_value = []
 
     get_runs = [
         Run(
@@ -329,10 +369,9 @@ def test_get_by_runs_not_created_yet(mocker: MockFixture, tensorboard_manager_mo
 
     k8s_tensorboard = K8STensorboardInstance.from_runs(id=fake_tensorboard_id, runs=runs)
 
+    mocker.patch.object(tensorboard_manager_mocked.client, 'list_pods').return_value = []
     mocker.patch.object(tensorboard_manager_mocked.client, 'list_deployments').return_value = \
         [k8s_tensorboard.deployment]
-    mocker.patch.object(tensorboard_manager_mocked.client, 'list_ingresses').return_value = [k8s_tensorboard.ingress]
-    mocker.patch.object(tensorboard_manager_mocked.client, 'get_pod').return_value = None
 
     tensorboard = tensorboard_manager_mocked.get_by_runs(runs)
 
@@ -17,11 +17,13 @@
 import logging as log
 # noinspection PyProtectedMember
 from os import getenv, _exit, path
-from time import sleep
+from typing import Dict, Optional
 
 from kubernetes import client, config
 from kubernetes.client import V1Job, V1JobStatus
 
+from k8s_waiter import wait_for
+
 END_HOOK_FILEPATH = "/pod-data/END"
 
 log.basicConfig(level=log.DEBUG)
@@ -52,28 +54,38 @@ def main():
 
     v1 = client.BatchV1Api()
 
-    while True:
-        batch_wrapper_job: V1Job = v1.read_namespaced_job(name=batch_wrapper_job_name, namespace=my_current_namespace)
+    def check_batch_wrapper_job(jobs: Dict[str, V1Job]) -> Optional[V1JobStatus]:
+        batch_wrapper_job = jobs.get(batch_wrapper_job_name)
+        if batch_wrapper_job and is_job_finished(batch_wrapper_job.status):
+            return batch_wrapper_job.status
+        return None
+
+    wait_for(list_function=v1.list_namespaced_job, check=check_batch_wrapper_job, namespace=my_current_namespace,
+             field_selector=f"metadata.name={batch_wrapper_job_name}")
+
+    open(END_HOOK_FILEPATH, 'a').close()
+    log.info("exiting...")
+
 
-        batch_wrapper_job_status: V1JobStatus = batch_wrapper_job.status
+def is_job_finished(batch_wrapper_job_status: V1JobStatus) -> bool:
+    if batch_wrapper_job_status is None:
+        return False
 
-        active_pods = batch_wrapper_job_status.active if batch_wrapper_job_status.active is not None else 0
-        succeeded_pods = batch_wrapper_job_status.succeeded if batch_wrapper_job_status.succeeded is not None else 0
+    active_pods = batch_wrapper_job_status.active if batch_wrapper_job_status.active is not None else 0
+    succeeded_pods = batch_wrapper_job_status.succeeded if batch_wrapper_job_status.succeeded is not None else 0
 
-        # model server should also be closed when there is failure in batch wrapper job
-        if hasattr(batch_wrapper_job_status, 'failed') and batch_wrapper_job_status.failed is not None:
-            failed_pods = batch_wrapper_job_status.failed
-        else:
-            failed_pods = 0
+    # model server should also be closed when there is failure in batch wrapper job
+    if hasattr(batch_wrapper_job_status, 'failed') and batch_wrapper_job_status.failed is not None:
+        failed_pods = batch_wrapper_job_status.failed
+    else:
+        failed_pods = 0
 
-        if active_pods == 0 and (succeeded_pods > 0 or failed_pods > 0):
-            log.info(f"active_pods == {active_pods}, succeeded_pods == {succeeded_pods}, failed_pods == {failed_pods}, "
-                     f"creating END hook")
-            open(END_HOOK_FILEPATH, 'a').close()
-            log.info("exiting...")
-            return
+    if active_pods == 0 and (succeeded_pods > 0 or failed_pods > 0):
+        log.info(f"active_pods == {active_pods}, succeeded_pods == {succeeded_pods}, failed_pods == {failed_pods}, "
+                 f"creating END hook")
+        return True
 
-        sleep(1)
+    return False
 
 
 if __name__ == '__main__':
@@ -0,0 +1,143 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from http import HTTPStatus
+from typing import Dict, List, Optional
+
+from kubernetes.client import V1ListMeta, V1ObjectMeta, V1Pod, V1PodList, V1PodStatus
+from kubernetes.client.rest import ApiException
+from pytest import fixture, raises
+
+from k8s_waiter import wait_for
+
+FAKE_NAMESPACE = 'fake-namespace'
+
+
+def _pod(name: str, phase: str, resource_version: str) -> V1Pod:
+    return V1Pod(metadata=V1ObjectMeta(name=name, resource_version=resource_version), status=V1PodStatus(phase=phase))
+
+
+def _event(event_type: str, pod: V1Pod) -> dict:
+    return {'type': event_type, 'object': pod, 'raw_object': {}}
+
+
+def _pod_list(pods: List[V1Pod], resource_version: str) -> V1PodList:
+    return V1PodList(items=pods, metadata=V1ListMeta(resource_version=resource_version))
+
+
+class FakeWatch:
+    """
+    Replaces kubernetes.watch.Watch - every stream returns the next list of scripted events, exceptions in
+    the list are raised instead of being returned, and arguments of streams are recorded.
+    """
+
+    def __init__(self, streams: List):
+        self.streams = list(streams)
+        self.stream_kwargs: List[dict] = []
+
+    def __call__(self):
+        return self
+
+    def stream(self, func, **kwargs):
+        self.stream_kwargs.append(kwargs)
+        for event in self.streams.pop(0):
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+
+def all_succeeded(pods: Dict[str, V1Pod]) -> Optional[List[str]]:
+    if pods and all(pod.status.phase == 'Succeeded' for pod in pods.values()):
+        return sorted(pods)
+    return None
+
+
+@fixture
+def sleep_mock(mocker):
+    return mocker.patch('k8s_waiter.sleep')
+
+
+def test_wait_for_already_met(mocker, sleep_mock):
+    list_function = mocker.MagicMock(return_value=_pod_list([_pod('a', 'Succeeded', '1')], resource_version='1'))
+    fake_watch = FakeWatch([])
+
+    assert wait_for(list_function=list_function, check=all_succeeded, namespace=FAKE_NAMESPACE,
+                    label_selector='runName=run', watch_factory=fake_watch) == ['a']
+    list_function.assert_called_once_with(namespace=FAKE_NAMESPACE, label_selector='runName=run')
+    assert fake_watch.stream_kwargs == []
+
+
+def test_wait_for_watch_resumed(mocker, sleep_mock):
+    list_function = mocker.MagicMock(return_value=_pod_list([_pod('a', 'Running', '1'), _pod('b', 'Running', '2')],
+                                                            resource_version='10'))
+    fake_watch = FakeWatch([
+        [_event('MODIFIED', _pod('a', 'Succeeded', '11')), _event('ADDED', _pod('c', 'Running', '12'))],
+        [_event('DELETED', _pod('c', 'Running', '13')), _event('MODIFIED', _pod('b', 'Succeeded', '14'))]
+    ])
+
+    assert wait_for(list_function=list_function, check=all_succeeded, namespace=FAKE_NAMESPACE,
+                    field_selector='metadata.name=a', watch_timeout=60, watch_factory=fake_watch) == ['a', 'b']
+    assert list_function.call_count == 1
+    assert [kwargs['resource_version'] for kwargs in fake_watch.stream_kwargs] == ['10', '12']
+    assert fake_watch.stream_kwargs[0] == {'namespace': FAKE_NAMESPACE, 'resource_version': '10',
+                                           'timeout_seconds': 60, 'field_selector': 'metadata.name=a'}
+    assert sleep_mock.call_count == 0
+
+
+def test_wait_for_expired_resource_version(mocker, sleep_mock):
+    list_function = mocker.MagicMock(side_effect=[
+        _pod_list([_pod('a', 'Running', '1')], resource_version='10'),
+        _pod_list([_pod('a', 'Running', '1')], resource_version='20')])
+    fake_watch = FakeWatch([
+        [{'type': 'ERROR', 'object': None, 'raw_object': {'code': HTTPStatus.GONE.value}}],
+        [_event('MODIFIED', _pod('a', 'Succeeded', '21'))]
+    ])
+
+    assert wait_for(list_function=list_function, check=all_succeeded, namespace=FAKE_NAMESPACE,
+                    watch_factory=fake_watch) == ['a']
+    assert list_function.call_count == 2
+    assert [kwargs['resource_version'] for kwargs in fake_watch.stream_kwargs] == ['10', '20']
+    assert sleep_mock.call_count == 0
+
+
+def test_wait_for_backoff(mocker, sleep_mock):
+    list_function = mocker.MagicMock(side_effect=[
+        ApiException(status=HTTPStatus.INTERNAL_SERVER_ERROR.value),
+        _pod_list([_pod('a', 'Running', '1')], resource_version='10'),
+        _pod_list([_pod('a', 'Running', '1')], resource_version='20'),
+        ApiException(status=HTTPStatus.INTERNAL_SERVER_ERROR.value),
+        _pod_list([_pod('a', 'Running', '1')], resource_version='30'),
+        _pod_list([_pod('a', 'Running', '1')], resource_version='40')])
+    fake_watch = FakeWatch([
+        [ApiException(status=HTTPStatus.GATEWAY_TIMEOUT.value)],
+        [{'type': 'ERROR', 'object': None, 'raw_object': {'code': HTTPStatus.INTERNAL_SERVER_ERROR.value}}],
+        [_event('MODIFIED', _pod('a', 'Running', '31')), ValueError()],
+        [_event('MODIFIED', _pod('a', 'Succeeded', '41'))]
+    ])
+
+    assert wait_for(list_function=list_function, check=all_succeeded, namespace=FAKE_NAMESPACE,
+                    initial_backoff=1, max_backoff=4, watch_factory=fake_watch) == ['a']
+    # backoff is reset after an event is received
+    assert [call[0][0] for call in sleep_mock.call_args_list] == [1, 2, 4, 4, 1]
+
+
+def test_wait_for_check_failure(mocker, sleep_mock):
+    list_function = mocker.MagicMock(return_value=_pod_list([_pod('a', 'Running', '1')], resource_version='10'))
+    check = mocker.MagicMock(side_effect=[None, KeyboardInterrupt])
+    fake_watch = FakeWatch([[_event('MODIFIED', _pod('a', 'Succeeded', '11'))]])
+
+    with raises(KeyboardInterrupt):
+        wait_for(list_function=list_function, check=check, namespace=FAKE_NAMESPACE, watch_factory=fake_watch)
@@ -14,67 +14,86 @@
 # limitations under the License.
 #
 
-from kubernetes.client import V1Job, V1JobStatus
+from kubernetes.client import V1Job, V1JobList, V1JobStatus, V1ListMeta, V1ObjectMeta
 from pytest import fixture, raises
 
 from main import main
+from test_k8s_waiter import FakeWatch
+
+FAKE_JOB_NAME = 'fake_job_name'
+
+
+def _job(status: V1JobStatus, resource_version: str) -> V1Job:
+    return V1Job(metadata=V1ObjectMeta(name=FAKE_JOB_NAME, resource_version=resource_version), status=status)
+
+
+def _job_list(status: V1JobStatus) -> V1JobList:
+    return V1JobList(items=[_job(status, resource_version='1')], metadata=V1ListMeta(resource_version='1'))
 
 
 @fixture
 def main_mock(mocker):
     mocker.patch('os.path.isfile').return_value = False
     kubernetes_config_load = mocker.patch('kubernetes.config.load_incluster_config')
-    mocker.patch('main.getenv').return_value = "fake_job_name"
+    mocker.patch('main.getenv').return_value = FAKE_JOB_NAME
     file_mock = mocker.MagicMock(read=lambda: 'fake-namespace')
     open_mock = mocker.MagicMock(__enter__=lambda x: file_mock)
     builtins_open = mocker.patch('builtins.open')
     builtins_open.return_value = open_mock
-    main_sleep = mocker.patch('main.sleep')
+    waiter_sleep = mocker.patch('k8s_waiter.sleep')
 
     fake_k8s_client = mocker.MagicMock()
     mocker.patch('kubernetes.client.BatchV1Api').return_value = fake_k8s_client
-    mocker.patch.object(fake_k8s_client, 'read_namespaced_job').return_value = V1Job(
-        status=V1JobStatus(active=0, succeeded=1))
+    mocker.patch.object(fake_k8s_client, 'list_namespaced_job').return_value = _job_list(
+        V1JobStatus(active=0, succeeded=1))
+    fake_watch = FakeWatch([])
+    mocker.patch('k8s_waiter.watch.Watch', new=fake_watch)
 
     class MainMock:
         kubernetes_config_load_mock = kubernetes_config_load
         builtins_open_mock = builtins_open
         kubernetes_client_mock = fake_k8s_client
-        time_sleep_mock = main_sleep
+        time_sleep_mock = waiter_sleep
+        watch = fake_watch
 
     return MainMock
 
 
 def test_main(mocker, main_mock):
-    job_status_history = [
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=0, succeeded=2))
+    mocker.patch.object(main_mock.kubernetes_client_mock, 'list_namespaced_job').return_value = _job_list(
+        V1JobStatus(active=1, succeeded=1))
+    main_mock.watch.streams = [
+        [{'type': 'MODIFIED', 'object': _job(V1JobStatus(active=1, succeeded=1), resource_version='2')}],
+        [{'type': 'MODIFIED', 'object': _job(V1JobStatus(active=0, succeeded=2), resource_version='3')}]
     ]
 
-    mocker.patch.object(main_mock.kubernetes_client_mock, 'read_namespaced_job').side_effect = job_status_history
-
     main()
 
     assert main_mock.kubernetes_config_load_mock.call_count == 1
     assert main_mock.builtins_open_mock.call_count == 2
-    assert main_mock.time_sleep_mock.call_count == len(job_status_history) - 1
+    assert main_mock.kubernetes_client_mock.list_namespaced_job.call_count == 1
+    assert main_mock.watch.stream_kwargs[0]['field_selector'] == f'metadata.name={FAKE_JOB_NAME}'
+    assert main_mock.time_sleep_mock.call_count == 0
 
 
 def test_main_failed_pods(mocker, main_mock):
-    job_status_history = [
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=0, succeeded=1, failed=1))
+    mocker.patch.object(main_mock.kubernetes_client_mock, 'list_namespaced_job').return_value = _job_list(
+        V1JobStatus(active=1, succeeded=1))
+    main_mock.watch.streams = [
+        [{'type': 'MODIFIED', 'object': _job(V1JobStatus(active=0, succeeded=1, failed=1), resource_version='2')}]
     ]
 
-    mocker.patch.object(main_mock.kubernetes_client_mock, 'read_namespaced_job').side_effect = job_status_history
-
     main()
 
     assert main_mock.kubernetes_config_load_mock.call_count == 1
     assert main_mock.builtins_open_mock.call_count == 2
-    assert main_mock.time_sleep_mock.call_count == len(job_status_history) - 1
+
+
+def test_main_job_already_finished(main_mock):
+    main()
+
+    assert main_mock.builtins_open_mock.call_count == 2
+    assert main_mock.watch.stream_kwargs == []
 
 
 def test_main_end_hook_already_created(mocker, main_mock):
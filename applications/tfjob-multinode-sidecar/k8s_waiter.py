@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# The same module is used by tf-serving-sidecar and tfjob-multinode-sidecar - keep both copies in sync.
+
+from http import HTTPStatus
+import logging as log
+from time import sleep
+from typing import Any, Callable, Dict, Optional
+
+from kubernetes import watch
+
+WATCH_TIMEOUT = 300  # seconds, after which a watch is restarted from the last seen resource version
+INITIAL_BACKOFF = 1  # seconds
+MAX_BACKOFF = 30  # seconds
+
+
+def wait_for(list_function: Callable, check: Callable[[Dict[str, Any]], Optional[Any]], namespace: str,
+             label_selector: str = None, field_selector: str = None, watch_timeout: int = WATCH_TIMEOUT,
+             initial_backoff: float = INITIAL_BACKOFF, max_backoff: float = MAX_BACKOFF,
+             watch_factory: Callable = None) -> Any:
+    """
+    Waits until objects listed by list_function meet a condition. Objects are listed once and then kept up to date
+    by a watch resumed from the last seen resource version, instead of listing them periodically. When listing
+    or watching fails, objects are listed again after a delay doubled after every consecutive failure.
+    :param list_function: function listing objects in a namespace, e.g. CoreV1Api().list_namespaced_pod
+    :param check: function called with current objects indexed by names, every time they change - waiting ends,
+                  when it returns a value other than None
+    :param namespace: namespace of objects
+    :param label_selector: label selector of objects
+    :param field_selector: field selector of objects
+    :param watch_timeout: time in seconds after which a watch is restarted
+    :param initial_backoff: delay in seconds of listing objects after the first failure
+    :param max_backoff: maximal delay in seconds of listing objects after a failure
+    :param watch_factory: function creating a watch, kubernetes.watch.Watch by default
+    :return: value returned by check
+    """
+    watch_factory = watch_factory or watch.Watch
+    selectors = {key: value for key, value in (('label_selector', label_selector),
+                                               ('field_selector', field_selector)) if value}
+    backoff = initial_backoff
+    resource_version = None
+    objects: Dict[str, Any] = {}
+
+    while True:
+        try:
+            if resource_version is None:
+                object_list = list_function(namespace=namespace, **selectors)
+                objects = {item.metadata.name: item for item in object_list.items}
+                resource_version = object_list.metadata.resource_version
+                result = check(objects)
+                if result is not None:
+                    return result
+
+            for event in watch_factory().stream(list_function, namespace=namespace,
+                                                resource_version=resource_version,
+                                                timeout_seconds=watch_timeout, **selectors):
+                if event['type'] == 'ERROR':
+                    if event['raw_object'].get('code') != HTTPStatus.GONE:
+                        raise RuntimeError(f'error during watching objects: {event["raw_object"]}')
+                    log.debug('resource version expired, listing objects again')
+                    resource_version = None
+                    break
+
+                changed_object = event['object']
+                if event['type'] == 'DELETED':
+                    objects.pop(changed_object.metadata.name, None)
+                else:
+                    objects[changed_object.metadata.name] = changed_object
+                resource_version = changed_object.metadata.resource_version
+                backoff = initial_backoff
+
+                result = check(objects)
+                if result is not None:
+                    return result
+        except Exception:
+            log.exception(f'error during listing or watching objects, retrying in {backoff} seconds')
+            resource_version = None
+            sleep(backoff)
+            backoff = min(backoff * 2, max_backoff)
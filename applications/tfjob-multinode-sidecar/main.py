@@ -17,11 +17,13 @@
 import logging as log
 # noinspection PyProtectedMember
 from os import getenv, _exit
-from time import sleep
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from kubernetes import client, config
-from kubernetes.client import V1Pod, V1ObjectMeta, V1PodList, V1PodStatus, V1ContainerStatus, V1ContainerState, V1ContainerStateTerminated
+from kubernetes.client import V1Pod, V1ObjectMeta, V1PodStatus, V1ContainerStatus, V1ContainerState, \
+    V1ContainerStateTerminated
+
+from k8s_waiter import wait_for
 
 
 JOB_SUCCESS_CONDITION = "Succeeded"
@@ -86,28 +88,36 @@ def main():
 
     log.info("initialization succeeded")
 
-    while True:
-        my_run_pods: V1PodList = v1.list_namespaced_pod(namespace=my_namespace, label_selector=f"runName={my_run_name}")
-
-        for pod in my_run_pods.items:
-            pod_typed: V1Pod = pod
-            pod_status: V1PodStatus = pod_typed.status
-            container_statuses: List[V1ContainerStatus] = pod_status.container_statuses
-            for status in container_statuses:
-                container_name: str = status.name
-                if container_name != "tensorflow":
-                    continue
-
-                container_state: V1ContainerState = status.state
-                container_state_terminated: V1ContainerStateTerminated = container_state.terminated
-                if container_state_terminated:
-                    exit_code = container_state_terminated.exit_code
-                    log.info(f"Tensorflow container of pod: {pod_typed.metadata.name} exited with code: {exit_code}, creating END hook")
-                    open("/pod-data/END", 'a').close()
-                    log.info("exiting...")
-                    _exit(exit_code)
-        log.info("No exited tensorflow container found")
-        sleep(1)
+    pod_name, exit_code = wait_for(list_function=v1.list_namespaced_pod, check=find_exited_tensorflow_container,
+                                   namespace=my_namespace, label_selector=f"runName={my_run_name}")
+
+    log.info(f"Tensorflow container of pod: {pod_name} exited with code: {exit_code}, creating END hook")
+    open("/pod-data/END", 'a').close()
+    log.info("exiting...")
+    _exit(exit_code)
+
+
+def find_exited_tensorflow_container(my_run_pods: Dict[str, V1Pod]) -> Optional[Tuple[str, int]]:
+    """
+    :return: name of a pod with a terminated tensorflow container and exit code of the container, None if all
+             tensorflow containers are still running
+    """
+    for pod in my_run_pods.values():
+        pod_typed: V1Pod = pod
+        pod_status: V1PodStatus = pod_typed.status
+        # container statuses are missing until containers of a pod are created
+        container_statuses: List[V1ContainerStatus] = (pod_status.container_statuses if pod_status else None) or []
+        for status in container_statuses:
+            container_name: str = status.name
+            if container_name != "tensorflow":
+                continue
+
+            container_state: V1ContainerState = status.state
+            container_state_terminated: V1ContainerStateTerminated = container_state.terminated
+            if container_state_terminated:
+                return pod_typed.metadata.name, container_state_terminated.exit_code
+    log.info("No exited tensorflow container found")
+    return None
 
 
 if __name__ == '__main__':